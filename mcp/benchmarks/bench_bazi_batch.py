@@ -0,0 +1,112 @@
+"""八字批量分析基准.
+
+随机生成 N 条出生记录（男女各半），分别以逐条串行（build_bazi + 两两
+_analyze_compatibility）和批量接口（分块分发到进程池）完成排盘与全部男女合婚，
+校验两者评分一致，并输出耗时与首块结果的返回时间。每轮开始前清空八字缓存。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_bazi_batch [--sizes 2,5,10,20,50,100,200]
+"""
+
+import argparse
+import asyncio
+import random
+import time
+
+from src.mcp.tool_executor import ExecutionPolicy, get_tool_executor
+from src.mcp.tools.bazi.analysis_cache import get_bazi_cache
+from src.mcp.tools.bazi.batch import (
+    BirthRecord,
+    compatibility_pairs,
+    iter_batch_analysis,
+)
+from src.mcp.tools.bazi.bazi_calculator import get_bazi_calculator
+from src.mcp.tools.bazi.marriage_tools import _analyze_compatibility
+
+
+def _random_records(rng: random.Random, size: int):
+    records = []
+    for i in range(size):
+        solar = (
+            f"{rng.randint(1960, 2005)}-{rng.randint(1, 12):02d}-"
+            f"{rng.randint(1, 28):02d} {rng.randrange(24):02d}:{rng.randrange(60):02d}"
+        )
+        records.append(
+            BirthRecord(name=f"记录{i + 1}", gender=i % 2, solar_datetime=solar)
+        )
+    return records
+
+
+def _serial(records):
+    calculator = get_bazi_calculator()
+    charts = [
+        calculator.build_bazi(solar_datetime=r.solar_datetime, gender=r.gender)
+        for r in records
+    ]
+    return {
+        (m, f): _analyze_compatibility(charts[m], charts[f])["overall_score"]
+        for m, f in compatibility_pairs(records)
+    }
+
+
+async def _batch(records, policy):
+    scores = {}
+    first_chunk = None
+    start = time.perf_counter()
+    async for kind, items in iter_batch_analysis(records, policy=policy):
+        if first_chunk is None:
+            first_chunk = time.perf_counter() - start
+        if kind == "合婚":
+            scores.update({(i["男方"], i["女方"]): i["综合评分"] for i in items})
+    return scores, first_chunk
+
+
+def _clear_caches():
+    get_bazi_cache().clear()
+    # 进程池的工作进程各有一份缓存，关闭工作池，下次使用时重建
+    get_tool_executor().shutdown(wait=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="2,5,10,20,50,100,200")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # 预热：导入模块并拉起进程池，避免计入首轮
+    asyncio.run(_batch(_random_records(rng, 2), ExecutionPolicy.PROCESS))
+
+    print(
+        f"{'N':>5}{'合婚对数':>8}{'串行':>12}{'批量':>12}{'首块返回':>10}{'加速比':>8}"
+    )
+    mismatches = 0
+    for size in (int(s) for s in args.sizes.split(",")):
+        records = _random_records(rng, size)
+
+        _clear_caches()
+        start = time.perf_counter()
+        expected = _serial(records)
+        serial = time.perf_counter() - start
+
+        _clear_caches()
+        asyncio.run(_batch(_random_records(rng, 2), ExecutionPolicy.PROCESS))
+        start = time.perf_counter()
+        actual, first_chunk = asyncio.run(_batch(records, None))
+        batch = time.perf_counter() - start
+
+        if actual != expected:
+            mismatches += 1
+            print(f"N={size} 批量结果与串行不一致")
+        print(
+            f"{size:>5}{len(expected):>12}{serial * 1000:>12.1f}ms"
+            f"{batch * 1000:>10.1f}ms{first_chunk * 1000:>10.1f}ms"
+            f"{serial / batch:>9.2f}x"
+        )
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
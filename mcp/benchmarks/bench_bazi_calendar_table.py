@@ -0,0 +1,130 @@
+"""八字引擎预计算历表的差分校验与基准.
+
+对随机时刻以及交节前后、晚子时、除夕等边界时刻，分别用预计算表和 lunar_python
+执行引擎的公历/农历互转、排八字、黄历、详细农历信息、起运年龄和生肖计算，
+要求结果完全一致，并输出两种方式的单次调用耗时。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_bazi_calendar_table [--samples 300] [--seed 1]
+"""
+
+import argparse
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from unittest import mock
+
+from src.mcp.tools.bazi import engine as engine_module
+from src.mcp.tools.bazi.bazi_calculator import get_bazi_calculator
+from src.mcp.tools.bazi.calendar_table import CalendarTable, get_calendar_table
+from src.mcp.tools.bazi.models import SolarTime
+
+
+@contextmanager
+def _lunar_python_only():
+    """
+    关闭预计算表，所有调用走 lunar_python.
+    """
+    with mock.patch.object(engine_module, "get_table_lunar", lambda *a: None):
+        with mock.patch.object(CalendarTable, "solar_date", lambda *a: None):
+            yield
+
+
+def _random_times(rng: random.Random, samples: int):
+    table = get_calendar_table()
+    start = datetime(1900, 1, 1)
+    times = []
+    for _ in range(samples):
+        dt = start + timedelta(seconds=rng.randrange(201 * 365 * 86400))
+        times.append(dt.replace(year=min(dt.year, 2100)))
+
+    # 交节时刻前后一秒、晚子时
+    for _ in range(samples // 4):
+        year = rng.randint(1900, 2100)
+        when = table.jieqi_datetime(year, rng.randrange(24))
+        times += [when - timedelta(seconds=1), when, when + timedelta(seconds=1)]
+        times.append(when.replace(hour=23, minute=rng.randrange(60)))
+
+    # 除夕与正月初一
+    for year in rng.sample(range(1901, 2100), max(1, samples // 20)):
+        new_year = table.solar_date(year, 1, 1)
+        for day in (-2, -1, 0):
+            d = new_year + timedelta(days=day)
+            times.append(datetime(d.year, d.month, d.day, 12))
+    return [
+        SolarTime(t.year, t.month, t.day, t.hour, t.minute, t.second) for t in times
+    ]
+
+
+def _run_all(engine, calculator, solar_time: SolarTime, gender: int):
+    lunar_time = engine.solar_to_lunar(solar_time)
+    eight_char = engine.build_eight_char(solar_time)
+    return (
+        lunar_time,
+        engine.lunar_to_solar(lunar_time),
+        str(eight_char),
+        engine.get_chinese_calendar(solar_time),
+        engine.get_detailed_lunar_info(solar_time),
+        calculator._calculate_start_age(solar_time, eight_char, gender),
+        calculator._get_zodiac_by_lunar_year(solar_time),
+    )
+
+
+def _time_call(func, cases) -> float:
+    start = time.perf_counter()
+    for case in cases:
+        func(case)
+    return (time.perf_counter() - start) / len(cases) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    calculator = get_bazi_calculator()
+    engine = calculator.engine
+    cases = _random_times(rng, args.samples)
+
+    mismatches = 0
+    for i, solar_time in enumerate(cases):
+        actual = _run_all(engine, calculator, solar_time, i % 2)
+        with _lunar_python_only():
+            expected = _run_all(engine, calculator, solar_time, i % 2)
+        if actual != expected:
+            mismatches += 1
+            for a, e in zip(actual, expected):
+                if a != e:
+                    print(f"不一致: {solar_time}\n  lunar_python: {e}\n  预计算表: {a}")
+    print(f"用例数: {len(cases)}, 不一致: {mismatches}")
+
+    lunar_cases = [engine.solar_to_lunar(s) for s in cases]
+    eight_chars = [engine.build_eight_char(s) for s in cases]
+    benchmarks = [
+        ("solar_to_lunar", engine.solar_to_lunar, cases),
+        ("lunar_to_solar", engine.lunar_to_solar, lunar_cases),
+        ("build_eight_char", engine.build_eight_char, cases),
+        ("get_chinese_calendar", engine.get_chinese_calendar, cases),
+        ("get_detailed_lunar_info", engine.get_detailed_lunar_info, cases),
+        (
+            "_calculate_start_age",
+            lambda p: calculator._calculate_start_age(p[0], p[1], 1),
+            list(zip(cases, eight_chars)),
+        ),
+    ]
+    print(f"{'调用':<26}{'lunar_python':>14}{'预计算表':>12}")
+    for name, func, inputs in benchmarks:
+        with _lunar_python_only():
+            legacy = _time_call(func, inputs)
+        table = _time_call(func, inputs)
+        print(f"{name:<26}{legacy:>12.3f}ms{table:>10.3f}ms")
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
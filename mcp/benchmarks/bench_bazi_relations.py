@@ -0,0 +1,298 @@
+"""八字干支关系整数编码查表基准.
+
+随机生成若干命盘（默认 10 万个，四柱均为合法六十甲子），对每个命盘计算地支
+三合/六合/三会/冲/刑/害、天干与藏干十神分布、长生十二宫、有利结婚年份（含婚姻
+分析工具实际传入、取不到地支名的排盘形式），以及与下一个命盘的生肖、日柱相配。分别用字符串字典查找（原实现）和整数编码查表两种方式计算，
+校验结果一致并输出耗时。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_bazi_relations [--charts 100000] [--seed 1]
+"""
+
+import argparse
+import random
+import time
+
+from src.mcp.tools.bazi import marriage_tools
+from src.mcp.tools.bazi.marriage_analyzer import get_marriage_analyzer
+from src.mcp.tools.bazi.professional_analyzer import get_professional_analyzer
+from src.mcp.tools.bazi.professional_data import (
+    CHANGSHENG_TWELVE,
+    GAN,
+    TAOHUA_XING,
+    SHENG_XIAO,
+    TEN_GODS,
+    TEN_GODS_MAP,
+    YIMA_XING,
+    ZHI,
+    ZHI_CANG_GAN,
+    ZHI_CHONG,
+    ZHI_CODE,
+    ZHI_HAI,
+    ZHI_LIU_HE,
+    ZHI_LIUHE,
+    ZHI_RELATIONS,
+    ZHI_SAN_HE,
+    ZHI_SAN_HUI,
+    ZHI_SANHE,
+    ZHI_XING,
+    analyze_zhi_codes,
+    encode_pillars,
+)
+
+# ==================== 字符串查找的原实现 ====================
+
+
+def _legacy_zhi_relation(zhi1, zhi2, relation_type):
+    if zhi1 not in ZHI_RELATIONS:
+        return False
+    relation = ZHI_RELATIONS[zhi1].get(relation_type)
+    if relation is None:
+        return False
+    if isinstance(relation, tuple):
+        return zhi2 in relation
+    return zhi2 == relation
+
+
+def _legacy_zhi_combinations(zhi_list):
+    result = {
+        "sanhe": [],
+        "liuhe": [],
+        "sanhui": [],
+        "chong": [],
+        "xing": [],
+        "hai": [],
+    }
+    for combo, element in ZHI_SAN_HE.items():
+        if all(zhi in zhi_list for zhi in combo):
+            result["sanhe"].append(f"{combo}合{element}")
+    for i, zhi1 in enumerate(zhi_list):
+        for zhi2 in zhi_list[i + 1 :]:
+            combo = "".join(sorted([zhi1, zhi2]))
+            if combo in ZHI_LIU_HE:
+                result["liuhe"].append(f"{zhi1}{zhi2}合{ZHI_LIU_HE[combo]}")
+    for combo, element in ZHI_SAN_HUI.items():
+        if all(zhi in zhi_list for zhi in combo):
+            result["sanhui"].append(f"{combo}会{element}")
+    for i, zhi1 in enumerate(zhi_list):
+        for zhi2 in zhi_list[i + 1 :]:
+            if _legacy_zhi_relation(zhi1, zhi2, "冲"):
+                result["chong"].append(f"{zhi1}冲{zhi2}")
+            if _legacy_zhi_relation(zhi1, zhi2, "刑"):
+                result["xing"].append(f"{zhi1}刑{zhi2}")
+            if _legacy_zhi_relation(zhi1, zhi2, "害"):
+                result["hai"].append(f"{zhi1}害{zhi2}")
+    return result
+
+
+def _legacy_ten_gods(day_master, gan_list, zhi_list):
+    ten_gods = {name: [] for name in TEN_GODS}
+    pillar_names = ["年干", "月干", "日干", "时干"]
+    for i, gan in enumerate(gan_list):
+        if gan == day_master:
+            continue
+        ten_god = TEN_GODS_MAP.get((day_master, gan), "未知")
+        if ten_god in ten_gods:
+            ten_gods[ten_god].append(f"{pillar_names[i]}{gan}")
+    pillar_names = ["年支", "月支", "日支", "时支"]
+    for i, zhi in enumerate(zhi_list):
+        for gan, strength in ZHI_CANG_GAN.get(zhi, {}).items():
+            if gan == day_master:
+                continue
+            ten_god = TEN_GODS_MAP.get((day_master, gan), "未知")
+            if ten_god in ten_gods:
+                ten_gods[ten_god].append(f"{pillar_names[i]}{zhi}藏{gan}({strength})")
+    return ten_gods
+
+
+def _legacy_changsheng(day_master, zhi_list):
+    pillar_names = ["年支", "月支", "日支", "时支"]
+    return [
+        f"{pillar_names[i]}{zhi}：{CHANGSHENG_TWELVE.get(day_master, {}).get(zhi, '未知')}"
+        for i, zhi in enumerate(zhi_list)
+    ]
+
+
+def _legacy_zodiac(male_zhi, female_zhi):
+    def paired(pairs):
+        return (male_zhi, female_zhi) in pairs or (female_zhi, male_zhi) in pairs
+
+    def grouped(groups):
+        return any(male_zhi in group and female_zhi in group for group in groups)
+
+    if paired(ZHI_LIUHE):
+        return "六合"
+    if grouped(ZHI_SANHE):
+        return "三合"
+    if paired(ZHI_CHONG):
+        return "相冲"
+    if grouped(ZHI_XING):
+        return "相刑"
+    if paired(ZHI_HAI):
+        return "相害"
+    return "平和"
+
+
+def _legacy_pillar(male_pillar, female_pillar):
+    if male_pillar == female_pillar:
+        return {"score": 55, "description": "日柱相同，共通点多但需要差异化解"}
+    male_gan, male_zhi = male_pillar
+    female_gan, female_zhi = female_pillar
+    score = 70
+    gan_relation = TEN_GODS_MAP.get((male_gan, female_gan), "未知")
+    if gan_relation in ["正财", "偏财", "正官", "七杀"]:
+        score += 10
+    if (male_zhi, female_zhi) in ZHI_LIUHE or (female_zhi, male_zhi) in ZHI_LIUHE:
+        score += 15
+    elif (male_zhi, female_zhi) in ZHI_CHONG or (female_zhi, male_zhi) in ZHI_CHONG:
+        score -= 20
+    return {
+        "score": min(95, max(30, score)),
+        "description": f"日柱组合分析：{gan_relation}关系",
+    }
+
+
+def _legacy_favorable_years(eight_char_data):
+    day_zhi, month_zhi, year_zhi = (
+        eight_char_data.get(pillar, {}).get("earth_branch", {}).get("name", "")
+        for pillar in ("day", "month", "year")
+    )
+    favorable_branches = []
+    if day_zhi in ZHI_RELATIONS and ZHI_RELATIONS[day_zhi].get("六", ""):
+        favorable_branches.append(
+            {"zhi": ZHI_RELATIONS[day_zhi]["六"], "reason": "日支六合", "priority": "高"}
+        )
+    for groups, name, kind, priority in (
+        (ZHI_SAN_HE, "三合", "局", "高"),
+        (ZHI_SAN_HUI, "三会", "方", "中"),
+    ):
+        for combo, element in groups.items():
+            if day_zhi in combo:
+                for zhi in combo:
+                    if zhi != day_zhi:
+                        favorable_branches.append(
+                            {
+                                "zhi": zhi,
+                                "reason": f"{name}{element}{kind}",
+                                "priority": priority,
+                            }
+                        )
+    for table, reason in ((TAOHUA_XING, "桃花星"), (YIMA_XING, "驿马星")):
+        if table.get(day_zhi, ""):
+            favorable_branches.append(
+                {"zhi": table[day_zhi], "reason": reason, "priority": "中"}
+            )
+    for zhi, reason, priority in (
+        (month_zhi, "月支六合", "中"),
+        (year_zhi, "年支六合", "低"),
+    ):
+        if zhi in ZHI_RELATIONS and ZHI_RELATIONS[zhi].get("六", ""):
+            favorable_branches.append(
+                {"zhi": ZHI_RELATIONS[zhi]["六"], "reason": reason, "priority": priority}
+            )
+    unique_branches = {}
+    for branch in favorable_branches:
+        if branch["zhi"] not in unique_branches or branch["priority"] == "高":
+            unique_branches[branch["zhi"]] = branch
+    priority_order = {"高": 1, "中": 2, "低": 3}
+    return [
+        f"{branch['zhi']}年({branch['reason']})"
+        for branch in sorted(
+            unique_branches.values(), key=lambda x: priority_order[x["priority"]]
+        )
+    ]
+
+
+def _eight_char(chart):
+    """
+    婚姻分析的八字数据：带地支名的形式，以及工具实际传入的排盘形式（没有
+    earth_branch 字段，地支名取到空串）.
+    """
+    gan_list, zhi_list = chart
+    pillars = ("year", "month", "day", "hour")
+    return (
+        {p: {"earth_branch": {"name": zhi}} for p, zhi in zip(pillars, zhi_list)},
+        {
+            p: {"天干": {"天干": gan}, "地支": {"地支": zhi}}
+            for p, gan, zhi in zip(pillars, gan_list, zhi_list)
+        },
+    )
+
+
+def _legacy_chart(chart, partner):
+    gan_list, zhi_list = chart
+    day_master = gan_list[2]
+    return (
+        [_legacy_favorable_years(data) for data in _eight_char(chart)],
+        _legacy_zhi_combinations(zhi_list),
+        _legacy_ten_gods(day_master, gan_list, zhi_list),
+        _legacy_changsheng(day_master, zhi_list),
+        _legacy_zodiac(zhi_list[0], partner[1][0]),
+        _legacy_pillar(gan_list[2] + zhi_list[2], partner[0][2] + partner[1][2]),
+    )
+
+
+# ==================== 整数编码查表 ====================
+
+_analyzer = get_professional_analyzer()
+_marriage = get_marriage_analyzer()
+
+
+def _coded_chart(chart, partner):
+    gan_list, zhi_list = chart
+    gan_codes, zhi_codes = encode_pillars(gan_list, zhi_list)
+    return (
+        [
+            _marriage._get_favorable_marriage_years(data, 1)
+            for data in _eight_char(chart)
+        ],
+        analyze_zhi_codes(zhi_codes),
+        _analyzer._analyze_ten_gods(gan_codes[2], gan_codes, zhi_codes),
+        _analyzer._analyze_changsheng(gan_codes[2], zhi_list, zhi_codes),
+        marriage_tools._analyze_zodiac_compatibility(
+            SHENG_XIAO[zhi_codes[0]], SHENG_XIAO[ZHI_CODE[partner[1][0]]]
+        )["relation"],
+        marriage_tools._analyze_pillar_compatibility(
+            gan_list[2] + zhi_list[2], partner[0][2] + partner[1][2]
+        ),
+    )
+
+
+def _random_charts(rng: random.Random, count: int):
+    charts = []
+    for _ in range(count):
+        cycles = [rng.randrange(60) for _ in range(4)]
+        charts.append(([GAN[c % 10] for c in cycles], [ZHI[c % 12] for c in cycles]))
+    return charts
+
+
+def _run(func, charts) -> tuple:
+    start = time.perf_counter()
+    results = [
+        func(chart, charts[(i + 1) % len(charts)]) for i, chart in enumerate(charts)
+    ]
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--charts", type=int, default=100_000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    charts = _random_charts(random.Random(args.seed), args.charts)
+    legacy, legacy_time = _run(_legacy_chart, charts)
+    coded, coded_time = _run(_coded_chart, charts)
+
+    mismatches = sum(1 for a, b in zip(legacy, coded) if a != b)
+    print(f"命盘数: {len(charts)}, 不一致: {mismatches}")
+    print(f"字符串查找: {legacy_time:.2f}s ({legacy_time / len(charts) * 1e6:.1f}us/盘)")
+    print(f"整数编码:   {coded_time:.2f}s ({coded_time / len(charts) * 1e6:.1f}us/盘)")
+    print(f"加速比: {legacy_time / coded_time:.2f}x")
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
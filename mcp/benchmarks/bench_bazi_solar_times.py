@@ -0,0 +1,118 @@
+"""BaziCalculator.get_solar_times 差分校验与基准.
+
+用旧的逐年逐日匹配实现（lunar_python 构造 Solar/Lunar/EightChar）与基于
+六十甲子周期 + 节气表的实现对比：随机抽取真实出生时刻的四柱以及完全随机的四柱，
+要求两者结果完全一致，并输出各自的单次查询耗时。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_bazi_solar_times [--samples 20] [--seed 1]
+"""
+
+import argparse
+import calendar
+import random
+import time
+
+from lunar_python import Solar
+
+from src.mcp.tools.bazi.professional_data import GAN, ZHI
+from src.mcp.tools.bazi.sexagenary import find_solar_times
+
+
+def _eight_char(year, month, day, hour, minute=0, second=0):
+    return Solar.fromYmdHms(year, month, day, hour, minute, second).getLunar().getEightChar()
+
+
+def _legacy_get_solar_times(bazi: str):
+    """
+    旧实现：1900-2099 年逐年、逐月、逐日、逐时辰构造 lunar_python 对象匹配.
+    """
+    year_p, month_p, day_p, hour_p = bazi.split(" ")
+    results = []
+    for year in range(1900, 2100):
+        year_pillars = {
+            (e.getYearGan(), e.getYearZhi())
+            for e in (
+                _eight_char(year, 1, 1, 0),
+                _eight_char(year, 6, 1, 0),
+                _eight_char(year, 12, 31, 23, 59, 59),
+            )
+        }
+        if (year_p[0], year_p[1]) not in year_pillars:
+            continue
+        for month in range(1, 13):
+            max_day = calendar.monthrange(year, month)[1]
+            month_pillars = set()
+            for day in (1, 8, 15, 22, 28):
+                e = _eight_char(year, month, min(day, max_day), 12)
+                month_pillars.add(e.getMonthGan() + e.getMonthZhi())
+            if month_p not in month_pillars:
+                continue
+            for day in range(1, max_day + 1):
+                e = _eight_char(year, month, day, 0)
+                if e.getDayGan() + e.getDayZhi() != day_p:
+                    continue
+                for hour in range(0, 24, 2):
+                    e = _eight_char(year, month, day, hour)
+                    if e.getTimeGan() + e.getTimeZhi() == hour_p:
+                        results.append(f"{year}-{month:02d}-{day:02d} {hour:02d}:00:00")
+                        if len(results) >= 20:
+                            return results
+    return results[:20]
+
+
+def _random_birth_bazi(rng: random.Random) -> str:
+    year = rng.randint(1900, 2099)
+    month = rng.randint(1, 12)
+    day = rng.randint(1, calendar.monthrange(year, month)[1])
+    e = _eight_char(year, month, day, rng.randint(0, 23), rng.randint(0, 59))
+    return " ".join([e.getYear(), e.getMonth(), e.getDay(), e.getTime()])
+
+
+def _random_pillars(rng: random.Random) -> str:
+    def pillar():
+        g = rng.randrange(10)
+        return GAN[g] + ZHI[(g + 2 * rng.randrange(6)) % 12]
+
+    return " ".join(pillar() for _ in range(4))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--samples", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cases = [_random_birth_bazi(rng) for _ in range(args.samples)]
+    cases += [_random_pillars(rng) for _ in range(args.samples)]
+
+    # 预先加载节气表，避免计入首次查询
+    find_solar_times(cases[0])
+
+    legacy_total = 0.0
+    indexed_total = 0.0
+    mismatches = 0
+    for bazi in cases:
+        start = time.perf_counter()
+        expected = _legacy_get_solar_times(bazi)
+        legacy_total += time.perf_counter() - start
+
+        start = time.perf_counter()
+        actual = find_solar_times(bazi)
+        indexed_total += time.perf_counter() - start
+
+        if actual != expected:
+            mismatches += 1
+            print(f"不一致: {bazi}\n  旧: {expected}\n  新: {actual}")
+
+    n = len(cases)
+    print(f"用例数: {n}, 不一致: {mismatches}")
+    print(f"旧实现平均: {legacy_total / n * 1000:.1f}ms/次")
+    print(f"新实现平均: {indexed_total / n * 1000:.3f}ms/次")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
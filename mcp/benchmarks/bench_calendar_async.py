@@ -0,0 +1,131 @@
+"""日程数据库异步访问层基准.
+
+模拟多个并发的日程工具调用（每个客户端依次添加事件并查询当天日程），同时运行
+一个每 10ms 醒来一次的心跳任务来测量事件循环的卡顿。分别比较：在事件循环中直接
+调用 CalendarDatabase（同步）、经异步访问层但每个写操作单独提交（max_batch=1）、
+经异步访问层组提交，输出总耗时、写入吞吐、提交次数与心跳的最大/P99 延迟。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_calendar_async [--clients 16] [--writes 50]
+    [--dir /path/on/sdcard]
+"""
+
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from src.mcp.tools.calendar.async_database import AsyncCalendarDatabase
+from src.mcp.tools.calendar.database import CalendarDatabase
+from src.mcp.tools.calendar.models import CalendarEvent
+
+BASE = datetime(2026, 3, 2)
+HEARTBEAT = 0.01
+
+
+def _event(client: int, index: int) -> dict:
+    # 每个事件占用不同的时间段，避免冲突检测拒绝写入
+    start = BASE + timedelta(minutes=(index * 1000 + client) * 30)
+    return CalendarEvent(
+        title=f"客户端{client} 事件{index}",
+        start_time=start.isoformat(),
+        end_time=(start + timedelta(minutes=20)).isoformat(),
+        category="工作",
+        event_id=f"event-{client}-{index}",
+    ).to_dict()
+
+
+async def _heartbeat(lags: list, stop: asyncio.Event):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT)
+        lags.append(time.perf_counter() - start - HEARTBEAT)
+
+
+async def _client_sync(db: CalendarDatabase, client: int, writes: int):
+    for index in range(writes):
+        event = _event(client, index)
+        db.add_event(event)
+        db.get_events(event["start_time"][:10], event["start_time"][:10] + "T23:59")
+        await asyncio.sleep(0)
+
+
+async def _client_async(adb: AsyncCalendarDatabase, client: int, writes: int):
+    for index in range(writes):
+        event = _event(client, index)
+        await adb.add_event(event)
+        await adb.get_events(
+            event["start_time"][:10], event["start_time"][:10] + "T23:59"
+        )
+
+
+async def _run(mode: str, db_file: str, clients: int, writes: int) -> dict:
+    db = CalendarDatabase(db_file)
+    adb = AsyncCalendarDatabase(db, max_batch=1 if mode == "single" else 64)
+    lags = []
+    stop = asyncio.Event()
+    heartbeat = asyncio.create_task(_heartbeat(lags, stop))
+    await asyncio.sleep(HEARTBEAT * 2)
+
+    start = time.perf_counter()
+    if mode == "sync":
+        tasks = [_client_sync(db, client, writes) for client in range(clients)]
+    else:
+        tasks = [_client_async(adb, client, writes) for client in range(clients)]
+    await asyncio.gather(*tasks)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await heartbeat
+    stats = adb.stats()
+    adb.close()
+    count = len(db.get_events())
+    db.close()
+
+    lags.sort()
+    return {
+        "elapsed": elapsed,
+        "count": count,
+        "commits": stats["commits"] if mode != "sync" else count,
+        "max_lag": lags[-1] * 1000 if lags else 0.0,
+        "p99_lag": lags[int(len(lags) * 0.99)] * 1000 if lags else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--writes", type=int, default=50)
+    parser.add_argument("--dir", help="数据库所在目录（默认系统临时目录）")
+    args = parser.parse_args()
+
+    total = args.clients * args.writes
+    print(f"客户端数: {args.clients}，每个客户端写入 {args.writes} 个事件")
+    print(
+        f"{'模式':<14}{'总耗时':>10}{'写入/秒':>10}{'提交次数':>10}"
+        f"{'最大卡顿':>10}{'P99卡顿':>10}"
+    )
+    modes = [("sync", "同步直接调用"), ("single", "异步逐条提交"), ("group", "异步组提交")]
+    failed = False
+    for mode, label in modes:
+        with tempfile.TemporaryDirectory(dir=args.dir) as tmp:
+            result = asyncio.run(
+                _run(mode, os.path.join(tmp, "calendar.db"), args.clients, args.writes)
+            )
+        if result["count"] != total:
+            failed = True
+            print(f"{label} 写入数不一致: {result['count']} != {total}")
+        print(
+            f"{label:<12}{result['elapsed']:>10.2f}s"
+            f"{total / result['elapsed']:>10.0f}{result['commits']:>10}"
+            f"{result['max_lag']:>8.1f}ms{result['p99_lag']:>8.1f}ms"
+        )
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
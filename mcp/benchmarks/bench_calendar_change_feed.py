@@ -0,0 +1,106 @@
+"""日程跨进程变更通知基准.
+
+在临时数据库中写入若干事件，由一个子进程（直接用 sqlite3，模拟另一份日程实现）
+以随机间隔逐个修改事件，本进程分别用 inotify 唤醒和定时检查数据版本两种方式订阅
+变更日志，校验每次修改都收到了通知，输出从子进程提交到本进程收到回调的延迟。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_calendar_change_feed [--writes 50]
+    [--interval 1.0]
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from src.mcp.tools.calendar.change_feed import ChangeFeed
+from src.mcp.tools.calendar.database import CalendarDatabase
+from src.mcp.tools.calendar.models import CalendarEvent
+
+# 子进程：逐个修改事件，每次提交后输出 "事件ID 提交时刻"（time.monotonic）
+_WRITER = """
+import random, sqlite3, sys, time
+conn = sqlite3.connect(sys.argv[1], timeout=5.0)
+rng = random.Random(1)
+for i in range(int(sys.argv[2])):
+    time.sleep(rng.uniform(0.02, 0.1))
+    conn.execute("UPDATE events SET title = 'updated' WHERE id = ?", (f"event-{i}",))
+    conn.commit()
+    print(f"event-{i} {time.monotonic()}", flush=True)
+"""
+
+
+def _run(db_file: str, writes: int, use_inotify: bool, interval: float) -> list:
+    received = {}
+    done = threading.Event()
+
+    def on_change(event_ids):
+        now = time.monotonic()
+        for event_id in event_ids or []:
+            received.setdefault(event_id, now)
+        if len(received) >= writes:
+            done.set()
+
+    feed = ChangeFeed(db_file, poll_interval=interval, use_inotify=use_inotify)
+    feed.subscribe(on_change)
+    output = subprocess.run(
+        [sys.executable, "-c", _WRITER, db_file, str(writes)],
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    done.wait(interval * 2 + 1)
+    feed.close()
+
+    latencies = []
+    for line in output.splitlines():
+        event_id, committed = line.split()
+        if event_id in received:
+            latencies.append((received[event_id] - float(committed)) * 1000)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--writes", type=int, default=50)
+    parser.add_argument("--interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    print(f"子进程修改 {args.writes} 个事件")
+    print(f"{'订阅方式':<16}{'收到':>6}{'中位延迟':>12}{'P90延迟':>12}{'最大延迟':>12}")
+    failed = False
+    for use_inotify, label in ((True, "inotify 唤醒"), (False, "定时检查")):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_file = os.path.join(tmp, "calendar.db")
+            db = CalendarDatabase(db_file)
+            for i in range(args.writes):
+                db.add_event(
+                    CalendarEvent(
+                        title=f"事件{i}",
+                        start_time=f"2026-03-{i % 28 + 1:02d}T{i // 28:02d}:00:00",
+                        end_time=f"2026-03-{i % 28 + 1:02d}T{i // 28:02d}:30:00",
+                        event_id=f"event-{i}",
+                    ).to_dict()
+                )
+            latencies = sorted(_run(db_file, args.writes, use_inotify, args.interval))
+            db.close()
+        if len(latencies) != args.writes:
+            failed = True
+        median = latencies[len(latencies) // 2] if latencies else 0.0
+        p90 = latencies[int(len(latencies) * 0.9)] if latencies else 0.0
+        worst = latencies[-1] if latencies else 0.0
+        print(
+            f"{label:<14}{len(latencies):>6}{median:>10.1f}ms"
+            f"{p90:>10.1f}ms{worst:>10.1f}ms"
+        )
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""日程数据库连接池基准.
+
+在临时目录中分别用连接池（WAL 长连接）和原实现（每次操作新建并关闭连接）
+执行事件的添加、查询、更新，以及提醒服务每轮检查（查询待发送提醒 + 清理过期
+标志）的开销，输出每次操作的平均耗时。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_calendar_db [--events 500] [--loops 200]
+"""
+
+import argparse
+import asyncio
+import os
+import sqlite3
+import tempfile
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from src.mcp.tools.calendar.database import CalendarDatabase
+from src.mcp.tools.calendar.reminder_service import CalendarReminderService
+
+
+class _PerOperationDatabase(CalendarDatabase):
+    """
+    原实现：每次操作新建连接，用完即关闭.
+    """
+
+    @contextmanager
+    def _get_connection(self):
+        conn = sqlite3.connect(self.db_file)
+        conn.row_factory = sqlite3.Row
+        try:
+            yield conn
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+
+def _events(count: int):
+    base = datetime.now().replace(minute=0, second=0, microsecond=0) + timedelta(days=1)
+    events = []
+    for i in range(count):
+        start = base + timedelta(hours=i)
+        now = datetime.now().isoformat()
+        events.append(
+            {
+                "id": str(uuid.uuid4()),
+                "title": f"会议{i}",
+                "start_time": start.isoformat(),
+                "end_time": (start + timedelta(minutes=30)).isoformat(),
+                "description": "",
+                "category": "工作",
+                "reminder_minutes": 15,
+                "reminder_time": (start - timedelta(minutes=15)).isoformat(),
+                "reminder_sent": False,
+                "created_at": now,
+                "updated_at": now,
+            }
+        )
+    return events
+
+
+def _per_op(func, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        func(item)
+    return (time.perf_counter() - start) / len(items) * 1000
+
+
+def _run(db: CalendarDatabase, events, loops: int):
+    service = CalendarReminderService(db)
+
+    async def reminder_rounds() -> float:
+        start = time.perf_counter()
+        for _ in range(loops):
+            await service._check_and_send_reminders()
+            await service._cleanup_expired_reminders()
+        return (time.perf_counter() - start) / loops * 1000
+
+    def get_day(event):
+        day = event["start_time"][:10]
+        return db.get_events(f"{day}T00:00:00", f"{day}T23:59:59")
+
+    return {
+        "add_event": _per_op(db.add_event, events),
+        "get_events": _per_op(get_day, events),
+        "get_event_by_id": _per_op(lambda e: db.get_event_by_id(e["id"]), events),
+        "update_event": _per_op(
+            lambda e: db.update_event(e["id"], description="已更新"), events
+        ),
+        "提醒检查一轮": asyncio.run(reminder_rounds()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--loops", type=int, default=200)
+    args = parser.parse_args()
+
+    events = _events(args.events)
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy = _run(
+            _PerOperationDatabase(os.path.join(tmp, "legacy.db")), events, args.loops
+        )
+        pooled_db = CalendarDatabase(os.path.join(tmp, "pooled.db"))
+        pooled = _run(pooled_db, events, args.loops)
+        pooled_db.close()
+
+    print(f"{'操作':<18}{'原实现':>12}{'连接池':>12}{'加速比':>8}")
+    for name in legacy:
+        print(
+            f"{name:<18}{legacy[name]:>10.3f}ms{pooled[name]:>10.3f}ms"
+            f"{legacy[name] / pooled[name]:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
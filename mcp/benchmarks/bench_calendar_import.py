@@ -0,0 +1,142 @@
+"""日程批量导入导出基准.
+
+生成 N 个随机事件（默认 5 万个，时间互不重叠）的 ICS 与 JSONL 文件，分别用
+原有接口（整个文件读入内存后逐条 add_event，每条检查冲突并单独提交）和流式批量
+导入写入空数据库，校验三者导入结果一致，输出耗时与 tracemalloc 统计的内存峰值；
+再测覆盖导入、导入后统一冲突检查与流式导出的耗时。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_calendar_import [--events 50000]
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import datetime, timedelta
+
+from src.mcp.tools.calendar.database import CalendarDatabase
+from src.mcp.tools.calendar.models import CalendarEvent
+from src.mcp.tools.calendar.transfer import export_file, import_file, write_ics
+
+BASE = datetime(2026, 1, 1)
+
+
+def _events(rng: random.Random, count: int, span_days: int):
+    """
+    每个事件占一个互不重叠的小时时段，原有接口的冲突检查不会拒绝任何事件.
+    """
+    for i, slot in enumerate(rng.sample(range(span_days * 24), count)):
+        start = BASE + timedelta(minutes=slot * 60 + rng.randrange(30))
+        end = start + timedelta(minutes=rng.randrange(15, 30))
+        yield CalendarEvent(
+            title=f"会议{i}",
+            start_time=start.isoformat(),
+            end_time=end.isoformat(),
+            description="季度规划, 第一阶段" if i % 3 == 0 else "",
+            category=rng.choice(["默认", "工作", "个人", "会议"]),
+            reminder_minutes=rng.choice([0, 5, 15, 30]),
+            event_id=str(uuid.UUID(int=rng.getrandbits(128))),
+        ).to_dict()
+
+
+def _peak_memory(func) -> float:
+    """
+    tracemalloc 统计的内存峰值（MB）；跟踪会拖慢运行，计时需另外单独运行.
+    """
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def _timed(func) -> tuple:
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def _legacy_import(db: CalendarDatabase, path: str) -> int:
+    """
+    原有接口：读入全部事件后逐条添加.
+    """
+    with open(path, "r", encoding="utf-8") as fp:
+        events = [json.loads(line) for line in fp]
+    return sum(db.add_event(event) for event in events)
+
+
+def _snapshot(db: CalendarDatabase):
+    keys = ("id", "title", "start_time", "end_time", "category", "rrule")
+    return sorted(tuple(event[k] for k in keys) for event in db.iter_events())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=50_000)
+    parser.add_argument("--days", type=int, default=3650)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl = os.path.join(tmp, "events.jsonl")
+        ics = os.path.join(tmp, "events.ics")
+        with open(jsonl, "w", encoding="utf-8") as fp:
+            for event in _events(random.Random(args.seed), args.events, args.days):
+                fp.write(json.dumps(event, ensure_ascii=False) + "\n")
+        with open(ics, "w", encoding="utf-8", newline="") as fp:
+            write_ics(_events(random.Random(args.seed), args.events, args.days), fp)
+        sizes = [os.path.getsize(f) / 1024 / 1024 for f in (jsonl, ics)]
+        print(f"事件数: {args.events}，JSONL {sizes[0]:.1f}MB，ICS {sizes[1]:.1f}MB")
+        print(f"{'':<22}{'耗时':>8}{'内存峰值':>10}{'写入':>8}")
+
+        rows = {}
+        runs = (
+            ("逐条 add_event(JSONL)", "legacy", lambda db: _legacy_import(db, jsonl)),
+            ("流式导入 JSONL", "jsonl", lambda db: import_file(jsonl, db=db)),
+            ("流式导入 ICS", "ics", lambda db: import_file(ics, db=db)),
+        )
+        for name, key, run in runs:
+            db = CalendarDatabase(os.path.join(tmp, f"{key}-memory.db"))
+            peak = _peak_memory(lambda: run(db))
+            db.close()
+            db = CalendarDatabase(os.path.join(tmp, f"{key}.db"))
+            result, elapsed = _timed(lambda: run(db))
+            written = result if isinstance(result, int) else result["imported"]
+            print(f"{name:<22}{elapsed:>7.2f}s{peak:>8.1f}MB{written:>8}")
+            rows[key] = _snapshot(db)
+            if key != "ics":
+                db.close()
+
+        # 再导入一遍，全部按 ID 覆盖已有事件
+        result, elapsed = _timed(lambda: import_file(ics, db=db))
+        print(f"{'重复导入 ICS(覆盖)':<22}{elapsed:>7.2f}s{'':>10}{result['imported']:>8}")
+        rows["reimport"] = _snapshot(db)
+
+        result, elapsed = _timed(lambda: db.find_conflicts(BASE.isoformat(), "9999"))
+        print(f"{'导入后统一冲突检查':<22}{elapsed:>7.2f}s{'':>10}{result['count']:>8}")
+        for fmt in ("jsonl", "ics"):
+            out = os.path.join(tmp, f"export.{fmt}")
+            peak = _peak_memory(lambda: export_file(out, db=db))
+            result, elapsed = _timed(lambda: export_file(out, db=db))
+            print(
+                f"{'流式导出 ' + fmt.upper():<22}{elapsed:>7.2f}s"
+                f"{peak:>8.1f}MB{result['exported']:>8}"
+            )
+        db.close()
+
+    mismatches = [
+        key for key in ("jsonl", "ics", "reimport") if rows[key] != rows["legacy"]
+    ]
+    for key in mismatches:
+        print(f"{key} 导入结果与逐条添加不一致")
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
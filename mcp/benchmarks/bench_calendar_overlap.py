@@ -0,0 +1,128 @@
+"""日程冲突检测基准.
+
+在临时数据库中写入 N 个随机时间段的事件（默认 10 万个），随机生成若干查询区间，
+分别用原实现（无索引、两个 OR 条件的全表扫描）和 R*Tree 区间索引查找与之重叠的
+事件，校验结果一致并输出每次查询的平均耗时。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_calendar_overlap [--events 100000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from src.mcp.tools.calendar.database import CalendarDatabase
+
+_LEGACY_QUERY = """
+    SELECT * FROM events
+    WHERE id != ? AND (
+        (start_time < ? AND end_time > ?) OR
+        (start_time < ? AND end_time > ?)
+    )
+"""
+
+
+def _fill(db: CalendarDatabase, rng: random.Random, count: int, span_days: int):
+    base = datetime(2026, 1, 1)
+    now = datetime.now().isoformat()
+    rows = []
+    for i in range(count):
+        start = base + timedelta(minutes=rng.randrange(span_days * 24 * 60))
+        end = start + timedelta(minutes=rng.randrange(15, 240))
+        rows.append(
+            (
+                str(uuid.uuid4()),
+                f"会议{i}",
+                start.isoformat(),
+                end.isoformat(),
+                (start - timedelta(minutes=15)).isoformat(),
+                now,
+                now,
+            )
+        )
+    with db._get_connection() as conn:
+        conn.executemany(
+            """
+            INSERT INTO events (id, title, start_time, end_time, reminder_time,
+                                created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+            rows,
+        )
+        conn.commit()
+
+
+def _queries(rng: random.Random, count: int, span_days: int):
+    base = datetime(2026, 1, 1)
+    queries = []
+    for _ in range(count):
+        start = base + timedelta(minutes=rng.randrange(span_days * 24 * 60))
+        end = start + timedelta(minutes=rng.randrange(15, 240))
+        queries.append((start.isoformat(), end.isoformat()))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    queries = _queries(rng, args.queries, args.days)
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_file = os.path.join(tmp, "legacy.db")
+        db = CalendarDatabase(os.path.join(tmp, "indexed.db"))
+        _fill(db, random.Random(args.seed), args.events, args.days)
+        db.close()
+
+        # 原实现：同样的数据，去掉索引与区间表
+        conn = sqlite3.connect(legacy_file)
+        conn.row_factory = sqlite3.Row
+        conn.execute(f"ATTACH DATABASE '{db.db_file}' AS src")
+        conn.execute("CREATE TABLE events AS SELECT * FROM src.events")
+        conn.commit()
+        conn.execute("DETACH DATABASE src")
+
+        start = time.perf_counter()
+        expected = [
+            sorted(
+                row["id"]
+                for row in conn.execute(_LEGACY_QUERY, ("", end, begin, begin, end))
+            )
+            for begin, end in queries
+        ]
+        legacy = (time.perf_counter() - start) / len(queries) * 1000
+        conn.close()
+
+        db = CalendarDatabase(os.path.join(tmp, "indexed.db"))
+        start = time.perf_counter()
+        actual = [
+            sorted(e["id"] for e in db.find_overlapping_events(begin, end))
+            for begin, end in queries
+        ]
+        indexed = (time.perf_counter() - start) / len(queries) * 1000
+        db.close()
+
+    mismatches = sum(1 for a, b in zip(expected, actual) if a != b)
+    hits = sum(len(ids) for ids in expected) / len(queries)
+    print(f"事件数: {args.events}, 查询数: {len(queries)}, 平均命中: {hits:.1f}")
+    print(f"不一致: {mismatches}")
+    print(f"全表扫描:    {legacy:.3f}ms/次")
+    print(f"R*Tree 索引: {indexed:.3f}ms/次")
+    print(f"加速比: {legacy / indexed:.1f}x")
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""日程查询缓存基准.
+
+在临时数据库中写入 N 个事件（含若干重复事件），模拟一段对话：反复询问今天、明天、
+本周的日程、即将到来的日程、分类与统计，其间穿插本进程的新增/修改，以及另一个进程
+直接写同一个数据库文件。每次查询都与不带缓存的数据库实例比对结果，输出带缓存与
+不带缓存的平均耗时和缓存命中统计。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_calendar_query_cache [--events 2000]
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from src.mcp.tools.calendar.database import CalendarDatabase
+from src.mcp.tools.calendar.models import CalendarEvent
+
+# 另一个进程（如 voice_rec 中的日程副本）直接写入同一个数据库文件
+_EXTERNAL_WRITE = """
+import sqlite3, sys
+conn = sqlite3.connect(sys.argv[1], timeout=5)
+conn.execute(
+    "INSERT INTO events (id, title, start_time, end_time, created_at, updated_at)"
+    " VALUES (?, '外部写入', ?, ?, ?, ?)",
+    (sys.argv[2], sys.argv[3], sys.argv[4], sys.argv[3], sys.argv[3]),
+)
+conn.commit()
+"""
+
+
+class _UncachedDatabase(CalendarDatabase):
+    """
+    不带查询缓存：每次都查询数据库.
+    """
+
+    def _cached(self, key, factory):
+        return factory()
+
+
+def _events(rng: random.Random, count: int, today: datetime):
+    for i in range(count):
+        start = today + timedelta(
+            days=rng.randrange(-60, 60), minutes=rng.randrange(0, 24 * 60, 15)
+        )
+        yield CalendarEvent(
+            title=f"会议{i}",
+            start_time=start.isoformat(),
+            end_time=(start + timedelta(minutes=30)).isoformat(),
+            category=rng.choice(["工作", "个人", "会议"]),
+            rrule="FREQ=WEEKLY" if i % 200 == 0 else None,
+        ).to_dict()
+
+
+def _queries(today: datetime):
+    """
+    对话中常见的查询（与 get_events_by_date / get_upcoming_events 的窗口一致）.
+    """
+    week = today - timedelta(days=today.weekday())
+    hour = datetime.now().replace(minute=0, second=0, microsecond=0)
+    return [
+        ("今天", lambda db: db.get_events(_iso(today), _iso(today, 1))),
+        ("明天", lambda db: db.get_events(_iso(today, 1), _iso(today, 2))),
+        ("本周", lambda db: db.get_events(_iso(week), _iso(week, 7))),
+        ("今天工作", lambda db: db.get_events(_iso(today), _iso(today, 1), "工作")),
+        ("即将到来", lambda db: db.get_events(_iso(hour), _iso(hour, 1 + 1 / 24))),
+        ("分类", lambda db: db.get_categories()),
+        ("统计", lambda db: db.get_statistics()),
+    ]
+
+
+def _iso(day: datetime, days: float = 0) -> str:
+    return (day + timedelta(days=days)).isoformat()
+
+
+def _timed(func, db):
+    start = time.perf_counter()
+    result = func(db)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=2000)
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "calendar.db")
+        cached = CalendarDatabase(db_file)
+        cached.import_events(_events(rng, args.events, today))
+        uncached = _UncachedDatabase(db_file)
+        queries = _queries(today)
+
+        totals = {"cached": 0.0, "uncached": 0.0, "hit": 0.0}
+        mismatches = local_writes = external_writes = 0
+        for turn in range(args.turns):
+            roll = rng.random()
+            start = today + timedelta(hours=rng.randrange(24), days=rng.randrange(2))
+            end = (start + timedelta(minutes=20)).isoformat()
+            if roll < 0.05:
+                event = CalendarEvent("新会议", start.isoformat(), end)
+                cached.import_events([event.to_dict()])
+                local_writes += 1
+            elif roll < 0.08:
+                subprocess.run(
+                    [sys.executable, "-c", _EXTERNAL_WRITE, db_file]
+                    + [str(uuid.uuid4()), start.isoformat(), end],
+                    check=True,
+                )
+                external_writes += 1
+
+            name, query = rng.choice(queries)
+            expected, elapsed = _timed(query, uncached)
+            totals["uncached"] += elapsed
+            hits = cached.cache_stats()["hits"]
+            actual, elapsed = _timed(query, cached)
+            totals["cached"] += elapsed
+            if cached.cache_stats()["hits"] > hits:
+                totals["hit"] += elapsed
+            if actual != expected:
+                mismatches += 1
+                print(f"第 {turn} 轮查询 {name} 结果不一致")
+
+        stats = cached.cache_stats()
+        cached.close()
+        uncached.close()
+
+    print(
+        f"事件数: {args.events}，查询 {args.turns} 次，"
+        f"本进程写入 {local_writes} 次，其他进程写入 {external_writes} 次"
+    )
+    print(f"不一致: {mismatches}")
+    for key, label in (("uncached", "无缓存"), ("cached", "查询缓存")):
+        print(f"{label:<8}{totals[key] / args.turns * 1000:>8.3f}ms/次")
+    if stats["hits"]:
+        print(f"{'其中命中':<8}{totals['hit'] / stats['hits'] * 1000:>8.3f}ms/次")
+    print(
+        f"命中 {stats['hits']}，未命中 {stats['misses']}，"
+        f"命中率 {stats['hit_rate']:.1%}，因写入失效 {stats['invalidations']}"
+    )
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
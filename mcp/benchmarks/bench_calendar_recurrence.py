@@ -0,0 +1,165 @@
+"""重复日程查询基准.
+
+以"每个工作日 7:30"为例，按系列长度 N（发生次数）分别构造两个数据库：逐次插入
+N 行的物化方式，以及只存一行 RRULE（COUNT=N）的重复事件。对系列最后一周做
+get_events 查询和冲突检测（find_overlapping_events），校验两者结果一致，
+并与不定位周期、从第一次发生逐个展开的做法对比耗时，同时输出两个数据库文件大小。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_calendar_recurrence [--sizes 10,100,1000]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from src.mcp.tools.calendar.database import CalendarDatabase
+from src.mcp.tools.calendar.models import CalendarEvent
+from src.mcp.tools.calendar.recurrence import RecurrenceRule
+
+DTSTART = datetime(2026, 1, 5, 7, 30)
+DURATION = timedelta(minutes=15)
+RRULE = "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR"
+
+
+def _series(size: int) -> CalendarEvent:
+    return CalendarEvent(
+        title="起床",
+        start_time=DTSTART.isoformat(),
+        end_time=(DTSTART + DURATION).isoformat(),
+        rrule=f"{RRULE};COUNT={size}",
+    )
+
+
+def _materialize(db: CalendarDatabase, series: CalendarEvent, size: int):
+    rule = RecurrenceRule.parse(series.rrule)
+    now = datetime.now().isoformat()
+    rows = [
+        (
+            str(uuid.uuid4()),
+            series.title,
+            start.isoformat(),
+            (start + DURATION).isoformat(),
+            (start - timedelta(minutes=15)).isoformat(),
+            now,
+            now,
+        )
+        for start in rule.occurrences(DTSTART)
+    ]
+    assert len(rows) == size
+    with db._get_connection() as conn:
+        conn.executemany(
+            """
+            INSERT INTO events (id, title, start_time, end_time, reminder_time,
+                                created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """,
+            rows,
+        )
+        conn.commit()
+    return rows[-1][2]
+
+
+def _per_call(func, loops: int) -> tuple:
+    start = time.perf_counter()
+    for _ in range(loops):
+        result = func()
+    return (time.perf_counter() - start) / loops * 1000, result
+
+
+def _measure(db: CalendarDatabase, week_start: datetime, loops: int):
+    week_end = week_start + timedelta(days=7)
+
+    def query_week():
+        db.clear_query_cache()  # 测量展开本身，不计查询缓存
+        return db.get_events(week_start.isoformat(), week_end.isoformat())
+
+    query, events = _per_call(query_week, loops)
+    probe = week_start + timedelta(hours=7, minutes=40)
+    conflict, overlapping = _per_call(
+        lambda: db.find_overlapping_events(
+            probe.isoformat(), (probe + timedelta(minutes=30)).isoformat()
+        ),
+        loops,
+    )
+    starts = [e["start_time"] for e in events]
+    return query, conflict, (starts, [e["start_time"] for e in overlapping])
+
+
+def _naive_expand(rule: RecurrenceRule, week_start: datetime, loops: int) -> float:
+    """
+    不定位周期，从第一次发生逐个展开到查询窗口.
+    """
+    week_end = week_start + timedelta(days=7)
+
+    def expand():
+        found = []
+        for start in rule.occurrences(DTSTART):
+            if start > week_end:
+                break
+            if start >= week_start:
+                found.append(start)
+        return found
+
+    return _per_call(expand, loops)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", default="10,100,1000,10000,100000")
+    parser.add_argument("--loops", type=int, default=200)
+    args = parser.parse_args()
+
+    print(
+        f"{'N':>7}{'物化查询':>10}{'重复查询':>10}{'从头展开':>10}"
+        f"{'物化冲突':>10}{'重复冲突':>10}{'物化库':>9}{'重复库':>9}"
+    )
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(s) for s in args.sizes.split(",")):
+            series = _series(size)
+
+            materialized = CalendarDatabase(os.path.join(tmp, f"rows-{size}.db"))
+            last_start = datetime.fromisoformat(
+                _materialize(materialized, series, size)
+            )
+            week_start = (last_start - timedelta(days=last_start.weekday())).replace(
+                hour=0, minute=0
+            )
+            rows_query, rows_conflict, rows_result = _measure(
+                materialized, week_start, args.loops
+            )
+            materialized.close()
+
+            recurring = CalendarDatabase(os.path.join(tmp, f"rrule-{size}.db"))
+            recurring.add_event(series.to_dict())
+            rule_query, rule_conflict, rule_result = _measure(
+                recurring, week_start, args.loops
+            )
+            recurring.close()
+
+            naive = _naive_expand(
+                RecurrenceRule.parse(series.rrule), week_start, max(args.loops // 20, 1)
+            )
+            sizes = [
+                os.path.getsize(os.path.join(tmp, f"{kind}-{size}.db")) // 1024
+                for kind in ("rows", "rrule")
+            ]
+            if rows_result != rule_result or not rule_result[0]:
+                mismatches += 1
+                print(f"N={size} 结果不一致")
+            print(
+                f"{size:>7}{rows_query:>10.3f}ms{rule_query:>8.3f}ms{naive:>8.3f}ms"
+                f"{rows_conflict:>8.3f}ms{rule_conflict:>8.3f}ms"
+                f"{sizes[0]:>9}KB{sizes[1]:>7}KB"
+            )
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
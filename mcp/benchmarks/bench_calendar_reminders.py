@@ -0,0 +1,270 @@
+"""日程提醒调度基准（虚拟时钟）.
+
+用虚拟时钟模拟若干天的运行：在临时数据库中写入随机事件，模拟期间按随机时间
+新增、改期、删除尚未提醒的事件，分别运行原实现（每 30 秒轮询一次）和按提醒时间
+调度的提醒服务。校验两者都恰好发送了应发送的提醒，并输出唤醒次数与提醒延迟。
+另附一轮没有任何事件的空闲模拟。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_calendar_reminders [--events 200] [--days 7]
+"""
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import tempfile
+import uuid
+from datetime import datetime, timedelta
+from typing import Optional
+
+from src.mcp.tools.calendar.database import CalendarDatabase
+from src.mcp.tools.calendar.models import CalendarEvent
+from src.mcp.tools.calendar.reminder_service import CalendarReminderService
+
+START = datetime(2026, 3, 2, 8, 0)
+SLOT_SECONDS = 15 * 60
+
+
+class VirtualClock:
+    """
+    虚拟时钟：等待超时不占用真实时间，由 run_until 按截止时间依次推进.
+    """
+
+    def __init__(self, now: datetime):
+        self._now = now
+        self._timers = []
+        self._seq = itertools.count()
+        self.waiting = False
+        self.resumed = 0
+        self.wakeups = 0  # 因超时醒来的次数
+
+    def now(self) -> datetime:
+        return self._now
+
+    async def wait(self, event: asyncio.Event, timeout: Optional[float]) -> bool:
+        loop = asyncio.get_running_loop()
+        timer = loop.create_future()
+        if timeout is not None:
+            deadline = self._now + timedelta(seconds=max(timeout, 0))
+            heapq.heappush(self._timers, (deadline, next(self._seq), timer))
+        waiter = asyncio.ensure_future(event.wait())
+        self.waiting = True
+        try:
+            await asyncio.wait({waiter, timer}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            self.waiting = False
+            self.resumed += 1
+            waiter.cancel()
+            timer.cancel()
+        return event.is_set()
+
+    async def settle(self):
+        """
+        让出事件循环，直到服务处理完手头的工作并重新进入等待.
+        """
+        resumed = self.resumed
+        for _ in range(100):
+            await asyncio.sleep(0)
+            if self.waiting and self.resumed > resumed:
+                return
+        while not self.waiting:
+            await asyncio.sleep(0)
+
+    async def run_until(self, end: datetime):
+        while True:
+            await self.settle()
+            if not self._timers or self._timers[0][0] > end:
+                break
+            deadline, _, timer = heapq.heappop(self._timers)
+            if timer.done():
+                continue
+            self._now = max(self._now, deadline)
+            self.wakeups += 1
+            timer.set_result(None)
+        self._now = max(self._now, end)
+
+
+class _RecordingMixin:
+    """
+    记录每次提醒的 (事件ID, 提醒时间) 与延迟，不经过 TTS.
+    """
+
+    def _init_records(self):
+        self.delivered = []
+        self.delays = []
+
+    async def _send_reminder(self, event_data: dict):
+        reminder_time = datetime.fromisoformat(event_data["reminder_time"])
+        self.delivered.append((event_data["id"], event_data["reminder_time"]))
+        self.delays.append((self.clock.now() - reminder_time).total_seconds())
+        await self._mark_reminder_sent(event_data["id"])
+
+
+class _SchedulerService(_RecordingMixin, CalendarReminderService):
+    pass
+
+
+class _PollingService(_RecordingMixin, CalendarReminderService):
+    """
+    原实现：每 30 秒查询一次数据库.
+    """
+
+    async def _reminder_loop(self):
+        never = asyncio.Event()
+        while self.is_running:
+            await self._check_and_send_reminders()
+            await self._cleanup_expired_reminders()
+            await self.clock.wait(never, 30)
+
+
+class _Scenario:
+    """
+    随机事件与变更脚本：事件各占一个 15 分钟时段，互不冲突.
+    """
+
+    def __init__(self, rng: random.Random, events: int, days: int):
+        self.rng = rng
+        self.days = days
+        self.free_slots = list(range(1, days * 24 * 4))
+        rng.shuffle(self.free_slots)
+        self.initial = [self._new_event() for _ in range(events)]
+        self.expected = {e.id: e.reminder_time for e in self.initial}
+        self.slots = {e.id: self._slot_of(e.start_time) for e in self.initial}
+        self.mutation_times = sorted(
+            START + timedelta(seconds=rng.randrange(days * 86400))
+            for _ in range(events // 2)
+        )
+
+    def _slot_of(self, start_time: str) -> int:
+        delta = datetime.fromisoformat(start_time) - START
+        return int(delta.total_seconds() // SLOT_SECONDS)
+
+    def _take_slot(self, after: datetime) -> Optional[int]:
+        first = int((after - START).total_seconds() // SLOT_SECONDS) + 8
+        for i, slot in enumerate(self.free_slots):
+            if slot >= first:
+                return self.free_slots.pop(i)
+        return None
+
+    def _start_in(self, slot: int) -> datetime:
+        return START + timedelta(
+            seconds=slot * SLOT_SECONDS + self.rng.randrange(SLOT_SECONDS // 3)
+        )
+
+    def _new_event(self, after: datetime = START) -> Optional[CalendarEvent]:
+        slot = self._take_slot(after)
+        if slot is None:
+            return None
+        start = self._start_in(slot)
+        return CalendarEvent(
+            title=f"会议{slot}",
+            start_time=start.isoformat(),
+            end_time=(start + timedelta(minutes=10)).isoformat(),
+            reminder_minutes=self.rng.choice([0, 5, 15, 30, 60]),
+            event_id=str(uuid.UUID(int=self.rng.getrandbits(128))),
+        )
+
+    def mutate(self, db: CalendarDatabase, now: datetime):
+        """
+        在 now 时刻对尚未到提醒时间的事件做一次随机变更.
+        """
+        pending = sorted(
+            event_id
+            for event_id, reminder_time in self.expected.items()
+            if datetime.fromisoformat(reminder_time) > now + timedelta(minutes=1)
+        )
+        action = self.rng.choice(["add", "move", "delete"])
+        if action == "add" or not pending:
+            event = self._new_event(now)
+            if event is not None and db.add_event(event.to_dict()):
+                self.expected[event.id] = event.reminder_time
+                self.slots[event.id] = self._slot_of(event.start_time)
+            return
+
+        event_id = self.rng.choice(pending)
+        if action == "delete":
+            db.delete_event(event_id)
+            del self.expected[event_id]
+            self.free_slots.append(self.slots.pop(event_id))
+            return
+
+        slot = self._take_slot(now)
+        if slot is None:
+            return
+        start = self._start_in(slot)
+        db.update_event(
+            event_id,
+            start_time=start.isoformat(),
+            end_time=(start + timedelta(minutes=10)).isoformat(),
+        )
+        self.free_slots.append(self.slots.pop(event_id))
+        self.slots[event_id] = slot
+        self.expected[event_id] = db.get_event_by_id(event_id)["reminder_time"]
+
+
+async def _simulate(service_cls, db_file: str, events: int, days: int, seed: int):
+    scenario = _Scenario(random.Random(seed), events, days)
+    db = CalendarDatabase(db_file)
+    for event in scenario.initial:
+        db.add_event(event.to_dict())
+
+    clock = VirtualClock(START)
+    service = service_cls(db, clock)
+    service._init_records()
+    await service.start()
+    for when in scenario.mutation_times:
+        await clock.run_until(when)
+        scenario.mutate(db, clock.now())
+    await clock.run_until(START + timedelta(days=days, hours=2))
+    await service.stop()
+    db.close()
+
+    expected = sorted(scenario.expected.items())
+    return service, clock, sorted(service.delivered) == expected, len(expected)
+
+
+def _report(name: str, service, clock, correct: bool, expected: int, days: int):
+    delays = service.delays or [0.0]
+    print(
+        f"{name:<10}{clock.wakeups:>10}{clock.wakeups / days:>10.1f}"
+        f"{len(service.delivered):>8}/{expected:<6}"
+        f"{sum(delays) / len(delays):>10.2f}s{max(delays):>9.2f}s"
+        f"{'  结果不一致' if not correct else ''}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--days", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    print(
+        f"{'':<10}{'唤醒次数':>6}{'每天唤醒':>6}{'已提醒/应提醒':>10}"
+        f"{'平均延迟':>6}{'最大延迟':>5}"
+    )
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, events in (("空闲", 0), ("繁忙", args.events)):
+            print(f"[{label}] 事件数 {events}，模拟 {args.days} 天")
+            for name, service_cls in (
+                ("30秒轮询", _PollingService),
+                ("按时调度", _SchedulerService),
+            ):
+                db_file = os.path.join(tmp, f"{label}-{name}.db")
+                service, clock, correct, expected = asyncio.run(
+                    _simulate(service_cls, db_file, events, args.days, args.seed)
+                )
+                _report(name, service, clock, correct, expected, args.days)
+                failures += not correct
+
+    if failures:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
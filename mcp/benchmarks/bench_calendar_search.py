@@ -0,0 +1,123 @@
+"""日程全文检索基准.
+
+在临时数据库中批量导入 N 个随机事件（默认 10 万个，标题/描述由中英文词汇组合），
+对一组检索词（一个字、两个字、长词、英文、多词组合，常见与罕见）分别用全文检索
+（search_events）和对标题、描述、分类逐行 LIKE '%词%' 扫描查询，校验两者命中的
+事件集合一致，输出导入耗时、数据库大小，以及取前 10 条与取全部结果的平均耗时。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_calendar_search [--events 100000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from src.mcp.tools.calendar.database import CalendarDatabase
+from src.mcp.tools.calendar.models import CalendarEvent
+
+BASE = datetime(2026, 1, 1)
+PEOPLE = ["张伟", "王芳", "李娜", "刘洋", "陈静", "Alice", "Bob", "Carol"]
+TOPICS = ["季度规划", "产品评审", "预算", "周报", "招聘面试", "牙医", "体检"]
+TOPICS += ["健身", "Q3 路线图", "Design Review", "客户拜访", "代码走查"]
+KINDS = ["会议", "讨论", "同步", "提醒", "复诊", "沟通", "Sync"]
+PLACES = ["3号会议室", "线上 Zoom", "望京 SOHO", "协和医院", "家里", "咖啡馆"]
+NOTES = ["带上笔记本", "准备材料", "记得带医保卡", "提前十分钟到", "Bring slides"]
+QUERIES = [
+    "会",
+    "牙",
+    "会议",
+    "预算",
+    "医保卡",
+    "季度规划",
+    "张伟 评审",
+    "design",
+    "REVIEW zoom",
+    "路线图 3号会议室",
+    "王芳 牙医 协和",
+    "不存在的词",
+]
+
+
+def _events(rng: random.Random, count: int):
+    for i in range(count):
+        start = BASE + timedelta(minutes=rng.randrange(365 * 24 * 4) * 15)
+        yield CalendarEvent(
+            title=f"{rng.choice(PEOPLE)}{rng.choice(TOPICS)}{rng.choice(KINDS)}",
+            start_time=start.isoformat(),
+            end_time=(start + timedelta(minutes=30)).isoformat(),
+            description=f"地点: {rng.choice(PLACES)}，{rng.choice(NOTES)}",
+            category=rng.choice(["默认", "工作", "个人", "会议"]),
+            event_id=f"event-{i}",
+        ).to_dict()
+
+
+def _like_scan(db: CalendarDatabase, query: str) -> list:
+    """
+    逐行 LIKE 扫描：每个词都须出现在标题、描述或分类中（同样读出完整事件行）.
+    """
+    terms = query.split()
+    where = " AND ".join(
+        ["(title LIKE ? OR description LIKE ? OR category LIKE ?)"] * len(terms)
+    )
+    params = [f"%{term}%" for term in terms for _ in range(3)]
+    with db._get_connection() as conn:
+        return [
+            dict(row)
+            for row in conn.execute(
+                f"SELECT * FROM events WHERE {where} ORDER BY start_time", params
+            )
+        ]
+
+
+def _per_call(func, loops: int) -> tuple:
+    start = time.perf_counter()
+    for _ in range(loops):
+        result = func()
+    return (time.perf_counter() - start) / loops * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--events", type=int, default=100_000)
+    parser.add_argument("--loops", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    mismatches = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        db_file = os.path.join(tmp, "calendar.db")
+        db = CalendarDatabase(db_file)
+        start = time.perf_counter()
+        db.import_events(_events(random.Random(args.seed), args.events))
+        elapsed = time.perf_counter() - start
+        size = os.path.getsize(db_file) / 1024 / 1024
+        print(f"事件数: {args.events}，导入 {elapsed:.2f}s，数据库 {size:.1f}MB")
+        print(
+            f"{'检索词':<20}{'命中':>8}{'检索前10':>12}{'检索全部':>12}{'LIKE扫描':>12}"
+        )
+
+        for query in QUERIES:
+            top, _ = _per_call(lambda: db.search_events(query), args.loops)
+            full, found = _per_call(
+                lambda: db.search_events(query, limit=args.events), args.loops
+            )
+            scan, expected = _per_call(lambda: _like_scan(db, query), args.loops)
+            if sorted(e["id"] for e in found) != sorted(e["id"] for e in expected):
+                mismatches += 1
+                print(f"检索 {query!r} 结果不一致: {len(found)} != {len(expected)}")
+            print(
+                f"{query:<20}{len(expected):>8}{top:>10.2f}ms"
+                f"{full:>10.2f}ms{scan:>10.2f}ms"
+            )
+        db.close()
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
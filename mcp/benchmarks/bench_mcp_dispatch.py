@@ -0,0 +1,138 @@
+"""McpServer 工具分发微基准.
+
+对比旧实现（线性查找 + 每次请求重新序列化 tools/list）与当前实现
+（名称索引 + 预序列化分页缓存）的 tools/list 与 tools/call 分发耗时。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_mcp_dispatch [--tools 64] [--rounds 2000]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+from src.mcp.mcp_server import McpServer, McpTool, Property, PropertyList, PropertyType
+
+
+async def _noop(args):
+    return True
+
+
+def _make_server(tool_count: int) -> McpServer:
+    server = McpServer()
+    for i in range(tool_count):
+        props = PropertyList(
+            [
+                Property("text", PropertyType.STRING),
+                Property("count", PropertyType.INTEGER, default_value=1, min_value=0, max_value=100),
+            ]
+        )
+        server.add_tool(
+            McpTool(
+                f"self.bench.tool_{i}",
+                "基准测试工具 " + "说明" * 40,
+                props,
+                _noop,
+            )
+        )
+    return server
+
+
+def _legacy_tools_list(server: McpServer, cursor: str) -> dict:
+    tools_json = []
+    total_size = 0
+    found_cursor = not cursor
+    next_cursor = ""
+    for tool in server.tools:
+        if not found_cursor:
+            if tool.name == cursor:
+                found_cursor = True
+            else:
+                continue
+        tool_json = tool.to_json()
+        tool_size = len(json.dumps(tool_json))
+        if total_size + tool_size + 100 > server.TOOLS_LIST_MAX_PAYLOAD:
+            next_cursor = tool.name
+            break
+        tools_json.append(tool_json)
+        total_size += tool_size
+    result = {"tools": tools_json}
+    if next_cursor:
+        result["nextCursor"] = next_cursor
+    return result
+
+
+def _legacy_lookup(server: McpServer, name: str):
+    for t in server.tools:
+        if t.name == name:
+            return t
+    return None
+
+
+def _timeit(fn, rounds: int) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - start) / rounds * 1e6
+
+
+async def _collect_pages(server: McpServer) -> list:
+    sent = []
+
+    async def send(payload):
+        sent.append(json.loads(payload)["result"])
+
+    server.set_send_callback(send)
+    cursor = ""
+    while True:
+        await server._handle_tools_list(1, {"cursor": cursor})
+        cursor = sent[-1].get("nextCursor", "")
+        if not cursor:
+            return sent
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tools", type=int, default=64)
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+
+    server = _make_server(args.tools)
+    last_name = server.tools[-1].name
+
+    # 结果一致性校验
+    pages = asyncio.run(_collect_pages(server))
+    legacy_pages = []
+    cursor = ""
+    while True:
+        legacy_pages.append(_legacy_tools_list(server, cursor))
+        cursor = legacy_pages[-1].get("nextCursor", "")
+        if not cursor:
+            break
+    assert pages == legacy_pages, "tools/list 分页结果与旧实现不一致"
+
+    if server._tools_list_cache is None:
+        server._tools_list_cache = server._build_tools_list_cache()
+
+    rows = [
+        (
+            "tools/list (首页)",
+            _timeit(lambda: json.dumps(_legacy_tools_list(server, "")), args.rounds),
+            _timeit(lambda: server._tools_list_cache.get(""), args.rounds),
+        ),
+        (
+            "tools/call 查找 (末尾工具)",
+            _timeit(lambda: _legacy_lookup(server, last_name), args.rounds),
+            _timeit(lambda: server.get_tool(last_name), args.rounds),
+        ),
+    ]
+
+    print(f"工具数: {args.tools}, 轮数: {args.rounds}, 页数: {len(pages)}")
+    print(f"{'场景':<24}{'旧实现(us)':>14}{'新实现(us)':>14}{'加速比':>10}")
+    for name, legacy, current in rows:
+        print(f"{name:<24}{legacy:>14.2f}{current:>14.2f}{legacy / current:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
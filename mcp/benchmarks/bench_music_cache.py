@@ -0,0 +1,159 @@
+"""音乐缓存淘汰与预取基准.
+
+在临时目录中模拟点歌：N 首歌（默认 300 首，大小随机）按 Zipf 分布被反复点播，
+缓存中有就直接播放，没有就“下载”（写入文件、加入音乐库索引）后按预算淘汰。
+分别以不限大小、LRU、LFU 运行同一播放序列，输出命中率、下载量、缓存目录的最大
+占用与每次淘汰的耗时；校验每次淘汰后占用不超过预算、收藏的歌曲从未被删除。
+
+随后用本地限速 HTTP 服务对比切歌时从点下一首到可以出声的时间：未预取时需要连接
+并等待开头部分下载，预取后直接打开缓存文件。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_music_cache [--songs 300] [--plays 3000]
+    [--budget 0.2] [--rate 2000]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from src.mcp.benchmarks.bench_music_streaming import _make_mp3, _serve, _start
+from src.mcp.tools.music.cache import MusicCache
+from src.mcp.tools.music.library import MusicLibrary
+
+
+def _simulate(
+    directory: Path,
+    sizes: list,
+    trace: list,
+    pinned: set,
+    budget: int,
+    policy: str,
+) -> dict:
+    library = MusicLibrary(directory)
+    library.load()
+    cache = MusicCache(library, budget, policy)
+    for song in pinned:
+        library.set_pinned(f"{song}.mp3")
+
+    hits = downloaded = peak = 0
+    stored_pins = set()
+    enforce_ms = []
+    failed = False
+    for step, song in enumerate(trace):
+        name = f"{song}.mp3"
+        path = directory / name
+        if path.exists():
+            hits += 1
+        else:
+            path.write_bytes(b"\0" * sizes[song])
+            downloaded += sizes[song]
+            if song in pinned:
+                stored_pins.add(song)
+            library.update_file(path)
+            peak = max(peak, cache.size())
+            cache.protect({name})
+            start = time.perf_counter()
+            cache.enforce()
+            enforce_ms.append((time.perf_counter() - start) * 1000)
+            if budget > 0 and cache.size() > budget:
+                failed = True
+        library.record_play(name, when=float(step))
+        if not all((directory / f"{p}.mp3").exists() for p in stored_pins):
+            failed = True
+    library.close()
+
+    enforce_ms.sort()
+    return {
+        "hit_rate": hits / len(trace),
+        "downloaded": downloaded,
+        "peak": peak,
+        "enforce_ms": enforce_ms[len(enforce_ms) // 2] if enforce_ms else 0.0,
+        "failed": failed,
+    }
+
+
+def _transition(rate: float, latency: float) -> tuple:
+    """
+    返回 (未预取, 已预取) 时从点下一首到可以出声的毫秒数.
+    """
+    data = _make_mp3(240, 100 * 1024)
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        server, url = _serve(data, rate, latency, fail=False)
+
+        start = time.monotonic()
+        download = _start(url, directory, "cold.mp3")
+        download.ready(60)
+        cold_ms = (time.monotonic() - start) * 1000
+        download.cancel()
+        download.wait(60)
+
+        # 上一首播放期间预取完成，切歌时直接打开缓存文件
+        prefetch = _start(url, directory, "next.mp3")
+        cached = prefetch.wait(120)
+        server.shutdown()
+        start = time.monotonic()
+        with open(cached, "rb") as f:
+            f.read(64 * 1024)
+        warm_ms = (time.monotonic() - start) * 1000
+    return cold_ms, warm_ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--songs", type=int, default=300)
+    parser.add_argument("--plays", type=int, default=3000)
+    parser.add_argument("--budget", type=float, default=0.2, help="预算占总大小的比例")
+    parser.add_argument("--zipf", type=float, default=1.0)
+    parser.add_argument("--rate", type=float, default=2000, help="限速 kbps")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    # 文件按 1/1000 缩小（3~10MB 的歌曲对应 3~10KB），比例不变
+    sizes = [rng.randint(3000, 10000) for _ in range(args.songs)]
+    weights = [1 / (rank + 1) ** args.zipf for rank in range(args.songs)]
+    order = list(range(args.songs))
+    rng.shuffle(order)
+    trace = rng.choices(order, weights=weights, k=args.plays)
+    pinned = set(rng.sample(order, 3))
+    budget = int(sum(sizes) * args.budget)
+    print(
+        f"歌曲 {args.songs} 首，共 {sum(sizes) / 1e3:.0f}MB，点播 {args.plays} 次，"
+        f"预算 {budget / 1e3:.0f}MB，收藏 {len(pinned)} 首"
+    )
+
+    print(f"{'策略':<8}{'命中率':>8}{'下载量':>10}{'最大占用':>10}{'淘汰中位':>10}")
+    failed = False
+    for policy, limit in (("不限", 0), ("lru", budget), ("lfu", budget)):
+        with tempfile.TemporaryDirectory() as tmp:
+            result = _simulate(
+                Path(tmp),
+                sizes,
+                trace,
+                pinned,
+                limit,
+                "lru" if policy == "不限" else policy,
+            )
+        failed = failed or result["failed"]
+        print(
+            f"{policy:<8}{result['hit_rate']:>9.1%}"
+            f"{result['downloaded'] / 1e3:>10.0f}MB{result['peak'] / 1e3:>9.0f}MB"
+            f"{result['enforce_ms']:>10.2f}ms"
+        )
+    if failed:
+        print("淘汰后缓存超出预算，或收藏的歌曲被删除")
+
+    cold_ms, warm_ms = _transition(args.rate, args.latency)
+    print(f"切歌到可以出声: 未预取 {cold_ms:.0f}ms，已预取 {warm_ms:.1f}ms")
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""无缝播放与交叉淡化基准.
+
+用 SDL 的 disk 音频驱动把 mixer 的输出写入文件（不需要声卡），测量切歌时歌曲之间
+的静音。生成 --tracks 首时长 --seconds 秒的测试歌曲（WAV，每首为不同的常数电平，
+输出中电平为 0 的采样即静音，介于两首电平之间的采样即交叉淡化）。分别测量：
+
+- 原实现：pygame.mixer.music 播放，按歌曲信息中的时长（整秒）每 200ms 检查一次，
+  到时后再加载下一首；
+- 无缝播放：预解码后在同一个声道上排队播放；
+- 无缝播放加 --crossfade 秒交叉淡化（需要 NumPy）；
+- 播放器：经 MusicPlayer 播放队列，第一首由 pygame.mixer.music 开始播放，缓存文件
+  完整后转到无缝播放的声道，之后的歌曲预解码后衔接。
+
+同时输出预解码一首歌的耗时。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_music_gapless [--tracks 3] [--seconds 1.5]
+    [--crossfade 0.5]
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import tempfile
+import shutil
+import time
+import wave
+from array import array
+from pathlib import Path
+from unittest import mock
+
+import pygame
+
+from src.constants.constants import AudioConfig
+from src.mcp.tools.music import music_player
+from src.mcp.tools.music.gapless import (
+    CHUNK_SECONDS,
+    NUMPY_AVAILABLE,
+    GaplessPlayback,
+    decode_track,
+)
+from src.mcp.tools.music.lyrics import Lyrics
+from src.mcp.tools.music.play_queue import QueueItem
+
+
+def _write_tone(path: Path, level: int, seconds: float, rate: int):
+    with wave.open(str(path), "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes((array("h", [level]) * int(seconds * rate)).tobytes())
+
+
+def _open_mixer(output: Path):
+    pygame.mixer.quit()
+    os.environ["SDL_AUDIODRIVER"] = "disk"
+    os.environ["SDL_DISKAUDIOFILE"] = str(output)
+    pygame.mixer.pre_init(
+        frequency=AudioConfig.OUTPUT_SAMPLE_RATE,
+        size=-16,
+        channels=AudioConfig.CHANNELS,
+        buffer=1024,
+    )
+    pygame.mixer.init()
+
+
+def _play_music(paths: list, seconds: float):
+    """
+    原实现：按整秒时长每 200ms 检查一次，播完再加载下一首.
+    """
+    duration = math.ceil(seconds)
+    for path in paths:
+        pygame.mixer.music.load(str(path))
+        pygame.mixer.music.play()
+        start = time.time()
+        while time.time() - start < duration:
+            time.sleep(0.2)
+
+
+async def _play_gapless(paths: list, crossfade: float, seconds: float) -> float:
+    """
+    预解码后无缝播放，返回每首的平均解码毫秒数.
+    """
+    start = time.perf_counter()
+    tracks = [decode_track(path) for path in paths]
+    decode_ms = (time.perf_counter() - start) * 1000 / len(paths)
+
+    finished = asyncio.Event()
+    following = tracks[1:]
+
+    def on_track_start(track):
+        playback.set_next(following.pop(0) if following else None)
+
+    # 测试歌曲很短，片段按比例缩短，下一首才能在交给声道之前安排好交叉淡化
+    playback = GaplessPlayback(
+        on_track_start,
+        finished.set,
+        crossfade=crossfade,
+        chunk_seconds=min(CHUNK_SECONDS, seconds / 4),
+    )
+    playback.set_next(following.pop(0) if following else None)
+    playback.play(tracks[0])
+    await finished.wait()
+    return decode_ms
+
+
+async def _play_player(paths: list, seconds: float, directory: Path):
+    """
+    经 MusicPlayer 播放队列（歌曲已在缓存中，不访问网络），直到播放结束.
+    """
+    with mock.patch.object(music_player, "get_user_cache_dir", lambda: directory):
+        player = music_player.MusicPlayer()
+    player.gapless.chunk_seconds = min(CHUNK_SECONDS, seconds / 4)
+    for i, path in enumerate(paths):
+        item = QueueItem(f"song{i}")
+        # 歌曲信息中的时长只有整秒，播放结束以 mixer 的状态为准
+        item.song_id, item.url, item.duration = str(i), "-", math.ceil(seconds)
+        shutil.copy(path, player.cache_dir / item.filename)
+        player._lyrics_cache.put(item.song_id, Lyrics())
+        player.queue.add(item)
+    # 缓存文件名按播放器的约定为 .mp3，测试歌曲实为 WAV，按 WAV 交给音乐解码器
+    load = pygame.mixer.music.load
+    try:
+        with mock.patch.object(
+            pygame.mixer.music, "load", lambda source, *_: load(source, "wav")
+        ):
+            result = await player.next()
+            if result["status"] != "success":
+                raise SystemExit(f"播放器播放失败: {result['message']}")
+            while player.is_playing or player.queue.upcoming(1):
+                await asyncio.sleep(0.05)
+    finally:
+        player.library.close()
+        await player.http.close()
+
+
+def _analyze(output: Path, levels: list, channels: int) -> tuple:
+    """
+    返回 (每次切歌的静音毫秒数, 交叉淡化的采样数).
+    """
+    samples = array("h")
+    samples.frombytes(output.read_bytes())
+    samples = samples[::channels]
+    active = [i for i, value in enumerate(samples) if value]
+    samples = samples[active[0] : active[-1] + 1]
+
+    gaps, run, mixed = [], 0, 0
+    for value in samples:
+        if value == 0:
+            run += 1
+            continue
+        if run:
+            gaps.append(run)
+            run = 0
+        if value not in levels:
+            mixed += 1
+    rate = AudioConfig.OUTPUT_SAMPLE_RATE
+    return [round(gap * 1000 / rate, 1) for gap in gaps], mixed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tracks", type=int, default=3)
+    parser.add_argument("--seconds", type=float, default=1.5)
+    parser.add_argument("--crossfade", type=float, default=0.5)
+    args = parser.parse_args()
+
+    rate = AudioConfig.OUTPUT_SAMPLE_RATE
+    levels = [4000 * (i + 1) for i in range(args.tracks)]
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        paths = []
+        for i, level in enumerate(levels):
+            paths.append(directory / f"{i}.wav")
+            _write_tone(paths[-1], level, args.seconds, rate)
+
+        rows = [("原实现", None), ("无缝播放", 0.0)]
+        if NUMPY_AVAILABLE and args.crossfade > 0:
+            rows.append((f"交叉淡化 {args.crossfade}s", args.crossfade))
+        rows.append(("播放器", "player"))
+
+        print(f"{'方式':<14}{'切歌静音(ms)':<24}{'过渡采样':>8}")
+        decode_ms = 0.0
+        for label, crossfade in rows:
+            output = directory / "output.raw"
+            _open_mixer(output)
+            if crossfade is None:
+                _play_music(paths, args.seconds)
+            elif crossfade == "player":
+                asyncio.run(_play_player(paths, args.seconds, directory / "cache"))
+            else:
+                decode_ms = asyncio.run(_play_gapless(paths, crossfade, args.seconds))
+            # disk 驱动按实时速度写入，等最后的数据写完
+            time.sleep(0.2)
+            pygame.mixer.quit()
+            channels = AudioConfig.CHANNELS
+            gaps, mixed = _analyze(output, levels, channels)
+            # 经过音乐解码器播放的部分电平不保证与文件完全一致，不统计过渡采样
+            mixed = mixed if isinstance(crossfade, float) else "-"
+            print(f"{label:<12}{str(gaps or [0]):<26}{mixed:>8}")
+            output.unlink()
+
+    print(
+        f"预解码一首 {args.seconds}s 的 WAV: {decode_ms:.1f}ms；"
+        f"交叉淡化的预期过渡采样 {int(args.crossfade * rate) * (args.tracks - 1)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
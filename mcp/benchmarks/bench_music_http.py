@@ -0,0 +1,144 @@
+"""音乐播放器 HTTP 请求基准.
+
+本地起一个模拟音乐接口的 HTTP 服务：每个新连接先等待 --handshake 秒（模拟 TCP/TLS
+握手），每个请求再等待 --latency 秒。点一首歌需要搜索、获取播放地址、获取歌词三个
+请求，分别测量：原实现（每个请求在线程池中新建连接）、共用连接池的异步客户端、
+再次点播同一首歌时命中搜索结果与歌词缓存，输出每首歌的中位耗时与服务器收到的连接
+数；最后同时点 --concurrency 首歌，对比总耗时。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_music_http [--songs 20] [--handshake 0.06]
+    [--latency 0.03] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.mcp.tools.music.http_client import MusicHttpClient
+from src.mcp.tools.music.ttl_cache import TTLCache
+
+
+def _serve(handshake: float, latency: float):
+    connections = [0]
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self):
+            super().setup()
+            # 响应头与响应体分两次写出，关闭 Nagle 以免被延迟确认拖慢
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with lock:
+                connections[0] += 1
+            time.sleep(handshake)
+
+        def do_GET(self):
+            time.sleep(latency)
+            body = b'{"code": 200, "data": {"content": "[00:01.00]..."}}'
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    class Server(ThreadingHTTPServer):
+        daemon_threads = True
+        # 默认的监听队列只有 5，同时建立多个连接时会因 SYN 重传多等 1 秒
+        request_queue_size = 128
+
+    server = Server(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", connections
+
+
+def _urlopen(url: str) -> str:
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return response.read().decode()
+
+
+async def _resolve_threaded(base: str, song: int):
+    """
+    原实现：每个请求在线程池中新建连接.
+    """
+    await asyncio.to_thread(_urlopen, f"{base}/search?all={song}")
+    await asyncio.to_thread(_urlopen, f"{base}/play?ID={song}")
+    await asyncio.to_thread(_urlopen, f"{base}/lyric?id={song}")
+
+
+async def _resolve_pooled(client: MusicHttpClient, base: str, song: int):
+    await client.get_text(f"{base}/search", {"all": str(song)})
+    await client.get_text(f"{base}/play", {"ID": str(song)})
+    await client.get_json(f"{base}/lyric", {"id": str(song)})
+
+
+async def _resolve_cached(
+    client: MusicHttpClient, cache: TTLCache, base: str, song: int
+):
+    if cache.get(song) is None:
+        await _resolve_pooled(client, base, song)
+        cache.put(song, True)
+
+
+async def _timed(resolve, songs: int) -> list:
+    times = []
+    for song in range(songs):
+        start = time.perf_counter()
+        await resolve(song)
+        times.append((time.perf_counter() - start) * 1000)
+    return times
+
+
+async def _run(args):
+    server, base, connections = _serve(args.handshake, args.latency)
+    client = MusicHttpClient(limit=args.concurrency, limit_per_host=args.concurrency)
+    cache = TTLCache()
+
+    print(f"{'方式':<14}{'每首中位':>10}{'连接数':>8}")
+    rows = (
+        ("线程池+新连接", lambda song: _resolve_threaded(base, song)),
+        ("共用连接池", lambda song: _resolve_pooled(client, base, song)),
+        ("再次点播(缓存)", lambda song: _resolve_cached(client, cache, base, song)),
+    )
+    for label, resolve in rows:
+        if label.startswith("再次点播"):
+            await _timed(resolve, args.songs)  # 第一次点播，写入缓存
+        before = connections[0]
+        times = await _timed(resolve, args.songs)
+        print(
+            f"{label:<12}{statistics.median(times):>10.1f}ms"
+            f"{connections[0] - before:>8}"
+        )
+
+    print(f"同时点 {args.concurrency} 首:")
+    for label, resolve in rows[:2]:
+        before = connections[0]
+        start = time.perf_counter()
+        await asyncio.gather(*(resolve(song) for song in range(args.concurrency)))
+        elapsed = (time.perf_counter() - start) * 1000
+        print(f"{label:<12}{elapsed:>10.1f}ms{connections[0] - before:>8}")
+
+    await client.close()
+    server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--songs", type=int, default=20)
+    parser.add_argument("--handshake", type=float, default=0.06)
+    parser.add_argument("--latency", type=float, default=0.03)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    asyncio.run(_run(args))
+
+
+if __name__ == "__main__":
+    main()
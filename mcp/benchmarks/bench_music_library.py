@@ -0,0 +1,126 @@
+"""本地音乐库索引基准.
+
+在临时目录中生成 N 个带 ID3 标签的 MP3 文件（默认 3000 个，标签后跟若干静音帧），
+分别测量：原实现（5 个通配符 glob 后逐个解析标签）、首次建立索引、启动时加载
+索引、没有变化时的增量扫描、少量文件变化后的增量扫描的耗时，并校验索引与原实现
+得到的歌单一致。未安装 mutagen 时不解析标签，只比较目录扫描部分。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_music_library [--files 3000] [--changed 20]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from src.mcp.tools.music.library import MUTAGEN_AVAILABLE, MusicLibrary, MusicMetadata
+
+ARTISTS = ["周杰伦", "林俊杰", "陈奕迅", "王菲", "Taylor Swift", "Coldplay"]
+WORDS = ["晴天", "稻香", "夜曲", "红豆", "十年", "Yellow", "Love", "Story", "雨", "星"]
+# MPEG-1 Layer III 128kbps 44.1kHz 的一帧（帧头 + 静音数据）
+_MPEG_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+
+def _syncsafe(size: int) -> bytes:
+    return bytes(
+        (size >> 21 & 0x7F, size >> 14 & 0x7F, size >> 7 & 0x7F, size & 0x7F)
+    )
+
+
+def _id3(title: str, artist: str, album: str) -> bytes:
+    frames = b""
+    for frame_id, text in (("TIT2", title), ("TPE1", artist), ("TALB", album)):
+        body = b"\x03" + text.encode("utf-8")  # 编码 3 = UTF-8
+        frames += frame_id.encode() + _syncsafe(len(body)) + b"\x00\x00" + body
+    return b"ID3\x04\x00\x00" + _syncsafe(len(frames)) + frames
+
+
+def _write_song(path: Path, rng: random.Random, frames: int):
+    title = "".join(rng.sample(WORDS, 2))
+    artist = rng.choice(ARTISTS)
+    path.write_bytes(_id3(title, artist, f"{artist}精选") + _MPEG_FRAME * frames)
+
+
+def _full_scan(directory: Path) -> list:
+    """
+    原实现：按 5 个扩展名 glob，逐个文件解析标签.
+    """
+    playlist = []
+    music_files = []
+    for pattern in ["*.mp3", "*.m4a", "*.flac", "*.wav", "*.ogg"]:
+        music_files.extend(directory.glob(pattern))
+    for file_path in music_files:
+        metadata = MusicMetadata(file_path)
+        if MUTAGEN_AVAILABLE:
+            metadata.extract_metadata()
+        playlist.append(metadata)
+    playlist.sort(key=lambda x: (x.artist or "Unknown", x.title or x.filename))
+    return playlist
+
+
+def _timed(func):
+    start = time.perf_counter()
+    result = func()
+    return (time.perf_counter() - start) * 1000, result
+
+
+def _summary(playlist: list) -> list:
+    return [(m.filename, m.title, m.artist, m.album, m.file_size) for m in playlist]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--files", type=int, default=3000)
+    parser.add_argument("--changed", type=int, default=20)
+    parser.add_argument("--frames", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        for i in range(args.files):
+            _write_song(directory / f"{100000 + i}.mp3", rng, args.frames)
+        print(f"歌曲数: {args.files}，mutagen: {'已安装' if MUTAGEN_AVAILABLE else '未安装'}")
+
+        rows = []
+        full_ms, expected = _timed(lambda: _full_scan(directory))
+        rows.append(("原实现全量扫描", full_ms))
+
+        library = MusicLibrary(directory)
+        library.load()
+        build_ms, _ = _timed(library.scan)
+        rows.append(("首次建立索引", build_ms))
+        library.close()
+
+        library = MusicLibrary(directory)
+        load_ms, _ = _timed(library.load)
+        rows.append(("启动加载索引", load_ms))
+        mismatch = _summary(library.tracks()) != _summary(expected)
+        noop_ms, _ = _timed(library.scan)
+        rows.append(("增量扫描(无变化)", noop_ms))
+
+        names = rng.sample(sorted(os.listdir(directory)), args.changed)
+        for name in names:
+            if name.endswith(".mp3"):
+                _write_song(directory / name, rng, args.frames + 1)
+        changed_ms, stats = _timed(library.scan)
+        rows.append((f"增量扫描({stats['updated']}个变化)", changed_ms))
+        mismatch = mismatch or (
+            _summary(library.tracks()) != _summary(_full_scan(directory))
+        )
+        library.close()
+
+        for label, elapsed in rows:
+            print(f"{label:<20}{elapsed:>10.1f}ms")
+
+    if mismatch:
+        print("索引与全量扫描结果不一致")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
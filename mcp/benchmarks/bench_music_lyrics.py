@@ -0,0 +1,124 @@
+"""歌词解析与显示调度基准.
+
+生成一首 --lines 行的 LRC 歌词（部分行带多个时间标签），分别测量：原实现逐行在
+循环内导入 re 并匹配的解析耗时与 parse_lrc 的解析耗时；按播放位置查找当前行时
+从头线性扫描与二分查找的耗时；播放一首歌时每 200ms 轮询一次与只在换行时刻更新的
+唤醒次数；以及再次播放时从磁盘缓存读取解析好的歌词与重新解析的耗时。同时校验
+两种查找方式在所有位置给出的行相同。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_music_lyrics [--lines 80] [--duration 240]
+"""
+
+import argparse
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from src.mcp.tools.music.lyrics import load_lyrics, parse_lrc, save_lyrics
+
+
+def _make_lrc(lines: int, duration: float, rng: random.Random) -> str:
+    out = ["[ti:基准]", "[ar:歌手]", "[00:00.00]作词：某人", "[00:00.50]作曲：某人"]
+    step = duration / (lines + 1)
+    for i in range(lines):
+        stamp = (i + 1) * step
+        tags = f"[{int(stamp // 60):02d}:{stamp % 60:05.2f}]"
+        if rng.random() < 0.2:
+            # 副歌在后面重复出现
+            later = min(duration - 1, stamp + duration / 2)
+            tags += f"[{int(later // 60):02d}:{later % 60:05.2f}]"
+        out.append(f"{tags}第 {i + 1} 句歌词")
+    return "\n".join(out)
+
+
+def _parse_old(content: str) -> list:
+    """
+    原实现：逐行在循环内导入 re 并匹配 [mm:ss.xx].
+    """
+    lyrics = []
+    for line in content.split("\n"):
+        line = line.strip()
+        if not line:
+            continue
+        import re
+
+        time_match = re.match(r"\[(\d{2}):(\d{2})\.(\d{2})\](.+)", line)
+        if time_match:
+            time_sec = (
+                int(time_match.group(1)) * 60
+                + int(time_match.group(2))
+                + int(time_match.group(3)) / 100.0
+            )
+            text = time_match.group(4).strip()
+            if text and not text.startswith(("作词", "作曲", "ti:", "ar:")):
+                lyrics.append((time_sec, text))
+    return lyrics
+
+
+def _find_linear(lyrics: list, current_time: float) -> int:
+    """
+    原实现：从头扫描到第一句晚于当前位置的歌词.
+    """
+    for i, (time_sec, _) in enumerate(lyrics):
+        if time_sec > current_time - 0.5:
+            return max(0, i - 1)
+    return len(lyrics) - 1
+
+
+def _best_us(func, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(5):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        best = min(best, (time.perf_counter() - start) / repeat)
+    return best * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--lines", type=int, default=80)
+    parser.add_argument("--duration", type=float, default=240.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    content = _make_lrc(args.lines, args.duration, rng)
+    lyrics = parse_lrc(content)
+    pairs = list(lyrics)
+    print(f"歌词 {len(lyrics)} 行（含重复的副歌），时长 {args.duration:.0f} 秒")
+
+    old_us = _best_us(lambda: _parse_old(content), 200)
+    new_us = _best_us(lambda: parse_lrc(content), 200)
+    print(f"解析: 原实现 {old_us:.1f}us，parse_lrc {new_us:.1f}us")
+
+    positions = [rng.uniform(0, args.duration) for _ in range(1000)]
+    mismatched = sum(
+        _find_linear(pairs, pos) != lyrics.index_at(pos) for pos in positions
+    )
+    linear_us = _best_us(lambda: [_find_linear(pairs, p) for p in positions], 5)
+    bisect_us = _best_us(lambda: [lyrics.index_at(p) for p in positions], 5)
+    print(
+        f"查找 1000 次: 线性扫描 {linear_us:.0f}us，二分查找 {bisect_us:.0f}us，"
+        f"结果不同 {mismatched} 次"
+    )
+
+    polls = int(args.duration / 0.2)
+    print(f"每首歌唤醒次数: 轮询 {polls}，按换行时刻 {len(lyrics) + 1}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "lyrics" / "1.json"
+        save_lyrics(path, lyrics)
+        load_us = _best_us(lambda: load_lyrics(path), 200)
+        cached = load_lyrics(path)
+    print(f"再次播放: 读取磁盘缓存 {load_us:.1f}us，重新解析 {new_us:.1f}us（另需请求）")
+
+    if mismatched or list(cached) != pairs:
+        print("查找结果不一致或磁盘缓存内容不同")
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""本地音乐搜索基准.
+
+构造 N 首歌的元数据（默认 10000 首，中英文标题、歌手、专辑随机组合，不生成音乐
+文件），对比原实现（逐首拼接字段后做子串查找）与倒排索引搜索的耗时。查询分为
+精确子串、错别字、全拼、带空格的拼音与首字母几类，输出每类的中位与 P95 延迟（索引
+搜索取前 --limit 个结果），以及出题用的那首歌出现在前 10 个结果中的比例。精确子串
+查询校验某个字段中含有该查询的歌曲都在索引的结果中，且排在其他（拼音、模糊）匹配
+之前（原实现把各字段用空格连起来查找，跨字段的匹配不计）；所有查询校验取前 --limit
+个的结果与全部结果的开头相同。任一类 P95 延迟不低于 --budget 毫秒时以非零状态退出。
+未安装 pypinyin 时跳过拼音类查询。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_music_search [--tracks 10000]
+    [--queries 200] [--limit 10] [--budget 5]
+"""
+
+import argparse
+import random
+import time
+from pathlib import Path
+
+from src.mcp.tools.music.library import MusicMetadata
+from src.mcp.tools.music.search_index import (
+    PYPINYIN_AVAILABLE,
+    MusicSearchIndex,
+    normalize,
+    pinyin_fields,
+    to_pinyin,
+)
+
+if PYPINYIN_AVAILABLE:
+    from pypinyin import lazy_pinyin
+
+CN_WORDS = (
+    "晴天 稻香 夜曲 红豆 十年 彩虹 告白 气球 青花 瓷器 江南 曹操 浮夸 富士 山下 "
+    "后来 勇气 传奇 童话 年轮 光年 之外 演员 绅士 丑八 怪物 起风 了吧 孤勇 者们 "
+    "平凡 之路 夜空 烟火 海阔 天空 光辉 岁月 喜欢 秋天 故乡 月亮 星辰 大海 少年 "
+    "追梦 赤子 心中 远方 明天 你好 再见 时光 背包 旅行 微风 细雨 城市 森林"
+).split()
+EN_WORDS = (
+    "love story yellow night shape dream heart light river fire rain summer "
+    "paradise someone blue hello forever wonder golden wild ocean magic city "
+    "shadow empty echo thunder sky broken happy lonely sweet stars"
+).split()
+SURNAMES = "周林陈王张李刘杨赵黄吴徐孙胡朱高何郭马罗梁宋郑谢韩唐冯"
+GIVEN = "杰伦俊奕迅菲学友德华宇春嘉欣子琪一鸣思远天佑小雨晓彤雅静文博浩然"
+
+
+def _make_tracks(count: int, rng: random.Random) -> list:
+    artists = [
+        rng.choice(SURNAMES) + "".join(rng.sample(GIVEN, 2)) for _ in range(300)
+    ]
+    artists += [f"{rng.choice(EN_WORDS).title()} Band" for _ in range(60)]
+    tracks = []
+    for i in range(count):
+        if rng.random() < 0.75:
+            title = "".join(rng.sample(CN_WORDS, rng.choice((1, 2, 2, 3))))
+            if rng.random() < 0.1:
+                title += " (Live)"
+        else:
+            title = " ".join(w.title() for w in rng.sample(EN_WORDS, rng.randint(1, 3)))
+        artist = rng.choice(artists)
+        metadata = MusicMetadata.__new__(MusicMetadata)
+        metadata.file_path = Path(f"{100000 + i}.mp3")
+        metadata.filename = metadata.file_path.name
+        metadata.file_id = metadata.file_path.stem
+        metadata.file_size = 0
+        metadata.mtime_ns = 0
+        metadata.title = title
+        metadata.artist = artist
+        metadata.album = f"{artist}精选{rng.randint(1, 5)}"
+        metadata.duration = 200.0
+        metadata.pinyin = None
+        tracks.append(metadata)
+    return tracks
+
+
+def _linear_search(tracks: list, query: str) -> list:
+    """
+    原实现：逐首拼接标题、歌手、专辑与文件名后做子串查找.
+    """
+    query = query.lower()
+    results = []
+    for metadata in tracks:
+        searchable_text = " ".join(
+            filter(
+                None,
+                [metadata.title, metadata.artist, metadata.album, metadata.filename],
+            )
+        ).lower()
+        if query in searchable_text:
+            results.append(metadata)
+    return results
+
+
+def _typo(text: str, rng: random.Random) -> str:
+    chars = list(text)
+    index = rng.randrange(len(chars))
+    pool = CN_WORDS if not text.isascii() else ["abcdefghijklmnopqrstuvwxyz"]
+    chars[index] = rng.choice(rng.choice(pool))
+    return "".join(chars)
+
+
+def _make_queries(tracks: list, count: int, rng: random.Random) -> dict:
+    """
+    查询类别 -> [(查询, 出题用的歌曲文件名)].
+    """
+    queries = {"精确子串": [], "错别字": []}
+    if PYPINYIN_AVAILABLE:
+        queries.update({"全拼": [], "拼音带空格": [], "首字母": []})
+    while min(len(items) for items in queries.values()) < count:
+        metadata = rng.choice(tracks)
+        title = normalize(metadata.title)
+        if len(queries["精确子串"]) < count:
+            field = rng.choice((metadata.title, metadata.artist))
+            start = rng.randrange(max(1, len(field) - 2))
+            query = field[start : start + rng.randint(2, 4)].strip()
+            if query:
+                queries["精确子串"].append((query, metadata.filename))
+        if len(title) >= 4 and len(queries["错别字"]) < count:
+            queries["错别字"].append((_typo(title, rng), metadata.filename))
+        if not PYPINYIN_AVAILABLE or title.isascii():
+            continue
+        full, initials = to_pinyin(metadata.title)
+        syllables = " ".join(
+            normalize(s) for s in lazy_pinyin(metadata.title) if normalize(s)
+        )
+        for label, query in (
+            ("全拼", full),
+            ("拼音带空格", syllables),
+            ("首字母", initials),
+        ):
+            if len(queries[label]) < count:
+                queries[label].append((query, metadata.filename))
+    return queries
+
+
+def _exact_names(fields: dict, query: str) -> set:
+    """
+    规范化后的标题、歌手、专辑或歌曲ID中含有整个查询的歌曲.
+
+    fields 为文件名 -> 规范化后的各字段。
+    """
+    term = normalize(query)
+    return {
+        name for name, texts in fields.items() if any(term in t for t in texts)
+    }
+
+
+def _percentile(values: list, ratio: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * ratio))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--tracks", type=int, default=10000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--budget", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    tracks = _make_tracks(args.tracks, rng)
+    print(f"歌曲数: {args.tracks}，pypinyin: {'已安装' if PYPINYIN_AVAILABLE else '未安装'}")
+
+    start = time.perf_counter()
+    for metadata in tracks:
+        metadata.pinyin = pinyin_fields(metadata.title, metadata.artist, metadata.album)
+    pinyin_ms = (time.perf_counter() - start) * 1000
+    index = MusicSearchIndex()
+    start = time.perf_counter()
+    index.rebuild(tracks)
+    build_ms = (time.perf_counter() - start) * 1000
+    print(f"计算拼音 {pinyin_ms:.0f}ms（随音乐库索引保存），建立倒排索引 {build_ms:.0f}ms")
+
+    queries = _make_queries(tracks, args.queries, rng)
+    fields = {
+        m.filename: [normalize(t) for t in (m.title, m.artist, m.album, m.file_id)]
+        for m in tracks
+    }
+    print(
+        f"{'查询类别':<10}{'原实现中位':>12}{'索引中位':>10}{'索引P95':>10}"
+        f"{'前10命中':>10}"
+    )
+    failed = False
+    for label, items in queries.items():
+        linear, indexed, hits = [], [], 0
+        for query, expected in items:
+            start = time.perf_counter()
+            _linear_search(tracks, query)
+            linear.append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            results = index.search(query, args.limit)
+            indexed.append((time.perf_counter() - start) * 1000)
+            hits += expected in [m.filename for m in results[:10]]
+            names = [m.filename for m in index.search(query)]
+            if [m.filename for m in results] != names[: args.limit]:
+                print(f"取前 {args.limit} 个的结果与全部结果的开头不同: {query!r}")
+                failed = True
+            if label != "精确子串":
+                continue
+            exact = _exact_names(fields, query)
+            if not exact <= set(names):
+                print(f"索引结果缺少字段中含有该查询的歌曲: {query!r}")
+                failed = True
+            elif set(names[: len(exact)]) != exact:
+                print(f"精确匹配的歌曲没有排在模糊匹配之前: {query!r}")
+                failed = True
+        p95 = _percentile(indexed, 0.95)
+        failed = failed or p95 >= args.budget
+        print(
+            f"{label:<10}{_percentile(linear, 0.5):>10.2f}ms"
+            f"{_percentile(indexed, 0.5):>8.2f}ms{p95:>8.2f}ms"
+            f"{hits / len(items):>10.0%}"
+        )
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
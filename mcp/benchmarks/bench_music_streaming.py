@@ -0,0 +1,195 @@
+"""边下载边播放基准.
+
+本地起一个限速的 HTTP 服务（模拟音乐服务器，先等待 --latency 秒再按 --rate
+kbps 发送），提供一首合成的 MP3（ID3 标签加静音帧，默认 240 秒 128kbps），
+分别测量原实现（整首下载完再交给解码器）与边下载边播放从开始下载到可以出声的
+时间。边下载边播放时模拟解码器的读取方式：打开时读开头、读末尾标签并扫描已有
+数据，开始播放后按实时速度的 --speed 倍顺序读取，校验读到的数据与原文件一致、
+缓存文件在下载完成后才出现；最后让服务器在发送一半时断开，校验不会留下缓存文件。
+
+用法（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.benchmarks.bench_music_streaming [--rate 2000]
+    [--latency 0.2] [--seconds 240] [--speed 20]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from src.mcp.tools.music.streaming import ProgressiveDownload
+
+# MPEG-1 Layer III 128kbps 44.1kHz 的一帧（帧头 + 静音数据），约 26ms
+_MPEG_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+_FRAME_SECONDS = 1152 / 44100
+_CHUNK = 8192
+
+
+def _make_mp3(seconds: float, tag_padding: int) -> bytes:
+    # ID3v2.4 标签只含填充，模拟内嵌封面图片的大标签
+    size = bytes(
+        (
+            tag_padding >> 21 & 0x7F,
+            tag_padding >> 14 & 0x7F,
+            tag_padding >> 7 & 0x7F,
+            tag_padding & 0x7F,
+        )
+    )
+    header = b"ID3\x04\x00\x00" + size + b"\x00" * tag_padding
+    return header + _MPEG_FRAME * int(seconds / _FRAME_SECONDS)
+
+
+def _serve(data: bytes, rate_kbps: float, latency: float, fail: bool):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            limit = len(data) // 2 if fail else len(data)
+            interval = _CHUNK * 8 / (rate_kbps * 1000)
+            start = time.monotonic()
+            for i, offset in enumerate(range(0, limit, _CHUNK)):
+                delay = start + i * interval - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                try:
+                    self.wfile.write(data[offset : min(offset + _CHUNK, limit)])
+                except (BrokenPipeError, ConnectionResetError):
+                    return
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/song.mp3"
+
+
+def _full_download(url: str, directory: Path) -> float:
+    """
+    原实现：下载到临时文件，完成后移入缓存，返回可以开始播放的时刻.
+    """
+    temp_path = directory / "temp_full.mp3"
+    with urllib.request.urlopen(url) as response, open(temp_path, "wb") as f:
+        for chunk in iter(lambda: response.read(_CHUNK), b""):
+            f.write(chunk)
+    shutil.move(str(temp_path), str(directory / "full.mp3"))
+    return time.monotonic()
+
+
+def _start(url: str, directory: Path, name: str) -> ProgressiveDownload:
+    response = urllib.request.urlopen(url)
+    total = response.headers.get("Content-Length")
+    download = ProgressiveDownload(
+        iter(lambda: response.read(_CHUNK), b""),
+        int(total) if total else None,
+        directory / f"temp_{name}",
+        directory / name,
+        close=response.close,
+    )
+    download.start()
+    return download
+
+
+def _decode(download: ProgressiveDownload, speed: float):
+    """
+    模拟解码器：打开（探测）后开始播放，返回 (可以出声的时刻, 读到的数据).
+    """
+    reader = download.open_reader()
+    # 打开：读开头、读末尾的 ID3v1 标签、扫描已下载的部分，均不等待下载
+    reader.read(10)
+    reader.seek(-128, os.SEEK_END)
+    reader.read(128)
+    reader.seek(0)
+    while reader.read(_CHUNK):
+        pass
+    reader.seek(0)
+    reader.start_streaming()
+
+    data = bytearray(reader.read(len(_MPEG_FRAME) * 2))
+    first_audio = time.monotonic()
+    # 按实时速度的 speed 倍读取剩余部分
+    delay = _CHUNK / len(_MPEG_FRAME) * _FRAME_SECONDS / speed
+    while True:
+        chunk = reader.read(_CHUNK)
+        if not chunk:
+            break
+        data += chunk
+        time.sleep(delay)
+    reader.close()
+    return first_audio, bytes(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rate", type=float, default=2000, help="限速 kbps")
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--seconds", type=float, default=240)
+    parser.add_argument("--tag", type=int, default=100 * 1024, help="ID3 标签字节数")
+    parser.add_argument("--speed", type=float, default=20)
+    args = parser.parse_args()
+
+    data = _make_mp3(args.seconds, args.tag)
+    print(
+        f"文件 {len(data) / 1e6:.1f}MB（{args.seconds:.0f} 秒），"
+        f"限速 {args.rate:.0f}kbps，服务器延迟 {args.latency * 1000:.0f}ms"
+    )
+    failed = False
+    with tempfile.TemporaryDirectory() as tmp:
+        directory = Path(tmp)
+        server, url = _serve(data, args.rate, args.latency, fail=False)
+
+        start = time.monotonic()
+        full_ms = (_full_download(url, directory) - start) * 1000
+
+        start = time.monotonic()
+        download = _start(url, directory, "stream.mp3")
+        if not download.ready(60):
+            raise SystemExit("等待开头数据超时")
+        if (directory / "stream.mp3").exists():
+            print("下载完成前缓存文件已出现")
+            failed = True
+        first_audio, received = _decode(download, args.speed)
+        stream_ms = (first_audio - start) * 1000
+        cached = download.wait(60)
+        done_ms = (time.monotonic() - start) * 1000
+        server.shutdown()
+
+        print(f"{'方式':<14}{'首次出声':>10}{'下载完成':>10}")
+        print(f"{'整首下载后播放':<10}{full_ms:>10.0f}ms{full_ms:>8.0f}ms")
+        print(f"{'边下载边播放':<11}{stream_ms:>10.0f}ms{done_ms:>8.0f}ms")
+        if received != data:
+            print("边下载边读取的数据与原文件不一致")
+            failed = True
+        if cached is None or cached.read_bytes() != data:
+            print("缓存文件缺失或不完整")
+            failed = True
+
+        # 下载中途断开：已播放的部分正常读取，不留下缓存与临时文件
+        server, url = _serve(data, args.rate * 4, args.latency, fail=True)
+        download = _start(url, directory, "broken.mp3")
+        download.ready(60)
+        _, received = _decode(download, args.speed * 10)
+        server.shutdown()
+        leftovers = sorted(p.name for p in directory.iterdir())
+        if download.wait(60) is not None or "broken.mp3" in leftovers:
+            print("下载中断后仍留下了缓存文件")
+            failed = True
+        print(
+            f"中途断开: 读到 {len(received) / 1e6:.1f}MB 后结束，"
+            f"缓存目录中的文件: {leftovers}"
+        )
+
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
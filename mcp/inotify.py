@@ -0,0 +1,71 @@
+"""
+Linux inotify 的 ctypes 封装.
+
+日程变更订阅与音乐目录监视共用：以非阻塞方式打开 inotify 实例并监视一个目录，
+调用方把 fileno() 放进 select 等待，可读后用 read_names() 取出发生变化的文件名。
+"""
+
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from typing import List
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+
+# struct inotify_event 的固定部分：wd, mask, cookie, len，其后是 len 字节的文件名
+_EVENT = struct.Struct("iIII")
+
+
+def inotify_supported() -> bool:
+    return sys.platform.startswith("linux")
+
+
+class Inotify:
+    """
+    监视一个目录的 inotify 实例，打开失败时抛出 OSError.
+    """
+
+    def __init__(self, directory: str, mask: int):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+            init1, add_watch = libc.inotify_init1, libc.inotify_add_watch
+        except AttributeError as e:
+            raise OSError(f"libc 不支持 inotify: {e}") from e
+        fd = init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 失败")
+        if add_watch(fd, os.fsencode(directory), mask) < 0:
+            error = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(error, f"无法监视目录 {directory}")
+        self._fd = fd
+
+    def fileno(self) -> int:
+        return self._fd
+
+    def read_names(self) -> List[bytes]:
+        """
+        读出所有待处理的事件，返回发生变化的文件名（没有事件时为空列表）.
+        """
+        names = []
+        while True:
+            try:
+                data = os.read(self._fd, 4096)
+            except BlockingIOError:
+                return names
+            offset = 0
+            while offset < len(data):
+                _, _, _, length = _EVENT.unpack_from(data, offset)
+                offset += _EVENT.size
+                names.append(data[offset : offset + length].rstrip(b"\0"))
+                offset += length
+
+    def close(self):
+        os.close(self._fd)
@@ -0,0 +1,158 @@
+"""
+MCP工具模块的延迟加载.
+
+工具注册时只发布静态的名称/描述/参数，回调以 "模块:属性" 的形式登记，
+首次调用时才导入对应模块；同时记录各模块的导入耗时，并支持后台并行预热。
+"""
+
+import asyncio
+import importlib
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 模块名 -> 导入耗时（秒），仅记录经由本模块触发的首次导入
+_import_times: Dict[str, float] = {}
+
+
+def _imported(name: str):
+    """
+    已导入完成的模块；未导入或仍在其他线程中导入（如后台预热）时返回 None.
+    """
+    module = sys.modules.get(name)
+    if module is None:
+        return None
+    if getattr(getattr(module, "__spec__", None), "_initializing", False):
+        return None
+    return module
+
+
+def load_module(name: str):
+    """
+    导入模块并记录耗时，已导入的模块直接返回.
+    """
+    module = _imported(name)
+    if module is not None:
+        return module
+    if name in sys.modules:
+        # 其他线程正在导入：import_module 等待该模块的导入锁，返回完整的模块
+        return importlib.import_module(name)
+
+    # importlib 自带模块级导入锁，不同模块可在多个线程中并行导入
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    elapsed = time.perf_counter() - start
+    _import_times.setdefault(name, elapsed)
+    logger.info(f"[LazyLoader] 导入模块 {name} 耗时 {elapsed * 1000:.1f}ms")
+    return module
+
+
+async def load_module_async(name: str):
+    """
+    在线程池中导入模块，避免阻塞事件循环.
+    """
+    module = _imported(name)
+    if module is not None:
+        return module
+    return await asyncio.to_thread(load_module, name)
+
+
+class LazyCallback:
+    """
+    延迟导入的工具回调，首次解析时才导入目标模块.
+    """
+
+    def __init__(self, module: str, attr: str):
+        self.module = module
+        self.attr = attr
+        self._target: Optional[Callable] = None
+
+    @property
+    def loaded(self) -> bool:
+        return self._target is not None
+
+    def resolve(self) -> Callable:
+        """
+        导入并返回真实回调.
+        """
+        if self._target is None:
+            self._target = getattr(load_module(self.module), self.attr)
+        return self._target
+
+    async def resolve_async(self) -> Callable:
+        """
+        在线程池中导入并返回真实回调.
+        """
+        if self._target is None:
+            await load_module_async(self.module)
+        return self.resolve()
+
+    def __call__(self, arguments: Dict[str, Any]) -> Any:
+        return self.resolve()(arguments)
+
+    def __repr__(self) -> str:
+        return f"LazyCallback({self.module}:{self.attr})"
+
+
+def lazy_callback(module: str, attr: str) -> LazyCallback:
+    """
+    创建延迟导入的回调，module 为完整模块名.
+    """
+    return LazyCallback(module, attr)
+
+
+def warm_up_modules(modules: Iterable[str], max_workers: int = 4) -> ThreadPoolExecutor:
+    """后台并行导入模块.
+
+    立即返回，导入在守护线程池中进行；失败只记录日志，首次调用时会再次尝试导入。
+    """
+    pending = [name for name in dict.fromkeys(modules) if name not in sys.modules]
+    executor = ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(pending) or 1)),
+        thread_name_prefix="mcp-warmup",
+    )
+
+    def _load(name: str):
+        try:
+            load_module(name)
+        except Exception as e:
+            logger.warning(f"[LazyLoader] 预热模块 {name} 失败: {e}")
+
+    for name in pending:
+        executor.submit(_load, name)
+    executor.shutdown(wait=False)
+    logger.info(f"[LazyLoader] 后台预热 {len(pending)} 个模块")
+    return executor
+
+
+def get_import_times() -> Dict[str, float]:
+    """
+    获取已记录的模块导入耗时（秒）.
+    """
+    return dict(_import_times)
+
+
+def format_startup_report(register_times: List[tuple]) -> str:
+    """格式化启动耗时报告.
+
+    register_times 为 (分组名, 注册耗时秒, 该分组的工具模块名列表)。
+    """
+    imports = get_import_times()
+    lines = ["[MCP] 启动耗时报告（注册 / 已导入模块）:"]
+    total = 0.0
+    for group, elapsed, modules in register_times:
+        total += elapsed
+        loaded = [
+            f"{m} {imports[m] * 1000:.1f}ms" for m in modules if m in imports
+        ]
+        lines.append(
+            f"  {group:<12} 注册 {elapsed * 1000:7.1f}ms"
+            + (f"  导入: {', '.join(loaded)}" if loaded else "  导入: 延迟")
+        )
+    lines.append(f"  {'合计':<12} 注册 {total * 1000:7.1f}ms")
+    return "\n".join(lines)
@@ -4,12 +4,28 @@ Reference: https://modelcontextprotocol.io/specification/2024-11-05
 """
 
 import asyncio
+import contextvars
 import json
+import time
 from dataclasses import dataclass, field
 from enum import Enum
-from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple, Union
 
 from src.constants.system import SystemConstants
+from src.mcp.lazy_loader import (
+    LazyCallback,
+    format_startup_report,
+    lazy_callback,
+    load_module,
+    load_module_async,
+    warm_up_modules,
+)
+from src.mcp.progress import build_progress_notification, set_progress_sender
+from src.mcp.tool_executor import (
+    ExecutionPolicy,
+    get_tool_executor,
+    resolve_execution_policy,
+)
 from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -17,6 +33,11 @@ logger = get_logger(__name__)
 # 返回值类型
 ReturnValue = Union[bool, int, str]
 
+# 批量请求的响应收集器，由 McpServer._handle_batch 在任务上下文中设置
+_batch_responses: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar(
+    "mcp_batch_responses", default=None
+)
+
 
 class PropertyType(Enum):
     """
@@ -154,6 +175,18 @@ class McpTool:
     description: str
     properties: PropertyList
     callback: Callable[[Dict[str, Any]], ReturnValue]
+    # 并发组名称，见 McpServer.CONCURRENCY_GROUP_LIMITS
+    concurrency_group: Optional[str] = None
+    # 执行策略，未指定时见 tool_executor.resolve_execution_policy
+    execution_policy: Optional[ExecutionPolicy] = None
+
+    def __post_init__(self):
+        # 延迟导入的回调要等首次调用拿到真实函数后才能确定执行策略
+        if self.execution_policy is None and isinstance(self.callback, LazyCallback):
+            return
+        self.execution_policy = resolve_execution_policy(
+            self.name, self.callback, self.execution_policy
+        )
 
     def to_json(self) -> Dict[str, Any]:
         """
@@ -177,11 +210,17 @@ class McpTool:
             # 解析参数
             parsed_args = self.properties.parse_arguments(arguments)
 
-            # 调用回调函数
-            if asyncio.iscoroutinefunction(self.callback):
-                result = await self.callback(parsed_args)
-            else:
-                result = self.callback(parsed_args)
+            # 首次调用时在线程池中导入延迟加载的工具模块
+            callback = self.callback
+            if isinstance(callback, LazyCallback):
+                callback = await callback.resolve_async()
+            if self.execution_policy is None:
+                self.execution_policy = resolve_execution_policy(self.name, callback)
+
+            # 按执行策略调用回调函数（内联/线程池/进程池）
+            result = await get_tool_executor().run(
+                self.execution_policy, callback, parsed_args
+            )
 
             # 格式化返回值
             if isinstance(result, bool):
@@ -195,6 +234,8 @@ class McpTool:
                 {"content": [{"type": "text", "text": text}], "isError": False}
             )
 
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"Error calling tool {self.name}: {e}", exc_info=True)
             return json.dumps(
@@ -218,10 +259,46 @@ class McpServer:
             cls._instance = McpServer()
         return cls._instance
 
+    # tools/list 单页最大载荷（字节）
+    TOOLS_LIST_MAX_PAYLOAD = 8000
+
+    # 并发组上限：红外串口必须串行，摄像头/HTTP 类工具有限并发
+    CONCURRENCY_GROUP_LIMITS: Dict[str, int] = {
+        "ir_serial": 1,
+        "camera": 2,
+        "http": 4,
+    }
+
+    # 未显式声明 concurrency_group 的工具按名称前缀归组
+    TOOL_CONCURRENCY_DEFAULTS: List[Tuple[str, str]] = [
+        ("self.ir.", "ir_serial"),
+        ("take_photo", "camera"),
+        ("take_screenshot", "camera"),
+        ("music_player.search_and_play", "http"),
+        ("music_player.get_lyrics", "http"),
+        ("music_player.enqueue", "http"),
+        ("music_player.next", "http"),
+        ("music_player.previous", "http"),
+    ]
+
+    # 预热时额外导入的重模块（不经 LazyCallback 引用，由管理器按需导入）
+    WARM_UP_EXTRA_MODULES: List[str] = ["src.mcp.tools.music.music_player"]
+
     def __init__(self):
         self.tools: List[McpTool] = []
+        # 名称 -> 工具 的索引，与 self.tools 保持同步
+        self._tool_index: Dict[str, McpTool] = {}
+        # tools/list 分页缓存: cursor -> 已序列化的 result JSON
+        self._tools_list_cache: Optional[Dict[str, str]] = None
         self._send_callback: Optional[Callable] = None
         self._camera = None
+        # 正在处理的请求: JSON-RPC id -> 任务
+        self._inflight_requests: Dict[Any, asyncio.Task] = {}
+        self._background_tasks: Set[asyncio.Task] = set()
+        # 并发组 -> 信号量（在事件循环内惰性创建）
+        self._concurrency_limits: Dict[str, asyncio.Semaphore] = {}
+        # 启动耗时: (分组, 注册耗时, 延迟加载模块列表)
+        self._startup_groups: List[Tuple[str, float, List[str]]] = []
 
     def set_send_callback(self, callback: Callable):
         """
@@ -229,59 +306,187 @@ class McpServer:
         """
         self._send_callback = callback
 
-    def add_tool(self, tool: Union[McpTool, Tuple[str, str, PropertyList, Callable]]):
-        """
-        添加工具.
+    def add_tool(
+        self,
+        tool: Union[McpTool, Tuple[str, str, PropertyList, Callable]],
+        execution_policy: Optional[Union[ExecutionPolicy, str]] = None,
+        concurrency_group: Optional[str] = None,
+    ):
+        """添加工具.
+
+        execution_policy 可为 ExecutionPolicy 或其取值（"inline"/"thread"/"process"），
+        concurrency_group 见 CONCURRENCY_GROUP_LIMITS；两者都会覆盖工具上的设置。
         """
         if isinstance(tool, tuple):
             # 从参数创建McpTool
             name, description, properties, callback = tool
             tool = McpTool(name, description, properties, callback)
 
+        if execution_policy is not None:
+            tool.execution_policy = ExecutionPolicy(execution_policy)
+        if concurrency_group is not None:
+            tool.concurrency_group = concurrency_group
+
         # 检查是否已存在
-        if any(t.name == tool.name for t in self.tools):
+        if tool.name in self._tool_index:
             logger.warning(f"Tool {tool.name} already added")
             return
 
         logger.info(f"Add tool: {tool.name}")
         self.tools.append(tool)
+        self._tool_index[tool.name] = tool
+        self._invalidate_tools_cache()
+
+    def get_tool(self, name: str) -> Optional[McpTool]:
+        """
+        按名称查找工具.
+        """
+        return self._tool_index.get(name)
+
+    def _rebuild_tool_index(self):
+        """
+        根据 self.tools 重建名称索引（保留首次出现的同名工具）.
+        """
+        index: Dict[str, McpTool] = {}
+        for tool in self.tools:
+            index.setdefault(tool.name, tool)
+        self._tool_index = index
+        self._invalidate_tools_cache()
 
-    def add_common_tools(self):
+    def _invalidate_tools_cache(self):
         """
-        添加通用工具.
+        工具集合变化时使 tools/list 缓存失效.
+        """
+        self._tools_list_cache = None
+
+    def _build_tools_list_cache(self) -> Dict[str, str]:
+        """预先序列化并分页工具列表.
+
+        分页规则与逐个计算时一致：按单个工具 JSON 的长度累加，超过
+        TOOLS_LIST_MAX_PAYLOAD 时以下一个工具名作为 nextCursor。
+        返回 cursor -> result JSON 字符串的映射，首页的 cursor 为空字符串。
+        """
+        serialized = [(tool.name, json.dumps(tool.to_json())) for tool in self.tools]
+        positions = {}
+        for i, (name, _) in enumerate(serialized):
+            positions.setdefault(name, i)
+
+        def build_page(start: int) -> str:
+            chunks = []
+            total_size = 0
+            next_index = len(serialized)
+            for i in range(start, len(serialized)):
+                tool_str = serialized[i][1]
+                tool_size = len(tool_str)
+                if total_size + tool_size + 100 > self.TOOLS_LIST_MAX_PAYLOAD:
+                    next_index = i
+                    break
+                chunks.append(tool_str)
+                total_size += tool_size
+
+            page = '{"tools": [' + ", ".join(chunks) + "]"
+            if next_index < len(serialized):
+                page += ', "nextCursor": ' + json.dumps(serialized[next_index][0])
+            return page + "}"
+
+        # 首页以及以任意工具名为 cursor 的起始页（同名取首次出现位置）
+        cache: Dict[str, str] = {"": build_page(0)}
+        for name, i in positions.items():
+            cache.setdefault(name, build_page(i))
+
+        return cache
+
+    def add_common_tools(self, warm_up: bool = False):
+        """添加通用工具.
+
+        各工具模块只在注册时发布名称/描述/参数，回调首次被调用时才导入；
+        warm_up=True 时在后台线程中并行预导入这些模块。
         """
         # 备份原有工具列表
         original_tools = self.tools.copy()
         self.tools.clear()
+        self._rebuild_tool_index()
+        self._startup_groups = []
 
         # 添加系统工具
-        from src.mcp.tools.system import get_system_tools_manager
-
-        system_manager = get_system_tools_manager()
-        system_manager.init_tools(self.add_tool, PropertyList, Property, PropertyType)
+        self._register_tool_group("system", "src.mcp.tools.system", "get_system_tools_manager")
 
         # 添加日程管理工具
-        from src.mcp.tools.calendar import get_calendar_manager
-
-        calendar_manager = get_calendar_manager()
-        calendar_manager.init_tools(self.add_tool, PropertyList, Property, PropertyType)
+        self._register_tool_group("calendar", "src.mcp.tools.calendar", "get_calendar_manager")
 
         # 添加倒计时器工具
-        from src.mcp.tools.timer import get_timer_manager
-
-        timer_manager = get_timer_manager()
-        timer_manager.init_tools(self.add_tool, PropertyList, Property, PropertyType)
+        self._register_tool_group("timer", "src.mcp.tools.timer", "get_timer_manager")
 
         # 添加音乐播放器工具
-        from src.mcp.tools.music import get_music_tools_manager
+        self._register_tool_group("music", "src.mcp.tools.music", "get_music_tools_manager")
+
+        # 添加摄像头和桌面截图工具
+        self._timed_registration("vision", self._register_vision_tools)
+
+        # 添加八字命理工具
+        self._register_tool_group("bazi", "src.mcp.tools.bazi", "get_bazi_manager")
+
+        # 添加温度和湿度工具
+        self._register_tool_group(
+            "temperature", "src.mcp.tools.temperature", "get_temperature_manager"
+        )
+
+        # 添加时间工具（节假日、正计时、闹钟）
+        self._register_tool_group(
+            "time_utils", "src.mcp.tools.time_utils", "get_time_utils_manager"
+        )
+
+        # 添加红外控制工具
+        try:
+            self._register_tool_group(
+                "ir_control", "src.mcp.tools.ir_control", "get_ir_control_manager"
+            )
+        except Exception as e:
+            logger.error(f"[MCP] 注册 IR 控制工具失败: {e}", exc_info=True)
+
+        # 恢复原有工具
+        self.tools.extend(original_tools)
+        self._rebuild_tool_index()
+
+        logger.info(self.get_startup_report())
+
+        if warm_up:
+            self.warm_up_tool_modules()
+
+    def _register_tool_group(self, group: str, package: str, manager_getter: str):
+        """
+        导入工具包的管理器并注册其工具，记录注册耗时.
+        """
+
+        def register():
+            manager = getattr(load_module(package), manager_getter)()
+            manager.init_tools(self.add_tool, PropertyList, Property, PropertyType)
 
-        music_manager = get_music_tools_manager()
-        music_manager.init_tools(self.add_tool, PropertyList, Property, PropertyType)
+        self._timed_registration(group, register)
 
-        # 添加摄像头工具
+    def _timed_registration(self, group: str, register: Callable[[], None]):
+        """
+        执行一组工具注册，记录耗时及该组延迟加载的模块.
+        """
+        first = len(self.tools)
+        start = time.perf_counter()
         try:
-            from src.mcp.tools.camera import take_photo
+            register()
+        finally:
+            modules = [
+                t.callback.module
+                for t in self.tools[first:]
+                if isinstance(t.callback, LazyCallback)
+            ]
+            self._startup_groups.append(
+                (group, time.perf_counter() - start, list(dict.fromkeys(modules)))
+            )
 
+    def _register_vision_tools(self):
+        """
+        注册拍照识图与桌面截图工具，回调延迟导入（cv2/openai）.
+        """
+        try:
             # 注册take_photo工具
             properties = PropertyList([Property("question", PropertyType.STRING)])
             VISION_DESC = (
@@ -305,13 +510,10 @@ class McpServer:
                     "take_photo",  # 保留原名兼容
                     VISION_DESC,
                     properties,
-                    take_photo,
+                    lazy_callback("src.mcp.tools.camera", "take_photo"),
                 )
             )
 
-            # 添加桌面截图工具
-            from src.mcp.tools.screenshot import take_screenshot
-
             # 注册take_screenshot工具
             screenshot_properties = PropertyList(
                 [
@@ -342,80 +544,154 @@ class McpServer:
                     "take_screenshot",
                     SCREENSHOT_DESC,
                     screenshot_properties,
-                    take_screenshot,
+                    lazy_callback("src.mcp.tools.screenshot", "take_screenshot"),
                 )
             )
         except Exception as e:
             logger.error(f"[MCP] 注册摄像头和截图工具失败: {e}", exc_info=True)
 
-        # 添加八字命理工具
-        from src.mcp.tools.bazi import get_bazi_manager
+    def warm_up_tool_modules(self, max_workers: int = 4):
+        """
+        在后台线程中并行导入所有延迟加载的工具模块.
+        """
+        modules = [
+            t.callback.module
+            for t in self.tools
+            if isinstance(t.callback, LazyCallback) and not t.callback.loaded
+        ]
+        return warm_up_modules(modules + self.WARM_UP_EXTRA_MODULES, max_workers)
 
-        bazi_manager = get_bazi_manager()
-        bazi_manager.init_tools(self.add_tool, PropertyList, Property, PropertyType)
+    def get_startup_report(self) -> str:
+        """
+        获取按工具分组的启动耗时报告（含已发生的延迟导入）.
+        """
+        return format_startup_report(self._startup_groups)
 
-        # 添加温度和湿度工具
-        from src.mcp.tools.temperature import get_temperature_manager
+    async def parse_message(self, message: Union[str, Dict[str, Any], List[Any]]):
+        """解析MCP消息.
 
-        temperature_manager = get_temperature_manager()
-        temperature_manager.init_tools(self.add_tool, PropertyList, Property, PropertyType)
+        每个请求作为独立任务调度，本方法不等待工具执行完成；响应通过
+        JSON-RPC id 与请求对应。支持批量数组与 notifications/cancelled。
+        """
+        try:
+            if isinstance(message, str):
+                data = json.loads(message)
+            else:
+                data = message
+        except Exception as e:
+            logger.error(f"Error parsing MCP message: {e}", exc_info=True)
+            return
 
-        # 添加时间工具（节假日、正计时、闹钟）
-        from src.mcp.tools.time_utils import get_time_utils_manager
+        if isinstance(data, list):
+            if not data:
+                logger.error("[MCP] 空的批量请求")
+                return
+            self._track_task(asyncio.create_task(self._handle_batch(data)))
+            return
 
-        time_utils_manager = get_time_utils_manager()
-        time_utils_manager.init_tools(self.add_tool, PropertyList, Property, PropertyType)
+        self._dispatch(data)
 
-        # 添加红外控制工具
-        try:
-            from src.mcp.tools.ir_control import get_ir_control_manager
+    def _dispatch(self, data: Any) -> Optional[asyncio.Task]:
+        """
+        校验单条消息并为请求创建处理任务，通知在此同步处理.
+        """
+        if not isinstance(data, dict):
+            logger.error(f"Invalid MCP message: {data!r}")
+            return None
 
-            ir_manager = get_ir_control_manager()
-            ir_manager.init_tools(self.add_tool, PropertyList, Property, PropertyType)
-        except Exception as e:
-            logger.error(f"[MCP] 注册 IR 控制工具失败: {e}", exc_info=True)
+        logger.info(f"[MCP] 解析消息: {json.dumps(data, ensure_ascii=False, indent=2)}")
 
-        # 恢复原有工具
-        self.tools.extend(original_tools)
+        # 检查JSONRPC版本
+        if data.get("jsonrpc") != "2.0":
+            logger.error(f"Invalid JSONRPC version: {data.get('jsonrpc')}")
+            return None
+
+        method = data.get("method")
+        if not method:
+            logger.error("Missing method")
+            return None
+
+        if method.startswith("notifications"):
+            if method == "notifications/cancelled":
+                self._handle_cancelled(data.get("params") or {})
+            else:
+                logger.info(f"[MCP] 忽略通知消息: {method}")
+            return None
 
-    async def parse_message(self, message: Union[str, Dict[str, Any]]):
+        id = data.get("id")
+        if id is None:
+            logger.error(f"Invalid id for method: {method}")
+            return None
+
+        if id in self._inflight_requests:
+            logger.warning(f"[MCP] 请求ID重复且仍在处理中: {id}")
+
+        task = asyncio.create_task(self._handle_request(id, method, data))
+        self._inflight_requests[id] = task
+        self._track_task(task)
+
+        def _on_done(t: asyncio.Task, id=id):
+            if self._inflight_requests.get(id) is t:
+                del self._inflight_requests[id]
+
+        task.add_done_callback(_on_done)
+        return task
+
+    def _track_task(self, task: asyncio.Task):
         """
-        解析MCP消息.
+        持有后台任务引用，避免任务在完成前被回收.
         """
-        try:
-            if isinstance(message, str):
-                data = json.loads(message)
-            else:
-                data = message
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
 
-            logger.info(
-                f"[MCP] 解析消息: {json.dumps(data, ensure_ascii=False, indent=2)}"
-            )
+    async def _handle_batch(self, items: List[Any]):
+        """处理 JSON-RPC 批量请求.
 
-            # 检查JSONRPC版本
-            if data.get("jsonrpc") != "2.0":
-                logger.error(f"Invalid JSONRPC version: {data.get('jsonrpc')}")
-                return
+        批内请求并发执行，全部完成后以数组形式一次性发送响应；
+        仅包含通知或全部被取消时不发送任何内容。
+        """
+        responses: List[str] = []
+        token = _batch_responses.set(responses)
+        try:
+            tasks = [t for t in (self._dispatch(item) for item in items) if t]
+        finally:
+            _batch_responses.reset(token)
 
-            method = data.get("method")
-            if not method:
-                logger.error("Missing method")
-                return
+        if not tasks:
+            return
 
-            # 忽略通知
-            if method.startswith("notifications"):
-                logger.info(f"[MCP] 忽略通知消息: {method}")
-                return
+        await asyncio.gather(*tasks, return_exceptions=True)
 
-            params = data.get("params", {})
-            id = data.get("id")
+        if not responses:
+            return
+        if self._send_callback:
+            await self._send_callback("[" + ", ".join(responses) + "]")
+        else:
+            logger.error("[MCP] 发送回调未设置!")
 
-            if id is None:
-                logger.error(f"Invalid id for method: {method}")
-                return
+    def _handle_cancelled(self, params: Dict[str, Any]):
+        """
+        处理 notifications/cancelled：取消仍在执行的请求，且不再发送其响应.
+        """
+        request_id = params.get("requestId")
+        task = self._inflight_requests.get(request_id)
+        if task is None or task.done():
+            logger.info(f"[MCP] 取消通知对应的请求不存在或已完成: {request_id}")
+            return
+
+        logger.info(
+            f"[MCP] 取消请求: ID={request_id}, 原因={params.get('reason', '')}"
+        )
+        task.cancel()
 
-            logger.info(f"[MCP] 处理方法: {method}, ID: {id}, 参数: {params}")
+    async def _handle_request(self, id: Any, method: str, data: Dict[str, Any]):
+        """
+        处理单个请求.
+        """
+        params = data.get("params", {})
+        logger.info(f"[MCP] 处理方法: {method}, ID: {id}, 参数: {params}")
 
+        try:
             # 处理不同的方法
             if method == "initialize":
                 await self._handle_initialize(id, params)
@@ -426,11 +702,32 @@ class McpServer:
             else:
                 logger.error(f"Method not implemented: {method}")
                 await self._reply_error(id, f"Method not implemented: {method}")
-
+        except asyncio.CancelledError:
+            logger.info(f"[MCP] 请求已取消: ID={id}, 方法={method}")
+            raise
         except Exception as e:
-            logger.error(f"Error parsing MCP message: {e}", exc_info=True)
-            if "id" in locals():
-                await self._reply_error(id, str(e))
+            logger.error(f"Error handling MCP request: {e}", exc_info=True)
+            await self._reply_error(id, str(e))
+
+    def _get_concurrency_limit(self, tool: McpTool) -> Optional[asyncio.Semaphore]:
+        """
+        获取工具所属并发组的信号量，未归组的工具不限并发.
+        """
+        group = tool.concurrency_group
+        if group is None:
+            for prefix, default_group in self.TOOL_CONCURRENCY_DEFAULTS:
+                if tool.name.startswith(prefix):
+                    group = default_group
+                    break
+        if group is None:
+            return None
+
+        semaphore = self._concurrency_limits.get(group)
+        if semaphore is None:
+            limit = self.CONCURRENCY_GROUP_LIMITS.get(group, 1)
+            semaphore = asyncio.Semaphore(limit)
+            self._concurrency_limits[group] = semaphore
+        return semaphore
 
     async def _handle_initialize(self, id: int, params: Dict[str, Any]):
         """
@@ -456,38 +753,14 @@ class McpServer:
         """
         处理工具列表请求.
         """
-        cursor = params.get("cursor", "")
-        max_payload_size = 8000
-
-        tools_json = []
-        total_size = 0
-        found_cursor = not cursor
-        next_cursor = ""
+        cursor = params.get("cursor", "") or ""
 
-        for tool in self.tools:
-            # 如果还没找到起始位置，继续搜索
-            if not found_cursor:
-                if tool.name == cursor:
-                    found_cursor = True
-                else:
-                    continue
+        if self._tools_list_cache is None:
+            self._tools_list_cache = self._build_tools_list_cache()
 
-            # 检查大小
-            tool_json = tool.to_json()
-            tool_size = len(json.dumps(tool_json))
-
-            if total_size + tool_size + 100 > max_payload_size:
-                next_cursor = tool.name
-                break
-
-            tools_json.append(tool_json)
-            total_size += tool_size
-
-        result = {"tools": tools_json}
-        if next_cursor:
-            result["nextCursor"] = next_cursor
-
-        await self._reply_result(id, result)
+        # 未知 cursor 与原实现一致：返回空列表
+        result_json = self._tools_list_cache.get(cursor, '{"tools": []}')
+        await self._reply_raw_result(id, result_json)
 
     async def _handle_tool_call(self, id: int, params: Dict[str, Any]):
         """
@@ -512,11 +785,7 @@ class McpServer:
         logger.info(f"[MCP] 尝试调用工具: {tool_name}")
 
         # 查找工具
-        tool = None
-        for t in self.tools:
-            if t.name == tool_name:
-                tool = t
-                break
+        tool = self._tool_index.get(tool_name)
 
         if not tool:
             await self._reply_result(
@@ -538,9 +807,19 @@ class McpServer:
 
         logger.info(f"[MCP] 开始执行工具 {tool_name}, 参数: {arguments}")
 
-        # 异步调用工具
+        # 请求携带 progressToken 时允许工具推送进度通知（仅对内联执行的工具可见）
+        progress_token = (params.get("_meta") or {}).get("progressToken")
+        if progress_token is not None:
+            set_progress_sender(self._make_progress_sender(progress_token))
+
+        # 异步调用工具（按并发组限流）
         try:
-            result = await tool.call(arguments)
+            semaphore = self._get_concurrency_limit(tool)
+            if semaphore is None:
+                result = await tool.call(arguments)
+            else:
+                async with semaphore:
+                    result = await tool.call(arguments)
             logger.info(f"[MCP] 工具 {tool_name} 执行完成，原始结果: {result}")
             try:
                 parsed = json.loads(result)
@@ -551,6 +830,8 @@ class McpServer:
                     "isError": False,
                 }
             await self._reply_result(id, parsed)
+        except asyncio.CancelledError:
+            raise
         except Exception as e:
             logger.error(f"[MCP] 工具 {tool_name} 执行失败: {e}", exc_info=True)
             # 始终通过 result 返回可见的错误文本
@@ -562,6 +843,22 @@ class McpServer:
                 },
             )
 
+    def _make_progress_sender(self, progress_token: Any):
+        """
+        创建向客户端发送 notifications/progress 的发送器；通知不参与批量响应收集.
+        """
+
+        async def send(
+            progress: float, total: Optional[float], message: Optional[str]
+        ):
+            payload = build_progress_notification(
+                progress_token, progress, total, message
+            )
+            if self._send_callback:
+                await self._send_callback(json.dumps(payload, ensure_ascii=False))
+
+        return send
+
     async def _parse_capabilities(self, capabilities):
         """
         解析capabilities.
@@ -571,9 +868,8 @@ class McpServer:
             url = vision.get("url")
             token = vision.get("token")
             if url:
-                from src.mcp.tools.camera import get_camera_instance
-
-                camera = get_camera_instance()
+                camera_module = await load_module_async("src.mcp.tools.camera")
+                camera = camera_module.get_camera_instance()
                 if hasattr(camera, "set_explain_url"):
                     camera.set_explain_url(url)
                 if token and hasattr(camera, "set_explain_token"):
@@ -589,10 +885,19 @@ class McpServer:
         result_len = len(json.dumps(result))
         logger.info(f"[MCP] 发送成功响应: ID={id}, 结果长度={result_len}")
 
-        if self._send_callback:
-            await self._send_callback(json.dumps(payload))
-        else:
-            logger.error("[MCP] 发送回调未设置!")
+        await self._send_response(json.dumps(payload))
+
+    async def _reply_raw_result(self, id: int, result_json: str):
+        """
+        发送已序列化好的成功响应，避免重复 json.dumps.
+        """
+        logger.info(f"[MCP] 发送成功响应: ID={id}, 结果长度={len(result_json)}")
+
+        await self._send_response(
+            '{"jsonrpc": "2.0", "id": ' + json.dumps(id) + ', "result": '
+            + result_json
+            + "}"
+        )
 
     async def _reply_error(self, id: int, message: str):
         """
@@ -602,5 +907,18 @@ class McpServer:
 
         logger.error(f"[MCP] 发送错误响应: ID={id}, 错误={message}")
 
+        await self._send_response(json.dumps(payload))
+
+    async def _send_response(self, payload: str):
+        """
+        发送单条响应；批量请求中的响应先收集，待整批完成后统一发送.
+        """
+        batch = _batch_responses.get()
+        if batch is not None:
+            batch.append(payload)
+            return
+
         if self._send_callback:
-            await self._send_callback(json.dumps(payload))
+            await self._send_callback(payload)
+        else:
+            logger.error("[MCP] 发送回调未设置!")
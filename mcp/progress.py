@@ -0,0 +1,58 @@
+"""
+MCP工具调用的进度通知.
+
+tools/call 请求的 params._meta.progressToken 存在时，服务器在处理该请求的任务中
+登记进度发送器；工具调用 report_progress 即可推送 notifications/progress，
+让批量类工具边计算边回传部分结果。未携带 progressToken 时调用为空操作。
+"""
+
+import contextvars
+from typing import Any, Awaitable, Callable, Optional
+
+# 当前请求的进度发送器：(progress, total, message) -> 发送通知
+ProgressSender = Callable[[float, Optional[float], Optional[str]], Awaitable[None]]
+
+_progress_sender: contextvars.ContextVar[Optional[ProgressSender]] = (
+    contextvars.ContextVar("mcp_progress_sender", default=None)
+)
+
+
+def set_progress_sender(sender: Optional[ProgressSender]) -> contextvars.Token:
+    """
+    为当前任务登记进度发送器（每个请求在独立任务中处理，互不影响）.
+    """
+    return _progress_sender.set(sender)
+
+
+def progress_enabled() -> bool:
+    """
+    当前请求是否要求进度通知.
+    """
+    return _progress_sender.get() is not None
+
+
+async def report_progress(
+    progress: float, total: Optional[float] = None, message: Optional[str] = None
+) -> bool:
+    """
+    推送进度通知，未要求进度时返回 False.
+    """
+    sender = _progress_sender.get()
+    if sender is None:
+        return False
+    await sender(progress, total, message)
+    return True
+
+
+def build_progress_notification(
+    token: Any, progress: float, total: Optional[float], message: Optional[str]
+) -> dict:
+    """
+    构造 notifications/progress 消息体.
+    """
+    params = {"progressToken": token, "progress": progress}
+    if total is not None:
+        params["total"] = total
+    if message is not None:
+        params["message"] = message
+    return {"jsonrpc": "2.0", "method": "notifications/progress", "params": params}
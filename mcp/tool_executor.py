@@ -0,0 +1,289 @@
+"""
+MCP工具执行器.
+
+按工具的执行策略把回调放到事件循环内联执行、线程池或进程池中执行，
+避免同步/CPU密集的工具阻塞整个语音管线，并统计各工作池的排队情况。
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class ExecutionPolicy(Enum):
+    """
+    工具执行策略.
+    """
+
+    INLINE = "inline"  # 直接在事件循环中执行
+    THREAD = "thread"  # 线程池执行，适合阻塞I/O
+    PROCESS = "process"  # 进程池执行，适合CPU密集计算（回调及参数需可pickle）
+
+
+# 已知阻塞的异步工具：协程内部直接做同步重计算，按名称前缀指定默认策略
+DEFAULT_EXECUTION_POLICIES: List[Tuple[str, ExecutionPolicy]] = [
+    ("self.bazi.", ExecutionPolicy.THREAD),
+]
+
+
+def resolve_execution_policy(
+    name: str, callback: Callable, policy: Optional[ExecutionPolicy] = None
+) -> ExecutionPolicy:
+    """确定工具的执行策略.
+
+    优先使用注册时声明的策略；其次按名称前缀匹配默认表；
+    都没有时同步回调进线程池，异步回调内联执行。
+    """
+    if policy is not None:
+        return ExecutionPolicy(policy)
+
+    for prefix, default_policy in DEFAULT_EXECUTION_POLICIES:
+        if name.startswith(prefix):
+            return default_policy
+
+    if asyncio.iscoroutinefunction(callback):
+        return ExecutionPolicy.INLINE
+    return ExecutionPolicy.THREAD
+
+
+def _call(callback: Callable, arguments: Dict[str, Any]) -> Any:
+    """
+    在工作线程/进程中执行回调，异步回调使用独立事件循环运行.
+    """
+    if asyncio.iscoroutinefunction(callback):
+        return asyncio.run(callback(arguments))
+    return callback(arguments)
+
+
+def _call_in_process(callback: Callable, arguments: Dict[str, Any], submitted_at: float):
+    """
+    进程池入口，额外返回任务在队列中的等待时间.
+    """
+    wait = time.time() - submitted_at
+    return _call(callback, arguments), wait
+
+
+class _PoolMetrics:
+    """
+    单个工作池的运行指标.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.queue_depth = 0
+        self.max_queue_depth = 0
+        self.running = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    def on_submit(self):
+        with self._lock:
+            self.submitted += 1
+            self.queue_depth += 1
+            self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def on_start(self, wait: float, state: Optional[Dict[str, bool]] = None) -> bool:
+        """
+        记录任务开始执行；任务已在排队时被取消则返回 False.
+        """
+        with self._lock:
+            if state is not None:
+                if state.get("aborted"):
+                    return False
+                state["started"] = True
+            self.queue_depth -= 1
+            self.running += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            return True
+
+    def on_finish(self, run: float, success: bool):
+        with self._lock:
+            self.running -= 1
+            self.total_run += run
+            if success:
+                self.completed += 1
+            else:
+                self.failed += 1
+
+    def on_abort(self, state: Optional[Dict[str, bool]] = None):
+        """
+        任务在开始执行前结束（被取消、进程池崩溃或回调无法pickle）.
+        """
+        with self._lock:
+            if state is not None:
+                if state.get("started"):
+                    return
+                state["aborted"] = True
+            self.queue_depth -= 1
+            self.failed += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            finished = self.completed + self.failed
+            started = finished + self.running
+            return {
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "queue_depth": self.queue_depth,
+                "max_queue_depth": self.max_queue_depth,
+                "running": self.running,
+                "avg_wait_ms": round(self.total_wait / started * 1000, 2)
+                if started
+                else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 2),
+                "avg_run_ms": round(self.total_run / finished * 1000, 2)
+                if finished
+                else 0.0,
+            }
+
+
+class ToolExecutor:
+    """
+    按执行策略分发工具回调的执行器，每种策略一个工作池.
+    """
+
+    def __init__(self, thread_workers: int = 4, process_workers: int = 2):
+        self._thread_workers = thread_workers
+        self._process_workers = process_workers
+        self._pools: Dict[ExecutionPolicy, Executor] = {}
+        self._pools_lock = threading.Lock()
+        self._metrics: Dict[ExecutionPolicy, _PoolMetrics] = {
+            policy: _PoolMetrics() for policy in ExecutionPolicy
+        }
+
+    def _get_pool(self, policy: ExecutionPolicy) -> Executor:
+        """
+        惰性创建工作池.
+        """
+        with self._pools_lock:
+            pool = self._pools.get(policy)
+            if pool is None:
+                if policy == ExecutionPolicy.PROCESS:
+                    pool = ProcessPoolExecutor(max_workers=self._process_workers)
+                else:
+                    pool = ThreadPoolExecutor(
+                        max_workers=self._thread_workers,
+                        thread_name_prefix="mcp-tool",
+                    )
+                self._pools[policy] = pool
+                logger.info(f"[ToolExecutor] 创建{policy.value}工作池")
+            return pool
+
+    async def run(
+        self,
+        policy: ExecutionPolicy,
+        callback: Callable,
+        arguments: Dict[str, Any],
+    ) -> Any:
+        """
+        按策略执行回调并返回其结果.
+        """
+        metrics = self._metrics[policy]
+        submitted_at = time.time()
+        metrics.on_submit()
+
+        if policy == ExecutionPolicy.INLINE:
+            metrics.on_start(0.0)
+            success = False
+            try:
+                if asyncio.iscoroutinefunction(callback):
+                    result = await callback(arguments)
+                else:
+                    result = callback(arguments)
+                success = True
+                return result
+            finally:
+                metrics.on_finish(time.time() - submitted_at, success)
+
+        loop = asyncio.get_running_loop()
+        pool = self._get_pool(policy)
+
+        if policy == ExecutionPolicy.THREAD:
+            state: Dict[str, bool] = {}
+            try:
+                return await loop.run_in_executor(
+                    pool, self._run_tracked, metrics, state, callback, arguments, submitted_at
+                )
+            except asyncio.CancelledError:
+                # 仍在排队的任务随之取消；已开始的任务无法中断，由工作线程自行记账
+                metrics.on_abort(state)
+                raise
+
+        # 进程池无法在子进程中更新指标，结束后按子进程返回的等待时间补记
+        try:
+            result, wait = await loop.run_in_executor(
+                pool, _call_in_process, callback, arguments, submitted_at
+            )
+        except BaseException:
+            metrics.on_abort()
+            raise
+        metrics.on_start(wait)
+        metrics.on_finish(time.time() - submitted_at - wait, True)
+        return result
+
+    @staticmethod
+    def _run_tracked(
+        metrics: "_PoolMetrics",
+        state: Dict[str, bool],
+        callback: Callable,
+        arguments: Dict[str, Any],
+        submitted_at: float,
+    ) -> Any:
+        """
+        线程池入口，在工作线程中记录等待与执行指标.
+        """
+        started_at = time.time()
+        if not metrics.on_start(started_at - submitted_at, state):
+            raise asyncio.CancelledError()
+        success = False
+        try:
+            result = _call(callback, arguments)
+            success = True
+            return result
+        finally:
+            metrics.on_finish(time.time() - started_at, success)
+
+    def get_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """
+        获取各执行策略工作池的指标快照.
+        """
+        return {
+            policy.value: metrics.snapshot()
+            for policy, metrics in self._metrics.items()
+        }
+
+    def shutdown(self, wait: bool = False):
+        """
+        关闭所有工作池.
+        """
+        with self._pools_lock:
+            pools, self._pools = self._pools, {}
+        for pool in pools.values():
+            pool.shutdown(wait=wait)
+
+
+# 全局执行器实例
+_tool_executor = None
+
+
+def get_tool_executor() -> ToolExecutor:
+    """
+    获取工具执行器单例.
+    """
+    global _tool_executor
+    if _tool_executor is None:
+        _tool_executor = ToolExecutor()
+    return _tool_executor
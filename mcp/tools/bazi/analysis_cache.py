@@ -0,0 +1,133 @@
+"""
+八字分析结果缓存。
+
+同一个人的八字常在短时间内被反复查询（追问大运、婚姻等），按规范化的
+(公历时刻, 性别, 子时流派) 缓存排盘结果、分析器输出与序列化后的工具响应，
+采用 LRU + TTL 淘汰，并统计命中情况供诊断工具查询。缓存中的对象应视为只读。
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from .models import SolarTime
+
+_MISSING = object()
+
+
+class LRUTTLCache:
+    """
+    线程安全的 LRU + TTL 缓存.
+    """
+
+    def __init__(self, name: str, maxsize: int = 256, ttl: float = 1800.0):
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, value: Any):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        命中直接返回，否则调用 factory 计算并写入；factory 抛出的异常不会被缓存.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
+
+
+class BaziCache:
+    """八字缓存，按产物类型分区.
+
+    analysis: 排盘结果（四柱、大运、神煞、专业分析等）
+    marriage: 婚姻分析器输出
+    response: 序列化后的工具响应 JSON
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 1800.0):
+        self.analysis = LRUTTLCache("analysis", maxsize, ttl)
+        self.marriage = LRUTTLCache("marriage", maxsize, ttl)
+        self.response = LRUTTLCache("response", maxsize, ttl)
+
+    def _partitions(self):
+        return (self.analysis, self.marriage, self.response)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        return {cache.name: cache.stats() for cache in self._partitions()}
+
+    def clear(self):
+        for cache in self._partitions():
+            cache.clear()
+
+
+def birth_key(solar_time: SolarTime, gender: int, sect: int) -> Tuple[str, int, int]:
+    """
+    规范化的缓存键：(公历时刻 YYYY-MM-DDTHH:MM:SS, 性别, 子时流派).
+    """
+    return (
+        f"{solar_time.year:04d}-{solar_time.month:02d}-{solar_time.day:02d}"
+        f"T{solar_time.hour:02d}:{solar_time.minute:02d}:{solar_time.second:02d}",
+        gender,
+        sect,
+    )
+
+
+# 全局缓存实例
+_bazi_cache = None
+
+
+def get_bazi_cache() -> BaziCache:
+    """
+    获取八字缓存单例.
+    """
+    global _bazi_cache
+    if _bazi_cache is None:
+        _bazi_cache = BaziCache()
+    return _bazi_cache
@@ -0,0 +1,208 @@
+"""
+八字批量分析。
+
+一次分析多条出生记录，并计算其中所有男女两两之间的合婚结果。排盘与合婚按块
+分发到工具执行器的进程池并行计算（工作进程内各自复用八字缓存），结果按块完成
+的先后以异步迭代产出，调用方可边算边回传。
+"""
+
+import asyncio
+import json
+import os
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from src.mcp.tool_executor import ExecutionPolicy, get_tool_executor
+
+# 单次批量的记录数上限（合婚对数随记录数平方增长）
+MAX_RECORDS = 200
+# 每个任务块包含的命盘数 / 合婚对数
+CHART_CHUNK_SIZE = 8
+PAIR_CHUNK_SIZE = 64
+# 记录数少于该值（或单核机器）时在线程池计算，不值得付出进程间传输的开销
+PROCESS_MIN_RECORDS = 8
+
+
+@dataclass
+class BirthRecord:
+    """
+    批量分析的一条出生记录.
+    """
+
+    name: str
+    gender: int
+    solar_datetime: Optional[str] = None
+    lunar_datetime: Optional[str] = None
+
+
+def parse_records(raw: Any) -> List[BirthRecord]:
+    """解析批量记录.
+
+    raw 为记录列表或其 JSON 字符串，每条形如
+    {"name": "张三", "gender": 1, "solar_datetime": "1990-05-15 08:30"}，
+    solar_datetime 与 lunar_datetime 二选一。
+    """
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"records 不是合法的JSON: {e}")
+    if not isinstance(raw, list) or not raw:
+        raise ValueError("records 必须是非空数组")
+    if len(raw) > MAX_RECORDS:
+        raise ValueError(f"单次最多分析 {MAX_RECORDS} 条记录")
+
+    records = []
+    for i, item in enumerate(raw):
+        if not isinstance(item, dict):
+            raise ValueError(f"第 {i + 1} 条记录格式错误")
+        solar = item.get("solar_datetime") or None
+        lunar = item.get("lunar_datetime") or None
+        if not solar and not lunar:
+            raise ValueError(
+                f"第 {i + 1} 条记录缺少 solar_datetime 或 lunar_datetime"
+            )
+        gender = item.get("gender", 1)
+        if gender not in (0, 1):
+            raise ValueError(f"第 {i + 1} 条记录的 gender 只能为 0 或 1")
+        records.append(
+            BirthRecord(
+                name=str(item.get("name") or f"记录{i + 1}"),
+                gender=gender,
+                solar_datetime=solar,
+                lunar_datetime=lunar,
+            )
+        )
+    return records
+
+
+def compatibility_pairs(records: List[BirthRecord]) -> List[Tuple[int, int]]:
+    """
+    列出所有男女组合 (男方序号, 女方序号)，同性记录之间不做合婚.
+    """
+    males = [i for i, r in enumerate(records) if r.gender == 1]
+    females = [i for i, r in enumerate(records) if r.gender == 0]
+    return [(m, f) for m in males for f in females]
+
+
+@lru_cache(maxsize=MAX_RECORDS * 2)
+def _build_bazi_cached(
+    solar_datetime: Optional[str], lunar_datetime: Optional[str], gender: int
+):
+    from .bazi_calculator import get_bazi_calculator
+
+    return get_bazi_calculator().build_bazi(
+        solar_datetime=solar_datetime, lunar_datetime=lunar_datetime, gender=gender
+    )
+
+
+def _build_bazi(record: Dict[str, Any]):
+    """
+    按原始记录复用排盘结果，同一记录在多个合婚块中出现时免去重复解析时间.
+    """
+    return _build_bazi_cached(
+        record["solar_datetime"], record["lunar_datetime"], record["gender"]
+    )
+
+
+def analyze_chart_chunk(args: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    计算一块命盘（在工作进程中执行，参数与返回值均可 pickle）.
+    """
+    results = []
+    for i in args["indices"]:
+        record = args["records"][i]
+        try:
+            analysis = _build_bazi(record)
+        except Exception as e:
+            results.append({"序号": i, "姓名": record["name"], "错误": str(e)})
+            continue
+
+        item = {
+            "序号": i,
+            "姓名": record["name"],
+            "八字": analysis.bazi,
+            "日主": analysis.day_master,
+            "生肖": analysis.zodiac,
+            "阳历": analysis.solar_time,
+            "农历": analysis.lunar_time,
+            "起运年龄": analysis.fortune["起运年龄"],
+        }
+        if args["detail"]:
+            item["详情"] = analysis.to_dict()
+        results.append(item)
+    return results
+
+
+def analyze_pair_chunk(args: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    计算一块合婚（在工作进程中执行；双方命盘取自进程内的八字缓存）.
+    """
+    from .marriage_tools import _analyze_compatibility
+
+    results = []
+    for male, female in args["pairs"]:
+        item = {"男方": male, "女方": female}
+        try:
+            compatibility = _analyze_compatibility(
+                _build_bazi(args["records"][male]),
+                _build_bazi(args["records"][female]),
+            )
+        except Exception as e:
+            item["错误"] = str(e)
+            results.append(item)
+            continue
+
+        item["综合评分"] = compatibility["overall_score"]
+        item["匹配等级"] = compatibility["overall_level"]
+        if args["detail"]:
+            item["详情"] = compatibility
+        results.append(item)
+    return results
+
+
+def _chunks(items: List[Any], size: int) -> List[List[Any]]:
+    return [items[i : i + size] for i in range(0, len(items), size)]
+
+
+async def iter_batch_analysis(
+    records: List[BirthRecord],
+    detail: bool = False,
+    policy: Optional[ExecutionPolicy] = None,
+) -> AsyncIterator[Tuple[str, List[Dict[str, Any]]]]:
+    """批量排盘并计算全部男女合婚，按块完成顺序产出 ("命盘"|"合婚", 结果列表).
+
+    policy 默认在多核机器上且记录数达到 PROCESS_MIN_RECORDS 时使用进程池，
+    否则使用线程池。
+    """
+    if policy is None:
+        multi_core = (os.cpu_count() or 1) > 1
+        policy = (
+            ExecutionPolicy.PROCESS
+            if multi_core and len(records) >= PROCESS_MIN_RECORDS
+            else ExecutionPolicy.THREAD
+        )
+    executor = get_tool_executor()
+    payload = [asdict(r) for r in records]
+
+    async def run(kind: str, func, key: str, chunk: List[Any]):
+        args = {"records": payload, key: chunk, "detail": detail}
+        return kind, await executor.run(policy, func, args)
+
+    tasks = [
+        asyncio.ensure_future(run("命盘", analyze_chart_chunk, "indices", chunk))
+        for chunk in _chunks(list(range(len(records))), CHART_CHUNK_SIZE)
+    ]
+    tasks += [
+        asyncio.ensure_future(run("合婚", analyze_pair_chunk, "pairs", chunk))
+        for chunk in _chunks(compatibility_pairs(records), PAIR_CHUNK_SIZE)
+    ]
+
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        # 调用方提前结束（如请求被取消）时撤销尚未开始的块
+        for task in tasks:
+            task.cancel()
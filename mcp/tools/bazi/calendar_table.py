@@ -0,0 +1,294 @@
+"""
+预计算的节气与农历月表。
+
+按公历年存放 24 节气时刻（相对当年 1 月 1 日 00:00:00 的秒数，北京时间），
+并按时间顺序存放各农历月的朔日、所属农历年与月份（闰月为负数）。
+数据由 lunar_python 生成并随代码发布，运行时只做数组读取与二分查找；
+日柱为固定的六十日循环，直接由日期推算（见 sexagenary.day_ganzhi_index），无需存表。
+
+重新生成数据文件（在 py-xiaozhi 根目录下）:
+    python -m src.mcp.tools.bazi.calendar_table
+"""
+
+import struct
+import sys
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# 表覆盖的公历年范围（含首尾）；首尾各多留一年，便于查询跨年边界
+FIRST_YEAR = 1899
+LAST_YEAR = 2101
+
+# 每年的节气顺序：从小寒开始到冬至，偶数下标为"节"（月柱分界），奇数为"气"
+JIEQI_NAMES = [
+    "小寒",
+    "大寒",
+    "立春",
+    "雨水",
+    "惊蛰",
+    "春分",
+    "清明",
+    "谷雨",
+    "立夏",
+    "小满",
+    "芒种",
+    "夏至",
+    "小暑",
+    "大暑",
+    "立秋",
+    "处暑",
+    "白露",
+    "秋分",
+    "寒露",
+    "霜降",
+    "立冬",
+    "小雪",
+    "大雪",
+    "冬至",
+]
+
+TABLE_FILE = Path(__file__).with_name("calendar_table.bin")
+
+# 文件头: 魔数、版本、首年、年数、每年节气数、农历月数
+# 其后依次为节气秒数(int32)、农历月朔日(int32)、农历年(int16)、农历月(int8)，均为小端序
+_HEADER = struct.Struct("<4sHHHHH")
+_MAGIC = b"BZCT"
+_VERSION = 2
+
+
+class CalendarTable:
+    """
+    节气时刻表（按 (年, 节气序号) 索引）与农历月表（按朔日排序）.
+    """
+
+    def __init__(
+        self,
+        first_year: int,
+        jieqi: array,
+        month_starts: array,
+        month_years: array,
+        month_numbers: array,
+    ):
+        self.first_year = first_year
+        self.last_year = first_year + len(jieqi) // 24 - 1
+        self._jieqi = jieqi
+        # 农历月朔日，为相对 first_year 年 1 月 1 日的天数
+        self._epoch = date(first_year, 1, 1).toordinal()
+        self._month_starts = month_starts
+        self._month_years = month_years
+        self._month_numbers = month_numbers
+        self._month_index: Optional[Dict[Tuple[int, int], int]] = None
+
+    def covers(self, year: int) -> bool:
+        return self.first_year <= year <= self.last_year
+
+    def covers_lunar(self, year: int) -> bool:
+        """
+        该公历年的农历换算、前后节气查询是否都能由表完成（首尾两年只用于跨年边界）.
+        """
+        return self.first_year < year < self.last_year
+
+    def jieqi_offsets(self, year: int) -> array:
+        """
+        获取某年 24 节气相对年初的秒数.
+        """
+        start = (year - self.first_year) * 24
+        return self._jieqi[start : start + 24]
+
+    def jie_offsets(self, year: int) -> array:
+        """
+        获取某年 12 个"节"（小寒、立春、惊蛰……大雪）相对年初的秒数.
+        """
+        start = (year - self.first_year) * 24
+        return self._jieqi[start : start + 24 : 2]
+
+    def jieqi_datetime(self, year: int, index: int) -> datetime:
+        """
+        获取某年第 index 个节气的时刻.
+        """
+        offset = self._jieqi[(year - self.first_year) * 24 + index]
+        return datetime(year, 1, 1) + timedelta(seconds=offset)
+
+    def jieqi_on(self, d: date) -> str:
+        """
+        获取某天交节的节气名称，当天无节气时返回空字符串.
+        """
+        offsets = self.jieqi_offsets(d.year)
+        day_start = (d - date(d.year, 1, 1)).days * 86400
+        i = bisect_left(offsets, day_start)
+        if i < 24 and offsets[i] < day_start + 86400:
+            return JIEQI_NAMES[i]
+        return ""
+
+    def near_jieqi(self, dt: datetime, forward: bool) -> Tuple[str, datetime]:
+        """获取最近的节气.
+
+        forward 为 True 时取严格晚于 dt 的第一个节气，否则取不晚于 dt 的最后一个节气。
+        """
+        year = dt.year
+        second = int((dt - datetime(year, 1, 1)).total_seconds())
+        i = bisect_right(self.jieqi_offsets(year), second)
+        if forward:
+            if i == 24:
+                year, i = year + 1, 0
+        else:
+            i -= 1
+            if i < 0:
+                year, i = year - 1, 23
+        return JIEQI_NAMES[i], self.jieqi_datetime(year, i)
+
+    def _month_at(self, d: date) -> Optional[int]:
+        """
+        获取 d 所在农历月在月表中的下标，需要下一个月的朔日确定月长.
+        """
+        i = bisect_right(self._month_starts, d.toordinal() - self._epoch) - 1
+        if 0 <= i < len(self._month_starts) - 1:
+            return i
+        return None
+
+    def lunar_date(self, d: date) -> Optional[Tuple[int, int, int]]:
+        """
+        公历日期转农历 (年, 月, 日)，闰月的月份为负数；超出表范围返回 None.
+        """
+        i = self._month_at(d)
+        if i is None:
+            return None
+        day = d.toordinal() - self._epoch - self._month_starts[i] + 1
+        return self._month_years[i], self._month_numbers[i], day
+
+    def solar_date(
+        self, lunar_year: int, lunar_month: int, lunar_day: int
+    ) -> Optional[date]:
+        """
+        农历 (年, 月, 日) 转公历日期，闰月的月份为负数；表中没有或日期不合法时返回 None.
+        """
+        if self._month_index is None:
+            self._month_index = {
+                (year, month): i
+                for i, (year, month) in enumerate(
+                    zip(self._month_years, self._month_numbers)
+                )
+            }
+        i = self._month_index.get((lunar_year, lunar_month))
+        if i is None or i >= len(self._month_starts) - 1:
+            return None
+        start = self._month_starts[i]
+        if not 1 <= lunar_day <= self._month_starts[i + 1] - start:
+            return None
+        return date.fromordinal(self._epoch + start + lunar_day - 1)
+
+
+def generate_table(first_year: int = FIRST_YEAR, last_year: int = LAST_YEAR) -> array:
+    """
+    使用 lunar_python 计算节气时刻表（较慢，仅用于生成数据文件）.
+    """
+    from lunar_python import Lunar
+
+    data = array("i")
+    for year in range(first_year, last_year + 1):
+        # 农历 year 年的节气表包含公历 year 年的小寒至大雪，当年冬至以 DONG_ZHI 为键
+        table = Lunar.fromYmd(year, 1, 1).getJieQiTable()
+        year_start = datetime(year, 1, 1)
+        for name in JIEQI_NAMES:
+            solar = table["DONG_ZHI" if name == "冬至" else name]
+            instant = datetime.strptime(solar.toYmdHms(), "%Y-%m-%d %H:%M:%S")
+            data.append(int((instant - year_start).total_seconds()))
+    return data
+
+
+def generate_lunar_months(
+    first_year: int = FIRST_YEAR, last_year: int = LAST_YEAR
+) -> Tuple[array, array, array]:
+    """
+    使用 lunar_python 计算农历月表：(朔日, 农历年, 农历月)，朔日为相对 first_year 年初的天数.
+    """
+    from lunar_python import LunarYear, Solar
+
+    epoch = date(first_year, 1, 1).toordinal()
+    months = {}
+    # 农历年跨越公历年，前后各多取一年保证首尾日期都落在表内
+    for lunar_year in range(first_year - 1, last_year + 2):
+        for m in LunarYear.fromYear(lunar_year).getMonths():
+            solar = Solar.fromJulianDay(m.getFirstJulianDay())
+            start = date(solar.getYear(), solar.getMonth(), solar.getDay())
+            months[start.toordinal() - epoch] = (m.getYear(), m.getMonth())
+
+    starts, years, numbers = array("i"), array("h"), array("b")
+    for start in sorted(months):
+        starts.append(start)
+        years.append(months[start][0])
+        numbers.append(months[start][1])
+    return starts, years, numbers
+
+
+def _build_table() -> CalendarTable:
+    return CalendarTable(FIRST_YEAR, generate_table(), *generate_lunar_months())
+
+
+def write_table(path: Path = TABLE_FILE) -> None:
+    """
+    生成并写入数据文件.
+    """
+    jieqi = generate_table()
+    starts, years, numbers = generate_lunar_months()
+    with open(path, "wb") as f:
+        header = (_MAGIC, _VERSION, FIRST_YEAR, len(jieqi) // 24, 24, len(starts))
+        f.write(_HEADER.pack(*header))
+        for data in (jieqi, starts, years, numbers):
+            if sys.byteorder == "big":
+                data.byteswap()
+            f.write(data.tobytes())
+
+
+def _read_table(path: Path) -> Optional[CalendarTable]:
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return None
+
+    if len(raw) < _HEADER.size:
+        return None
+    magic, version, first_year, years, per_year, months = _HEADER.unpack_from(raw)
+    if magic != _MAGIC or version != _VERSION or per_year != 24:
+        return None
+
+    sections = []
+    pos = _HEADER.size
+    layout = (("i", years * per_year), ("i", months), ("h", months), ("b", months))
+    for typecode, count in layout:
+        data = array(typecode)
+        size = data.itemsize * count
+        if len(raw) < pos + size:
+            return None
+        data.frombytes(raw[pos : pos + size])
+        # 文件统一为小端序
+        if sys.byteorder == "big":
+            data.byteswap()
+        sections.append(data)
+        pos += size
+    return CalendarTable(first_year, *sections)
+
+
+_table: Optional[CalendarTable] = None
+_table_lock = threading.Lock()
+
+
+def get_calendar_table() -> CalendarTable:
+    """
+    获取节气与农历月表单例；数据文件缺失或损坏时退回 lunar_python 现场计算.
+    """
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                _table = _read_table(TABLE_FILE) or _build_table()
+    return _table
+
+
+if __name__ == "__main__":
+    write_table()
+    print(f"已生成 {TABLE_FILE}")
@@ -8,6 +8,7 @@ from typing import Any, Dict, List, Optional
 import pendulum
 from lunar_python import Lunar, Solar
 
+from .calendar_table import get_calendar_table
 from .models import (
     ChineseCalendar,
     EarthBranch,
@@ -27,6 +28,7 @@ from .professional_data import (
     ZHI_WUXING,
     ZHI_YINYANG,
 )
+from .table_lunar import get_table_lunar
 
 
 class BaziEngine:
@@ -134,21 +136,38 @@ class BaziEngine:
                 second=dt.second,
             )
 
+    def get_lunar(self, solar_time: SolarTime):
+        """获取公历时刻对应的 (Solar, Lunar) 对象.
+
+        1900-2100 年内的 Lunar 由预计算表构造（接口为 lunar_python.Lunar 的常用子集），
+        范围之外由 lunar_python 现场计算。
+        """
+        solar = Solar.fromYmdHms(
+            solar_time.year,
+            solar_time.month,
+            solar_time.day,
+            solar_time.hour,
+            solar_time.minute,
+            solar_time.second,
+        )
+        lunar = get_table_lunar(
+            solar_time.year,
+            solar_time.month,
+            solar_time.day,
+            solar_time.hour,
+            solar_time.minute,
+            solar_time.second,
+        )
+        if lunar is None:
+            lunar = solar.getLunar()
+        return solar, lunar
+
     def solar_to_lunar(self, solar_time: SolarTime) -> LunarTime:
         """
         公历转农历 - 增强闰月处理.
         """
         try:
-            # 使用lunar-python进行真正的公历农历转换
-            solar = Solar.fromYmdHms(
-                solar_time.year,
-                solar_time.month,
-                solar_time.day,
-                solar_time.hour,
-                solar_time.minute,
-                solar_time.second,
-            )
-            lunar = solar.getLunar()
+            solar, lunar = self.get_lunar(solar_time)
 
             # 判断是否为闰月
             is_leap = lunar.isLeap() if hasattr(lunar, "isLeap") else False
@@ -176,6 +195,22 @@ class BaziEngine:
         农历转公历 - 增强闰月处理.
         """
         try:
+            # 优先查预计算的农历月表，闰月以负数月份表示
+            solar_date = get_calendar_table().solar_date(
+                lunar_time.year,
+                -lunar_time.month if lunar_time.is_leap else lunar_time.month,
+                lunar_time.day,
+            )
+            if solar_date is not None:
+                return SolarTime(
+                    year=solar_date.year,
+                    month=solar_date.month,
+                    day=solar_date.day,
+                    hour=lunar_time.hour,
+                    minute=lunar_time.minute,
+                    second=lunar_time.second,
+                )
+
             # 处理闰月
             if lunar_time.is_leap:
                 # 如果是闰月，使用特殊方法创建农历对象
@@ -216,16 +251,7 @@ class BaziEngine:
         构建八字.
         """
         try:
-            # 使用lunar-python计算八字
-            solar = Solar.fromYmdHms(
-                solar_time.year,
-                solar_time.month,
-                solar_time.day,
-                solar_time.hour,
-                solar_time.minute,
-                solar_time.second,
-            )
-            lunar = solar.getLunar()
+            solar, lunar = self.get_lunar(solar_time)
             bazi = lunar.getEightChar()
 
             # 获取年柱
@@ -378,15 +404,7 @@ class BaziEngine:
             )
 
         try:
-            solar = Solar.fromYmdHms(
-                solar_time.year,
-                solar_time.month,
-                solar_time.day,
-                solar_time.hour,
-                solar_time.minute,
-                solar_time.second,
-            )
-            lunar = solar.getLunar()
+            solar, lunar = self.get_lunar(solar_time)
 
             # 获取详细信息
             bazi = lunar.getEightChar()
@@ -457,15 +475,7 @@ class BaziEngine:
         获取详细的农历信息.
         """
         try:
-            solar = Solar.fromYmdHms(
-                solar_time.year,
-                solar_time.month,
-                solar_time.day,
-                solar_time.hour,
-                solar_time.minute,
-                solar_time.second,
-            )
-            lunar = solar.getLunar()
+            solar, lunar = self.get_lunar(solar_time)
 
             # 获取节气信息
             current_jieqi = lunar.getJieQi()
@@ -2,6 +2,7 @@
 八字命理管理器 负责八字分析和命理计算的核心功能。
 """
 
+from src.mcp.lazy_loader import lazy_callback
 from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -21,17 +22,24 @@ class BaziManager:
         """
         初始化并注册所有八字命理工具。
         """
-        from .marriage_tools import (
-            analyze_marriage_compatibility,
-            analyze_marriage_timing,
+        # 工具回调延迟到首次调用时才导入（避免启动时加载 lunar_python/pendulum）
+        tools_module = f"{__package__}.tools"
+        marriage_module = f"{__package__}.marriage_tools"
+        analyze_marriage_compatibility = lazy_callback(
+            marriage_module, "analyze_marriage_compatibility"
         )
-        from .tools import (
-            build_bazi_from_lunar_datetime,
-            build_bazi_from_solar_datetime,
-            get_bazi_detail,
-            get_chinese_calendar,
-            get_solar_times,
+        analyze_marriage_timing = lazy_callback(marriage_module, "analyze_marriage_timing")
+        analyze_bazi_batch = lazy_callback(tools_module, "analyze_bazi_batch")
+        build_bazi_from_lunar_datetime = lazy_callback(
+            tools_module, "build_bazi_from_lunar_datetime"
         )
+        build_bazi_from_solar_datetime = lazy_callback(
+            tools_module, "build_bazi_from_solar_datetime"
+        )
+        get_bazi_cache_stats = lazy_callback(tools_module, "get_bazi_cache_stats")
+        get_bazi_detail = lazy_callback(tools_module, "get_bazi_detail")
+        get_chinese_calendar = lazy_callback(tools_module, "get_chinese_calendar")
+        get_solar_times = lazy_callback(tools_module, "get_solar_times")
 
         # 获取八字详情（主要工具）
         bazi_detail_props = PropertyList(
@@ -252,6 +260,56 @@ class BaziManager:
             )
         )
 
+        # 八字缓存诊断
+        cache_stats_props = PropertyList(
+            [Property("clear", PropertyType.BOOLEAN, default_value=False)]
+        )
+        add_tool(
+            (
+                "self.bazi.get_cache_stats",
+                "诊断工具：查看八字分析缓存的命中统计。"
+                "八字排盘、婚姻分析和工具响应会按出生时间、性别、子时流派缓存一段时间，"
+                "同一人的追问无需重新计算。\n"
+                "\n返回各缓存分区的条目数、容量、有效期、命中/未命中次数、命中率、"
+                "淘汰与过期次数。\n"
+                "\n参数说明：\n"
+                "  clear: 是否在返回统计后清空缓存，默认false",
+                cache_stats_props,
+                get_bazi_cache_stats,
+            )
+        )
+
+        # 批量排盘与合婚
+        batch_props = PropertyList(
+            [
+                Property("records", PropertyType.STRING),
+                Property("detail", PropertyType.BOOLEAN, default_value=False),
+            ]
+        )
+        add_tool(
+            (
+                "self.bazi.analyze_bazi_batch",
+                "一次分析多个人的八字，并计算其中所有男女两两之间的合婚匹配度。"
+                "适合家庭成员、相亲候选人等多人对比场景，比逐个调用快得多。\n"
+                "使用场景：\n"
+                "1. 多人八字一次性排盘\n"
+                "2. 在多位候选人中找出合婚评分最高的组合\n"
+                "\n功能特点：\n"
+                "- 排盘与合婚分块并行计算\n"
+                "- 请求携带 progressToken 时，通过进度通知逐块回传部分结果\n"
+                "- 返回每人的八字摘要、全部男女组合的评分以及评分最高的组合\n"
+                "\n参数说明：\n"
+                "  records: 出生记录的JSON数组（最多200条），每条包含 name、gender"
+                "（1男/0女）以及 solar_datetime 或 lunar_datetime，"
+                '如 [{"name":"张三","gender":1,"solar_datetime":"1990-05-15 08:30"}]\n'
+                "  detail: 是否返回完整命盘与合婚详情，默认false只返回摘要",
+                batch_props,
+                analyze_bazi_batch,
+            ),
+            # 计算自行分发到进程池；内联执行才能推送进度通知
+            execution_policy="inline",
+        )
+
 
 # 全局管理器实例
 _bazi_manager = None
@@ -48,10 +48,21 @@ class MarriageAnalyzer:
         """
         分析夫妻星.
         """
-        from .professional_data import ZHI_CANG_GAN, get_changsheng_state
+        from .professional_data import (
+            CHANGSHENG_STAGES,
+            CHANGSHENG_TABLE,
+            GAN,
+            GAN_CODE,
+            TEN_GOD_TABLE,
+            TEN_GODS,
+            ZHI_CODE,
+            ZHI_HIDDEN_STEMS,
+        )
 
         gender_key = "male" if gender == 1 else "female"
         target_gods = self.marriage_gods[gender_key]
+        # 夫妻星对应的十神编码
+        target_codes = {TEN_GODS.index(god) for god in target_gods}
 
         # 统一获取天干数据格式
         year_gan = self._extract_gan_from_pillar(eight_char_data.get("year", {}))
@@ -60,6 +71,11 @@ class MarriageAnalyzer:
         hour_gan = self._extract_gan_from_pillar(eight_char_data.get("hour", {}))
 
         marriage_stars = []
+        day_code = GAN_CODE.get(day_gan)
+        if day_code is None:
+            # 日干无法识别时没有十神可言
+            return self._marriage_star_result(marriage_stars, day_gan, gender)
+        row = day_code * 10
 
         # 检查天干夫妻星
         for position, gan in [
@@ -67,9 +83,11 @@ class MarriageAnalyzer:
             ("月干", month_gan),
             ("时干", hour_gan),
         ]:
-            if gan and gan != day_gan:
-                ten_god = get_ten_gods_relation(day_gan, gan)
-                if ten_god in target_gods:
+            gan_code = GAN_CODE.get(gan)
+            if gan_code is not None and gan_code != day_code:
+                god_code = TEN_GOD_TABLE[row + gan_code]
+                if god_code in target_codes:
+                    ten_god = TEN_GODS[god_code]
                     # 获取更详细的分析
                     star_info = {
                         "position": position,
@@ -90,31 +108,44 @@ class MarriageAnalyzer:
             ("时支", eight_char_data.get("hour", {})),
         ]:
             zhi_name = self._extract_zhi_from_pillar(pillar)
-            if zhi_name and zhi_name in ZHI_CANG_GAN:
-                cang_gan_data = ZHI_CANG_GAN[zhi_name]
-
-                for hidden_gan, strength in cang_gan_data.items():
-                    if hidden_gan != day_gan:
-                        ten_god = get_ten_gods_relation(day_gan, hidden_gan)
-                        if ten_god in target_gods:
-                            # 根据藏干强度判断类型
-                            gan_type = self._determine_canggan_type(strength)
-
-                            star_info = {
-                                "position": position,
-                                "star": ten_god,
-                                "strength": self._get_hidden_strength(gan_type),
-                                "element": self._get_gan_element(hidden_gan),
-                                "type": f"藏干{gan_type}",
-                                "quality": self._evaluate_hidden_star_quality(
-                                    zhi_name, hidden_gan, strength
-                                ),
-                                "changsheng_state": get_changsheng_state(
-                                    day_gan, zhi_name
-                                ),
-                            }
-                            marriage_stars.append(star_info)
+            zhi_code = ZHI_CODE.get(zhi_name)
+            if zhi_code is None:
+                continue
+
+            for hidden_code, strength in ZHI_HIDDEN_STEMS[zhi_code]:
+                if hidden_code == day_code:
+                    continue
+                god_code = TEN_GOD_TABLE[row + hidden_code]
+                if god_code not in target_codes:
+                    continue
+
+                hidden_gan = GAN[hidden_code]
+                # 根据藏干强度判断类型
+                gan_type = self._determine_canggan_type(strength)
+
+                star_info = {
+                    "position": position,
+                    "star": TEN_GODS[god_code],
+                    "strength": self._get_hidden_strength(gan_type),
+                    "element": self._get_gan_element(hidden_gan),
+                    "type": f"藏干{gan_type}",
+                    "quality": self._evaluate_hidden_star_quality(
+                        zhi_name, hidden_gan, strength
+                    ),
+                    "changsheng_state": CHANGSHENG_STAGES[
+                        CHANGSHENG_TABLE[day_code * 12 + zhi_code]
+                    ],
+                }
+                marriage_stars.append(star_info)
+
+        return self._marriage_star_result(marriage_stars, day_gan, gender)
 
+    def _marriage_star_result(
+        self, marriage_stars: List[Dict[str, Any]], day_gan: str, gender: int
+    ) -> Dict[str, Any]:
+        """
+        汇总夫妻星分析结果.
+        """
         # 分析夫妻星的综合情况
         star_analysis = self._comprehensive_star_analysis(
             marriage_stars, day_gan, gender
@@ -138,11 +169,14 @@ class MarriageAnalyzer:
         预测结婚年龄段.
         """
         from .professional_data import (
-            CHANGSHENG_TWELVE,
+            CHANGSHENG_STAGES,
+            CHANGSHENG_TABLE,
+            GAN_CODE,
             GAN_WUXING,
             HUAGAI_XING,
             TIANYI_GUIREN,
             WUXING_RELATIONS,
+            ZHI_CODE,
             ZHI_WUXING,
         )
 
@@ -195,8 +229,12 @@ class MarriageAnalyzer:
             factors["detailed_analysis"].append("夫妻星偏弱，需要耐心等待")
 
         # 3. 长生十二宫分析
-        if day_gan in CHANGSHENG_TWELVE:
-            changsheng_state = CHANGSHENG_TWELVE[day_gan].get(day_zhi, "")
+        day_code = GAN_CODE.get(day_gan)
+        day_zhi_code = ZHI_CODE.get(day_zhi)
+        if day_code is not None and day_zhi_code is not None:
+            changsheng_state = CHANGSHENG_STAGES[
+                CHANGSHENG_TABLE[day_code * 12 + day_zhi_code]
+            ]
             if changsheng_state in ["长生", "帝旺", "建禄"]:
                 factors["score"] -= 6
                 factors["early_signs"].append(f"日主在日支{changsheng_state}")
@@ -298,7 +336,14 @@ class MarriageAnalyzer:
         """
         获取有利的结婚年份 - 使用完整的地支关系分析.
         """
-        from .professional_data import YIMA_XING, ZHI_RELATIONS, ZHI_SAN_HE, ZHI_SAN_HUI
+        from .professional_data import (
+            LIUHE_MASK,
+            SANHE_GROUPS,
+            SANHUI_GROUPS,
+            YIMA_XING,
+            ZHI,
+            ZHI_CODE,
+        )
 
         day_zhi = eight_char_data.get("day", {}).get("earth_branch", {}).get("name", "")
         month_zhi = (
@@ -308,30 +353,40 @@ class MarriageAnalyzer:
             eight_char_data.get("year", {}).get("earth_branch", {}).get("name", "")
         )
 
+        def liuhe_partner(zhi: str) -> str:
+            code = ZHI_CODE.get(zhi)
+            return "" if code is None else ZHI[LIUHE_MASK[code].bit_length() - 1]
+
         favorable_branches = []
 
         # 1. 六合关系 - 最有利
-        if day_zhi in ZHI_RELATIONS:
-            liuhe_zhi = ZHI_RELATIONS[day_zhi].get("六", "")
-            if liuhe_zhi:
-                favorable_branches.append(
-                    {"zhi": liuhe_zhi, "reason": "日支六合", "priority": "高"}
-                )
+        liuhe_zhi = liuhe_partner(day_zhi)
+        if liuhe_zhi:
+            favorable_branches.append(
+                {"zhi": liuhe_zhi, "reason": "日支六合", "priority": "高"}
+            )
+
+        day_code = ZHI_CODE.get(day_zhi)
+        day_bit = 1 << day_code if day_code is not None else 0
+
+        def in_group(mask: int, combo: str) -> bool:
+            # 无法编码的日支（如缺少地支名时的空串）沿用字符串包含判断，
+            # 空串包含于每一组
+            return bool(mask & day_bit) if day_bit else day_zhi in combo
 
-        # 2. 三合关系 - 非常有利
-        for sanhe_combo, element in ZHI_SAN_HE.items():
-            if day_zhi in sanhe_combo:
-                # 找到三合中的其他地支
-                for zhi in sanhe_combo:
+        # 2. 三合关系 - 非常有利：三合中的其他地支
+        for mask, combo, element in SANHE_GROUPS:
+            if in_group(mask, combo):
+                for zhi in combo:
                     if zhi != day_zhi:
                         favorable_branches.append(
                             {"zhi": zhi, "reason": f"三合{element}局", "priority": "高"}
                         )
 
         # 3. 三会方 - 有利
-        for sanhui_combo, element in ZHI_SAN_HUI.items():
-            if day_zhi in sanhui_combo:
-                for zhi in sanhui_combo:
+        for mask, combo, element in SANHUI_GROUPS:
+            if in_group(mask, combo):
+                for zhi in combo:
                     if zhi != day_zhi:
                         favorable_branches.append(
                             {"zhi": zhi, "reason": f"三会{element}方", "priority": "中"}
@@ -352,20 +407,18 @@ class MarriageAnalyzer:
             )
 
         # 6. 月支相关的有利年份
-        if month_zhi in ZHI_RELATIONS:
-            month_liuhe = ZHI_RELATIONS[month_zhi].get("六", "")
-            if month_liuhe:
-                favorable_branches.append(
-                    {"zhi": month_liuhe, "reason": "月支六合", "priority": "中"}
-                )
+        month_liuhe = liuhe_partner(month_zhi)
+        if month_liuhe:
+            favorable_branches.append(
+                {"zhi": month_liuhe, "reason": "月支六合", "priority": "中"}
+            )
 
         # 7. 年支相关的有利年份
-        if year_zhi in ZHI_RELATIONS:
-            year_liuhe = ZHI_RELATIONS[year_zhi].get("六", "")
-            if year_liuhe:
-                favorable_branches.append(
-                    {"zhi": year_liuhe, "reason": "年支六合", "priority": "低"}
-                )
+        year_liuhe = liuhe_partner(year_zhi)
+        if year_liuhe:
+            favorable_branches.append(
+                {"zhi": year_liuhe, "reason": "年支六合", "priority": "低"}
+            )
 
         # 去重并按优先级排序
         unique_branches = {}
@@ -877,20 +930,23 @@ class MarriageAnalyzer:
         """
         评估配偶兼容性.
         """
-        from .professional_data import ZHI_RELATIONS
+        from .professional_data import CHONG_MASK, LIUHE_MASK, SANHE_MASK, ZHI_CODE
 
         compatibility_score = 70  # 基础分数
 
         # 检查地支关系
-        if day_zhi in ZHI_RELATIONS:
-            relations = ZHI_RELATIONS[day_zhi]
-            if month_zhi == relations.get("六", ""):
+        day_code = ZHI_CODE.get(day_zhi)
+        month_code = ZHI_CODE.get(month_zhi)
+        if day_code is not None and month_code is not None:
+            month_bit = 1 << month_code
+            if LIUHE_MASK[day_code] & month_bit:
                 compatibility_score += 20
                 return "配偶兼容性极佳，天生一对"
-            elif month_zhi in relations.get("合", ()):
+            # 三合位图含自身，同支不算相合
+            elif SANHE_MASK[day_code] & month_bit and day_code != month_code:
                 compatibility_score += 15
                 return "配偶兼容性很好，相处和谐"
-            elif month_zhi == relations.get("冲", ""):
+            elif CHONG_MASK[day_code] & month_bit:
                 compatibility_score -= 30
                 return "配偶兼容性较差，需要磨合"
 
@@ -7,11 +7,42 @@ from typing import Any, Dict, List
 
 from src.utils.logging_config import get_logger
 
+from .analysis_cache import birth_key, get_bazi_cache
 from .bazi_calculator import get_bazi_calculator
 from .marriage_analyzer import get_marriage_analyzer
+from .professional_data import (
+    CHONG_MASK,
+    GAN_CODE,
+    HAI_MASK,
+    LIUHE_MASK,
+    SANHE_MASK,
+    SHENG_XIAO_CODE,
+    TEN_GOD_TABLE,
+    TEN_GODS,
+    XING_GROUP_MASK,
+    ZHI_CODE,
+)
 
 logger = get_logger(__name__)
 
+# 双方地支关系标志：_BRANCH_PAIR_RELATIONS[男方地支 * 12 + 女方地支]
+_LIUHE, _SANHE, _CHONG, _XING, _HAI = 1, 2, 4, 8, 16
+_BRANCH_PAIR_RELATIONS = tuple(
+    sum(
+        flag
+        for flag, masks in (
+            (_LIUHE, LIUHE_MASK),
+            (_SANHE, SANHE_MASK),
+            (_CHONG, CHONG_MASK),
+            (_XING, XING_GROUP_MASK),
+            (_HAI, HAI_MASK),
+        )
+        if masks[a] >> b & 1
+    )
+    for a in range(12)
+    for b in range(12)
+)
+
 
 async def analyze_marriage_timing(args: Dict[str, Any]) -> str:
     """
@@ -34,41 +65,39 @@ async def analyze_marriage_timing(args: Dict[str, Any]) -> str:
 
         # 先获取基础八字信息
         calculator = get_bazi_calculator()
-        bazi_result = calculator.build_bazi(
-            solar_datetime=solar_datetime,
-            lunar_datetime=lunar_datetime,
-            gender=gender,
-            eight_char_provider_sect=eight_char_provider_sect,
+        solar_time, lunar_time = calculator.resolve_birth_time(
+            solar_datetime, lunar_datetime
         )
+        key = birth_key(solar_time, gender, eight_char_provider_sect)
+        cache = get_bazi_cache()
 
-        # 进行婚姻专项分析
-        marriage_analyzer = get_marriage_analyzer()
+        def build_response() -> str:
+            bazi_result = calculator.build_bazi_from_times(
+                solar_time, lunar_time, gender, eight_char_provider_sect
+            )
 
-        # 构建适合婚姻分析的八字数据格式
-        eight_char_dict = {
-            "year": bazi_result.year_pillar,
-            "month": bazi_result.month_pillar,
-            "day": bazi_result.day_pillar,
-            "hour": bazi_result.hour_pillar,
-        }
+            # 进行婚姻专项分析（结果按出生时间缓存）
+            marriage_analysis = cache.marriage.get_or_compute(
+                key, lambda: _analyze_marriage_timing(bazi_result, gender)
+            )
 
-        marriage_analysis = marriage_analyzer.analyze_marriage_timing(
-            eight_char_dict, gender
-        )
+            # 合并结果
+            result = {
+                "basic_info": {
+                    "八字": bazi_result.bazi,
+                    "性别": "男" if gender == 1 else "女",
+                    "日主": bazi_result.day_master,
+                    "生肖": bazi_result.zodiac,
+                },
+                "marriage_analysis": marriage_analysis,
+            }
 
-        # 合并结果
-        result = {
-            "basic_info": {
-                "八字": bazi_result.bazi,
-                "性别": "男" if gender == 1 else "女",
-                "日主": bazi_result.day_master,
-                "生肖": bazi_result.zodiac,
-            },
-            "marriage_analysis": marriage_analysis,
-        }
+            return json.dumps(
+                {"success": True, "data": result}, ensure_ascii=False, indent=2
+            )
 
-        return json.dumps(
-            {"success": True, "data": result}, ensure_ascii=False, indent=2
+        return cache.response.get_or_compute(
+            ("analyze_marriage_timing", key), build_response
         )
 
     except Exception as e:
@@ -79,6 +108,23 @@ async def analyze_marriage_timing(args: Dict[str, Any]) -> str:
         )
 
 
+def _analyze_marriage_timing(bazi_result, gender: int) -> Dict[str, Any]:
+    """
+    对排盘结果进行婚姻专项分析.
+    """
+    marriage_analyzer = get_marriage_analyzer()
+
+    # 构建适合婚姻分析的八字数据格式
+    eight_char_dict = {
+        "year": bazi_result.year_pillar,
+        "month": bazi_result.month_pillar,
+        "day": bazi_result.day_pillar,
+        "hour": bazi_result.hour_pillar,
+    }
+
+    return marriage_analyzer.analyze_marriage_timing(eight_char_dict, gender)
+
+
 async def analyze_marriage_compatibility(args: Dict[str, Any]) -> str:
     """
     分析两人八字婚姻合婚.
@@ -102,37 +148,51 @@ async def analyze_marriage_compatibility(args: Dict[str, Any]) -> str:
             )
 
         calculator = get_bazi_calculator()
-
-        # 获取男方八字
-        male_bazi = calculator.build_bazi(
-            solar_datetime=male_solar, lunar_datetime=male_lunar, gender=1
+        male_solar_time, male_lunar_time = calculator.resolve_birth_time(
+            male_solar, male_lunar
         )
-
-        # 获取女方八字
-        female_bazi = calculator.build_bazi(
-            solar_datetime=female_solar, lunar_datetime=female_lunar, gender=0
+        female_solar_time, female_lunar_time = calculator.resolve_birth_time(
+            female_solar, female_lunar
+        )
+        key = (
+            "analyze_marriage_compatibility",
+            birth_key(male_solar_time, 1, 2),
+            birth_key(female_solar_time, 0, 2),
         )
 
-        # 进行合婚分析
-        compatibility_result = _analyze_compatibility(male_bazi, female_bazi)
-
-        result = {
-            "male_info": {
-                "八字": male_bazi.bazi,
-                "日主": male_bazi.day_master,
-                "生肖": male_bazi.zodiac,
-            },
-            "female_info": {
-                "八字": female_bazi.bazi,
-                "日主": female_bazi.day_master,
-                "生肖": female_bazi.zodiac,
-            },
-            "compatibility": compatibility_result,
-        }
+        def build_response() -> str:
+            # 获取男方八字
+            male_bazi = calculator.build_bazi_from_times(
+                male_solar_time, male_lunar_time, gender=1
+            )
 
-        return json.dumps(
-            {"success": True, "data": result}, ensure_ascii=False, indent=2
-        )
+            # 获取女方八字
+            female_bazi = calculator.build_bazi_from_times(
+                female_solar_time, female_lunar_time, gender=0
+            )
+
+            # 进行合婚分析
+            compatibility_result = _analyze_compatibility(male_bazi, female_bazi)
+
+            result = {
+                "male_info": {
+                    "八字": male_bazi.bazi,
+                    "日主": male_bazi.day_master,
+                    "生肖": male_bazi.zodiac,
+                },
+                "female_info": {
+                    "八字": female_bazi.bazi,
+                    "日主": female_bazi.day_master,
+                    "生肖": female_bazi.zodiac,
+                },
+                "compatibility": compatibility_result,
+            }
+
+            return json.dumps(
+                {"success": True, "data": result}, ensure_ascii=False, indent=2
+            )
+
+        return get_bazi_cache().response.get_or_compute(key, build_response)
 
     except Exception as e:
         logger.error(f"合婚分析失败: {e}")
@@ -236,29 +296,16 @@ def _analyze_zodiac_compatibility(
     """
     专业生肖相配分析.
     """
-    from .professional_data import ZHI_CHONG, ZHI_HAI, ZHI_LIUHE, ZHI_SANHE, ZHI_XING
-
-    # 生肖对应地支映射
-    zodiac_to_zhi = {
-        "鼠": "子",
-        "牛": "丑",
-        "虎": "寅",
-        "兔": "卯",
-        "龙": "辰",
-        "蛇": "巳",
-        "马": "午",
-        "羊": "未",
-        "猴": "申",
-        "鸡": "酉",
-        "狗": "戌",
-        "猪": "亥",
-    }
-
-    male_zhi = zodiac_to_zhi.get(male_zodiac, "")
-    female_zhi = zodiac_to_zhi.get(female_zodiac, "")
+    # 生肖编码与地支编码一致（鼠=子=0 … 猪=亥=11）
+    male_zhi = SHENG_XIAO_CODE.get(male_zodiac)
+    female_zhi = SHENG_XIAO_CODE.get(female_zodiac)
+    if male_zhi is None or female_zhi is None:
+        relations = 0
+    else:
+        relations = _BRANCH_PAIR_RELATIONS[male_zhi * 12 + female_zhi]
 
     # 检查关系
-    if (male_zhi, female_zhi) in ZHI_LIUHE or (female_zhi, male_zhi) in ZHI_LIUHE:
+    if relations & _LIUHE:
         return {
             "score": 90,
             "level": "天作之合",
@@ -267,17 +314,16 @@ def _analyze_zodiac_compatibility(
         }
 
     # 检查三合
-    for sanhe_group in ZHI_SANHE:
-        if male_zhi in sanhe_group and female_zhi in sanhe_group:
-            return {
-                "score": 85,
-                "level": "天作之合",
-                "description": "三合生肖，相处融洽",
-                "relation": "三合",
-            }
+    if relations & _SANHE:
+        return {
+            "score": 85,
+            "level": "天作之合",
+            "description": "三合生肖，相处融洽",
+            "relation": "三合",
+        }
 
     # 检查相冲
-    if (male_zhi, female_zhi) in ZHI_CHONG or (female_zhi, male_zhi) in ZHI_CHONG:
+    if relations & _CHONG:
         return {
             "score": 30,
             "level": "相冲不合",
@@ -286,17 +332,16 @@ def _analyze_zodiac_compatibility(
         }
 
     # 检查相刑
-    for xing_group in ZHI_XING:
-        if male_zhi in xing_group and female_zhi in xing_group:
-            return {
-                "score": 40,
-                "level": "相刑不合",
-                "description": "生肖相刑，需要化解",
-                "relation": "相刑",
-            }
+    if relations & _XING:
+        return {
+            "score": 40,
+            "level": "相刑不合",
+            "description": "生肖相刑，需要化解",
+            "relation": "相刑",
+        }
 
     # 检查相害
-    if (male_zhi, female_zhi) in ZHI_HAI or (female_zhi, male_zhi) in ZHI_HAI:
+    if relations & _HAI:
         return {
             "score": 45,
             "level": "相害不合",
@@ -323,25 +368,27 @@ def _analyze_pillar_compatibility(
         return {"score": 55, "description": "日柱相同，共通点多但需要差异化解"}
 
     # 分析干支组合
-    male_gan, male_zhi = male_pillar[0], male_pillar[1]
-    female_gan, female_zhi = female_pillar[0], female_pillar[1]
+    male_gan, male_zhi = GAN_CODE.get(male_pillar[0]), ZHI_CODE.get(male_pillar[1])
+    female_gan = GAN_CODE.get(female_pillar[0])
+    female_zhi = ZHI_CODE.get(female_pillar[1])
 
     score = 70  # 基础分数
 
     # 天干关系
-    from .professional_data import get_ten_gods_relation
-
-    gan_relation = get_ten_gods_relation(male_gan, female_gan)
+    if male_gan is None or female_gan is None:
+        gan_relation = "未知"
+    else:
+        gan_relation = TEN_GODS[TEN_GOD_TABLE[male_gan * 10 + female_gan]]
     if gan_relation in ["正财", "偏财", "正官", "七杀"]:
         score += 10
 
     # 地支关系
-    from .professional_data import ZHI_CHONG, ZHI_LIUHE
-
-    if (male_zhi, female_zhi) in ZHI_LIUHE or (female_zhi, male_zhi) in ZHI_LIUHE:
-        score += 15
-    elif (male_zhi, female_zhi) in ZHI_CHONG or (female_zhi, male_zhi) in ZHI_CHONG:
-        score -= 20
+    if male_zhi is not None and female_zhi is not None:
+        relations = _BRANCH_PAIR_RELATIONS[male_zhi * 12 + female_zhi]
+        if relations & _LIUHE:
+            score += 15
+        elif relations & _CHONG:
+            score -= 20
 
     return {
         "score": min(95, max(30, score)),
@@ -5,14 +5,22 @@
 from typing import Any, Dict, List
 
 from .professional_data import (
+    CHANGSHENG_STAGES,
+    CHANGSHENG_TABLE,
+    GAN,
     GAN_WUXING,
+    NAYIN_BY_CYCLE,
+    TEN_GOD_TABLE,
+    TEN_GODS,
     WUXING,
     WUXING_RELATIONS,
+    ZHI,
     ZHI_CANG_GAN,
+    ZHI_HIDDEN_STEMS,
     ZHI_WUXING,
-    analyze_zhi_combinations,
-    get_changsheng_state,
-    get_nayin,
+    analyze_zhi_codes,
+    cycle_code,
+    encode_pillars,
     get_shensha,
     get_ten_gods_relation,
 )
@@ -62,13 +70,14 @@ class ProfessionalAnalyzer:
         # 基础信息
         gan_list = [year_gan, month_gan, day_gan, hour_gan]
         zhi_list = [year_zhi, month_zhi, day_zhi, hour_zhi]
+        gan_codes, zhi_codes = encode_pillars(gan_list, zhi_list)
 
         analysis = {
             "day_master": day_gan,
-            "ten_gods": self._analyze_ten_gods(day_gan, gan_list, zhi_list),
-            "nayin": self._analyze_nayin(gan_list, zhi_list),
-            "changsheng": self._analyze_changsheng(day_gan, zhi_list),
-            "zhi_relations": analyze_zhi_combinations(zhi_list),
+            "ten_gods": self._analyze_ten_gods(gan_codes[2], gan_codes, zhi_codes),
+            "nayin": self._analyze_nayin(gan_list, zhi_list, gan_codes, zhi_codes),
+            "changsheng": self._analyze_changsheng(gan_codes[2], zhi_list, zhi_codes),
+            "zhi_relations": analyze_zhi_codes([c for c in zhi_codes if c >= 0]),
             "wuxing_balance": self._analyze_wuxing_balance(gan_list, zhi_list),
             "shensha": self._analyze_shensha(gan_list, zhi_list),
             "strength": self._analyze_day_master_strength(day_gan, month_zhi, zhi_list),
@@ -80,51 +89,46 @@ class ProfessionalAnalyzer:
         return analysis
 
     def _analyze_ten_gods(
-        self, day_master: str, gan_list: List[str], zhi_list: List[str]
+        self, day_master: int, gan_codes: List[int], zhi_codes: List[int]
     ) -> Dict[str, List[str]]:
         """
-        分析十神分布.
+        分析十神分布（干支为整数编码，-1 表示无法识别）.
         """
-        ten_gods = {
-            "比肩": [],
-            "劫财": [],
-            "食神": [],
-            "伤官": [],
-            "偏财": [],
-            "正财": [],
-            "七杀": [],
-            "正官": [],
-            "偏印": [],
-            "正印": [],
-        }
+        ten_gods = {name: [] for name in TEN_GODS}
+        if day_master < 0:
+            return ten_gods
 
+        row = day_master * 10
         # 天干十神
-        for i, gan in enumerate(gan_list):
-            if gan == day_master:
+        pillar_names = ["年干", "月干", "日干", "时干"]
+        for i, gan in enumerate(gan_codes):
+            if gan < 0 or gan == day_master:
                 continue
-
-            ten_god = get_ten_gods_relation(day_master, gan)
-            pillar_names = ["年干", "月干", "日干", "时干"]
-            if ten_god in ten_gods:
-                ten_gods[ten_god].append(f"{pillar_names[i]}{gan}")
+            ten_gods[TEN_GODS[TEN_GOD_TABLE[row + gan]]].append(
+                f"{pillar_names[i]}{GAN[gan]}"
+            )
 
         # 地支藏干十神
         pillar_names = ["年支", "月支", "日支", "时支"]
-        for i, zhi in enumerate(zhi_list):
-            cang_gan = ZHI_CANG_GAN.get(zhi, {})
-            for gan, strength in cang_gan.items():
+        for i, zhi in enumerate(zhi_codes):
+            if zhi < 0:
+                continue
+            for gan, strength in ZHI_HIDDEN_STEMS[zhi]:
                 if gan == day_master:
                     continue
-
-                ten_god = get_ten_gods_relation(day_master, gan)
-                if ten_god in ten_gods:
-                    ten_gods[ten_god].append(
-                        f"{pillar_names[i]}{zhi}藏{gan}({strength})"
-                    )
+                ten_gods[TEN_GODS[TEN_GOD_TABLE[row + gan]]].append(
+                    f"{pillar_names[i]}{ZHI[zhi]}藏{GAN[gan]}({strength})"
+                )
 
         return ten_gods
 
-    def _analyze_nayin(self, gan_list: List[str], zhi_list: List[str]) -> List[str]:
+    def _analyze_nayin(
+        self,
+        gan_list: List[str],
+        zhi_list: List[str],
+        gan_codes: List[int],
+        zhi_codes: List[int],
+    ) -> List[str]:
         """
         分析纳音.
         """
@@ -132,20 +136,30 @@ class ProfessionalAnalyzer:
         pillar_names = ["年柱", "月柱", "日柱", "时柱"]
 
         for i, (gan, zhi) in enumerate(zip(gan_list, zhi_list)):
-            nayin = get_nayin(gan, zhi)
+            cycle = (
+                cycle_code(gan_codes[i], zhi_codes[i])
+                if gan_codes[i] >= 0 and zhi_codes[i] >= 0
+                else -1
+            )
+            nayin = NAYIN_BY_CYCLE[cycle] if cycle >= 0 else "未知"
             nayin_list.append(f"{pillar_names[i]}{gan}{zhi}：{nayin}")
 
         return nayin_list
 
-    def _analyze_changsheng(self, day_master: str, zhi_list: List[str]) -> List[str]:
+    def _analyze_changsheng(
+        self, day_master: int, zhi_list: List[str], zhi_codes: List[int]
+    ) -> List[str]:
         """
         分析长生十二宫.
         """
         changsheng_list = []
         pillar_names = ["年支", "月支", "日支", "时支"]
 
-        for i, zhi in enumerate(zhi_list):
-            state = get_changsheng_state(day_master, zhi)
+        for i, (zhi, code) in enumerate(zip(zhi_list, zhi_codes)):
+            if day_master < 0 or code < 0:
+                state = "未知"
+            else:
+                state = CHANGSHENG_STAGES[CHANGSHENG_TABLE[day_master * 12 + code]]
             changsheng_list.append(f"{pillar_names[i]}{zhi}：{state}")
 
         return changsheng_list
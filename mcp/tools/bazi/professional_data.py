@@ -814,6 +814,175 @@ CHANGSHENG_TWELVE = {
     },
 }
 
+# ==================== 整数编码查表 ====================
+# 天干 0-9、地支 0-11、六十甲子 0-59。下列表在导入时由上方字符串表生成，
+# 分析器先把四柱转成整数，之后只做下标查表与位运算；输出时再换回字符串。
+
+GAN_CODE = {gan: i for i, gan in enumerate(GAN)}
+ZHI_CODE = {zhi: i for i, zhi in enumerate(ZHI)}
+SHENG_XIAO_CODE = {animal: i for i, animal in enumerate(SHENG_XIAO)}
+
+TEN_GODS = ("比肩", "劫财", "食神", "伤官", "偏财", "正财", "七杀", "正官", "偏印", "正印")
+
+CHANGSHENG_STAGES = (
+    "长生",
+    "沐浴",
+    "冠带",
+    "建禄",
+    "帝旺",
+    "衰",
+    "病",
+    "死",
+    "墓",
+    "绝",
+    "胎",
+    "养",
+)
+
+# 十神：TEN_GOD_TABLE[日干 * 10 + 他干] 为 TEN_GODS 下标
+TEN_GOD_TABLE = tuple(
+    TEN_GODS.index(TEN_GODS_MAP[(day, other)]) for day in GAN for other in GAN
+)
+
+# 长生十二宫：CHANGSHENG_TABLE[天干 * 12 + 地支] 为 CHANGSHENG_STAGES 下标
+CHANGSHENG_TABLE = tuple(
+    CHANGSHENG_STAGES.index(CHANGSHENG_TWELVE[gan][zhi]) for gan in GAN for zhi in ZHI
+)
+
+# 纳音：NAYIN_BY_CYCLE[六十甲子序号]，NAYIN_TABLE 未收录的为"未知"
+NAYIN_BY_CYCLE = tuple(
+    NAYIN_TABLE.get((GAN[i % 10], ZHI[i % 12]), "未知") for i in range(60)
+)
+
+# 地支藏干：ZHI_HIDDEN_STEMS[地支] 为 ((天干, 力量), ...)，顺序同 ZHI_CANG_GAN
+ZHI_HIDDEN_STEMS = tuple(
+    tuple((GAN_CODE[gan], strength) for gan, strength in ZHI_CANG_GAN[zhi].items())
+    for zhi in ZHI
+)
+
+
+def _branch_mask(branches) -> int:
+    mask = 0
+    for zhi in branches:
+        mask |= 1 << ZHI_CODE[zhi]
+    return mask
+
+
+def _relation_masks(relation_type: str) -> tuple:
+    return tuple(_branch_mask(ZHI_RELATIONS[zhi][relation_type]) for zhi in ZHI)
+
+
+def _group_masks(groups) -> tuple:
+    masks = [_branch_mask(group) for group in groups]
+    return tuple(
+        sum(mask for mask in masks if mask >> i & 1) for i in range(len(ZHI))
+    )
+
+
+# 地支关系位图：XXX_MASK[地支] 的第 k 位为 1 表示与地支 k 有该关系
+LIUHE_MASK = _relation_masks("六")
+CHONG_MASK = _relation_masks("冲")
+XING_MASK = _relation_masks("刑")  # 有方向：a 刑 b 不代表 b 刑 a
+HAI_MASK = _relation_masks("害")
+# 同属一个三合局/三会方/相刑组（含自身）
+SANHE_MASK = _group_masks(ZHI_SAN_HE)
+SANHUI_MASK = _group_masks(ZHI_SAN_HUI)
+XING_GROUP_MASK = _group_masks(ZHI_XING)
+
+# 三合局、三会方：(位图, 组合, 五行)
+SANHE_GROUPS = tuple(
+    (_branch_mask(combo), combo, element) for combo, element in ZHI_SAN_HE.items()
+)
+SANHUI_GROUPS = tuple(
+    (_branch_mask(combo), combo, element) for combo, element in ZHI_SAN_HUI.items()
+)
+
+_RELATION_MASKS = {"冲": CHONG_MASK, "刑": XING_MASK, "害": HAI_MASK, "六": LIUHE_MASK}
+
+# analyze_zhi_combinations 的两两关系：PAIR_RELATIONS[a * 12 + b] 为下列标志位之和
+PAIR_LIUHE = 1
+PAIR_CHONG = 2
+PAIR_XING = 4
+PAIR_HAI = 8
+
+
+def _combination_liuhe(zhi1: str, zhi2: str) -> str:
+    # 沿用原有判定：两支按字符排序拼接后查 ZHI_LIU_HE（键的字序与排序结果不同的组合不命中）
+    return ZHI_LIU_HE.get("".join(sorted([zhi1, zhi2])), "")
+
+
+PAIR_LIUHE_ELEMENT = tuple(_combination_liuhe(a, b) for a in ZHI for b in ZHI)
+PAIR_RELATIONS = tuple(
+    (PAIR_LIUHE if PAIR_LIUHE_ELEMENT[a * 12 + b] else 0)
+    | (PAIR_CHONG if CHONG_MASK[a] >> b & 1 else 0)
+    | (PAIR_XING if XING_MASK[a] >> b & 1 else 0)
+    | (PAIR_HAI if HAI_MASK[a] >> b & 1 else 0)
+    for a in range(12)
+    for b in range(12)
+)
+
+
+def cycle_code(gan_code: int, zhi_code: int) -> int:
+    """
+    干支编码转六十甲子序号，阴阳不匹配时返回 -1.
+    """
+    if (gan_code - zhi_code) % 2:
+        return -1
+    return (6 * gan_code - 5 * zhi_code) % 60
+
+
+def encode_pillars(gan_list: List[str], zhi_list: List[str]):
+    """
+    四柱干支转整数编码，无法识别的干支记为 -1.
+    """
+    return (
+        [GAN_CODE.get(gan, -1) for gan in gan_list],
+        [ZHI_CODE.get(zhi, -1) for zhi in zhi_list],
+    )
+
+
+def analyze_zhi_codes(codes: List[int]) -> Dict[str, List[str]]:
+    """
+    按地支编码分析三合、六合、三会、冲、刑、害，输出同 analyze_zhi_combinations.
+    """
+    result = {
+        "sanhe": [],
+        "liuhe": [],
+        "sanhui": [],
+        "chong": [],
+        "xing": [],
+        "hai": [],
+    }
+
+    present = 0
+    for code in codes:
+        present |= 1 << code
+    for mask, combo, element in SANHE_GROUPS:
+        if present & mask == mask:
+            result["sanhe"].append(f"{combo}合{element}")
+    for mask, combo, element in SANHUI_GROUPS:
+        if present & mask == mask:
+            result["sanhui"].append(f"{combo}会{element}")
+
+    for i, a in enumerate(codes):
+        row = a * 12
+        for b in codes[i + 1 :]:
+            flags = PAIR_RELATIONS[row + b]
+            if not flags:
+                continue
+            zhi1, zhi2 = ZHI[a], ZHI[b]
+            if flags & PAIR_LIUHE:
+                result["liuhe"].append(f"{zhi1}{zhi2}合{PAIR_LIUHE_ELEMENT[row + b]}")
+            if flags & PAIR_CHONG:
+                result["chong"].append(f"{zhi1}冲{zhi2}")
+            if flags & PAIR_XING:
+                result["xing"].append(f"{zhi1}刑{zhi2}")
+            if flags & PAIR_HAI:
+                result["hai"].append(f"{zhi1}害{zhi2}")
+
+    return result
+
+
 # ==================== 实用函数 ====================
 
 
@@ -821,7 +990,11 @@ def get_ten_gods_relation(day_master: str, other_stem: str) -> str:
     """
     获取十神关系.
     """
-    return TEN_GODS_MAP.get((day_master, other_stem), "未知")
+    day = GAN_CODE.get(day_master)
+    other = GAN_CODE.get(other_stem)
+    if day is None or other is None:
+        return "未知"
+    return TEN_GODS[TEN_GOD_TABLE[day * 10 + other]]
 
 
 def get_nayin(gan: str, zhi: str) -> str:
@@ -835,24 +1008,29 @@ def get_zhi_relation(zhi1: str, zhi2: str, relation_type: str) -> bool:
     """
     检查地支关系.
     """
-    if zhi1 not in ZHI_RELATIONS:
-        return False
-
-    relation = ZHI_RELATIONS[zhi1].get(relation_type)
-    if relation is None:
+    code1 = ZHI_CODE.get(zhi1)
+    code2 = ZHI_CODE.get(zhi2)
+    if code1 is None:
         return False
 
-    if isinstance(relation, tuple):
-        return zhi2 in relation
-    else:
-        return zhi2 == relation
+    masks = _RELATION_MASKS.get(relation_type)
+    if masks is None:
+        relation = ZHI_RELATIONS[zhi1].get(relation_type)
+        if relation is None:
+            return False
+        return zhi2 in relation if isinstance(relation, tuple) else zhi2 == relation
+    return code2 is not None and bool(masks[code1] >> code2 & 1)
 
 
 def get_changsheng_state(gan: str, zhi: str) -> str:
     """
     获取长生十二宫状态.
     """
-    return CHANGSHENG_TWELVE.get(gan, {}).get(zhi, "未知")
+    gan_code = GAN_CODE.get(gan)
+    zhi_code = ZHI_CODE.get(zhi)
+    if gan_code is None or zhi_code is None:
+        return "未知"
+    return CHANGSHENG_STAGES[CHANGSHENG_TABLE[gan_code * 12 + zhi_code]]
 
 
 def get_shensha(item: str, shensha_type: str) -> str:
@@ -873,42 +1051,6 @@ def get_shensha(item: str, shensha_type: str) -> str:
 
 def analyze_zhi_combinations(zhi_list: List[str]) -> Dict[str, List[str]]:
     """
-    分析地支组合（三合、六合、三会等）
+    分析地支组合（三合、六合、三会等），无法识别的地支不参与组合.
     """
-    result = {
-        "sanhe": [],
-        "liuhe": [],
-        "sanhui": [],
-        "chong": [],
-        "xing": [],
-        "hai": [],
-    }
-
-    # 检查三合
-    for combo, element in ZHI_SAN_HE.items():
-        if all(zhi in zhi_list for zhi in combo):
-            result["sanhe"].append(f"{combo}合{element}")
-
-    # 检查六合
-    for i, zhi1 in enumerate(zhi_list):
-        for j, zhi2 in enumerate(zhi_list[i + 1 :], i + 1):
-            combo = "".join(sorted([zhi1, zhi2]))
-            if combo in ZHI_LIU_HE:
-                result["liuhe"].append(f"{zhi1}{zhi2}合{ZHI_LIU_HE[combo]}")
-
-    # 检查三会
-    for combo, element in ZHI_SAN_HUI.items():
-        if all(zhi in zhi_list for zhi in combo):
-            result["sanhui"].append(f"{combo}会{element}")
-
-    # 检查相冲、相刑、相害
-    for i, zhi1 in enumerate(zhi_list):
-        for zhi2 in zhi_list[i + 1 :]:
-            if get_zhi_relation(zhi1, zhi2, "冲"):
-                result["chong"].append(f"{zhi1}冲{zhi2}")
-            if get_zhi_relation(zhi1, zhi2, "刑"):
-                result["xing"].append(f"{zhi1}刑{zhi2}")
-            if get_zhi_relation(zhi1, zhi2, "害"):
-                result["hai"].append(f"{zhi1}害{zhi2}")
-
-    return result
+    return analyze_zhi_codes([ZHI_CODE[zhi] for zhi in zhi_list if zhi in ZHI_CODE])
@@ -0,0 +1,155 @@
+"""
+六十甲子周期运算与八字反推公历时间。
+
+年柱、日柱、时柱直接按六十甲子周期换算；月柱通过预计算的节气时刻表二分查找，
+从而无需逐日构造 lunar_python 对象即可枚举满足四柱的日期。
+"""
+
+import calendar
+from bisect import bisect_right
+from datetime import date, datetime
+from typing import List, Optional, Tuple
+
+from .calendar_table import get_calendar_table
+from .professional_data import GAN, ZHI
+
+# 1900-01-01 的日柱为甲戌（六十甲子序号 10）
+_DAY_CYCLE_EPOCH = date(1900, 1, 1).toordinal()
+_DAY_CYCLE_EPOCH_INDEX = 10
+
+# 判断月柱所取的采样时刻：每月这几天的正午
+_MONTH_SAMPLE_DAYS = (1, 8, 15, 22, 28)
+_MONTH_SAMPLE_SECOND = 12 * 3600
+
+
+def ganzhi_index(gan: str, zhi: str) -> Optional[int]:
+    """
+    干支转六十甲子序号（0=甲子 … 59=癸亥），不是合法组合时返回 None.
+    """
+    if gan not in GAN or zhi not in ZHI:
+        return None
+    g, z = GAN.index(gan), ZHI.index(zhi)
+    if g % 2 != z % 2:
+        return None
+    # 满足 i ≡ g (mod 10) 且 i ≡ z (mod 12) 的唯一解
+    return (6 * g - 5 * z) % 60
+
+
+def ganzhi_name(index: int) -> str:
+    """
+    六十甲子序号转干支.
+    """
+    return GAN[index % 10] + ZHI[index % 12]
+
+
+def year_ganzhi_index(year: int) -> int:
+    """
+    立春之后的年柱序号.
+    """
+    return (year - 4) % 60
+
+
+def day_ganzhi_index(d: date) -> int:
+    """
+    日柱序号（按公历日期，子时换日不在此处理）.
+    """
+    return (d.toordinal() - _DAY_CYCLE_EPOCH + _DAY_CYCLE_EPOCH_INDEX) % 60
+
+
+def hour_ganzhi_index(day_index: int, branch: int) -> int:
+    """
+    由日柱序号与时支推出时柱序号（五鼠遁）.
+    """
+    return (day_index % 5 * 12 + branch) % 60
+
+
+def month_ganzhi_index(year: int, second_of_year: int) -> int:
+    """
+    以"节"为界的月柱序号；second_of_year 为相对当年 1 月 1 日 00:00:00 的秒数.
+    """
+    # 节气时刻之前仍属上一个月（与 lunar_python 的 Exact 算法一致）
+    passed = bisect_right(get_calendar_table().jie_offsets(year), second_of_year)
+    # 立春（当年第 2 个节）起寅月：甲己之年丙作首
+    lichun_index = (year - 4) % 5 * 12 + 2
+    return (lichun_index + passed - 2) % 60
+
+
+def _second_of_year(year: int, month: int, day: int, second: int = 0) -> int:
+    return (date(year, month, day) - date(year, 1, 1)).days * 86400 + second
+
+
+def eight_char_indices(dt: datetime) -> Tuple[int, int, int, int]:
+    """根据公历时刻计算四柱的六十甲子序号 (年, 月, 日, 时).
+
+    与 lunar_python 默认流派一致：年、月以节气交接时刻为界；
+    23 点后的晚子时日柱仍算当天，时柱按次日日干起。
+    """
+    second = _second_of_year(
+        dt.year, dt.month, dt.day, dt.hour * 3600 + dt.minute * 60 + dt.second
+    )
+    lichun = get_calendar_table().jie_offsets(dt.year)[1]
+    year_idx = year_ganzhi_index(dt.year if second >= lichun else dt.year - 1)
+    month_idx = month_ganzhi_index(dt.year, second)
+    day_idx = day_ganzhi_index(dt.date())
+    time_day_idx = day_idx + 1 if dt.hour == 23 else day_idx
+    hour_idx = hour_ganzhi_index(time_day_idx, (dt.hour + 1) // 2 % 12)
+    return year_idx, month_idx, day_idx, hour_idx
+
+
+def find_solar_times(
+    bazi: str, start_year: int = 1900, end_year: int = 2100, limit: int = 20
+) -> List[str]:
+    """根据八字枚举可能的公历时间.
+
+    结果与逐年逐日匹配的实现一致：公历年在年初、年中、年末任一采样点的年柱匹配即可；
+    月份在 1/8/15/22/28 日正午任一采样点的月柱匹配即可；日柱取当日 00:00；
+    时辰取各时辰的偶数整点。按时间顺序返回，最多 limit 条，格式 YYYY-MM-DD hh:mm:ss。
+    """
+    pillars = bazi.split(" ")
+    if len(pillars) != 4:
+        raise ValueError("八字格式错误")
+    if any(len(p) != 2 for p in pillars):
+        raise ValueError("八字格式错误，每柱应为两个字符")
+
+    indices = [ganzhi_index(p[0], p[1]) for p in pillars]
+    if any(i is None for i in indices):
+        return []
+    year_idx, month_idx, day_idx, hour_idx = indices
+
+    # 时干由日干决定，不一致则不可能匹配
+    branch = hour_idx % 12
+    if hour_ganzhi_index(day_idx, branch) != hour_idx:
+        return []
+    hour = branch * 2
+
+    table = get_calendar_table()
+    results: List[str] = []
+    for year in range(start_year, end_year):
+        # 1 月 1 日在立春前属上一年，年中与年末属当年
+        if year_idx not in (year_ganzhi_index(year - 1), year_ganzhi_index(year)):
+            continue
+        if not table.covers(year):
+            continue
+
+        for month in range(1, 13):
+            month_matched = any(
+                month_ganzhi_index(
+                    year, _second_of_year(year, month, day, _MONTH_SAMPLE_SECOND)
+                )
+                == month_idx
+                for day in _MONTH_SAMPLE_DAYS
+            )
+            if not month_matched:
+                continue
+
+            # 六十日一循环，一个月内至多一天日柱匹配
+            first_index = day_ganzhi_index(date(year, month, 1))
+            day = 1 + (day_idx - first_index) % 60
+            if day > calendar.monthrange(year, month)[1]:
+                continue
+
+            results.append(datetime(year, month, day, hour).strftime("%Y-%m-%d %H:%M:%S"))
+            if len(results) >= limit:
+                return results
+
+    return results
@@ -0,0 +1,211 @@
+"""
+基于预计算表的农历对象。
+
+实现引擎用到的 lunar_python.Lunar 接口子集（农历日期、八字、节气、黄历宜忌等），
+日期与干支由节气/农历月表和六十甲子周期直接推出，黄历条目仍查 lunar_python 的静态数据，
+不再为每次调用重新做天文计算。表范围之外返回 None，由调用方退回 lunar_python。
+"""
+
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from lunar_python import JieQi, Solar
+from lunar_python.util import LunarUtil
+
+from .calendar_table import get_calendar_table
+from .sexagenary import eight_char_indices, ganzhi_name, month_ganzhi_index
+
+
+class TableEightChar:
+    """
+    八字（接口同 lunar_python.EightChar 的四柱部分）.
+    """
+
+    def __init__(self, year: int, month: int, day: int, time: int):
+        self._pillars = [ganzhi_name(i) for i in (year, month, day, time)]
+
+    def getYear(self) -> str:
+        return self._pillars[0]
+
+    def getYearGan(self) -> str:
+        return self._pillars[0][0]
+
+    def getYearZhi(self) -> str:
+        return self._pillars[0][1]
+
+    def getMonth(self) -> str:
+        return self._pillars[1]
+
+    def getMonthGan(self) -> str:
+        return self._pillars[1][0]
+
+    def getMonthZhi(self) -> str:
+        return self._pillars[1][1]
+
+    def getDay(self) -> str:
+        return self._pillars[2]
+
+    def getDayGan(self) -> str:
+        return self._pillars[2][0]
+
+    def getDayZhi(self) -> str:
+        return self._pillars[2][1]
+
+    def getTime(self) -> str:
+        return self._pillars[3]
+
+    def getTimeGan(self) -> str:
+        return self._pillars[3][0]
+
+    def getTimeZhi(self) -> str:
+        return self._pillars[3][1]
+
+
+class TableLunar:
+    """
+    农历日期（接口同 lunar_python.Lunar 的常用部分）.
+    """
+
+    def __init__(
+        self, dt: datetime, lunar_year: int, lunar_month: int, lunar_day: int
+    ):
+        self._dt = dt
+        self._year = lunar_year
+        self._month = lunar_month
+        self._day = lunar_day
+        self._eight_char_indices = eight_char_indices(dt)
+
+        day_idx = self._eight_char_indices[2]
+        self._day_gan = day_idx % 10
+        self._day_zhi = day_idx % 12
+        self._day_gan_zhi = ganzhi_name(day_idx)
+        # 黄历宜忌按日取月柱：交节当天即算新月
+        day_of_year = (dt.date() - date(dt.year, 1, 1)).days
+        self._month_gan_zhi = ganzhi_name(
+            month_ganzhi_index(dt.year, day_of_year * 86400 + 86399)
+        )
+
+    def getYear(self) -> int:
+        return self._year
+
+    def getMonth(self) -> int:
+        return self._month
+
+    def getDay(self) -> int:
+        return self._day
+
+    def getHour(self) -> int:
+        return self._dt.hour
+
+    def getMinute(self) -> int:
+        return self._dt.minute
+
+    def getSecond(self) -> int:
+        return self._dt.second
+
+    def getYearInChinese(self) -> str:
+        return "".join(LunarUtil.NUMBER[int(c)] for c in str(self._year))
+
+    def getMonthInChinese(self) -> str:
+        return ("闰" if self._month < 0 else "") + LunarUtil.MONTH[abs(self._month)]
+
+    def getDayInChinese(self) -> str:
+        return LunarUtil.DAY[self._day]
+
+    def getYearShengXiao(self) -> str:
+        # 以正月初一为界
+        return LunarUtil.SHENGXIAO[(self._year - 4) % 12 + 1]
+
+    def getEightChar(self) -> TableEightChar:
+        return TableEightChar(*self._eight_char_indices)
+
+    def getDayNaYin(self) -> str:
+        return LunarUtil.NAYIN[self._day_gan_zhi]
+
+    def getFestivals(self) -> List[str]:
+        festivals = []
+        key = "%d-%d" % (self._month, self._day)
+        if key in LunarUtil.FESTIVAL:
+            festivals.append(LunarUtil.FESTIVAL[key])
+        if abs(self._month) == 12 and self._day >= 29:
+            tomorrow = get_calendar_table().lunar_date(
+                self._dt.date() + timedelta(days=1)
+            )
+            if tomorrow is not None and tomorrow[0] != self._year:
+                festivals.append("除夕")
+        return festivals
+
+    def getJieQi(self) -> str:
+        return get_calendar_table().jieqi_on(self._dt.date())
+
+    def getNextJieQi(self) -> JieQi:
+        return self._near_jieqi(True)
+
+    def getPrevJieQi(self) -> JieQi:
+        return self._near_jieqi(False)
+
+    def _near_jieqi(self, forward: bool) -> JieQi:
+        name, when = get_calendar_table().near_jieqi(self._dt, forward)
+        return JieQi(
+            name,
+            Solar.fromYmdHms(
+                when.year, when.month, when.day, when.hour, when.minute, when.second
+            ),
+        )
+
+    def getXiu(self) -> str:
+        # 星期：0 为周日
+        week = (self._dt.weekday() + 1) % 7
+        return LunarUtil.XIU[LunarUtil.ZHI[self._day_zhi + 1] + str(week)]
+
+    def getPengZuGan(self) -> str:
+        return LunarUtil.PENG_ZU_GAN[self._day_gan + 1]
+
+    def getPengZuZhi(self) -> str:
+        return LunarUtil.PENG_ZU_ZHI[self._day_zhi + 1]
+
+    def getPositionXi(self) -> str:
+        return LunarUtil.POSITION_XI[self._day_gan + 1]
+
+    def getPositionYangGui(self) -> str:
+        return LunarUtil.POSITION_YANG_GUI[self._day_gan + 1]
+
+    def getPositionYinGui(self) -> str:
+        return LunarUtil.POSITION_YIN_GUI[self._day_gan + 1]
+
+    def getPositionFu(self) -> str:
+        return LunarUtil.POSITION_FU_2[self._day_gan + 1]
+
+    def getPositionCai(self) -> str:
+        return LunarUtil.POSITION_CAI[self._day_gan + 1]
+
+    def getDayChongDesc(self) -> str:
+        chong = LunarUtil.CHONG[self._day_zhi]
+        shengxiao = LunarUtil.SHENGXIAO[LunarUtil.ZHI.index(chong)]
+        return f"({LunarUtil.CHONG_GAN[self._day_gan]}{chong}){shengxiao}"
+
+    def getDayYi(self) -> List[str]:
+        return LunarUtil.getDayYi(self._month_gan_zhi, self._day_gan_zhi)
+
+    def getDayJi(self) -> List[str]:
+        return LunarUtil.getDayJi(self._month_gan_zhi, self._day_gan_zhi)
+
+
+def get_table_lunar(
+    year: int, month: int, day: int, hour: int = 0, minute: int = 0, second: int = 0
+) -> Optional[TableLunar]:
+    """
+    由预计算表构造公历时刻对应的农历对象，超出表范围或时间不合法时返回 None.
+    """
+    table = get_calendar_table()
+    if not table.covers_lunar(year):
+        return None
+    try:
+        dt = datetime(year, month, day, hour, minute, second)
+    except ValueError:
+        return None
+
+    lunar_date = table.lunar_date(dt.date())
+    if lunar_date is None:
+        return None
+    return TableLunar(dt, *lunar_date)
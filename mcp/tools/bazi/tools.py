@@ -3,16 +3,53 @@
 """
 
 import json
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
+from src.mcp.progress import report_progress
 from src.utils.logging_config import get_logger
 
+from .analysis_cache import birth_key, get_bazi_cache
+from .batch import compatibility_pairs, iter_batch_analysis, parse_records
 from .bazi_calculator import get_bazi_calculator
 from .engine import get_bazi_engine
 
 logger = get_logger(__name__)
 
 
+def _cached_bazi_response(
+    tool: str,
+    solar_datetime: Optional[str],
+    lunar_datetime: Optional[str],
+    gender: int,
+    eight_char_provider_sect: int,
+    extra: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    构建八字分析并序列化为工具响应，响应按 (工具, 规范化出生时间, 农历文本) 缓存.
+    """
+    calculator = get_bazi_calculator()
+    solar_time, lunar_time = calculator.resolve_birth_time(
+        solar_datetime, lunar_datetime
+    )
+    key = (
+        tool,
+        birth_key(solar_time, gender, eight_char_provider_sect),
+        str(lunar_time),
+    )
+
+    def build_response() -> str:
+        result = calculator.build_bazi_from_times(
+            solar_time, lunar_time, gender, eight_char_provider_sect
+        )
+        return json.dumps(
+            {"success": True, **(extra or {}), "data": result.to_dict()},
+            ensure_ascii=False,
+            indent=2,
+        )
+
+    return get_bazi_cache().response.get_or_compute(key, build_response)
+
+
 async def get_bazi_detail(args: Dict[str, Any]) -> str:
     """
     根据时间（公历或农历）、性别来获取八字信息。
@@ -32,16 +69,12 @@ async def get_bazi_detail(args: Dict[str, Any]) -> str:
                 ensure_ascii=False,
             )
 
-        calculator = get_bazi_calculator()
-        result = calculator.build_bazi(
-            solar_datetime=solar_datetime,
-            lunar_datetime=lunar_datetime,
-            gender=gender,
-            eight_char_provider_sect=eight_char_provider_sect,
-        )
-
-        return json.dumps(
-            {"success": True, "data": result.to_dict()}, ensure_ascii=False, indent=2
+        return _cached_bazi_response(
+            "get_bazi_detail",
+            solar_datetime,
+            lunar_datetime,
+            gender,
+            eight_char_provider_sect,
         )
 
     except Exception as e:
@@ -123,21 +156,13 @@ async def build_bazi_from_lunar_datetime(args: Dict[str, Any]) -> str:
                 ensure_ascii=False,
             )
 
-        calculator = get_bazi_calculator()
-        result = calculator.build_bazi(
-            lunar_datetime=lunar_datetime,
-            gender=gender,
-            eight_char_provider_sect=eight_char_provider_sect,
-        )
-
-        return json.dumps(
-            {
-                "success": True,
-                "message": "此方法已弃用，请使用get_bazi_detail",
-                "data": result.to_dict(),
-            },
-            ensure_ascii=False,
-            indent=2,
+        return _cached_bazi_response(
+            "build_bazi_from_lunar_datetime",
+            None,
+            lunar_datetime,
+            gender,
+            eight_char_provider_sect,
+            extra={"message": "此方法已弃用，请使用get_bazi_detail"},
         )
 
     except Exception as e:
@@ -163,26 +188,95 @@ async def build_bazi_from_solar_datetime(args: Dict[str, Any]) -> str:
                 ensure_ascii=False,
             )
 
-        calculator = get_bazi_calculator()
-        result = calculator.build_bazi(
-            solar_datetime=solar_datetime,
-            gender=gender,
-            eight_char_provider_sect=eight_char_provider_sect,
+        return _cached_bazi_response(
+            "build_bazi_from_solar_datetime",
+            solar_datetime,
+            None,
+            gender,
+            eight_char_provider_sect,
+            extra={"message": "此方法已弃用，请使用get_bazi_detail"},
         )
 
+    except Exception as e:
+        logger.error(f"根据阳历时间获取八字失败: {e}")
+        return json.dumps(
+            {"success": False, "message": f"根据阳历时间获取八字失败: {str(e)}"},
+            ensure_ascii=False,
+        )
+
+
+async def get_bazi_cache_stats(args: Dict[str, Any]) -> str:
+    """
+    获取八字分析缓存的命中统计，可选清空缓存。
+    """
+    try:
+        cache = get_bazi_cache()
+        stats = cache.stats()
+        cleared = bool(args.get("clear", False))
+        if cleared:
+            cache.clear()
+
+        return json.dumps(
+            {"success": True, "data": {"缓存": stats, "已清空": cleared}},
+            ensure_ascii=False,
+            indent=2,
+        )
+
+    except Exception as e:
+        logger.error(f"获取八字缓存统计失败: {e}")
+        return json.dumps(
+            {"success": False, "message": f"获取八字缓存统计失败: {str(e)}"},
+            ensure_ascii=False,
+        )
+
+
+async def analyze_bazi_batch(args: Dict[str, Any]) -> str:
+    """
+    批量排盘并计算全部男女合婚，请求携带 progressToken 时逐块推送部分结果。
+    """
+    try:
+        records = parse_records(args.get("records"))
+        detail = bool(args.get("detail", False))
+
+        charts = []
+        compatibilities = []
+        total = len(records) + len(compatibility_pairs(records))
+        async for kind, items in iter_batch_analysis(records, detail):
+            (charts if kind == "命盘" else compatibilities).extend(items)
+            await report_progress(
+                len(charts) + len(compatibilities),
+                total,
+                json.dumps({"类型": kind, "结果": items}, ensure_ascii=False),
+            )
+
+        charts.sort(key=lambda item: item["序号"])
+        compatibilities.sort(key=lambda item: (item["男方"], item["女方"]))
+        ranked = [item for item in compatibilities if "错误" not in item]
+        ranked.sort(key=lambda item: item["综合评分"], reverse=True)
+
         return json.dumps(
             {
                 "success": True,
-                "message": "此方法已弃用，请使用get_bazi_detail",
-                "data": result.to_dict(),
+                "data": {
+                    "命盘": charts,
+                    "合婚": compatibilities,
+                    "统计": {
+                        "记录数": len(records),
+                        "合婚对数": len(compatibilities),
+                        "失败数": sum(
+                            "错误" in item for item in charts + compatibilities
+                        ),
+                        "最佳组合": ranked[:3],
+                    },
+                },
             },
             ensure_ascii=False,
             indent=2,
         )
 
     except Exception as e:
-        logger.error(f"根据阳历时间获取八字失败: {e}")
+        logger.error(f"批量八字分析失败: {e}")
         return json.dumps(
-            {"success": False, "message": f"根据阳历时间获取八字失败: {str(e)}"},
+            {"success": False, "message": f"批量八字分析失败: {str(e)}"},
             ensure_ascii=False,
         )
@@ -3,17 +3,24 @@
 提供完整的日程管理功能，包括事件创建、查询、更新、删除等操作。
 """
 
+from .async_database import AsyncCalendarDatabase, get_async_calendar_database
+from .change_feed import ChangeFeed
 from .database import CalendarDatabase, get_calendar_database
 from .manager import CalendarManager, get_calendar_manager
 from .models import CalendarEvent
+from .recurrence import RecurrenceRule
 from .reminder_service import CalendarReminderService, get_reminder_service
 from .tools import (
     create_event,
     delete_event,
     delete_events_batch,
+    export_events,
+    get_cache_stats,
     get_categories,
     get_events_by_date,
     get_upcoming_events,
+    import_events,
+    search_events,
     update_event,
 )
 
@@ -21,15 +28,23 @@ __all__ = [
     "CalendarManager",
     "get_calendar_manager",
     "CalendarEvent",
+    "RecurrenceRule",
     "CalendarDatabase",
     "get_calendar_database",
+    "AsyncCalendarDatabase",
+    "get_async_calendar_database",
+    "ChangeFeed",
     "CalendarReminderService",
     "get_reminder_service",
     "create_event",
     "delete_event",
     "delete_events_batch",
+    "export_events",
+    "get_cache_stats",
     "get_categories",
     "get_events_by_date",
     "get_upcoming_events",
+    "import_events",
+    "search_events",
     "update_event",
 ]
@@ -0,0 +1,292 @@
+"""
+日程数据库的异步访问层.
+
+日程工具与提醒服务都运行在事件循环中，直接调用 CalendarDatabase 会让磁盘 I/O 阻塞
+事件循环（SD 卡上一次 fsync 可能超过 100ms，语音播放随之卡顿）。读操作在读线程池中
+执行；写操作交给唯一的写线程排队执行：写线程每次取出已排队的全部写操作（组提交），
+放进同一个事务，每个写操作用 SAVEPOINT 隔离（失败只回滚它自己），整批只提交一次，
+提交后一次性通知事件变更。
+"""
+
+import asyncio
+import atexit
+import functools
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from src.utils.logging_config import get_logger
+
+from .database import CalendarDatabase, WriteOp, get_calendar_database
+
+logger = get_logger(__name__)
+
+_STOP = object()
+
+
+class AsyncCalendarDatabase:
+    """
+    CalendarDatabase 的异步门面：读线程池 + 单写线程组提交.
+    """
+
+    def __init__(
+        self,
+        db: Optional[CalendarDatabase] = None,
+        readers: int = 2,
+        max_batch: int = 64,
+        commit_delay: float = 0.0,
+    ):
+        self.db = db or get_calendar_database()
+        self.max_batch = max_batch
+        # 取到第一个写操作后再等待这么久收集后续写操作，0 表示只合并已排队的
+        self.commit_delay = commit_delay
+        self._readers = ThreadPoolExecutor(
+            max_workers=readers, thread_name_prefix="calendar-reader"
+        )
+        self._queue: "queue.Queue" = queue.Queue()
+        self._writer: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        self._closed = False
+        self._stats_lock = threading.Lock()
+        self._writes = 0
+        self._commits = 0
+        self._largest_batch = 0
+        atexit.register(self.close)
+
+    async def read(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        在读线程池中执行同步函数（如 CalendarDatabase 的查询方法）.
+        """
+        if self._closed:
+            raise RuntimeError("日程数据库已关闭")
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._readers, functools.partial(func, *args, **kwargs)
+        )
+
+    async def write(self, op: WriteOp, *args) -> Any:
+        """
+        交给写线程执行写操作 op(conn, *args)，提交后返回其结果（失败时抛出异常）.
+        """
+        if self._closed:
+            raise RuntimeError("日程数据库已关闭")
+        self._ensure_writer()
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((op, args, loop, future))
+        return await future
+
+    def _ensure_writer(self):
+        with self._writer_lock:
+            if self._writer is None:
+                self._writer = threading.Thread(
+                    target=self._writer_loop, name="calendar-writer", daemon=True
+                )
+                self._writer.start()
+
+    def _writer_loop(self):
+        while True:
+            request = self._queue.get()
+            if request is _STOP:
+                return
+            batch = [request]
+            stop = self._collect(batch)
+            self._commit(batch)
+            if stop:
+                return
+
+    def _collect(self, batch: List[tuple]) -> bool:
+        """
+        收集随后排队的写操作，遇到停止标记时返回 True.
+        """
+        deadline = time.monotonic() + self.commit_delay
+        while len(batch) < self.max_batch:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout > 0:
+                    request = self._queue.get(timeout=timeout)
+                else:
+                    request = self._queue.get_nowait()
+            except queue.Empty:
+                return False
+            if request is _STOP:
+                return True
+            batch.append(request)
+        return False
+
+    def _commit(self, batch: List[tuple]):
+        """
+        在一个事务中依次执行一批写操作并提交一次.
+        """
+        outcomes = []
+        notify = False
+        try:
+            with self.db._get_connection() as conn:
+                conn.execute("BEGIN IMMEDIATE")
+                for op, args, _, _ in batch:
+                    conn.execute("SAVEPOINT calendar_write")
+                    try:
+                        result, event_ids = op(conn, *args)
+                    except Exception as e:
+                        conn.execute("ROLLBACK TO calendar_write")
+                        outcomes.append((False, e))
+                    else:
+                        outcomes.append((True, result))
+                        notify = notify or event_ids is None or bool(event_ids)
+                    conn.execute("RELEASE calendar_write")
+                conn.commit()
+        except Exception as e:
+            logger.error(f"日程写入提交失败: {e}")
+            outcomes = [(False, e)] * len(batch)
+            notify = False
+
+        with self._stats_lock:
+            self._writes += len(batch)
+            self._commits += 1
+            self._largest_batch = max(self._largest_batch, len(batch))
+        if notify:
+            self.db._notify_change()
+        for (_, _, loop, future), outcome in zip(batch, outcomes):
+            self._resolve(loop, future, outcome)
+
+    @staticmethod
+    def _resolve(loop: asyncio.AbstractEventLoop, future: asyncio.Future, outcome):
+        ok, value = outcome
+
+        def settle():
+            if future.done():
+                return  # 等待方已取消
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+
+        try:
+            loop.call_soon_threadsafe(settle)
+        except RuntimeError:
+            pass  # 事件循环已关闭
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        写入统计：写操作数、提交次数与最大批次.
+        """
+        with self._stats_lock:
+            return {
+                "writes": self._writes,
+                "commits": self._commits,
+                "largest_batch": self._largest_batch,
+                "pending": self._queue.qsize(),
+            }
+
+    def close(self):
+        """
+        执行完已排队的写操作后停止写线程与读线程池.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        with self._writer_lock:
+            writer = self._writer
+        if writer is not None:
+            self._queue.put(_STOP)
+            writer.join()
+        self._readers.shutdown(wait=True)
+
+    # 与 CalendarDatabase 对应的异步接口
+
+    async def add_event(self, event_data: Dict[str, Any]) -> bool:
+        """
+        添加事件.
+        """
+        try:
+            return await self.write(self.db._add_event, event_data)
+        except Exception as e:
+            logger.error(f"添加事件失败: {e}")
+            return False
+
+    async def update_event(self, event_id: str, **kwargs) -> bool:
+        """
+        更新事件.
+        """
+        try:
+            return await self.write(self.db._update_event, event_id, kwargs)
+        except Exception as e:
+            logger.error(f"更新事件失败: {e}")
+            return False
+
+    async def delete_event(self, event_id: str) -> bool:
+        """
+        删除事件.
+        """
+        try:
+            return await self.write(self.db._delete_event, event_id)
+        except Exception as e:
+            logger.error(f"删除事件失败: {e}")
+            return False
+
+    async def delete_events_batch(
+        self,
+        start_date: str = None,
+        end_date: str = None,
+        category: str = None,
+        delete_all: bool = False,
+    ) -> Dict[str, Any]:
+        """
+        批量删除事件.
+        """
+        try:
+            return await self.write(
+                self.db._delete_events_batch, start_date, end_date, category, delete_all
+            )
+        except Exception as e:
+            logger.error(f"批量删除事件失败: {e}")
+            return {
+                "success": False,
+                "deleted_count": 0,
+                "message": f"批量删除失败: {str(e)}",
+            }
+
+    async def get_events(
+        self, start_date: str = None, end_date: str = None, category: str = None
+    ) -> List[Dict[str, Any]]:
+        """
+        获取事件列表.
+        """
+        return await self.read(self.db.get_events, start_date, end_date, category)
+
+    async def get_event_by_id(self, event_id: str) -> Optional[Dict[str, Any]]:
+        return await self.read(self.db.get_event_by_id, event_id)
+
+    async def get_categories(self) -> List[str]:
+        return await self.read(self.db.get_categories)
+
+    async def get_statistics(self) -> Dict[str, Any]:
+        return await self.read(self.db.get_statistics)
+
+    async def search_events(
+        self,
+        query: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        return await self.read(
+            self.db.search_events, query, start_date, end_date, category, limit
+        )
+
+
+# 全局异步访问层实例
+_async_calendar_db = None
+
+
+def get_async_calendar_database() -> AsyncCalendarDatabase:
+    """
+    获取异步访问层单例（与 get_calendar_database 共用同一个数据库实例）.
+    """
+    global _async_calendar_db
+    if _async_calendar_db is None:
+        _async_calendar_db = AsyncCalendarDatabase()
+    return _async_calendar_db
@@ -2,17 +2,50 @@
 日程管理SQLite数据库操作模块.
 """
 
+import atexit
+import heapq
 import os
+import queue
 import sqlite3
+import threading
 from contextlib import contextmanager
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+from datetime import datetime, timedelta
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
 
 from src.utils.logging_config import get_logger
 from src.utils.resource_finder import get_user_data_dir
 
+from .change_feed import CHANGE_LOG_SCHEMA, ChangeFeed, ChangeListener
+from .models import CalendarEvent
+from .query_cache import VersionedCache
+from .recurrence import RecurringSeries, parse_datetime
+from .search import (
+    SEARCH_BACKFILL,
+    SEARCH_SCHEMA,
+    SEARCH_WEIGHTS,
+    make_snippet,
+    match_expression,
+    matches,
+    search_terms,
+)
+
 logger = get_logger(__name__)
 
+# 写操作：在调用方的事务内执行（不提交），返回 (结果, 变更的事件 ID 列表)；
+# None 表示可能有大量事件变更，空列表表示无需立即通知订阅者（变更日志中的记录
+# 稍后由 ChangeFeed 的后台线程送达）
+WriteResult = Tuple[Any, Optional[List[str]]]
+WriteOp = Callable[..., WriteResult]
+
 
 def _get_database_file_path() -> str:
     """
@@ -28,15 +61,328 @@ def _get_database_file_path() -> str:
 DATABASE_FILE = _get_database_file_path()
 
 
+# 连接调优：WAL 允许读写并发，NORMAL 同步在 WAL 下仍保证一致性
+_CONNECTION_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-4000",
+    "PRAGMA busy_timeout=5000",
+)
+
+
+# ISO 时间文本转 Unix 秒：只取前 19 位（忽略小数秒与时区后缀，与按文本比较的语义一致），
+# 无法解析时记为 0
+_EPOCH_SECONDS_SQL = "COALESCE(CAST(strftime('%s', substr({}, 1, 19)) AS INTEGER), 0)"
+
+# 区间索引：R*Tree 以事件 rowid 为键保存 [开始秒, 结束秒]，由触发器随 events 写入同步。
+# R*Tree 按 32 位浮点向外取整存储，查询结果是候选超集，再用原始时间文本精确判定。
+_SPAN_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS event_spans "
+    "USING rtree(id, start_sec, end_sec)",
+    """
+    CREATE TRIGGER IF NOT EXISTS events_span_insert AFTER INSERT ON events BEGIN
+        INSERT OR REPLACE INTO event_spans VALUES (new.rowid, {lo}, {hi});
+    END
+    """,
+    # 用 UPDATE 而非 INSERT OR REPLACE：触发器内的冲突处理会被外层语句
+    # （如批量导入的 UPSERT）覆盖，R*Tree 主键冲突时整条语句失败
+    """
+    CREATE TRIGGER IF NOT EXISTS events_span_update
+    AFTER UPDATE OF start_time, end_time ON events BEGIN
+        UPDATE event_spans SET start_sec = {lo}, end_sec = {hi} WHERE id = new.rowid;
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_span_delete AFTER DELETE ON events BEGIN
+        DELETE FROM event_spans WHERE id = old.rowid;
+    END
+    """,
+)
+
+
+def _span_bounds(start_col: str, end_col: str) -> Dict[str, str]:
+    """
+    R*Tree 中区间的上下界表达式（上界多 1 秒以覆盖被截掉的小数秒）.
+    """
+    start_sec = _EPOCH_SECONDS_SQL.format(start_col)
+    end_sec = _EPOCH_SECONDS_SQL.format(end_col)
+    return {
+        "lo": f"min({start_sec}, {end_sec})",
+        "hi": f"max({start_sec}, {end_sec}) + 1",
+    }
+
+
+# 与 [start, end) 重叠（开始早于 end 且结束晚于 start）的事件
+_OVERLAP_QUERY_RTREE = """
+    SELECT e.* FROM event_spans AS s JOIN events AS e ON e.rowid = s.id
+    WHERE s.start_sec < {end_sec} + 1 AND s.end_sec > {start_sec} - 1
+    AND e.rrule IS NULL AND e.id != ? AND e.start_time < ? AND e.end_time > ?
+    ORDER BY e.start_time
+""".format(
+    end_sec=_EPOCH_SECONDS_SQL.format("?"), start_sec=_EPOCH_SECONDS_SQL.format("?")
+)
+_OVERLAP_QUERY_INDEX = """
+    SELECT * FROM events
+    WHERE rrule IS NULL AND id != ? AND start_time < ? AND end_time > ?
+    ORDER BY start_time
+"""
+
+# 重复事件只存一行（第一次发生 + 规则），series_end 为最后一次发生的结束时间上界，
+# 无限重复时为 NULL；按时间窗口筛出可能有发生落在窗口内的系列，再在窗口内展开
+_SERIES_QUERY = """
+    SELECT * FROM events
+    WHERE rrule IS NOT NULL AND id != ? AND start_time < ?
+    AND (series_end IS NULL OR series_end > ?)
+"""
+# 查询未指定结束日期时，重复事件最多展开到这段时间
+RECURRENCE_QUERY_HORIZON = timedelta(days=366)
+
+# 批量导入：按 ID 覆盖已有事件。用 UPSERT 而非 INSERT OR REPLACE，
+# 覆盖时保留原 rowid，R*Tree 区间索引由更新触发器同步
+_UPSERT_EVENT = """
+    INSERT INTO events (
+        id, title, start_time, end_time, description,
+        category, reminder_minutes, reminder_time, reminder_sent,
+        created_at, updated_at, rrule, series_end
+    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(id) DO UPDATE SET
+        title = excluded.title, start_time = excluded.start_time,
+        end_time = excluded.end_time, description = excluded.description,
+        category = excluded.category, reminder_minutes = excluded.reminder_minutes,
+        reminder_time = excluded.reminder_time,
+        reminder_sent = excluded.reminder_sent, updated_at = excluded.updated_at,
+        rrule = excluded.rrule, series_end = excluded.series_end
+"""
+# 导出：单次事件按开始时间、重复事件按系列时间范围筛选
+_EXPORT_QUERY = """
+    SELECT * FROM events
+    WHERE (rrule IS NULL AND start_time >= ? AND start_time <= ?)
+    OR (rrule IS NOT NULL AND start_time <= ?
+        AND (series_end IS NULL OR series_end >= ?))
+    ORDER BY start_time
+"""
+# 全文检索：先按 BM25 得分（取反，越大越相关）排出候选，再分批按 rowid 读取事件行并
+# 按时间（同导出）、分类筛选，取够结果即停止，不必读取全部候选
+_SEARCH_RANK = """
+    SELECT rowid, -bm25(event_search, {}, {}, {}) AS score FROM event_search
+    WHERE event_search MATCH ? ORDER BY score DESC, rowid
+""".format(
+    *SEARCH_WEIGHTS
+)
+_SEARCH_FILTER = """
+    ((rrule IS NULL AND start_time >= ? AND start_time <= ?)
+    OR (rrule IS NOT NULL AND start_time <= ?
+        AND (series_end IS NULL OR series_end >= ?)))
+    AND (? IS NULL OR category = ?)
+"""
+_SEARCH_ROWS = "SELECT rowid, * FROM events WHERE rowid IN ({}) AND" + _SEARCH_FILTER
+# SQLite 未编译 FTS5 时逐行扫描，按开始时间排序
+_SEARCH_SCAN = (
+    "SELECT *, 0.0 AS score FROM events WHERE"
+    + _SEARCH_FILTER
+    + "ORDER BY start_time"
+)
+
+# 查询索引：(start_time, end_time) 覆盖时间范围与冲突查询，
+# (reminder_sent, reminder_time, start_time) 覆盖提醒轮询的过滤条件
+_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS idx_events_start_time ON events(start_time, end_time)",
+    "CREATE INDEX IF NOT EXISTS idx_events_reminder "
+    "ON events(reminder_sent, reminder_time, start_time)",
+    "CREATE INDEX IF NOT EXISTS idx_events_category ON events(category, start_time)",
+    "CREATE INDEX IF NOT EXISTS idx_events_series "
+    "ON events(start_time) WHERE rrule IS NOT NULL",
+)
+
+
+class SQLiteConnectionPool:
+    """SQLite 长连接池.
+
+    连接在首次使用时创建并一直复用（每个连接自带预编译语句缓存），
+    借出期间只被一个线程使用，归还后可被其他线程借用。
+    """
+
+    def __init__(self, db_file: str, max_size: int = 4, statement_cache: int = 128):
+        self.db_file = db_file
+        self.max_size = max_size
+        self.statement_cache = statement_cache
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.db_file,
+            timeout=5.0,
+            check_same_thread=False,
+            cached_statements=self.statement_cache,
+        )
+        conn.row_factory = sqlite3.Row  # 使结果可以按列名访问
+        for pragma in _CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self, timeout: float = 10.0) -> sqlite3.Connection:
+        """
+        借出连接：优先复用空闲连接，未达上限时新建，否则等待归还.
+        """
+        if self._closed:
+            raise sqlite3.ProgrammingError("连接池已关闭")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            if len(self._all) < self.max_size:
+                conn = self._connect()
+                self._all.append(conn)
+                return conn
+
+        try:
+            return self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise sqlite3.OperationalError("等待数据库连接超时")
+
+    def release(self, conn: sqlite3.Connection, discard: bool = False):
+        """
+        归还连接；连接状态不可信（出错）时丢弃，之后按需重建.
+        """
+        if not discard and not self._closed:
+            try:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.put(conn)
+                return
+            except sqlite3.Error:
+                pass
+
+        with self._lock:
+            if conn in self._all:
+                self._all.remove(conn)
+        conn.close()
+
+    def close(self):
+        """
+        关闭所有连接（最后一个连接关闭时 SQLite 会做 WAL 检查点）.
+        """
+        with self._lock:
+            self._closed = True
+            connections, self._all = self._all, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error:
+                pass
+
+
 class CalendarDatabase:
     """
     日程管理数据库操作类.
     """
 
-    def __init__(self):
-        self.db_file = DATABASE_FILE
+    def __init__(self, db_file: Optional[str] = None):
+        self.db_file = db_file or DATABASE_FILE
+        self._pool = SQLiteConnectionPool(self.db_file)
+        # SQLite 未编译 R*Tree 时退回按 start_time 索引查询
+        self._has_span_index = False
+        # SQLite 未编译 FTS5 时全文检索退回逐行扫描
+        self._has_search_index = False
+        # 变更日志的订阅（含其他进程的写入）
+        self._change_feed = ChangeFeed(self.db_file)
+        # 查询结果缓存，按数据版本失效（见 data_version）
+        self._query_cache = VersionedCache("queries")
+        self._version_conn: Optional[sqlite3.Connection] = None
+        self._version_lock = threading.Lock()
+        atexit.register(self.close)
         self._ensure_database()
 
+    def close(self):
+        """
+        关闭数据库连接池.
+        """
+        self._change_feed.close()
+        self._pool.close()
+        with self._version_lock:
+            if self._version_conn is not None:
+                self._version_conn.close()
+                self._version_conn = None
+        self._query_cache.clear()
+
+    def data_version(self) -> int:
+        """数据版本：任何连接（含其他进程）提交写入后变化.
+
+        由一个只用于读取版本的专用连接执行 PRAGMA data_version，该值只随
+        其他连接的提交变化，而这个连接从不写入，所以能看到全部写入。
+        """
+        with self._version_lock:
+            if self._version_conn is None:
+                self._version_conn = sqlite3.connect(
+                    self.db_file, timeout=5.0, check_same_thread=False
+                )
+            return self._version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _cached(self, key: tuple, factory: Callable[[], Any]) -> Any:
+        """
+        按数据版本读取缓存的查询结果，无法读取版本时直接查询.
+        """
+        try:
+            version = self.data_version()
+        except sqlite3.Error as e:
+            logger.debug(f"读取数据版本失败，跳过查询缓存: {e}")
+            return factory()
+        return self._query_cache.get_or_compute(key, version, factory)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        查询缓存的命中统计.
+        """
+        return self._query_cache.stats()
+
+    def clear_query_cache(self):
+        """
+        清空查询缓存.
+        """
+        self._query_cache.clear()
+
+    def add_change_listener(self, listener: ChangeListener):
+        """注册事件变更回调，任何进程写入数据库后都会收到通知.
+
+        本进程的写入在提交写入的线程中回调，其他进程的写入在变更订阅的后台线程
+        中回调，回调需自行切换线程。
+        """
+        self._change_feed.subscribe(listener)
+
+    def remove_change_listener(self, listener: ChangeListener):
+        """
+        注销事件变更回调.
+        """
+        self._change_feed.unsubscribe(listener)
+
+    def _notify_change(self):
+        """
+        本进程提交写入后立即拉取变更日志并通知订阅者.
+        """
+        try:
+            self._change_feed.poll()
+        except sqlite3.Error as e:
+            logger.warning(f"读取日程变更日志失败: {e}")
+
+    def _execute_write(self, op: WriteOp, *args) -> Any:
+        """
+        在单独的事务中执行写操作并提交，提交后通知变更.
+        """
+        with self._get_connection() as conn:
+            # 先取得写锁：写操作先查询（如冲突检测）再写入，其他写入者不能插在中间
+            conn.execute("BEGIN IMMEDIATE")
+            result, event_ids = op(conn, *args)
+            conn.commit()
+        if event_ids is None or event_ids:
+            self._notify_change()
+        return result
+
     def _ensure_database(self):
         """
         确保数据库和表存在.
@@ -58,7 +404,9 @@ class CalendarDatabase:
                     reminder_time TEXT,
                     reminder_sent BOOLEAN DEFAULT 0,
                     created_at TEXT NOT NULL,
-                    updated_at TEXT NOT NULL
+                    updated_at TEXT NOT NULL,
+                    rrule TEXT,
+                    series_end TEXT
                 )
             """
             )
@@ -90,162 +438,282 @@ class CalendarDatabase:
     @contextmanager
     def _get_connection(self):
         """
-        获取数据库连接的上下文管理器.
+        从连接池借用数据库连接的上下文管理器，未提交的事务在归还时回滚.
         """
-        conn = None
+        conn = self._pool.acquire()
         try:
-            conn = sqlite3.connect(self.db_file)
-            conn.row_factory = sqlite3.Row  # 使结果可以按列名访问
             yield conn
         except Exception as e:
-            if conn:
+            try:
                 conn.rollback()
+            except sqlite3.Error:
+                self._pool.release(conn, discard=True)
+                conn = None
             logger.error(f"数据库操作失败: {e}")
             raise
         finally:
-            if conn:
-                conn.close()
+            if conn is not None:
+                self._pool.release(conn)
 
     def add_event(self, event_data: Dict[str, Any]) -> bool:
         """
         添加事件.
         """
         try:
-            with self._get_connection() as conn:
-                # 检查时间冲突
-                if self._has_conflict(conn, event_data):
-                    return False
-
-                conn.execute(
-                    """
-                    INSERT INTO events (
-                        id, title, start_time, end_time, description,
-                        category, reminder_minutes, reminder_time, reminder_sent,
-                        created_at, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """,
-                    (
-                        event_data["id"],
-                        event_data["title"],
-                        event_data["start_time"],
-                        event_data["end_time"],
-                        event_data["description"],
-                        event_data["category"],
-                        event_data["reminder_minutes"],
-                        event_data.get("reminder_time"),
-                        event_data.get("reminder_sent", False),
-                        event_data["created_at"],
-                        event_data["updated_at"],
-                    ),
-                )
-                conn.commit()
-                logger.info(f"添加事件成功: {event_data['title']}")
-                return True
+            return self._execute_write(self._add_event, event_data)
         except Exception as e:
             logger.error(f"添加事件失败: {e}")
             return False
 
+    def _add_event(
+        self, conn: sqlite3.Connection, event_data: Dict[str, Any]
+    ) -> WriteResult:
+        rrule, series_end = self._series_columns(event_data)
+        # 检查时间冲突
+        if self._has_conflict(conn, event_data):
+            return False, []
+
+        conn.execute(
+            """
+            INSERT INTO events (
+                id, title, start_time, end_time, description,
+                category, reminder_minutes, reminder_time, reminder_sent,
+                created_at, updated_at, rrule, series_end
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """,
+            (
+                event_data["id"],
+                event_data["title"],
+                event_data["start_time"],
+                event_data["end_time"],
+                event_data["description"],
+                event_data["category"],
+                event_data["reminder_minutes"],
+                event_data.get("reminder_time"),
+                event_data.get("reminder_sent", False),
+                event_data["created_at"],
+                event_data["updated_at"],
+                rrule,
+                series_end,
+            ),
+        )
+        logger.info(f"添加事件成功: {event_data['title']}")
+        return True, [event_data["id"]]
+
+    @staticmethod
+    def _series_columns(event_data: Dict[str, Any]) -> tuple:
+        """
+        校验重复规则，返回 (规范化的 rrule, series_end)，单次事件均为 None.
+        """
+        rrule = event_data.get("rrule") or None
+        if rrule is None:
+            return None, None
+        series = RecurringSeries({**event_data, "rrule": rrule})
+        last_end = series.last_end()
+        return str(series.rule), last_end.isoformat() if last_end else None
+
     def get_events(
         self, start_date: str = None, end_date: str = None, category: str = None
     ) -> List[Dict[str, Any]]:
-        """
-        获取事件列表.
+        """获取事件列表.
+
+        重复事件展开为开始时间在查询范围内的各次发生（ID 与所属系列相同）。
+        指定了结束日期的查询结果按数据版本缓存。
         """
         try:
-            with self._get_connection() as conn:
-                query = "SELECT * FROM events WHERE 1=1"
-                params = []
+            if not end_date:
+                # 未指定结束日期时重复事件的展开范围随当前时间变化，不缓存
+                return self._query_events(start_date, end_date, category)
+            events = self._cached(
+                ("events", start_date, end_date, category),
+                lambda: self._query_events(start_date, end_date, category),
+            )
+            return [dict(event) for event in events]
+        except Exception as e:
+            logger.error(f"获取事件失败: {e}")
+            return []
 
-                if start_date:
-                    query += " AND start_time >= ?"
-                    params.append(start_date)
+    def _query_events(
+        self,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        category: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        with self._get_connection() as conn:
+            query = "SELECT * FROM events WHERE rrule IS NULL"
+            params = []
 
-                if end_date:
-                    query += " AND start_time <= ?"
-                    params.append(end_date)
+            if start_date:
+                query += " AND start_time >= ?"
+                params.append(start_date)
 
-                if category:
-                    query += " AND category = ?"
-                    params.append(category)
+            if end_date:
+                query += " AND start_time <= ?"
+                params.append(end_date)
 
-                query += " ORDER BY start_time"
+            if category:
+                query += " AND category = ?"
+                params.append(category)
 
-                cursor = conn.execute(query, params)
-                rows = cursor.fetchall()
+            query += " ORDER BY start_time"
 
-                events = []
-                for row in rows:
-                    events.append(dict(row))
+            cursor = conn.execute(query, params)
+            rows = cursor.fetchall()
 
-                return events
-        except Exception as e:
-            logger.error(f"获取事件失败: {e}")
-            return []
+            events = []
+            for row in rows:
+                events.append(dict(row))
+
+            recurring = self._expand_series(conn, start_date, end_date, category)
+            if recurring:
+                events.extend(recurring)
+                events.sort(key=lambda event: event["start_time"])
+
+            return events
+
+    def _expand_series(
+        self,
+        conn: sqlite3.Connection,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        category: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        """
+        在查询范围内展开重复事件（只生成范围内的发生，不物化整个系列）.
+        """
+        window_start = parse_datetime(start_date) if start_date else None
+        if end_date:
+            window_end = parse_datetime(end_date)
+        else:
+            window_end = (window_start or datetime.now()) + RECURRENCE_QUERY_HORIZON
+
+        query = "SELECT * FROM events WHERE rrule IS NOT NULL AND start_time <= ?"
+        params = [window_end.isoformat()]
+        if window_start is not None:
+            query += " AND (series_end IS NULL OR series_end >= ?)"
+            params.append(window_start.isoformat())
+        if category:
+            query += " AND category = ?"
+            params.append(category)
+
+        events = []
+        for row in conn.execute(query, params):
+            try:
+                series = RecurringSeries(dict(row))
+            except ValueError as e:
+                logger.warning(f"跳过重复规则无效的事件 {row['id']}: {e}")
+                continue
+            # 结束日期包含在查询范围内
+            events.extend(
+                series.expand(window_start, window_end + timedelta(microseconds=1))
+            )
+        return events
 
     def update_event(self, event_id: str, **kwargs) -> bool:
         """
         更新事件.
         """
         try:
-            with self._get_connection() as conn:
-                # 构建更新查询
-                set_clauses = []
-                params = []
-
-                for key, value in kwargs.items():
-                    if key in [
-                        "title",
-                        "start_time",
-                        "end_time",
-                        "description",
-                        "category",
-                        "reminder_minutes",
-                    ]:
-                        set_clauses.append(f"{key} = ?")
-                        params.append(value)
-
-                if not set_clauses:
-                    return False
-
-                # 添加更新时间
-                set_clauses.append("updated_at = ?")
-                params.append(datetime.now().isoformat())
-                params.append(event_id)
-
-                query = f"UPDATE events SET {', '.join(set_clauses)} WHERE id = ?"
-
-                cursor = conn.execute(query, params)
-                conn.commit()
-
-                if cursor.rowcount > 0:
-                    logger.info(f"更新事件成功: {event_id}")
-                    return True
-                else:
-                    logger.warning(f"事件不存在: {event_id}")
-                    return False
+            return self._execute_write(self._update_event, event_id, kwargs)
         except Exception as e:
             logger.error(f"更新事件失败: {e}")
             return False
 
+    def _update_event(
+        self, conn: sqlite3.Connection, event_id: str, kwargs: Dict[str, Any]
+    ) -> WriteResult:
+        # 构建更新查询
+        set_clauses = []
+        params = []
+
+        for key, value in kwargs.items():
+            if key in [
+                "title",
+                "start_time",
+                "end_time",
+                "description",
+                "category",
+                "reminder_minutes",
+            ]:
+                set_clauses.append(f"{key} = ?")
+                params.append(value)
+
+        # 时间或重复规则变化时重新校验规则并计算系列结束时间
+        if {"start_time", "end_time", "rrule"} & kwargs.keys():
+            row = conn.execute(
+                "SELECT start_time, end_time, rrule FROM events WHERE id = ?",
+                (event_id,),
+            ).fetchone()
+            if row is not None:
+                series = {**dict(row), **kwargs}
+                rrule, series_end = self._series_columns(series)
+                set_clauses.append("rrule = ?")
+                params.append(rrule)
+                set_clauses.append("series_end = ?")
+                params.append(series_end)
+
+        if not set_clauses:
+            return False, []
+
+        # 开始时间、提前量或重复规则变化时重新计算提醒时间，并重新等待提醒
+        if {"start_time", "reminder_minutes", "rrule"} & kwargs.keys():
+            reminder_time = self._recalculate_reminder_time(conn, event_id, kwargs)
+            if reminder_time is not None:
+                set_clauses.append("reminder_time = ?")
+                params.append(reminder_time)
+                set_clauses.append("reminder_sent = 0")
+
+        # 添加更新时间
+        set_clauses.append("updated_at = ?")
+        params.append(datetime.now().isoformat())
+        params.append(event_id)
+
+        query = f"UPDATE events SET {', '.join(set_clauses)} WHERE id = ?"
+
+        cursor = conn.execute(query, params)
+        if cursor.rowcount > 0:
+            logger.info(f"更新事件成功: {event_id}")
+            return True, [event_id]
+        else:
+            logger.warning(f"事件不存在: {event_id}")
+            return False, []
+
+    def _recalculate_reminder_time(
+        self, conn: sqlite3.Connection, event_id: str, updates: Dict[str, Any]
+    ) -> Optional[str]:
+        row = conn.execute(
+            "SELECT start_time, reminder_minutes FROM events WHERE id = ?",
+            (event_id,),
+        ).fetchone()
+        if row is None:
+            return None
+        start_time = updates.get("start_time", row["start_time"])
+        reminder_minutes = updates.get("reminder_minutes", row["reminder_minutes"])
+        try:
+            start_dt = datetime.fromisoformat(start_time)
+            return (start_dt - timedelta(minutes=reminder_minutes)).isoformat()
+        except Exception:
+            return start_time  # 如果计算失败，返回开始时间
+
     def delete_event(self, event_id: str) -> bool:
         """
         删除事件.
         """
         try:
-            with self._get_connection() as conn:
-                cursor = conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
-                conn.commit()
-
-                if cursor.rowcount > 0:
-                    logger.info(f"删除事件成功: {event_id}")
-                    return True
-                else:
-                    logger.warning(f"事件不存在: {event_id}")
-                    return False
+            return self._execute_write(self._delete_event, event_id)
         except Exception as e:
             logger.error(f"删除事件失败: {e}")
             return False
 
+    def _delete_event(self, conn: sqlite3.Connection, event_id: str) -> WriteResult:
+        cursor = conn.execute("DELETE FROM events WHERE id = ?", (event_id,))
+        if cursor.rowcount > 0:
+            logger.info(f"删除事件成功: {event_id}")
+            return True, [event_id]
+        else:
+            logger.warning(f"事件不存在: {event_id}")
+            return False, []
+
     def delete_events_batch(
         self,
         start_date: str = None,
@@ -265,92 +733,9 @@ class CalendarDatabase:
             包含删除结果的字典
         """
         try:
-            with self._get_connection() as conn:
-                if delete_all:
-                    # 删除所有事件
-                    cursor = conn.execute("SELECT COUNT(*) FROM events")
-                    total_count = cursor.fetchone()[0]
-
-                    if total_count == 0:
-                        return {
-                            "success": True,
-                            "deleted_count": 0,
-                            "message": "没有事件需要删除",
-                        }
-
-                    cursor = conn.execute("DELETE FROM events")
-                    conn.commit()
-
-                    logger.info(f"删除所有事件成功，共删除 {total_count} 个事件")
-                    return {
-                        "success": True,
-                        "deleted_count": total_count,
-                        "message": f"成功删除所有 {total_count} 个事件",
-                    }
-
-                else:
-                    # 按条件删除事件
-                    # 首先查询符合条件的事件
-                    query = "SELECT id, title FROM events WHERE 1=1"
-                    params = []
-
-                    if start_date:
-                        query += " AND start_time >= ?"
-                        params.append(start_date)
-
-                    if end_date:
-                        query += " AND start_time <= ?"
-                        params.append(end_date)
-
-                    if category:
-                        query += " AND category = ?"
-                        params.append(category)
-
-                    cursor = conn.execute(query, params)
-                    events_to_delete = cursor.fetchall()
-
-                    if not events_to_delete:
-                        return {
-                            "success": True,
-                            "deleted_count": 0,
-                            "message": "没有符合条件的事件需要删除",
-                        }
-
-                    # 执行删除
-                    delete_query = "DELETE FROM events WHERE 1=1"
-                    delete_params = []
-
-                    if start_date:
-                        delete_query += " AND start_time >= ?"
-                        delete_params.append(start_date)
-
-                    if end_date:
-                        delete_query += " AND start_time <= ?"
-                        delete_params.append(end_date)
-
-                    if category:
-                        delete_query += " AND category = ?"
-                        delete_params.append(category)
-
-                    cursor = conn.execute(delete_query, delete_params)
-                    deleted_count = cursor.rowcount
-                    conn.commit()
-
-                    # 记录删除的事件标题
-                    deleted_titles = [event[1] for event in events_to_delete]
-                    logger.info(
-                        f"批量删除事件成功，共删除 {deleted_count} 个事件: "
-                        f"{', '.join(deleted_titles[:3])}"
-                        f"{'...' if len(deleted_titles) > 3 else ''}"
-                    )
-
-                    return {
-                        "success": True,
-                        "deleted_count": deleted_count,
-                        "deleted_titles": deleted_titles,
-                        "message": f"成功删除 {deleted_count} 个事件",
-                    }
-
+            return self._execute_write(
+                self._delete_events_batch, start_date, end_date, category, delete_all
+            )
         except Exception as e:
             logger.error(f"批量删除事件失败: {e}")
             return {
@@ -359,6 +744,96 @@ class CalendarDatabase:
                 "message": f"批量删除失败: {str(e)}",
             }
 
+    def _delete_events_batch(
+        self,
+        conn: sqlite3.Connection,
+        start_date: Optional[str],
+        end_date: Optional[str],
+        category: Optional[str],
+        delete_all: bool,
+    ) -> WriteResult:
+        if delete_all:
+            # 删除所有事件
+            cursor = conn.execute("SELECT COUNT(*) FROM events")
+            total_count = cursor.fetchone()[0]
+
+            if total_count == 0:
+                return {
+                    "success": True,
+                    "deleted_count": 0,
+                    "message": "没有事件需要删除",
+                }, []
+
+            cursor = conn.execute("DELETE FROM events")
+
+            logger.info(f"删除所有事件成功，共删除 {total_count} 个事件")
+            return {
+                "success": True,
+                "deleted_count": total_count,
+                "message": f"成功删除所有 {total_count} 个事件",
+            }, None
+
+        # 按条件删除事件
+        # 首先查询符合条件的事件
+        query = "SELECT id, title FROM events WHERE 1=1"
+        params = []
+
+        if start_date:
+            query += " AND start_time >= ?"
+            params.append(start_date)
+
+        if end_date:
+            query += " AND start_time <= ?"
+            params.append(end_date)
+
+        if category:
+            query += " AND category = ?"
+            params.append(category)
+
+        cursor = conn.execute(query, params)
+        events_to_delete = cursor.fetchall()
+
+        if not events_to_delete:
+            return {
+                "success": True,
+                "deleted_count": 0,
+                "message": "没有符合条件的事件需要删除",
+            }, []
+
+        # 执行删除
+        delete_query = "DELETE FROM events WHERE 1=1"
+        delete_params = []
+
+        if start_date:
+            delete_query += " AND start_time >= ?"
+            delete_params.append(start_date)
+
+        if end_date:
+            delete_query += " AND start_time <= ?"
+            delete_params.append(end_date)
+
+        if category:
+            delete_query += " AND category = ?"
+            delete_params.append(category)
+
+        cursor = conn.execute(delete_query, delete_params)
+        deleted_count = cursor.rowcount
+
+        # 记录删除的事件标题
+        deleted_titles = [event[1] for event in events_to_delete]
+        logger.info(
+            f"批量删除事件成功，共删除 {deleted_count} 个事件: "
+            f"{', '.join(deleted_titles[:3])}"
+            f"{'...' if len(deleted_titles) > 3 else ''}"
+        )
+
+        return {
+            "success": True,
+            "deleted_count": deleted_count,
+            "deleted_titles": deleted_titles,
+            "message": f"成功删除 {deleted_count} 个事件",
+        }, [event[0] for event in events_to_delete]
+
     def get_event_by_id(self, event_id: str) -> Optional[Dict[str, Any]]:
         """
         根据ID获取事件.
@@ -380,14 +855,16 @@ class CalendarDatabase:
         获取所有分类.
         """
         try:
-            with self._get_connection() as conn:
-                cursor = conn.execute("SELECT name FROM categories ORDER BY name")
-                rows = cursor.fetchall()
-                return [row[0] for row in rows]
+            return list(self._cached(("categories",), self._query_categories))
         except Exception as e:
             logger.error(f"获取分类失败: {e}")
             return ["默认"]
 
+    def _query_categories(self) -> List[str]:
+        with self._get_connection() as conn:
+            cursor = conn.execute("SELECT name FROM categories ORDER BY name")
+            return [row[0] for row in cursor.fetchall()]
+
     def add_category(self, category_name: str) -> bool:
         """
         添加新分类.
@@ -436,79 +913,378 @@ class CalendarDatabase:
             logger.error(f"删除分类失败: {e}")
             return False
 
+    def find_overlapping_events(
+        self, start_time: str, end_time: str, exclude_id: str = ""
+    ) -> List[Dict[str, Any]]:
+        """
+        获取与 [start_time, end_time) 时间段重叠的全部事件（含包含与被包含、重复事件的各次发生）.
+        """
+        try:
+            with self._get_connection() as conn:
+                rows = self._query_overlapping(conn, start_time, end_time, exclude_id)
+                return [dict(row) for row in rows]
+        except Exception as e:
+            logger.error(f"查询重叠事件失败: {e}")
+            return []
+
+    def _query_overlapping(
+        self, conn: sqlite3.Connection, start_time: str, end_time: str, exclude_id: str
+    ) -> List[Dict[str, Any]]:
+        events = [
+            dict(row)
+            for row in self._query_single_overlapping(
+                conn, start_time, end_time, exclude_id
+            )
+        ]
+        series_rows = conn.execute(_SERIES_QUERY, (exclude_id, end_time, start_time))
+        start, end = parse_datetime(start_time), parse_datetime(end_time)
+        for row in series_rows:
+            events.extend(RecurringSeries(dict(row)).overlapping(start, end))
+        events.sort(key=lambda event: event["start_time"])
+        return events
+
+    def _query_single_overlapping(
+        self, conn: sqlite3.Connection, start_time: str, end_time: str, exclude_id: str
+    ) -> List[sqlite3.Row]:
+        """
+        与时间段重叠的单次事件.
+        """
+        if self._has_span_index:
+            params = (end_time, start_time, exclude_id, end_time, start_time)
+            return conn.execute(_OVERLAP_QUERY_RTREE, params).fetchall()
+        params = (exclude_id, end_time, start_time)
+        return conn.execute(_OVERLAP_QUERY_INDEX, params).fetchall()
+
+    def _query_series_conflicts(
+        self, conn: sqlite3.Connection, event_data: Dict[str, Any]
+    ) -> List[Dict[str, Any]]:
+        """与新重复事件任一次发生重叠的事件.
+
+        单次事件逐个判断是否落在系列的某次发生上；与其他重复系列比较时只展开
+        本系列在双方时间范围内的发生，并逐个探测对方。无限重复的系列只检查一年。
+        """
+        series = RecurringSeries(event_data)
+        start, end = series.dtstart, series.horizon()
+        conflicts = []
+        for row in self._query_single_overlapping(
+            conn, start.isoformat(), end.isoformat(), event_data["id"]
+        ):
+            row_start = parse_datetime(row["start_time"])
+            row_end = parse_datetime(row["end_time"])
+            if next(series.overlapping(row_start, row_end), None) is not None:
+                conflicts.append(dict(row))
+
+        series_rows = conn.execute(
+            _SERIES_QUERY, (event_data["id"], end.isoformat(), start.isoformat())
+        )
+        for row in series_rows:
+            other = RecurringSeries(dict(row))
+            window_start = max(start, other.dtstart - series.duration)
+            window_end = min(end, other.horizon())
+            for occurrence in series.rule.occurrences(
+                series.dtstart, window_start, window_end
+            ):
+                hit = next(
+                    other.overlapping(occurrence, occurrence + series.duration), None
+                )
+                if hit is not None:
+                    conflicts.append(hit)
+                    break
+        return conflicts
+
     def _has_conflict(
         self, conn: sqlite3.Connection, event_data: Dict[str, Any]
     ) -> bool:
         """
         检查时间冲突.
         """
-        cursor = conn.execute(
-            """
-            SELECT title FROM events
-            WHERE id != ? AND (
-                (start_time < ? AND end_time > ?) OR
-                (start_time < ? AND end_time > ?)
+        if event_data.get("rrule"):
+            conflicting_events = self._query_series_conflicts(conn, event_data)
+        else:
+            conflicting_events = self._query_overlapping(
+                conn, event_data["start_time"], event_data["end_time"], event_data["id"]
             )
-        """,
-            (
-                event_data["id"],
-                event_data["end_time"],
-                event_data["start_time"],
-                event_data["start_time"],
-                event_data["end_time"],
-            ),
-        )
-
-        conflicting_events = cursor.fetchall()
 
         if conflicting_events:
             for event in conflicting_events:
-                logger.warning(f"时间冲突: 与事件 '{event[0]}' 冲突")
+                logger.warning(f"时间冲突: 与事件 '{event['title']}' 冲突")
             return True
 
         return False
 
-    def get_statistics(self) -> Dict[str, Any]:
-        """
-        获取统计信息.
+    def import_events(
+        self, events: Iterable[Dict[str, Any]], batch_size: int = 5000
+    ) -> Dict[str, Any]:
+        """批量写入事件，已存在的 ID 被覆盖，不做逐条冲突检查.
+
+        events 为 CalendarEvent.to_dict() 格式的可迭代对象（可以是生成器），按
+        batch_size 分块用 executemany 写入，每块一个事务，内存占用与总数无关。
+        缺少字段或重复规则无效的事件跳过。返回写入数、跳过的事件，以及导入的单次
+        事件的时间范围（供 find_conflicts 使用）。
         """
-        try:
-            with self._get_connection() as conn:
-                # 总事件数
-                cursor = conn.execute("SELECT COUNT(*) FROM events")
-                total_events = cursor.fetchone()[0]
+        imported = 0
+        skipped: List[Dict[str, str]] = []
+        categories = set()
+        first_start = last_end = None
+        with self._get_connection() as conn:
+            batch = []
+            for event in events:
+                try:
+                    rrule, series_end = self._series_columns(event)
+                    batch.append(
+                        (
+                            event["id"],
+                            event["title"],
+                            event["start_time"],
+                            event["end_time"],
+                            event.get("description", ""),
+                            event.get("category", "默认"),
+                            event.get("reminder_minutes", 15),
+                            event.get("reminder_time"),
+                            event.get("reminder_sent", False),
+                            event["created_at"],
+                            event["updated_at"],
+                            rrule,
+                            series_end,
+                        )
+                    )
+                except KeyError as e:
+                    skipped.append({"id": event.get("id", ""), "error": f"缺少字段 {e}"})
+                    continue
+                except ValueError as e:
+                    skipped.append({"id": event.get("id", ""), "error": str(e)})
+                    continue
+                categories.add(event.get("category", "默认"))
+                # 导入后的冲突检查只覆盖单次事件
+                if rrule is None:
+                    if first_start is None or event["start_time"] < first_start:
+                        first_start = event["start_time"]
+                    if last_end is None or event["end_time"] > last_end:
+                        last_end = event["end_time"]
+                if len(batch) >= batch_size:
+                    conn.executemany(_UPSERT_EVENT, batch)
+                    conn.commit()
+                    imported += len(batch)
+                    batch = []
+            if batch:
+                conn.executemany(_UPSERT_EVENT, batch)
+                imported += len(batch)
+            conn.executemany(
+                "INSERT OR IGNORE INTO categories (name) VALUES (?)",
+                [(category,) for category in categories],
+            )
+            conn.commit()
 
-                # 按分类统计
-                cursor = conn.execute(
-                    """
-                    SELECT category, COUNT(*)
-                    FROM events
-                    GROUP BY category
-                    ORDER BY COUNT(*) DESC
+        logger.info(f"批量导入 {imported} 个事件，跳过 {len(skipped)} 个")
+        if imported:
+            self._notify_change()
+        return {
+            "imported": imported,
+            "skipped": skipped,
+            "start_time": first_start,
+            "end_time": last_end,
+        }
+
+    def find_conflicts(
+        self, start_time: str, end_time: str, limit: int = 20
+    ) -> Dict[str, Any]:
+        """查找时间段内相互重叠的单次事件对（批量导入后统一检查）.
+
+        按开始时间扫描一遍，只保留尚未结束的事件，开销与事件数成线性（加上冲突数）。
+        返回冲突对总数与前 limit 对示例。
+        """
+        count = 0
+        examples = []
+        active: List[tuple] = []  # (结束时间, 开始时间, ID, 标题) 的小顶堆
+        with self._get_connection() as conn:
+            rows = conn.execute(
                 """
-                )
-                category_stats = dict(cursor.fetchall())
+                SELECT id, title, start_time, end_time FROM events
+                WHERE rrule IS NULL AND start_time < ? AND end_time > ?
+                ORDER BY start_time
+            """,
+                (end_time, start_time),
+            )
+            for row in rows:
+                start = parse_datetime(row["start_time"])
+                end = parse_datetime(row["end_time"])
+                while active and active[0][0] <= start:
+                    heapq.heappop(active)
+                if end > start:
+                    for _, _, other_id, other_title in active:
+                        count += 1
+                        if len(examples) < limit:
+                            examples.append(
+                                {
+                                    "event_id": other_id,
+                                    "title": other_title,
+                                    "conflict_id": row["id"],
+                                    "conflict_title": row["title"],
+                                }
+                            )
+                    heapq.heappush(active, (end, start, row["id"], row["title"]))
+        return {"count": count, "examples": examples}
+
+    def iter_events(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        batch_size: int = 500,
+    ) -> Iterator[Dict[str, Any]]:
+        """按开始时间逐条读出数据库中的事件行（用于导出）.
+
+        重复事件按原样输出一行（第一次发生 + 规则），不展开。结果分批读取，
+        迭代期间占用一个连接。
+        """
+        low, high = start_date or "", end_date or "9999"
+        with self._get_connection() as conn:
+            cursor = conn.execute(_EXPORT_QUERY, (low, high, high, low))
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
 
-                # 今天的事件数
-                today = datetime.now().strftime("%Y-%m-%d")
-                cursor = conn.execute(
-                    """
-                    SELECT COUNT(*) FROM events
-                    WHERE date(start_time) = ?
-                """,
-                    (today,),
+    def search_events(
+        self,
+        query: str,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        category: Optional[str] = None,
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """按关键词检索事件（标题、描述、分类），按相关度排序.
+
+        空白分隔的多个词须全部出现，英文不区分大小写。单次事件按开始时间筛选，
+        重复事件取时间范围内（未指定开始日期时从现在起）的下一次发生，范围内
+        没有发生的系列不返回。每个结果附带得分 score 和命中片段 snippet。
+        """
+        terms = search_terms(query)
+        if not terms or limit <= 0:
+            return []
+        low, high = start_date or "", end_date or "9999"
+        window_start = parse_datetime(start_date) if start_date else datetime.now()
+        window_end = parse_datetime(end_date) if end_date else None
+        filters = (low, high, high, low, category or None, category or None)
+
+        results = []
+        with self._get_connection() as conn:
+            for event in self._search_candidates(conn, terms, filters):
+                if not matches(event, terms):
+                    continue
+                if event["rrule"]:
+                    event = self._next_occurrence(event, window_start, window_end)
+                    if event is None:
+                        continue
+                event["score"] = round(event["score"], 4)
+                event["snippet"] = (
+                    make_snippet(event["description"], terms)
+                    or make_snippet(event["title"], terms)
+                    or make_snippet(event["category"], terms)
                 )
-                today_events = cursor.fetchone()[0]
+                results.append(event)
+                if len(results) >= limit:
+                    break
+        return results
+
+    def _search_candidates(
+        self, conn: sqlite3.Connection, terms: List[str], filters: tuple
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        按相关度依次产出满足时间、分类条件的候选事件（尚未按原文精确筛选）.
+        """
+        if not self._has_search_index:
+            for row in conn.execute(_SEARCH_SCAN, filters):
+                yield dict(row)
+            return
 
-                return {
-                    "total_events": total_events,
-                    "category_stats": category_stats,
-                    "today_events": today_events,
-                }
+        ranked = conn.execute(_SEARCH_RANK, (match_expression(terms),))
+        batch_size = 32
+        try:
+            while True:
+                batch = ranked.fetchmany(batch_size)
+                if not batch:
+                    return
+                query = _SEARCH_ROWS.format(", ".join("?" * len(batch)))
+                params = [rowid for rowid, _ in batch] + list(filters)
+                rows = {row["rowid"]: row for row in conn.execute(query, params)}
+                for rowid, score in batch:
+                    if rowid in rows:
+                        event = dict(rows[rowid])
+                        del event["rowid"]
+                        event["score"] = score
+                        yield event
+                # 时间条件筛掉大部分候选时逐步加大批次，减少查询次数
+                batch_size = min(batch_size * 2, 1024)
+        finally:
+            # 取够结果提前结束时释放排序语句
+            ranked.close()
+
+    @staticmethod
+    def _next_occurrence(
+        event: Dict[str, Any], start: datetime, end: Optional[datetime]
+    ) -> Optional[Dict[str, Any]]:
+        """
+        重复事件在 [start, end] 内的下一次发生，没有发生时返回 None.
+        """
+        try:
+            series = RecurringSeries(event)
+        except ValueError as e:
+            logger.warning(f"跳过重复规则无效的事件 {event['id']}: {e}")
+            return None
+        next_start = series.next_start(start - timedelta(microseconds=1))
+        if next_start is None or (end is not None and next_start > end):
+            return None
+        return series.occurrence(next_start)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """
+        获取统计信息.
+        """
+        try:
+            today = datetime.now().strftime("%Y-%m-%d")
+            stats = self._cached(
+                ("statistics", today), lambda: self._query_statistics(today)
+            )
+            return {**stats, "category_stats": dict(stats["category_stats"])}
         except Exception as e:
             logger.error(f"获取统计信息失败: {e}")
             return {}
 
+    def _query_statistics(self, today: str) -> Dict[str, Any]:
+        with self._get_connection() as conn:
+            # 总事件数
+            cursor = conn.execute("SELECT COUNT(*) FROM events")
+            total_events = cursor.fetchone()[0]
+
+            # 按分类统计
+            cursor = conn.execute(
+                """
+                SELECT category, COUNT(*)
+                FROM events
+                GROUP BY category
+                ORDER BY COUNT(*) DESC
+            """
+            )
+            category_stats = dict(cursor.fetchall())
+
+            # 今天的事件数
+            cursor = conn.execute(
+                """
+                SELECT COUNT(*) FROM events
+                WHERE date(start_time) = ?
+            """,
+                (today,),
+            )
+            today_events = cursor.fetchone()[0]
+
+            return {
+                "total_events": total_events,
+                "category_stats": category_stats,
+                "today_events": today_events,
+            }
+
     def migrate_from_json(self, json_file_path: str) -> bool:
         """
         从JSON文件迁移数据.
@@ -528,39 +1304,21 @@ class CalendarDatabase:
 
             with self._get_connection() as conn:
                 # 迁移分类
-                for category in categories_data:
-                    conn.execute(
-                        "INSERT OR IGNORE INTO categories (name) VALUES (?)",
-                        (category,),
-                    )
-
-                # 迁移事件
-                for event_data in events_data:
-                    conn.execute(
-                        """
-                        INSERT OR REPLACE INTO events (
-                            id, title, start_time, end_time, description,
-                            category, reminder_minutes, created_at, updated_at
-                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                        (
-                            event_data["id"],
-                            event_data["title"],
-                            event_data["start_time"],
-                            event_data["end_time"],
-                            event_data.get("description", ""),
-                            event_data.get("category", "默认"),
-                            event_data.get("reminder_minutes", 15),
-                            event_data.get("created_at", datetime.now().isoformat()),
-                            event_data.get("updated_at", datetime.now().isoformat()),
-                        ),
-                    )
-
-                conn.commit()
-                logger.info(
-                    f"成功迁移 {len(events_data)} 个事件和 {len(categories_data)} 个分类"
+                conn.executemany(
+                    "INSERT OR IGNORE INTO categories (name) VALUES (?)",
+                    [(category,) for category in categories_data],
                 )
-                return True
+                conn.commit()
+
+            # 迁移事件（补全提醒时间等字段后批量写入）
+            result = self.import_events(
+                CalendarEvent.from_dict(event_data).to_dict()
+                for event_data in events_data
+            )
+            logger.info(
+                f"成功迁移 {result['imported']} 个事件和 {len(categories_data)} 个分类"
+            )
+            return True
 
         except Exception as e:
             logger.error(f"数据迁移失败: {e}")
@@ -587,6 +1345,12 @@ class CalendarDatabase:
                 )
                 logger.info("已添加reminder_sent字段")
 
+            # 添加重复规则字段
+            if "rrule" not in columns:
+                conn.execute("ALTER TABLE events ADD COLUMN rrule TEXT")
+                conn.execute("ALTER TABLE events ADD COLUMN series_end TEXT")
+                logger.info("已添加rrule与series_end字段")
+
             # 为现有事件计算并设置reminder_time
             cursor = conn.execute(
                 "SELECT id, start_time, reminder_minutes "
@@ -612,11 +1376,68 @@ class CalendarDatabase:
             if events_to_update:
                 logger.info(f"已为{len(events_to_update)}个现有事件设置提醒时间")
 
+            for statement in _INDEXES:
+                conn.execute(statement)
+            self._ensure_span_index(conn)
+            self._ensure_search_index(conn)
+            for statement in CHANGE_LOG_SCHEMA:
+                conn.execute(statement)
+
             conn.commit()
 
         except Exception as e:
             logger.error(f"数据库升级失败: {e}", exc_info=True)
 
+    def _ensure_span_index(self, conn: sqlite3.Connection):
+        """
+        创建事件区间的 R*Tree 索引与同步触发器，首次创建时回填已有事件.
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'event_spans'"
+        ).fetchone()
+        # 旧版本的更新触发器用 INSERT OR REPLACE，与批量导入的 UPSERT 冲突，重建
+        trigger = conn.execute(
+            "SELECT sql FROM sqlite_master WHERE name = 'events_span_update'"
+        ).fetchone()
+        if trigger is not None and "INSERT OR REPLACE" in trigger[0]:
+            conn.execute("DROP TRIGGER events_span_update")
+        try:
+            for statement in _SPAN_SCHEMA:
+                conn.execute(
+                    statement.format(**_span_bounds("new.start_time", "new.end_time"))
+                )
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite 不支持 R*Tree，冲突检测改用普通索引: {e}")
+            return
+
+        if not exists:
+            bounds = _span_bounds("start_time", "end_time")
+            conn.execute(
+                "INSERT OR REPLACE INTO event_spans "
+                f"SELECT rowid, {bounds['lo']}, {bounds['hi']} FROM events"
+            )
+            logger.info("已建立事件区间索引")
+        self._has_span_index = True
+
+    def _ensure_search_index(self, conn: sqlite3.Connection):
+        """
+        创建全文检索表与同步触发器，首次创建时回填已有事件.
+        """
+        exists = conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'event_search'"
+        ).fetchone()
+        try:
+            for statement in SEARCH_SCHEMA:
+                conn.execute(statement)
+        except sqlite3.OperationalError as e:
+            logger.warning(f"SQLite 不支持 FTS5，全文检索改用逐行扫描: {e}")
+            return
+
+        if not exists:
+            conn.execute(SEARCH_BACKFILL)
+            logger.info("已建立事件全文检索索引")
+        self._has_search_index = True
+
 
 # 全局数据库实例
 _calendar_db = None
@@ -1,12 +1,15 @@
 """
 日程管理器 负责日程数据的存储、查询、更新等核心功能.
+
+数据访问经由异步访问层（读线程池 + 单写线程组提交），不阻塞事件循环.
 """
 
 import os
-from typing import List
+from typing import Any, Dict, List
 
 from src.utils.logging_config import get_logger
 
+from .async_database import get_async_calendar_database
 from .database import get_calendar_database
 from .models import CalendarEvent
 
@@ -20,6 +23,7 @@ class CalendarManager:
 
     def __init__(self):
         self.db = get_calendar_database()
+        self.adb = get_async_calendar_database()
         # 尝试从旧的JSON文件迁移数据
         self._migrate_from_json_if_exists()
 
@@ -31,9 +35,13 @@ class CalendarManager:
             create_event,
             delete_event,
             delete_events_batch,
+            export_events,
+            get_cache_stats,
             get_categories,
             get_events_by_date,
             get_upcoming_events,
+            import_events,
+            search_events,
             update_event,
         )
 
@@ -46,6 +54,7 @@ class CalendarManager:
                 Property("description", PropertyType.STRING, default_value=""),
                 Property("category", PropertyType.STRING, default_value="默认"),
                 Property("reminder_minutes", PropertyType.INTEGER, default_value=15),
+                Property("rrule", PropertyType.STRING, default_value=""),
             ]
         )
         add_tool(
@@ -71,7 +80,11 @@ class CalendarManager:
                 "  end_time: End time, auto-calculated if not provided\n"
                 "  description: Event description\n"
                 "  category: Event category (默认/工作/个人/会议/提醒)\n"
-                "  reminder_minutes: Reminder time in minutes before event",
+                "  reminder_minutes: Reminder time in minutes before event\n"
+                "  rrule: Recurrence rule for repeating events, stored as one event "
+                "(optional), e.g. 'FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR' (every weekday), "
+                "'FREQ=DAILY;COUNT=10', 'FREQ=MONTHLY;UNTIL=20261231'. Supports "
+                "FREQ=DAILY/WEEKLY/MONTHLY/YEARLY, INTERVAL, BYDAY, COUNT, UNTIL",
                 create_event_props,
                 create_event,
             )
@@ -114,6 +127,46 @@ class CalendarManager:
             )
         )
 
+        # 按关键词检索日程
+        search_events_props = PropertyList(
+            [
+                Property("query", PropertyType.STRING),
+                Property("start_date", PropertyType.STRING, default_value=""),
+                Property("end_date", PropertyType.STRING, default_value=""),
+                Property("category", PropertyType.STRING, default_value=""),
+                Property("limit", PropertyType.INTEGER, default_value=10),
+            ]
+        )
+        add_tool(
+            (
+                "self.calendar.search_events",
+                "Search calendar events by keyword in title, description and "
+                "category, ranked by relevance. Much cheaper than listing events "
+                "over wide date ranges and scanning titles.\n"
+                "Use this tool when user asks about:\n"
+                "1. When is my dentist appointment / the product review\n"
+                "2. Find events mentioning a person, place or topic\n"
+                "3. Did I schedule anything about X\n"
+                "\nBehavior:\n"
+                "- Space-separated keywords must all match (substring match, "
+                "Chinese words of any length, case-insensitive for English)\n"
+                "- Recurring events are returned once, at their next occurrence "
+                "within the date range\n"
+                "- Each result includes a snippet with matched keywords marked "
+                "by 【】\n"
+                "\nArgs:\n"
+                "  query: Keywords, e.g. '牙医' or '评审 Q3'\n"
+                "  start_date: Only events starting from this time (ISO format, "
+                "optional; recurring events default to from now)\n"
+                "  end_date: Only events starting before this time "
+                "(ISO format, optional)\n"
+                "  category: Filter by category (optional)\n"
+                "  limit: Maximum number of results (default: 10)",
+                search_events_props,
+                search_events,
+            )
+        )
+
         # 获取即将到来的日程
         upcoming_events_props = PropertyList(
             [Property("hours", PropertyType.INTEGER, default_value=24)]
@@ -152,6 +205,7 @@ class CalendarManager:
                 Property("description", PropertyType.STRING, default_value=""),
                 Property("category", PropertyType.STRING, default_value=""),
                 Property("reminder_minutes", PropertyType.INTEGER, default_value=15),
+                Property("rrule", PropertyType.STRING, default_value=""),
             ]
         )
         add_tool(
@@ -176,7 +230,8 @@ class CalendarManager:
                 "  end_time: New end time in ISO format (optional)\n"
                 "  description: New description (optional)\n"
                 "  category: New category (optional)\n"
-                "  reminder_minutes: New reminder time in minutes (optional)",
+                "  reminder_minutes: New reminder time in minutes (optional)\n"
+                "  rrule: New recurrence rule, applies to the whole series (optional)",
                 update_event_props,
                 update_event,
             )
@@ -272,6 +327,89 @@ class CalendarManager:
             )
         )
 
+        # 查询缓存诊断
+        cache_stats_props = PropertyList(
+            [Property("clear", PropertyType.BOOLEAN, default_value=False)]
+        )
+        add_tool(
+            (
+                "self.calendar.get_cache_stats",
+                "Diagnostic tool: show hit statistics of the calendar query cache. "
+                "Event lists, categories and statistics are cached per query window "
+                "and category, and invalidated whenever the calendar database "
+                "changes (including writes from other processes).\n"
+                "\nReturns cache size, capacity, hits, misses, hit rate, evictions "
+                "and invalidations.\n"
+                "\nArgs:\n"
+                "  clear: Clear the cache after returning statistics "
+                "(default: false)",
+                cache_stats_props,
+                get_cache_stats,
+            )
+        )
+
+        # 批量导入日程
+        import_props = PropertyList(
+            [
+                Property("path", PropertyType.STRING),
+                Property("format", PropertyType.STRING, default_value=""),
+                Property("check_conflicts", PropertyType.BOOLEAN, default_value=False),
+            ]
+        )
+        add_tool(
+            (
+                "self.calendar.import_events",
+                "Bulk import calendar events from an iCalendar (.ics) or JSON Lines "
+                "(.jsonl) file. The file is parsed incrementally and written in "
+                "batched transactions, so large calendars import quickly.\n"
+                "Use this tool when user wants to:\n"
+                "1. Import a calendar exported from another app\n"
+                "2. Restore events from a backup file\n"
+                "\nBehavior:\n"
+                "- Events with an existing ID (ICS UID) are overwritten\n"
+                "- Invalid or unsupported events are skipped and reported\n"
+                "- Conflicts are not checked per event; with check_conflicts=true "
+                "overlapping events are reported after the import\n"
+                "\nArgs:\n"
+                "  path: Path of the .ics or .jsonl file\n"
+                "  format: 'ics' or 'jsonl' (optional, detected from extension)\n"
+                "  check_conflicts: Report overlapping events after import "
+                "(default: false)",
+                import_props,
+                import_events,
+            )
+        )
+
+        # 批量导出日程
+        export_props = PropertyList(
+            [
+                Property("path", PropertyType.STRING),
+                Property("format", PropertyType.STRING, default_value=""),
+                Property("start_date", PropertyType.STRING, default_value=""),
+                Property("end_date", PropertyType.STRING, default_value=""),
+            ]
+        )
+        add_tool(
+            (
+                "self.calendar.export_events",
+                "Export calendar events to an iCalendar (.ics) or JSON Lines "
+                "(.jsonl) file. Recurring events are exported once with their "
+                "RRULE.\n"
+                "Use this tool when user wants to:\n"
+                "1. Back up the calendar\n"
+                "2. Share or move events to another calendar app\n"
+                "\nArgs:\n"
+                "  path: Path of the output .ics or .jsonl file\n"
+                "  format: 'ics' or 'jsonl' (optional, detected from extension)\n"
+                "  start_date: Only export events starting from this time "
+                "(ISO format, optional)\n"
+                "  end_date: Only export events starting before this time "
+                "(ISO format, optional)",
+                export_props,
+                export_events,
+            )
+        )
+
     def _migrate_from_json_if_exists(self):
         """
         从旧的JSON文件迁移数据（如果存在）
@@ -297,38 +435,38 @@ class CalendarManager:
             else:
                 logger.warning("数据迁移失败，保留原JSON文件")
 
-    def add_event(self, event: CalendarEvent) -> bool:
+    async def add_event(self, event: CalendarEvent) -> bool:
         """
         添加事件.
         """
-        return self.db.add_event(event.to_dict())
+        return await self.adb.add_event(event.to_dict())
 
-    def get_events(
+    async def get_events(
         self, start_date: str = None, end_date: str = None, category: str = None
     ) -> List[CalendarEvent]:
         """
         获取事件列表.
         """
         try:
-            events_data = self.db.get_events(start_date, end_date, category)
+            events_data = await self.adb.get_events(start_date, end_date, category)
             return [CalendarEvent.from_dict(event_data) for event_data in events_data]
         except Exception as e:
             logger.error(f"获取日程失败: {e}")
             return []
 
-    def update_event(self, event_id: str, **kwargs) -> bool:
+    async def update_event(self, event_id: str, **kwargs) -> bool:
         """
         更新事件.
         """
-        return self.db.update_event(event_id, **kwargs)
+        return await self.adb.update_event(event_id, **kwargs)
 
-    def delete_event(self, event_id: str) -> bool:
+    async def delete_event(self, event_id: str) -> bool:
         """
         删除事件.
         """
-        return self.db.delete_event(event_id)
+        return await self.adb.delete_event(event_id)
 
-    def delete_events_batch(
+    async def delete_events_batch(
         self,
         start_date: str = None,
         end_date: str = None,
@@ -338,13 +476,46 @@ class CalendarManager:
         """
         批量删除事件.
         """
-        return self.db.delete_events_batch(start_date, end_date, category, delete_all)
+        return await self.adb.delete_events_batch(
+            start_date, end_date, category, delete_all
+        )
+
+    async def search_events(
+        self,
+        query: str,
+        start_date: str = None,
+        end_date: str = None,
+        category: str = None,
+        limit: int = 10,
+    ) -> List[Dict[str, Any]]:
+        """
+        按关键词检索事件，结果附带得分与命中片段.
+        """
+        try:
+            return await self.adb.search_events(
+                query, start_date, end_date, category, limit
+            )
+        except Exception as e:
+            logger.error(f"检索日程失败: {e}")
+            return []
 
-    def get_categories(self) -> List[str]:
+    async def get_categories(self) -> List[str]:
         """
         获取所有分类.
         """
-        return self.db.get_categories()
+        return await self.adb.get_categories()
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        获取查询缓存的命中统计.
+        """
+        return self.db.cache_stats()
+
+    def clear_cache(self):
+        """
+        清空查询缓存.
+        """
+        self.db.clear_query_cache()
 
 
 # 全局管理器实例
@@ -0,0 +1,84 @@
+"""
+日程查询结果缓存.
+
+同一轮对话里"今天/明天有什么安排"常被反复询问。按规范化的查询条件（时间窗口、
+分类）缓存查询结果，每个条目记录写入时的数据版本；读取时版本不一致即视为失效。
+数据版本取自 SQLite 的 PRAGMA data_version：任何其他连接（包括同一进程的连接池
+和其他进程，如 voice_rec 中的日程副本）提交写入后都会变化，因此无需依赖写入方
+主动通知。缓存中的对象应视为只读。
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+_MISSING = object()
+
+
+class VersionedCache:
+    """
+    线程安全的 LRU 缓存，条目在数据版本变化后失效.
+    """
+
+    def __init__(self, name: str, maxsize: int = 128):
+        self.name = name
+        self.maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Tuple[Any, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, version: Any, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                entry_version, value = entry
+                if entry_version == version:
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+                self.invalidations += 1
+            self.misses += 1
+            return default
+
+    def put(self, key: Hashable, version: Any, value: Any):
+        with self._lock:
+            self._data[key] = (version, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def get_or_compute(
+        self, key: Hashable, version: Any, factory: Callable[[], Any]
+    ) -> Any:
+        """命中直接返回，否则调用 factory 计算并写入.
+
+        version 须在调用 factory 之前读取：计算期间若有写入，条目带着旧版本写入，
+        下次读取时失效，不会返回过期结果。factory 抛出的异常不会被缓存。
+        """
+        value = self.get(key, version, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.put(key, version, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
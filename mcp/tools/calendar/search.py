@@ -0,0 +1,157 @@
+"""
+日程全文检索.
+
+FTS5 自带的分词器都不适合中文：unicode61 把连续的汉字当成一个词，trigram 查不了
+一两个字的词（"会议"、"牙"）。这里把标题、描述、分类（ASCII 转小写、末尾补一个
+空格）拆成相邻两字的二元组，每个二元组按 UTF-8 十六进制编码成一个 ASCII 词写入
+FTS5 表。二元组由触发器用纯 SQL 生成（借助 1..N 的序号表），其他进程直接写数据库
+时索引同样保持同步。
+
+检索时按词长匹配：一个字用前缀查询（该字开头的二元组，末尾补的空格保证最后一个字
+也有二元组），两个字即一个二元组，更长的词要求其全部二元组都出现；候选再按原文
+精确筛选，所以结果与逐行子串匹配一致。每个字段只索引前 SEARCH_TEXT_LIMIT 个字。
+"""
+
+import string
+from typing import Any, Dict, Iterable, List
+
+# 每个字段参与索引的最大字数（序号表的行数）
+SEARCH_TEXT_LIMIT = 4096
+# 标题、描述、分类在 BM25 排序中的权重
+SEARCH_WEIGHTS = (10.0, 3.0, 1.0)
+SNIPPET_WIDTH = 40
+
+_SEARCH_COLUMNS = ("title", "description", "category")
+# SQLite 的 lower() 只转换 ASCII 字母，检索词按同样规则折叠
+_ASCII_LOWER = str.maketrans(string.ascii_uppercase, string.ascii_lowercase)
+
+# 字段文本 -> 以空格分隔的十六进制二元组
+_BIGRAMS_SQL = (
+    "(SELECT coalesce(group_concat(hex(substr(t, n, 2)), ' '), '') "
+    "FROM (SELECT lower(coalesce({}, '')) || ' ' AS t) "
+    "JOIN search_seq ON n < length(t))"
+)
+
+
+def _bigram_values(prefix: str) -> str:
+    return ", ".join(_BIGRAMS_SQL.format(f"{prefix}{c}") for c in _SEARCH_COLUMNS)
+
+
+# contentless 表只存倒排索引；删除时按原值重新生成同样的词条
+_INSERT_ENTRY = (
+    "INSERT INTO event_search (rowid, title, description, category) "
+    f"VALUES (new.rowid, {_bigram_values('new.')});"
+)
+_DELETE_ENTRY = (
+    "INSERT INTO event_search (event_search, rowid, title, description, category) "
+    f"VALUES ('delete', old.rowid, {_bigram_values('old.')});"
+)
+
+SEARCH_SCHEMA = (
+    "CREATE VIRTUAL TABLE IF NOT EXISTS event_search USING fts5("
+    "title, description, category, content='', tokenize='ascii')",
+    "CREATE TABLE IF NOT EXISTS search_seq (n INTEGER PRIMARY KEY)",
+    "INSERT OR IGNORE INTO search_seq (n) "
+    "WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq "
+    f"WHERE n < {SEARCH_TEXT_LIMIT}) SELECT n FROM seq",
+    f"""
+    CREATE TRIGGER IF NOT EXISTS events_search_insert AFTER INSERT ON events BEGIN
+        {_INSERT_ENTRY}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS events_search_update
+    AFTER UPDATE OF title, description, category ON events BEGIN
+        {_DELETE_ENTRY}
+        {_INSERT_ENTRY}
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS events_search_delete AFTER DELETE ON events BEGIN
+        {_DELETE_ENTRY}
+    END
+    """,
+)
+# 首次建立索引时回填已有事件
+SEARCH_BACKFILL = (
+    "INSERT INTO event_search (rowid, title, description, category) "
+    f"SELECT rowid, {_bigram_values('')} FROM events"
+)
+
+
+def fold(text: str) -> str:
+    return (text or "").translate(_ASCII_LOWER)
+
+
+def search_terms(query: str) -> List[str]:
+    """
+    把检索语句按空白拆成去重的检索词（多个词之间为"与"关系）.
+    """
+    terms = []
+    for term in fold(query).split():
+        if term not in terms:
+            terms.append(term)
+    return terms
+
+
+def _hex(text: str) -> str:
+    return text.encode("utf-8").hex().upper()
+
+
+def match_expression(terms: Iterable[str]) -> str:
+    """
+    检索词对应的 FTS5 查询：结果是包含全部检索词的事件的超集.
+    """
+    tokens = []
+    for term in terms:
+        if len(term) == 1:
+            token = f"{_hex(term)}*"
+            if token not in tokens:
+                tokens.append(token)
+            continue
+        for i in range(len(term) - 1):
+            token = _hex(term[i : i + 2])
+            if token not in tokens:
+                tokens.append(token)
+    return " AND ".join(tokens)
+
+
+def matches(event: Dict[str, Any], terms: Iterable[str]) -> bool:
+    """
+    每个检索词都出现在标题、描述或分类中（精确的子串匹配）.
+    """
+    text = "\n".join(fold(event.get(column)) for column in _SEARCH_COLUMNS)
+    return all(term in text for term in terms)
+
+
+def make_snippet(text: str, terms: Iterable[str], width: int = SNIPPET_WIDTH) -> str:
+    """
+    截取第一个命中附近的一段文本，命中的检索词用【】标出；没有命中时返回空串.
+    """
+    if not text:
+        return ""
+    folded = fold(text)
+    hits = []
+    for term in terms:
+        pos = folded.find(term)
+        while pos != -1:
+            hits.append((pos, pos + len(term)))
+            pos = folded.find(term, pos + 1)
+    if not hits:
+        return ""
+    hits.sort()
+
+    start = max(0, min(hits[0][0] - width // 4, len(text) - width))
+    end = min(len(text), start + width)
+    parts = ["…"] if start > 0 else []
+    cursor = start
+    for hit_start, hit_end in hits:
+        if hit_start < cursor or hit_start >= end:
+            continue
+        hit_end = min(hit_end, end)
+        parts.extend((text[cursor:hit_start], "【", text[hit_start:hit_end], "】"))
+        cursor = hit_end
+    parts.append(text[cursor:end])
+    if end < len(text):
+        parts.append("…")
+    return "".join(parts)
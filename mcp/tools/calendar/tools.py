@@ -2,6 +2,7 @@
 日程管理MCP工具函数 提供给MCP服务器调用的异步工具函数.
 """
 
+import asyncio
 import json
 from datetime import datetime, timedelta
 from typing import Any, Dict
@@ -10,6 +11,7 @@ from src.utils.logging_config import get_logger
 
 from .manager import get_calendar_manager
 from .models import CalendarEvent
+from .recurrence import RecurrenceRule
 
 logger = get_logger(__name__)
 
@@ -25,6 +27,7 @@ async def create_event(args: Dict[str, Any]) -> str:
         description = args.get("description", "")
         category = args.get("category", "默认")
         reminder_minutes = args.get("reminder_minutes", 15)
+        rrule = args.get("rrule") or None
 
         # 如果没有结束时间，根据分类智能设置默认时长
         if not end_time:
@@ -50,9 +53,11 @@ async def create_event(args: Dict[str, Any]) -> str:
 
             end_time = end_dt.isoformat()
 
-        # 验证时间格式
+        # 验证时间格式与重复规则
         datetime.fromisoformat(start_time)
         datetime.fromisoformat(end_time)
+        if rrule:
+            rrule = str(RecurrenceRule.parse(rrule))
 
         # 创建事件
         event = CalendarEvent(
@@ -62,10 +67,11 @@ async def create_event(args: Dict[str, Any]) -> str:
             description=description,
             category=category,
             reminder_minutes=reminder_minutes,
+            rrule=rrule,
         )
 
         manager = get_calendar_manager()
-        if manager.add_event(event):
+        if await manager.add_event(event):
             return json.dumps(
                 {
                     "success": True,
@@ -134,7 +140,7 @@ async def get_events_by_date(args: Dict[str, Any]) -> str:
             )
 
         manager = get_calendar_manager()
-        events = manager.get_events(
+        events = await manager.get_events(
             start_date=start_date.isoformat() if start_date else None,
             end_date=end_date.isoformat() if end_date else None,
             category=category,
@@ -189,6 +195,8 @@ async def update_event(args: Dict[str, Any]) -> str:
         ]:
             if field in args:
                 update_fields[field] = args[field]
+        if args.get("rrule"):
+            update_fields["rrule"] = str(RecurrenceRule.parse(args["rrule"]))
 
         if not update_fields:
             return json.dumps(
@@ -197,7 +205,7 @@ async def update_event(args: Dict[str, Any]) -> str:
             )
 
         manager = get_calendar_manager()
-        if manager.update_event(event_id, **update_fields):
+        if await manager.update_event(event_id, **update_fields):
             return json.dumps(
                 {
                     "success": True,
@@ -227,7 +235,7 @@ async def delete_event(args: Dict[str, Any]) -> str:
         event_id = args["event_id"]
 
         manager = get_calendar_manager()
-        if manager.delete_event(event_id):
+        if await manager.delete_event(event_id):
             return json.dumps(
                 {"success": True, "message": "日程删除成功"}, ensure_ascii=False
             )
@@ -291,7 +299,7 @@ async def delete_events_batch(args: Dict[str, Any]) -> str:
                 end_date = end_date.isoformat()
 
         manager = get_calendar_manager()
-        result = manager.delete_events_batch(
+        result = await manager.delete_events_batch(
             start_date=start_date,
             end_date=end_date,
             category=category,
@@ -314,7 +322,7 @@ async def get_categories(args: Dict[str, Any]) -> str:
     """
     try:
         manager = get_calendar_manager()
-        categories = manager.get_categories()
+        categories = await manager.get_categories()
 
         return json.dumps(
             {"success": True, "categories": categories}, ensure_ascii=False
@@ -337,9 +345,13 @@ async def get_upcoming_events(args: Dict[str, Any]) -> str:
         now = datetime.now()
         end_time = now + timedelta(hours=hours)
 
+        # 查询窗口取整到小时，同一小时内的重复询问可以命中查询缓存，精确范围在下面过滤
+        window_start = now.replace(minute=0, second=0, microsecond=0)
+        window_end = end_time.replace(minute=0, second=0, microsecond=0)
         manager = get_calendar_manager()
-        events = manager.get_events(
-            start_date=now.isoformat(), end_date=end_time.isoformat()
+        events = await manager.get_events(
+            start_date=window_start.isoformat(),
+            end_date=(window_end + timedelta(hours=1)).isoformat(),
         )
 
         # 计算提醒时间
@@ -350,7 +362,7 @@ async def get_upcoming_events(args: Dict[str, Any]) -> str:
 
             # 计算距离开始的时间
             time_until = start_dt - now
-            if time_until.total_seconds() > 0:
+            if time_until.total_seconds() > 0 and start_dt <= end_time:
                 hours_until = int(time_until.total_seconds() // 3600)
                 minutes_until = int((time_until.total_seconds() % 3600) // 60)
 
@@ -380,3 +392,136 @@ async def get_upcoming_events(args: Dict[str, Any]) -> str:
             {"success": False, "message": f"获取即将到来的日程失败: {str(e)}"},
             ensure_ascii=False,
         )
+
+
+async def search_events(args: Dict[str, Any]) -> str:
+    """
+    按关键词检索日程.
+    """
+    try:
+        query = args["query"]
+        start_date = args.get("start_date") or None
+        end_date = args.get("end_date") or None
+        if start_date:
+            datetime.fromisoformat(start_date)
+        if end_date:
+            datetime.fromisoformat(end_date)
+
+        manager = get_calendar_manager()
+        events = await manager.search_events(
+            query,
+            start_date=start_date,
+            end_date=end_date,
+            category=args.get("category") or None,
+            limit=args.get("limit", 10),
+        )
+
+        # 只返回必要字段，减少输出长度
+        events_data = []
+        for event in events:
+            start_dt = datetime.fromisoformat(event["start_time"])
+            end_dt = datetime.fromisoformat(event["end_time"])
+            events_data.append(
+                {
+                    "id": event["id"],
+                    "title": event["title"],
+                    "display_time": (
+                        f"{start_dt.strftime('%Y/%m/%d %H:%M')} - "
+                        f"{end_dt.strftime('%H:%M')}"
+                    ),
+                    "start_time": event["start_time"],
+                    "end_time": event["end_time"],
+                    "category": event["category"],
+                    "rrule": event["rrule"],
+                    "snippet": event["snippet"],
+                    "score": event["score"],
+                }
+            )
+
+        return json.dumps(
+            {
+                "success": True,
+                "query": query,
+                "total_events": len(events_data),
+                "events": events_data,
+            },
+            ensure_ascii=False,
+            indent=2,
+        )
+
+    except Exception as e:
+        logger.error(f"检索日程失败: {e}")
+        return json.dumps(
+            {"success": False, "message": f"检索日程失败: {str(e)}"}, ensure_ascii=False
+        )
+
+
+async def import_events(args: Dict[str, Any]) -> str:
+    """
+    从 ICS/JSONL 文件批量导入日程.
+    """
+    try:
+        from .transfer import import_file
+
+        # 文件读写与数据库写入都是阻塞操作，放到线程中执行，不阻塞事件循环
+        result = await asyncio.to_thread(
+            import_file,
+            args["path"],
+            args.get("format") or None,
+            check_conflicts=args.get("check_conflicts", False),
+        )
+        return json.dumps(result, ensure_ascii=False, indent=2)
+
+    except Exception as e:
+        logger.error(f"导入日程失败: {e}")
+        return json.dumps(
+            {"success": False, "message": f"导入日程失败: {str(e)}"}, ensure_ascii=False
+        )
+
+
+async def export_events(args: Dict[str, Any]) -> str:
+    """
+    把日程导出为 ICS/JSONL 文件.
+    """
+    try:
+        from .transfer import export_file
+
+        result = await asyncio.to_thread(
+            export_file,
+            args["path"],
+            args.get("format") or None,
+            start_date=args.get("start_date") or None,
+            end_date=args.get("end_date") or None,
+        )
+        return json.dumps(result, ensure_ascii=False, indent=2)
+
+    except Exception as e:
+        logger.error(f"导出日程失败: {e}")
+        return json.dumps(
+            {"success": False, "message": f"导出日程失败: {str(e)}"}, ensure_ascii=False
+        )
+
+
+async def get_cache_stats(args: Dict[str, Any]) -> str:
+    """
+    获取日程查询缓存的命中统计，可选清空缓存.
+    """
+    try:
+        manager = get_calendar_manager()
+        stats = manager.get_cache_stats()
+        cleared = bool(args.get("clear", False))
+        if cleared:
+            manager.clear_cache()
+
+        return json.dumps(
+            {"success": True, "cache": stats, "cleared": cleared},
+            ensure_ascii=False,
+            indent=2,
+        )
+
+    except Exception as e:
+        logger.error(f"获取日程缓存统计失败: {e}")
+        return json.dumps(
+            {"success": False, "message": f"获取日程缓存统计失败: {str(e)}"},
+            ensure_ascii=False,
+        )
@@ -5,19 +5,20 @@
 
 from typing import Any, Dict
 
+from src.mcp.lazy_loader import lazy_callback
 from src.utils.logging_config import get_logger
 
-from .tools import (
-	list_ir_codes,
-	send_ir_by_name,
-	send_ir_by_hex,
-	learn_ir_and_save,
-	get_ir_code_info,
-	set_ir_code_info,
-)
-
 logger = get_logger(__name__)
 
+# 工具回调延迟到首次调用时才导入（避免启动时加载 pyserial）
+_TOOLS_MODULE = f"{__package__}.tools"
+list_ir_codes = lazy_callback(_TOOLS_MODULE, "list_ir_codes")
+send_ir_by_name = lazy_callback(_TOOLS_MODULE, "send_ir_by_name")
+send_ir_by_hex = lazy_callback(_TOOLS_MODULE, "send_ir_by_hex")
+learn_ir_and_save = lazy_callback(_TOOLS_MODULE, "learn_ir_and_save")
+get_ir_code_info = lazy_callback(_TOOLS_MODULE, "get_ir_code_info")
+set_ir_code_info = lazy_callback(_TOOLS_MODULE, "set_ir_code_info")
+
 
 class IRControlManager:
 	"""IR 控制工具管理器"""
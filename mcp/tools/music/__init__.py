@@ -4,10 +4,18 @@
 """
 
 from .manager import MusicToolsManager, get_music_tools_manager
-from .music_player import get_music_player_instance
 
 __all__ = [
     "MusicToolsManager",
     "get_music_tools_manager",
     "get_music_player_instance",
 ]
+
+
+def __getattr__(name):
+    # 播放器模块依赖 pygame，按需导入
+    if name == "get_music_player_instance":
+        from .music_player import get_music_player_instance
+
+        return get_music_player_instance
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,105 @@
+"""
+音乐磁盘缓存淘汰.
+
+缓存目录中的歌曲总大小超过字节预算时，按 LRU（最久未播放）或 LFU（播放次数最少，
+次数相同时最久未播放）顺序删除歌曲，直到回到预算以内。从未播放过的歌曲以文件修改
+时间（即下载时间）作为最近使用时间。收藏的歌曲与受保护的歌曲（正在播放、队列中
+即将播放或正在预取的歌曲）不会被删除；使用统计来自音乐库索引（见 library）。
+"""
+
+import threading
+from typing import Iterable, List
+
+from src.utils.logging_config import get_logger
+
+from .library import MusicLibrary, MusicMetadata, TrackUsage
+
+logger = get_logger(__name__)
+
+CACHE_POLICIES = ("lru", "lfu")
+
+
+class MusicCache:
+    """
+    按字节预算淘汰缓存目录中的歌曲.
+    """
+
+    def __init__(self, library: MusicLibrary, max_bytes: int, policy: str = "lru"):
+        """
+        max_bytes 不大于 0 时不限制大小.
+        """
+        if policy not in CACHE_POLICIES:
+            raise ValueError(f"不支持的缓存淘汰策略: {policy}")
+        self.library = library
+        self.max_bytes = max_bytes
+        self.policy = policy
+        self._protected = frozenset()
+        self._lock = threading.Lock()
+
+    def protect(self, names: Iterable[str]):
+        """
+        设置受保护的文件名（替换之前的设置）.
+        """
+        self._protected = frozenset(names)
+
+    def size(self) -> int:
+        """
+        缓存中歌曲的总字节数.
+        """
+        return sum(m.file_size for m in self.library.tracks())
+
+    def _sort_key(self, metadata: MusicMetadata, usage: TrackUsage) -> tuple:
+        last_used = usage.last_played
+        if last_used is None:
+            last_used = metadata.mtime_ns / 1e9
+        if self.policy == "lfu":
+            return (usage.play_count, last_used)
+        return (last_used,)
+
+    def enforce(self) -> List[str]:
+        """
+        删除歌曲直到总大小回到预算以内，返回被删除的文件名.
+        """
+        if self.max_bytes <= 0:
+            return []
+        with self._lock:
+            tracks = self.library.tracks()
+            total = sum(m.file_size for m in tracks)
+            if total <= self.max_bytes:
+                return []
+
+            protected = self._protected
+            candidates = []
+            for metadata in tracks:
+                if metadata.filename in protected:
+                    continue
+                usage = self.library.usage(metadata.filename)
+                if usage.pinned:
+                    continue
+                candidates.append((self._sort_key(metadata, usage), metadata))
+            candidates.sort(key=lambda item: item[0])
+
+            evicted = []
+            for _, metadata in candidates:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    metadata.file_path.unlink()
+                except FileNotFoundError:
+                    pass
+                except OSError as e:
+                    # 仍被占用（Windows 上正在播放）时跳过
+                    logger.debug(f"暂时无法删除缓存文件 {metadata.filename}: {e}")
+                    continue
+                total -= metadata.file_size
+                evicted.append(metadata.filename)
+
+            self.library.remove(evicted)
+        if evicted:
+            logger.info(
+                f"音乐缓存超出预算，已删除 {len(evicted)} 首，"
+                f"当前 {total / 1048576:.1f}MB / {self.max_bytes / 1048576:.0f}MB"
+            )
+        if total > self.max_bytes:
+            logger.warning("收藏或受保护的歌曲已超出音乐缓存预算")
+        return evicted
@@ -0,0 +1,366 @@
+"""
+无缝播放与交叉淡化.
+
+队列中的下一首预取到缓存后，在后台线程中解码为 mixer 输出格式（初始化 mixer 时的
+AudioConfig.OUTPUT_SAMPLE_RATE 采样率）的 PCM。解码好的歌曲切成几秒长的片段，在
+一个保留的 mixer 声道上排队播放：mixer 在同一次混音回调中接着播放排队的片段，
+片段之间、歌曲之间都没有间隙，切歌精确到采样点。开启交叉淡化时，用 NumPy 把上一首
+的结尾与下一首的开头按等功率曲线混合成一个过渡片段（没有 NumPy 时直接衔接）。
+
+片段长度已知，在预计的切换时刻检查声道状态：排队的片段已开始播放即切到下一段
+（下一首的第一段开始时通知播放器换歌），声道空闲即播放结束，不按墙钟估计。
+"""
+
+import asyncio
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, Deque, Optional
+
+import pygame
+
+from src.utils.logging_config import get_logger
+
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+# 每个片段的时长（秒）；片段越短，换下一首或取消下一首时能调整的范围越大
+CHUNK_SECONDS = 5.0
+
+# 检查排队的片段是否已开始播放的间隔（秒），用于 mixer 比预计稍慢时
+_POLL_INTERVAL = 0.02
+
+
+class DecodedTrack:
+    """
+    解码为 mixer 输出格式的一首歌.
+    """
+
+    __slots__ = ("key", "pcm", "rate", "sample_format", "channels", "frame_size")
+
+    def __init__(
+        self, key: str, pcm: bytes, rate: int, sample_format: int, channels: int
+    ):
+        self.key = key  # 缓存文件名
+        self.pcm = pcm
+        self.rate = rate
+        self.sample_format = sample_format  # 与 pygame.mixer.get_init() 相同，如 -16
+        self.channels = channels
+        self.frame_size = abs(sample_format) // 8 * channels
+
+    @property
+    def frames(self) -> int:
+        return len(self.pcm) // self.frame_size
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.rate
+
+    def slice(self, start: int, end: int) -> bytes:
+        """
+        第 start 到 end 帧的 PCM.
+        """
+        return self.pcm[start * self.frame_size : end * self.frame_size]
+
+
+def decode_track(path: Path) -> Optional[DecodedTrack]:
+    """
+    把整个文件解码为 mixer 输出格式的 PCM（在线程中调用），失败时返回 None.
+    """
+    mixer_format = pygame.mixer.get_init()
+    if not mixer_format:
+        return None
+    rate, sample_format, channels = mixer_format
+    try:
+        sound = pygame.mixer.Sound(str(path))
+        pcm = sound.get_raw()
+    except Exception as e:
+        logger.warning(f"解码失败，不能无缝播放 {Path(path).name}: {e}")
+        return None
+    return DecodedTrack(Path(path).name, pcm, rate, sample_format, channels)
+
+
+def crossfade_pcm(tail: bytes, head: bytes, channels: int) -> bytes:
+    """
+    按等功率曲线混合 16 位 PCM：tail 淡出、head 淡入，长度取两者中较短的.
+    """
+    fade_out = np.frombuffer(tail, dtype=np.int16)
+    fade_in = np.frombuffer(head, dtype=np.int16)
+    frames = min(len(fade_out), len(fade_in)) // channels
+    ramp = np.linspace(0.0, 1.0, frames, dtype=np.float32)
+    gain_in = np.repeat(np.sqrt(ramp), channels)
+    gain_out = np.repeat(np.sqrt(1.0 - ramp), channels)
+    samples = frames * channels
+    mixed = fade_out[:samples] * gain_out + fade_in[:samples] * gain_in
+    return np.clip(mixed, -32768, 32767).astype(np.int16).tobytes()
+
+
+class _Segment:
+    """
+    一个片段：track 的第 start 到 end 帧，mix 不为空时与下一首开头混合.
+    """
+
+    __slots__ = ("track", "start", "end", "mix")
+
+    def __init__(
+        self,
+        track: DecodedTrack,
+        start: int,
+        end: int,
+        mix: Optional[DecodedTrack] = None,
+    ):
+        self.track = track
+        self.start = start
+        self.end = end
+        self.mix = mix
+
+    @property
+    def owner(self) -> DecodedTrack:
+        """
+        片段所属的歌曲：过渡片段属于下一首.
+        """
+        return self.mix if self.mix is not None else self.track
+
+    @property
+    def offset(self) -> int:
+        """
+        片段开头在所属歌曲中的帧位置.
+        """
+        return 0 if self.mix is not None else self.start
+
+    @property
+    def frames(self) -> int:
+        return self.end - self.start
+
+    def sound(self) -> "pygame.mixer.Sound":
+        pcm = self.track.slice(self.start, self.end)
+        if self.mix is not None:
+            head = self.mix.slice(0, self.frames)
+            pcm = crossfade_pcm(pcm, head, self.track.channels)
+        return pygame.mixer.Sound(buffer=pcm)
+
+
+class GaplessPlayback:
+    """
+    在一个 mixer 声道上连续播放解码好的歌曲.
+
+    下一首开始时调用 on_track_start(track)，没有下一首、播放结束时调用
+    on_finished()；均在事件循环中调用。
+    """
+
+    def __init__(
+        self,
+        on_track_start: Callable[[DecodedTrack], object],
+        on_finished: Callable[[], object],
+        crossfade: float = 0.0,
+        chunk_seconds: float = CHUNK_SECONDS,
+    ):
+        self._on_track_start = on_track_start
+        self._on_finished = on_finished
+        self.crossfade = crossfade
+        self.chunk_seconds = chunk_seconds
+        self._channel: Optional["pygame.mixer.Channel"] = None
+        self.current: Optional[DecodedTrack] = None
+        self.next: Optional[DecodedTrack] = None
+        self._playing: Optional[_Segment] = None  # 声道正在播放的片段
+        self._queued: Optional[_Segment] = None  # 已交给声道排队的片段
+        self._pending: Deque[_Segment] = deque()  # 尚未交给声道的片段
+        self._started_at = 0.0  # 正在播放的片段开始的时刻（monotonic）
+        self._paused_at: Optional[float] = None
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def active(self) -> bool:
+        return self._playing is not None
+
+    @property
+    def paused(self) -> bool:
+        return self._paused_at is not None
+
+    def _get_channel(self) -> "pygame.mixer.Channel":
+        if self._channel is None:
+            # 保留 0 号声道，不被其他音效占用
+            pygame.mixer.set_reserved(1)
+            self._channel = pygame.mixer.Channel(0)
+        return self._channel
+
+    def play(self, track: DecodedTrack, position: float = 0.0):
+        """
+        从 position 秒开始播放 track（之前设置的下一首保留）.
+        """
+        self.stop(keep_next=True)
+        if self.next is track:
+            self.next = None
+        self.current = track
+        self._plan(track, min(track.frames, max(0, int(position * track.rate))))
+        if not self._pending:
+            return
+        self._playing = self._pending.popleft()
+        self._get_channel().play(self._playing.sound())
+        self._started_at = time.monotonic()
+        self._queue_following()
+        self._arm()
+
+    def seek(self, position: float):
+        """
+        跳转到当前歌曲的 position 秒，暂停中跳转时保持暂停.
+        """
+        if self.current is None:
+            return
+        paused = self.paused
+        self.play(self.current, position)
+        if paused:
+            self.pause()
+
+    def set_next(self, track: Optional[DecodedTrack]) -> bool:
+        """设置当前歌曲之后播放的歌曲（None 为取消）.
+
+        下一首的开头已交给声道时不能再更改，返回 False。
+        """
+        if any(
+            segment is not None and segment.owner is not self.current
+            for segment in (self._playing, self._queued)
+        ):
+            return track is self.next
+        self.next = track
+        # 重新安排尚未交给声道的片段
+        self._pending.clear()
+        if self._playing is not None:
+            self._queue_following()
+        return True
+
+    def _plan(self, track: DecodedTrack, start: int):
+        """
+        安排 track 从第 start 帧到结尾的片段，以及之后的过渡片段与下一首的第一段.
+        """
+        chunk = max(1, int(self.chunk_seconds * track.rate))
+        following = self.next
+        fade = 0
+        if following is not None and self._can_crossfade(track, following):
+            fade = min(
+                int(self.crossfade * track.rate),
+                track.frames // 2,
+                following.frames // 2,
+                track.frames - start,
+            )
+        body_end = track.frames - fade
+        for begin in range(start, body_end, chunk):
+            self._pending.append(_Segment(track, begin, min(begin + chunk, body_end)))
+        if following is None:
+            return
+        if fade > 0:
+            self._pending.append(_Segment(track, body_end, track.frames, following))
+        # 下一首其余的片段在它开始播放后再安排
+        end = min(following.frames, fade + chunk)
+        if end > fade:
+            self._pending.append(_Segment(following, fade, end))
+
+    def _can_crossfade(self, track: DecodedTrack, following: DecodedTrack) -> bool:
+        return (
+            self.crossfade > 0
+            and NUMPY_AVAILABLE
+            and track.sample_format == following.sample_format == -16
+            and track.channels == following.channels
+            and track.rate == following.rate
+        )
+
+    def _queue_following(self):
+        """
+        把下一个片段交给声道排队，需要时先安排当前歌曲后面的片段.
+        """
+        if self._queued is not None:
+            return
+        if not self._pending:
+            last = self._playing
+            if last is None or last.owner is not self.current:
+                return
+            cursor = last.offset + last.frames
+            self._plan(self.current, cursor)
+        if self._pending:
+            self._queued = self._pending.popleft()
+            self._get_channel().queue(self._queued.sound())
+
+    def _arm(self):
+        """
+        在正在播放的片段预计结束时检查声道状态.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._playing is None or self.paused:
+            return
+        ends_at = self._started_at + self._playing.frames / self._playing.track.rate
+        delay = max(_POLL_INTERVAL, ends_at - time.monotonic())
+        self._timer = asyncio.get_running_loop().call_later(delay, self._poll)
+
+    def _poll(self):
+        self._timer = None
+        if self._playing is None or self.paused:
+            return
+        channel = self._get_channel()
+        if self._queued is not None and channel.get_queue() is None:
+            # 排队的片段已开始播放
+            finished = self._playing
+            self._started_at += finished.frames / finished.track.rate
+            self._playing, self._queued = self._queued, None
+            started = self._playing.owner is not self.current
+            if started:
+                self.current, self.next = self._playing.owner, None
+            self._queue_following()
+            if started:
+                self._on_track_start(self.current)
+        elif self._queued is None and not channel.get_busy():
+            self._playing = None
+            self.current = None
+            self._on_finished()
+            return
+        self._arm()
+
+    def position(self) -> float:
+        """
+        当前歌曲已播放的秒数.
+        """
+        if self._playing is None:
+            return 0.0
+        now = self._paused_at if self._paused_at is not None else time.monotonic()
+        rate = self._playing.track.rate
+        elapsed = min(max(0.0, now - self._started_at), self._playing.frames / rate)
+        return self._playing.offset / rate + elapsed
+
+    def pause(self):
+        if self._playing is None or self.paused:
+            return
+        self._get_channel().pause()
+        self._paused_at = time.monotonic()
+        self._arm()
+
+    def resume(self):
+        if not self.paused:
+            return
+        self._get_channel().unpause()
+        self._started_at += time.monotonic() - self._paused_at
+        self._paused_at = None
+        self._arm()
+
+    def stop(self, keep_next: bool = False):
+        """
+        停止播放，keep_next 为 False 时同时取消下一首.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._channel is not None and self._playing is not None:
+            self._channel.stop()
+        self._playing = self._queued = None
+        self._pending.clear()
+        self._paused_at = None
+        self.current = None
+        if not keep_next:
+            self.next = None
+
@@ -0,0 +1,162 @@
+"""
+音乐播放器共用的异步 HTTP 客户端.
+
+搜索、获取播放地址、歌词与音频下载共用一个 aiohttp 会话：连接池保持长连接（同一
+主机的后续请求省去 TCP/TLS 握手），每个主机同时使用的连接数受限；连接失败、超时、
+429 与 5xx 响应按带随机抖动的指数退避重试。音频下载只在收到响应头之前重试，响应
+体由下载线程通过 iter_content_threadsafe 逐块读取。
+"""
+
+import asyncio
+import json
+import random
+from typing import Any, Dict, Iterator, Optional
+
+import aiohttp
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 可重试的响应状态码
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+_RETRY_ERRORS = (
+    aiohttp.ClientConnectionError,
+    aiohttp.ClientPayloadError,
+    asyncio.TimeoutError,
+)
+
+
+class MusicHttpClient:
+    """
+    带连接池与重试的 HTTP 客户端，会话在第一次请求时于当前事件循环中创建.
+    """
+
+    def __init__(
+        self,
+        headers: Optional[Dict[str, str]] = None,
+        limit: int = 8,
+        limit_per_host: int = 4,
+        retries: int = 2,
+        backoff: float = 0.3,
+        max_backoff: float = 3.0,
+    ):
+        self.headers = dict(headers or {})
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector, headers=self.headers
+            )
+        return self._session
+
+    async def _get(
+        self,
+        url: str,
+        params: Optional[Dict[str, str]],
+        timeout: aiohttp.ClientTimeout,
+    ) -> aiohttp.ClientResponse:
+        response = await self._get_session().get(url, params=params, timeout=timeout)
+        if response.status >= 400:
+            response.release()
+            raise aiohttp.ClientResponseError(
+                response.request_info,
+                response.history,
+                status=response.status,
+                message=response.reason or "",
+                headers=response.headers,
+            )
+        return response
+
+    async def _retry(self, attempt):
+        """
+        执行 attempt()，可重试的错误按带抖动的指数退避重试.
+        """
+        for retry in range(self.retries + 1):
+            try:
+                return await attempt()
+            except aiohttp.ClientResponseError as e:
+                if e.status not in RETRY_STATUSES or retry == self.retries:
+                    raise
+                error = e
+            except _RETRY_ERRORS as e:
+                if retry == self.retries:
+                    raise
+                error = e
+            delay = random.uniform(0, min(self.max_backoff, self.backoff * 2**retry))
+            logger.debug(f"请求失败，{delay:.2f} 秒后重试: {error!r}")
+            await asyncio.sleep(delay)
+
+    async def get_text(
+        self,
+        url: str,
+        params: Optional[Dict[str, str]] = None,
+        timeout: float = 10.0,
+    ) -> str:
+        """
+        GET 请求并返回响应文本（按 UTF-8 解码）.
+        """
+        client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+        async def attempt():
+            async with await self._get(url, params, client_timeout) as response:
+                return await response.text(encoding="utf-8", errors="replace")
+
+        return await self._retry(attempt)
+
+    async def get_json(
+        self,
+        url: str,
+        params: Optional[Dict[str, str]] = None,
+        timeout: float = 10.0,
+    ) -> Any:
+        """
+        GET 请求并解析 JSON（不检查 Content-Type）.
+        """
+        return json.loads(await self.get_text(url, params, timeout))
+
+    async def open(self, url: str, timeout: float = 30.0) -> aiohttp.ClientResponse:
+        """
+        GET 请求，收到响应头后返回响应，由调用方读取响应体并关闭.
+
+        timeout 为建立连接与两次读取之间的最长等待时间，不限制总时长。
+        """
+        client_timeout = aiohttp.ClientTimeout(
+            total=None, sock_connect=timeout, sock_read=timeout
+        )
+        return await self._retry(lambda: self._get(url, None, client_timeout))
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+def iter_content_threadsafe(
+    response: aiohttp.ClientResponse,
+    loop: asyncio.AbstractEventLoop,
+    chunk_size: int = 64 * 1024,
+) -> Iterator[bytes]:
+    """
+    在其他线程中逐块读取事件循环中的响应体（网络读取仍在事件循环中进行）.
+    """
+    while True:
+        chunk = asyncio.run_coroutine_threadsafe(
+            response.content.read(chunk_size), loop
+        ).result()
+        if not chunk:
+            return
+        yield chunk
@@ -0,0 +1,515 @@
+"""
+本地音乐库索引.
+
+缓存目录中每首歌的标签信息（标题、歌手、专辑、时长）连同文件大小、修改时间保存
+在 SQLite 索引中，启动时直接加载索引。重新扫描只读取目录项与文件状态，只有新增或
+大小/修改时间变化的文件才用 mutagen 重新解析标签，已删除的文件从索引中移除。扫描
+在工作线程中执行；Linux 上监视缓存目录，文件变化后自动增量扫描。
+
+索引同时保存标题、歌手、专辑的拼音（见 search_index），搜索用的倒排索引在第一次
+搜索时由内存中的歌曲信息建立，此后随扫描结果增量更新。
+
+播放次数、最近播放时间与收藏标记单独保存在 usage 表中，文件被删除后仍然保留，供
+缓存淘汰（见 cache）使用。
+"""
+
+import asyncio
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.utils.logging_config import get_logger
+
+from .search_index import PYPINYIN_AVAILABLE, MusicSearchIndex, pinyin_fields
+from .watcher import DirectoryWatcher
+
+# 尝试导入音乐元数据库
+try:
+    from mutagen import File as MutagenFile
+    from mutagen.id3 import ID3NoHeaderError
+
+    MUTAGEN_AVAILABLE = True
+except ImportError:
+    MUTAGEN_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+MUSIC_EXTENSIONS = (".mp3", ".m4a", ".flac", ".wav", ".ogg")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    path TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    title TEXT,
+    artist TEXT,
+    album TEXT,
+    duration REAL,
+    pinyin TEXT
+)
+"""
+
+_USAGE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS usage (
+    path TEXT PRIMARY KEY,
+    play_count INTEGER NOT NULL DEFAULT 0,
+    last_played REAL,
+    pinned INTEGER NOT NULL DEFAULT 0
+)
+"""
+
+_UPSERT_USAGE = """
+INSERT INTO usage (path, play_count, last_played, pinned) VALUES (?, ?, ?, ?)
+ON CONFLICT(path) DO UPDATE SET
+    play_count = excluded.play_count, last_played = excluded.last_played,
+    pinned = excluded.pinned
+"""
+
+_UPSERT_TRACK = """
+INSERT INTO tracks (path, size, mtime_ns, title, artist, album, duration, pinyin)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(path) DO UPDATE SET
+    size = excluded.size, mtime_ns = excluded.mtime_ns, title = excluded.title,
+    artist = excluded.artist, album = excluded.album, duration = excluded.duration,
+    pinyin = excluded.pinyin
+"""
+
+
+class MusicMetadata:
+    """
+    音乐元数据类.
+    """
+
+    def __init__(self, file_path: Path, stat: Optional[os.stat_result] = None):
+        self.file_path = file_path
+        self.filename = file_path.name
+        self.file_id = file_path.stem  # 文件名去掉扩展名，即歌曲ID
+        stat = stat or file_path.stat()
+        self.file_size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+
+        # 从文件提取的元数据
+        self.title = None
+        self.artist = None
+        self.album = None
+        self.duration = None  # 秒数
+        # 标题、歌手、专辑的拼音（见 search_index.pinyin_fields），None 表示未计算
+        self.pinyin = None
+
+    @classmethod
+    def from_row(cls, directory: Path, row: sqlite3.Row) -> "MusicMetadata":
+        """
+        由索引中的记录构造，不访问文件.
+        """
+        metadata = cls.__new__(cls)
+        metadata.file_path = directory / row["path"]
+        metadata.filename = row["path"]
+        metadata.file_id = metadata.file_path.stem
+        metadata.file_size = row["size"]
+        metadata.mtime_ns = row["mtime_ns"]
+        metadata.title = row["title"]
+        metadata.artist = row["artist"]
+        metadata.album = row["album"]
+        metadata.duration = row["duration"]
+        metadata.pinyin = row["pinyin"]
+        return metadata
+
+    def extract_metadata(self) -> bool:
+        """
+        提取音乐文件元数据.
+        """
+        if not MUTAGEN_AVAILABLE:
+            return False
+
+        try:
+            audio_file = MutagenFile(self.file_path)
+            if audio_file is None:
+                return False
+
+            # 基本信息
+            if hasattr(audio_file, "info"):
+                self.duration = getattr(audio_file.info, "length", None)
+
+            # ID3标签信息
+            tags = audio_file.tags if audio_file.tags else {}
+
+            # 标题
+            self.title = self._get_tag_value(tags, ["TIT2", "TITLE", "\xa9nam"])
+
+            # 艺术家
+            self.artist = self._get_tag_value(tags, ["TPE1", "ARTIST", "\xa9ART"])
+
+            # 专辑
+            self.album = self._get_tag_value(tags, ["TALB", "ALBUM", "\xa9alb"])
+
+            return True
+
+        except ID3NoHeaderError:
+            # 没有ID3标签，不是错误
+            return True
+        except Exception as e:
+            logger.debug(f"提取元数据失败 {self.filename}: {e}")
+            return False
+
+    def _get_tag_value(self, tags: dict, tag_names: List[str]) -> Optional[str]:
+        """
+        从多个可能的标签名中获取值.
+        """
+        for tag_name in tag_names:
+            if tag_name in tags:
+                value = tags[tag_name]
+                if isinstance(value, list) and value:
+                    return str(value[0])
+                elif value:
+                    return str(value)
+        return None
+
+    def format_duration(self) -> str:
+        """
+        格式化播放时长.
+        """
+        if self.duration is None:
+            return "未知"
+
+        minutes = int(self.duration) // 60
+        seconds = int(self.duration) % 60
+        return f"{minutes:02d}:{seconds:02d}"
+
+    def _index_row(self) -> tuple:
+        return (
+            self.filename,
+            self.file_size,
+            self.mtime_ns,
+            self.title,
+            self.artist,
+            self.album,
+            self.duration,
+            self.pinyin,
+        )
+
+
+class TrackUsage:
+    """
+    歌曲的使用统计.
+    """
+
+    __slots__ = ("play_count", "last_played", "pinned")
+
+    def __init__(
+        self,
+        play_count: int = 0,
+        last_played: Optional[float] = None,
+        pinned: bool = False,
+    ):
+        self.play_count = play_count
+        self.last_played = last_played  # 时间戳，未播放过为 None
+        self.pinned = pinned  # 收藏的歌曲不会被缓存淘汰
+
+    def _index_row(self, name: str) -> tuple:
+        return (name, self.play_count, self.last_played, int(self.pinned))
+
+
+class MusicLibrary:
+    """
+    持久化的本地音乐索引，增量扫描缓存目录.
+    """
+
+    def __init__(self, music_dir: Path, index_file: Optional[Path] = None):
+        self.music_dir = Path(music_dir)
+        self.index_file = Path(index_file or self.music_dir / "library.db")
+        self._tracks: Dict[str, MusicMetadata] = {}  # 文件名 -> 元数据
+        self._sorted: Optional[List[MusicMetadata]] = None
+        self._usage: Dict[str, TrackUsage] = {}  # 文件名 -> 使用统计
+        self._lock = threading.RLock()
+        # 同一时间只执行一次扫描
+        self._scan_lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._watcher: Optional[DirectoryWatcher] = None
+        # 搜索索引，第一次搜索时建立
+        self._search_index: Optional[MusicSearchIndex] = None
+        self.last_scan = 0.0
+        atexit.register(self.close)
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                str(self.index_file), timeout=5.0, check_same_thread=False
+            )
+            self._conn.row_factory = sqlite3.Row
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(_SCHEMA)
+            self._conn.execute(_USAGE_SCHEMA)
+            columns = {
+                row[1] for row in self._conn.execute("PRAGMA table_info(tracks)")
+            }
+            if "pinyin" not in columns:
+                # 旧版本的索引没有拼音列，拼音在下次扫描时补齐
+                self._conn.execute("ALTER TABLE tracks ADD COLUMN pinyin TEXT")
+        return self._conn
+
+    def load(self) -> int:
+        """
+        从索引加载歌曲信息（不访问音乐文件），返回歌曲数.
+        """
+        with self._lock:
+            try:
+                conn = self._connection()
+                rows = conn.execute("SELECT * FROM tracks").fetchall()
+                usage_rows = conn.execute("SELECT * FROM usage").fetchall()
+            except sqlite3.Error as e:
+                logger.warning(f"读取音乐索引失败，将重新扫描: {e}")
+                rows = usage_rows = []
+            self._tracks = {
+                row["path"]: MusicMetadata.from_row(self.music_dir, row) for row in rows
+            }
+            self._usage = {
+                row["path"]: TrackUsage(
+                    row["play_count"], row["last_played"], bool(row["pinned"])
+                )
+                for row in usage_rows
+            }
+            self._sorted = None
+            self._search_index = None
+        logger.info(f"已加载音乐索引，共 {len(rows)} 首")
+        return len(rows)
+
+    def tracks(self) -> List[MusicMetadata]:
+        """
+        全部歌曲，按艺术家和标题排序.
+        """
+        with self._lock:
+            if self._sorted is None:
+                self._sorted = sorted(
+                    self._tracks.values(),
+                    key=lambda x: (x.artist or "Unknown", x.title or x.filename),
+                )
+            return self._sorted
+
+    def get(self, file_id: str) -> Optional[MusicMetadata]:
+        """
+        按歌曲ID（文件名去掉扩展名）查找.
+        """
+        with self._lock:
+            for ext in MUSIC_EXTENSIONS:
+                metadata = self._tracks.get(f"{file_id}{ext}")
+                if metadata is not None:
+                    return metadata
+        return None
+
+    def needs_scan(self, max_age: float) -> bool:
+        """
+        是否需要扫描：从未扫描过，或未监视目录且距上次扫描超过 max_age 秒.
+        """
+        if self.last_scan == 0:
+            return True
+        return not self.watching and time.time() - self.last_scan >= max_age
+
+    def scan(self) -> Dict[str, int]:
+        """
+        增量扫描缓存目录，只解析新增或变化的文件，返回各类文件数.
+        """
+        with self._scan_lock:
+            return self._scan()
+
+    def _scan(self) -> Dict[str, int]:
+        stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+        if not self.music_dir.exists():
+            logger.warning(f"缓存目录不存在: {self.music_dir}")
+            return stats
+
+        with self._lock:
+            known = dict(self._tracks)
+        seen = set()
+        changed: List[MusicMetadata] = []
+        with os.scandir(self.music_dir) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith(MUSIC_EXTENSIONS):
+                    continue
+                try:
+                    if not entry.is_file():
+                        continue
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                seen.add(entry.name)
+                old = known.get(entry.name)
+                if (
+                    old is not None
+                    and old.file_size == stat.st_size
+                    and old.mtime_ns == stat.st_mtime_ns
+                ):
+                    stats["unchanged"] += 1
+                    if old.pinyin is None and PYPINYIN_AVAILABLE:
+                        changed.append(self._with_pinyin(old))
+                    continue
+                changed.append(self._read_file(Path(entry.path), stat))
+                stats["updated" if old is not None else "added"] += 1
+
+        removed = [name for name in known if name not in seen]
+        stats["removed"] = len(removed)
+        self._store(changed, removed)
+        self.last_scan = time.time()
+        logger.info(
+            f"音乐库扫描完成: 新增 {stats['added']}，更新 {stats['updated']}，"
+            f"删除 {stats['removed']}，未变化 {stats['unchanged']}"
+        )
+        return stats
+
+    def _read_file(self, file_path: Path, stat: os.stat_result) -> MusicMetadata:
+        metadata = MusicMetadata(file_path, stat)
+        if MUTAGEN_AVAILABLE:
+            metadata.extract_metadata()
+        metadata.pinyin = pinyin_fields(metadata.title, metadata.artist, metadata.album)
+        return metadata
+
+    @staticmethod
+    def _with_pinyin(old: MusicMetadata) -> MusicMetadata:
+        # 复制一份再补拼音，其他线程可能正在读取旧的元数据
+        metadata = MusicMetadata.__new__(MusicMetadata)
+        metadata.__dict__.update(old.__dict__)
+        metadata.pinyin = pinyin_fields(old.title, old.artist, old.album)
+        return metadata
+
+    def remove(self, names: List[str]):
+        """
+        从索引中移除文件（文件已被删除），保留使用统计.
+        """
+        self._store([], names)
+
+    def update_file(self, file_path: Path) -> Optional[MusicMetadata]:
+        """
+        （重新）索引单个文件，如刚下载完成的歌曲；文件不存在时从索引中移除.
+        """
+        file_path = Path(file_path)
+        try:
+            metadata = self._read_file(file_path, file_path.stat())
+        except OSError:
+            self._store([], [file_path.name])
+            return None
+        self._store([metadata], [])
+        return metadata
+
+    def _store(self, changed: List[MusicMetadata], removed: List[str]):
+        if not changed and not removed:
+            return
+        with self._lock:
+            conn = self._connection()
+            try:
+                conn.executemany(_UPSERT_TRACK, [m._index_row() for m in changed])
+                conn.executemany(
+                    "DELETE FROM tracks WHERE path = ?", [(name,) for name in removed]
+                )
+                conn.commit()
+            except sqlite3.Error as e:
+                conn.rollback()
+                logger.error(f"写入音乐索引失败: {e}")
+            for metadata in changed:
+                self._tracks[metadata.filename] = metadata
+            for name in removed:
+                self._tracks.pop(name, None)
+            self._sorted = None
+            if self._search_index is not None:
+                self._search_index.update(changed, removed)
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[MusicMetadata]:
+        """
+        模糊搜索标题、歌手、专辑与歌曲ID（支持拼音与首字母），按相关度排序.
+        """
+        with self._lock:
+            if self._search_index is None:
+                self._search_index = MusicSearchIndex()
+                self._search_index.rebuild(self._tracks.values())
+            return self._search_index.search(query, limit)
+
+    def usage(self, name: str) -> TrackUsage:
+        """
+        文件的使用统计（副本），没有记录时全为默认值.
+        """
+        with self._lock:
+            usage = self._usage.get(name)
+            if usage is None:
+                return TrackUsage()
+            return TrackUsage(usage.play_count, usage.last_played, usage.pinned)
+
+    def record_play(self, name: str, when: Optional[float] = None):
+        """
+        记录一次播放（文件可能仍在下载）.
+        """
+        with self._lock:
+            usage = self._usage.setdefault(name, TrackUsage())
+            usage.play_count += 1
+            usage.last_played = time.time() if when is None else when
+            self._store_usage(name, usage)
+
+    def set_pinned(self, name: str, pinned: bool = True):
+        """
+        收藏或取消收藏，收藏的歌曲不会被缓存淘汰.
+        """
+        with self._lock:
+            usage = self._usage.setdefault(name, TrackUsage())
+            usage.pinned = pinned
+            self._store_usage(name, usage)
+
+    def _store_usage(self, name: str, usage: TrackUsage):
+        conn = self._connection()
+        try:
+            conn.execute(_UPSERT_USAGE, usage._index_row(name))
+            conn.commit()
+        except sqlite3.Error as e:
+            conn.rollback()
+            logger.error(f"写入播放统计失败: {e}")
+
+    async def refresh(self) -> Dict[str, int]:
+        """
+        在工作线程中增量扫描.
+        """
+        return await asyncio.to_thread(self.scan)
+
+    @property
+    def watching(self) -> bool:
+        return self._watcher is not None
+
+    def start_watching(self) -> bool:
+        """
+        监视缓存目录，文件变化后自动增量扫描；平台不支持时返回 False.
+        """
+        if self._watcher is not None:
+            return True
+        watcher = DirectoryWatcher(self.music_dir, MUSIC_EXTENSIONS, self.scan)
+        if not watcher.start():
+            return False
+        self._watcher = watcher
+        return True
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        索引状态.
+        """
+        with self._lock:
+            size = sum(m.file_size for m in self._tracks.values())
+            pinned = sum(1 for usage in self._usage.values() if usage.pinned)
+        return {
+            "tracks": len(self._tracks),
+            "bytes": size,
+            "pinned": pinned,
+            "index_file": str(self.index_file),
+            "watching": self.watching,
+            "last_scan": self.last_scan,
+        }
+
+    def close(self):
+        """
+        停止监视并关闭索引.
+        """
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
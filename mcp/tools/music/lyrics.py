@@ -0,0 +1,142 @@
+"""
+LRC 歌词解析.
+
+歌词解析一次，得到按时间排序的两个并列数组（时间戳与文本），按播放位置用二分查找
+当前行，并给出下一次换行的时间，播放器据此只在换行时刻更新显示。支持一行多个时间
+标签（[00:12.00][01:30.50]副歌）、毫秒精度（[00:12.345]）与 [offset:±毫秒] 标签。
+解析结果以 JSON 保存在磁盘缓存中。
+"""
+
+import bisect
+import json
+import os
+import re
+from array import array
+from pathlib import Path
+from typing import Iterator, List, Optional, Tuple
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 时间标签 [mm:ss]、[mm:ss.xx]、[mm:ss.xxx]（也有用冒号分隔小数部分的）
+_TIME_TAG = re.compile(r"\[(\d+):(\d{1,2})(?:[.:](\d{1,3}))?\]")
+_OFFSET_TAG = re.compile(r"\[offset:\s*([+-]?\d+)\s*\]", re.IGNORECASE)
+
+# 作词、作曲等制作信息与写在时间标签之后的元信息不作为歌词显示
+_SKIP_PREFIXES = ("作词", "作曲", "编曲", "ti:", "ar:", "al:", "by:", "offset:")
+
+# 歌词比时间标签晚显示的秒数（补偿音频输出延迟）
+LYRIC_DELAY = 0.5
+
+_CACHE_VERSION = 1
+
+
+class Lyrics:
+    """
+    解析后的歌词：times 与 texts 按时间排序、一一对应.
+    """
+
+    __slots__ = ("times", "texts")
+
+    def __init__(self, times: Optional[array] = None, texts: Optional[list] = None):
+        self.times = times if times is not None else array("d")
+        self.texts: List[str] = texts if texts is not None else []
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def __iter__(self) -> Iterator[Tuple[float, str]]:
+        return zip(self.times, self.texts)
+
+    def index_at(self, position: float) -> int:
+        """
+        播放到 position 秒时应显示的行；第一行之前显示第一行.
+        """
+        return max(0, bisect.bisect_right(self.times, position - LYRIC_DELAY) - 1)
+
+    def next_change(self, index: int) -> Optional[float]:
+        """
+        显示第 index 行之后，下一次换行的播放位置（秒），已是最后一行时为 None.
+        """
+        if index + 1 < len(self.times):
+            return self.times[index + 1] + LYRIC_DELAY
+        return None
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {"version": _CACHE_VERSION, "times": list(self.times), "texts": self.texts},
+            ensure_ascii=False,
+        )
+
+    @classmethod
+    def from_json(cls, text: str) -> Optional["Lyrics"]:
+        data = json.loads(text)
+        if data.get("version") != _CACHE_VERSION:
+            return None
+        return cls(array("d", data["times"]), list(data["texts"]))
+
+
+def parse_lrc(content: str) -> Lyrics:
+    """
+    解析 LRC 歌词，跳过空行、元信息与制作信息.
+    """
+    offset = 0.0
+    match = _OFFSET_TAG.search(content)
+    if match:
+        # 正值表示歌词提前显示
+        offset = int(match.group(1)) / 1000.0
+
+    entries = []
+    for line in content.splitlines():
+        position = 0
+        stamps = []
+        while True:
+            match = _TIME_TAG.match(line, position)
+            if match is None:
+                break
+            minutes, seconds, fraction = match.groups()
+            stamp = int(minutes) * 60 + int(seconds)
+            if fraction:
+                # .x 为十分之一秒，.xx 为百分之一秒，.xxx 为毫秒
+                stamp += int(fraction) / 10 ** len(fraction)
+            stamps.append(stamp)
+            position = match.end()
+        if not stamps:
+            continue
+        text = line[position:].strip()
+        if not text or text.startswith(_SKIP_PREFIXES):
+            continue
+        for stamp in stamps:
+            entries.append((max(0.0, stamp - offset), text))
+
+    # 多时间标签的行会打乱顺序；同一时刻保持原顺序
+    entries.sort(key=lambda entry: entry[0])
+    return Lyrics(array("d", (t for t, _ in entries)), [text for _, text in entries])
+
+
+def load_lyrics(path: Path) -> Optional[Lyrics]:
+    """
+    从磁盘缓存读取解析好的歌词，不存在或无法读取时返回 None.
+    """
+    try:
+        return Lyrics.from_json(Path(path).read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, KeyError, AttributeError) as e:
+        logger.debug(f"读取歌词缓存失败 {path}: {e}")
+        return None
+
+
+def save_lyrics(path: Path, lyrics: Lyrics):
+    """
+    写入磁盘缓存（先写临时文件再替换，不会留下不完整的文件）.
+    """
+    path = Path(path)
+    temp_path = path.with_name(path.name + ".tmp")
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path.write_text(lyrics.to_json(), encoding="utf-8")
+        os.replace(temp_path, path)
+    except OSError as e:
+        logger.warning(f"写入歌词缓存失败 {path}: {e}")
@@ -5,10 +5,9 @@
 
 from typing import Any, Dict
 
+from src.mcp.lazy_loader import load_module_async
 from src.utils.logging_config import get_logger
 
-from .music_player import get_music_player_instance
-
 logger = get_logger(__name__)
 
 
@@ -32,9 +31,6 @@ class MusicToolsManager:
         try:
             logger.info("[MusicManager] 开始注册音乐工具")
 
-            # 获取音乐播放器单例实例
-            self._music_player = get_music_player_instance()
-
             # 注册搜索并播放工具
             self._register_search_and_play_tool(
                 add_tool, PropertyList, Property, PropertyType
@@ -60,6 +56,12 @@ class MusicToolsManager:
                 add_tool, PropertyList, Property, PropertyType
             )
 
+            # 注册播放队列工具（加入队列、上一首/下一首、随机、查看队列）
+            self._register_queue_tools(add_tool, PropertyList, Property, PropertyType)
+
+            # 注册收藏工具
+            self._register_pin_tool(add_tool, PropertyList, Property, PropertyType)
+
             self._initialized = True
             logger.info("[MusicManager] 音乐工具注册完成")
 
@@ -76,7 +78,8 @@ class MusicToolsManager:
 
         async def search_and_play_wrapper(args: Dict[str, Any]) -> str:
             song_name = args.get("song_name", "")
-            result = await self._music_player.search_and_play(song_name)
+            player = await self._get_music_player()
+            result = await player.search_and_play(song_name)
             return result.get("message", "搜索播放完成")
 
         search_props = PropertyList([Property("song_name", PropertyType.STRING)])
@@ -99,7 +102,8 @@ class MusicToolsManager:
         """
 
         async def play_pause_wrapper(args: Dict[str, Any]) -> str:
-            result = await self._music_player.play_pause()
+            player = await self._get_music_player()
+            result = await player.play_pause()
             return result.get("message", "播放状态切换完成")
 
         add_tool(
@@ -120,7 +124,8 @@ class MusicToolsManager:
         """
 
         async def stop_wrapper(args: Dict[str, Any]) -> str:
-            result = await self._music_player.stop()
+            player = await self._get_music_player()
+            result = await player.stop()
             return result.get("message", "停止播放完成")
 
         add_tool(
@@ -142,7 +147,8 @@ class MusicToolsManager:
 
         async def seek_wrapper(args: Dict[str, Any]) -> str:
             position = args.get("position", 0)
-            result = await self._music_player.seek(float(position))
+            player = await self._get_music_player()
+            result = await player.seek(float(position))
             return result.get("message", "跳转完成")
 
         seek_props = PropertyList(
@@ -167,7 +173,8 @@ class MusicToolsManager:
         """
 
         async def get_lyrics_wrapper(args: Dict[str, Any]) -> str:
-            result = await self._music_player.get_lyrics()
+            player = await self._get_music_player()
+            result = await player.get_lyrics()
             if result.get("status") == "success":
                 lyrics = result.get("lyrics", [])
                 return "歌词内容:\n" + "\n".join(lyrics)
@@ -192,7 +199,8 @@ class MusicToolsManager:
         """
 
         async def get_status_wrapper(args: Dict[str, Any]) -> str:
-            result = await self._music_player.get_status()
+            player = await self._get_music_player()
+            result = await player.get_status()
             if result.get("status") == "success":
                 status_info = []
                 status_info.append(f"当前歌曲: {result.get('current_song', '无')}")
@@ -240,7 +248,8 @@ class MusicToolsManager:
 
         async def get_local_playlist_wrapper(args: Dict[str, Any]) -> str:
             force_refresh = args.get("force_refresh", False)
-            result = await self._music_player.get_local_playlist(force_refresh)
+            player = await self._get_music_player()
+            result = await player.get_local_playlist(force_refresh)
 
             if result.get("status") == "success":
                 playlist = result.get("playlist", [])
@@ -273,6 +282,124 @@ class MusicToolsManager:
         )
         logger.debug("[MusicManager] 注册获取本地歌单工具成功")
 
+    def _register_queue_tools(self, add_tool, PropertyList, Property, PropertyType):
+        """
+        注册播放队列工具.
+        """
+
+        async def enqueue_wrapper(args: Dict[str, Any]) -> str:
+            song_name = args.get("song_name", "")
+            player = await self._get_music_player()
+            result = await player.enqueue(song_name)
+            return result.get("message", "已加入播放队列")
+
+        async def next_wrapper(args: Dict[str, Any]) -> str:
+            player = await self._get_music_player()
+            result = await player.next()
+            return result.get("message", "已切换到下一首")
+
+        async def previous_wrapper(args: Dict[str, Any]) -> str:
+            player = await self._get_music_player()
+            result = await player.previous()
+            return result.get("message", "已切换到上一首")
+
+        async def shuffle_wrapper(args: Dict[str, Any]) -> str:
+            player = await self._get_music_player()
+            result = await player.shuffle()
+            return result.get("message", "已打乱播放队列")
+
+        async def get_queue_wrapper(args: Dict[str, Any]) -> str:
+            player = await self._get_music_player()
+            result = await player.get_queue()
+            lines = [f"当前歌曲: {result.get('current') or '无'}"]
+            upcoming = result.get("upcoming", [])
+            if upcoming:
+                lines.append(f"接下来播放 (共{len(upcoming)}首):")
+                lines.extend(f"{i}. {song}" for i, song in enumerate(upcoming, 1))
+            else:
+                lines.append("播放队列为空")
+            return "\n".join(lines)
+
+        add_tool(
+            (
+                "music_player.enqueue",
+                "Add a song to the play queue by name. It will be played after the "
+                "songs already queued; if nothing is playing it starts immediately. "
+                "Use this when the user wants to play a song next or later.",
+                PropertyList([Property("song_name", PropertyType.STRING)]),
+                enqueue_wrapper,
+            )
+        )
+        add_tool(
+            (
+                "music_player.next",
+                "Skip to the next song in the play queue.",
+                PropertyList(),
+                next_wrapper,
+            )
+        )
+        add_tool(
+            (
+                "music_player.previous",
+                "Go back to the previous song in the play queue.",
+                PropertyList(),
+                previous_wrapper,
+            )
+        )
+        add_tool(
+            (
+                "music_player.shuffle",
+                "Shuffle the songs waiting in the play queue.",
+                PropertyList(),
+                shuffle_wrapper,
+            )
+        )
+        add_tool(
+            (
+                "music_player.get_queue",
+                "Get the current song and the songs waiting in the play queue.",
+                PropertyList(),
+                get_queue_wrapper,
+            )
+        )
+        logger.debug("[MusicManager] 注册播放队列工具成功")
+
+    def _register_pin_tool(self, add_tool, PropertyList, Property, PropertyType):
+        """
+        注册收藏工具.
+        """
+
+        async def pin_wrapper(args: Dict[str, Any]) -> str:
+            pinned = args.get("pinned", True)
+            player = await self._get_music_player()
+            result = await player.pin_current(bool(pinned))
+            return result.get("message", "收藏操作完成")
+
+        pin_props = PropertyList(
+            [Property("pinned", PropertyType.BOOLEAN, default_value=True)]
+        )
+
+        add_tool(
+            (
+                "music_player.pin",
+                "Mark the current song as a favourite (pinned=true) so it is never "
+                "removed from the local cache, or unmark it (pinned=false). Use this "
+                "when the user says they like the song or wants to keep it.",
+                pin_props,
+                pin_wrapper,
+            )
+        )
+        logger.debug("[MusicManager] 注册收藏工具成功")
+
+    async def _get_music_player(self):
+        """
+        获取音乐播放器实例，首次调用时才导入播放器模块（pygame 等）.
+        """
+        if self._music_player is None:
+            module = await load_module_async(f"{__package__}.music_player")
+            self._music_player = module.get_music_player_instance()
+        return self._music_player
+
     def _format_time(self, seconds: float) -> str:
         """
         将秒数格式化为 mm:ss 格式.
@@ -293,7 +420,7 @@ class MusicToolsManager:
         """
         return {
             "initialized": self._initialized,
-            "tools_count": 7,  # 当前注册的工具数量
+            "tools_count": 13,  # 当前注册的工具数量
             "available_tools": [
                 "search_and_play",
                 "play_pause",
@@ -302,6 +429,12 @@ class MusicToolsManager:
                 "get_lyrics",
                 "get_status",
                 "get_local_playlist",
+                "enqueue",
+                "next",
+                "previous",
+                "shuffle",
+                "get_queue",
+                "pin",
             ],
             "music_player_ready": self._music_player is not None,
         }
@@ -4,108 +4,30 @@
 """
 
 import asyncio
-import shutil
 import tempfile
 import time
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Union
 
 import pygame
-import requests
 
 from src.constants.constants import AudioConfig
 from src.utils.logging_config import get_logger
 from src.utils.resource_finder import get_user_cache_dir
 
-# 尝试导入音乐元数据库
-try:
-    from mutagen import File as MutagenFile
-    from mutagen.id3 import ID3NoHeaderError
-
-    MUTAGEN_AVAILABLE = True
-except ImportError:
-    MUTAGEN_AVAILABLE = False
+from .cache import MusicCache
+from .gapless import DecodedTrack, GaplessPlayback, decode_track
+from .http_client import MusicHttpClient, iter_content_threadsafe
+from .library import MusicLibrary, MusicMetadata
+from .lyrics import Lyrics, load_lyrics, parse_lrc, save_lyrics
+from .play_queue import PlayQueue, QueueItem
+from .streaming import ProgressiveDownload, ProgressiveReader
+from .ttl_cache import TTLCache
 
 logger = get_logger(__name__)
 
-
-class MusicMetadata:
-    """
-    音乐元数据类.
-    """
-
-    def __init__(self, file_path: Path):
-        self.file_path = file_path
-        self.filename = file_path.name
-        self.file_id = file_path.stem  # 文件名去掉扩展名，即歌曲ID
-        self.file_size = file_path.stat().st_size
-
-        # 从文件提取的元数据
-        self.title = None
-        self.artist = None
-        self.album = None
-        self.duration = None  # 秒数
-
-    def extract_metadata(self) -> bool:
-        """
-        提取音乐文件元数据.
-        """
-        if not MUTAGEN_AVAILABLE:
-            return False
-
-        try:
-            audio_file = MutagenFile(self.file_path)
-            if audio_file is None:
-                return False
-
-            # 基本信息
-            if hasattr(audio_file, "info"):
-                self.duration = getattr(audio_file.info, "length", None)
-
-            # ID3标签信息
-            tags = audio_file.tags if audio_file.tags else {}
-
-            # 标题
-            self.title = self._get_tag_value(tags, ["TIT2", "TITLE", "\xa9nam"])
-
-            # 艺术家
-            self.artist = self._get_tag_value(tags, ["TPE1", "ARTIST", "\xa9ART"])
-
-            # 专辑
-            self.album = self._get_tag_value(tags, ["TALB", "ALBUM", "\xa9alb"])
-
-            return True
-
-        except ID3NoHeaderError:
-            # 没有ID3标签，不是错误
-            return True
-        except Exception as e:
-            logger.debug(f"提取元数据失败 {self.filename}: {e}")
-            return False
-
-    def _get_tag_value(self, tags: dict, tag_names: List[str]) -> Optional[str]:
-        """
-        从多个可能的标签名中获取值.
-        """
-        for tag_name in tag_names:
-            if tag_name in tags:
-                value = tags[tag_name]
-                if isinstance(value, list) and value:
-                    return str(value[0])
-                elif value:
-                    return str(value)
-        return None
-
-    def format_duration(self) -> str:
-        """
-        格式化播放时长.
-        """
-        if self.duration is None:
-            return "未知"
-
-        minutes = int(self.duration) // 60
-        seconds = int(self.duration) % 60
-        return f"{minutes:02d}:{seconds:02d}"
+# pygame.mixer.music 播放时检查是否已播放结束的间隔（秒）
+MUSIC_END_POLL_INTERVAL = 0.1
 
 
 class MusicPlayer:
@@ -129,14 +51,33 @@ class MusicPlayer:
         self.start_play_time = 0
 
         # 歌词相关
-        self.lyrics = []  # 歌词列表，格式为 [(时间, 文本), ...]
+        self.lyrics = Lyrics()
         self.current_lyric_index = -1  # 当前歌词索引
+        # 下一次换行时触发的定时器
+        self._lyrics_timer: Optional[asyncio.TimerHandle] = None
+        # pygame.mixer.music 播放时检查是否已播放结束的定时器
+        self._music_timer: Optional[asyncio.TimerHandle] = None
+        self._lyrics_fetch_task: Optional[asyncio.Task] = None
+        self._finish_task: Optional[asyncio.Task] = None
+
+        # 边下载边播放：进行中的下载（缓存路径 -> 下载，含预取）与交给解码器的文件对象
+        self._downloads: Dict[Path, ProgressiveDownload] = {}
+        self._stream: Optional[ProgressiveReader] = None
+
+        # 播放队列与预取
+        self.queue = PlayQueue()
+        self._current_file = ""  # 当前歌曲的缓存文件名
+        self._prefetch_tasks: Dict[QueueItem, asyncio.Task] = {}
+        self._prefetch_slots: Optional[asyncio.Semaphore] = None
+        self._advance_task: Optional[asyncio.Task] = None
 
         # 缓存目录设置 - 使用用户缓存目录确保可写
         user_cache_dir = get_user_cache_dir()
         self.cache_dir = user_cache_dir / "music"
         self.temp_cache_dir = self.cache_dir / "temp"
         self._init_cache_dirs()
+        # 解析好的歌词（按歌曲ID保存为 JSON）
+        self.lyrics_cache_dir = self.cache_dir / "lyrics"
 
         # API配置
         self.config = {
@@ -150,8 +91,43 @@ class MusicPlayer:
                 "Accept": "*/*",
                 "Connection": "keep-alive",
             },
+            # 开头部分下载完即开始播放，其余部分在后台继续下载
+            "STREAM_PLAYBACK": True,
+            # 缓存目录大小上限（MB，0 为不限制）与淘汰策略（lru / lfu）
+            "CACHE_MAX_MB": 1024,
+            "CACHE_POLICY": "lru",
+            # 预取队列中接下来的几首，以及同时进行的预取下载数
+            "PREFETCH_COUNT": 2,
+            "PREFETCH_WORKERS": 2,
+            # 每个主机同时使用的连接数，搜索结果与歌词的缓存有效期（秒）
+            "HTTP_LIMIT_PER_HOST": 4,
+            "SEARCH_CACHE_TTL": 1800,
+            "LYRICS_CACHE_TTL": 86400,
+            # 预解码队列中的下一首，与当前歌曲无缝衔接；交叉淡化的秒数（0 为不淡化，
+            # 需要 NumPy）
+            "GAPLESS_PLAYBACK": True,
+            "CROSSFADE_SECONDS": 0.0,
         }
 
+        # 解码好的歌曲在一个 mixer 声道上连续播放，下一首在后台预解码
+        self.gapless = GaplessPlayback(
+            self._on_gapless_track_start,
+            self._on_gapless_finished,
+            crossfade=self.config["CROSSFADE_SECONDS"],
+        )
+        self._decoded: Dict[str, DecodedTrack] = {}  # 当前与下一首，按缓存文件名
+        self._decode_item: Optional[QueueItem] = None
+        self._decode_task: Optional[asyncio.Task] = None
+        # 当前歌曲从 pygame.mixer.music 转到无缝播放声道的任务
+        self._adopt_task: Optional[asyncio.Task] = None
+
+        # 共用的 HTTP 连接池；再次点播同一首歌时直接使用缓存的搜索结果与歌词
+        self.http = MusicHttpClient(
+            self.config["HEADERS"], limit_per_host=self.config["HTTP_LIMIT_PER_HOST"]
+        )
+        self._search_cache = TTLCache(256, self.config["SEARCH_CACHE_TTL"])
+        self._lyrics_cache = TTLCache(128, self.config["LYRICS_CACHE_TTL"])
+
         # 清理临时缓存
         self._clean_temp_cache()
 
@@ -159,9 +135,17 @@ class MusicPlayer:
         self.app = None
         self._initialize_app_reference()
 
-        # 本地歌单缓存
-        self._local_playlist = None
-        self._last_scan_time = 0
+        # 本地歌单索引：启动时只加载索引，目录由后台监视或按需增量扫描
+        self.library = MusicLibrary(self.cache_dir)
+        self.library.load()
+        self.library.start_watching()
+
+        # 缓存超出预算时按播放统计淘汰，收藏与队列中的歌曲不淘汰
+        self.cache = MusicCache(
+            self.library,
+            self.config["CACHE_MAX_MB"] * 1024 * 1024,
+            self.config["CACHE_POLICY"],
+        )
 
         logger.info("音乐播放器单例初始化完成")
 
@@ -220,6 +204,7 @@ class MusicPlayer:
             # 回退到系统临时目录
             self.cache_dir = Path(tempfile.gettempdir()) / "xiaozhi_music_cache"
             self.temp_cache_dir = self.cache_dir / "temp"
+            self.lyrics_cache_dir = self.cache_dir / "lyrics"
             self.cache_dir.mkdir(parents=True, exist_ok=True)
             self.temp_cache_dir.mkdir(parents=True, exist_ok=True)
 
@@ -241,63 +226,22 @@ class MusicPlayer:
         except Exception as e:
             logger.error(f"清理临时缓存目录失败: {e}")
 
-    def _scan_local_music(self, force_refresh: bool = False) -> List[MusicMetadata]:
+    async def _scan_local_music(
+        self, force_refresh: bool = False
+    ) -> List[MusicMetadata]:
         """
-        扫描本地音乐缓存，返回歌单.
+        获取本地歌单，强制刷新或索引可能过期（未监视目录时为5分钟）时增量扫描.
         """
-        current_time = time.time()
-
-        # 如果不强制刷新且缓存未过期（5分钟），直接返回缓存
-        if (
-            not force_refresh
-            and self._local_playlist is not None
-            and (current_time - self._last_scan_time) < 300
-        ):
-            return self._local_playlist
-
-        playlist = []
-
-        if not self.cache_dir.exists():
-            logger.warning(f"缓存目录不存在: {self.cache_dir}")
-            return playlist
-
-        # 查找所有音乐文件
-        music_files = []
-        for pattern in ["*.mp3", "*.m4a", "*.flac", "*.wav", "*.ogg"]:
-            music_files.extend(self.cache_dir.glob(pattern))
-
-        logger.debug(f"找到 {len(music_files)} 个音乐文件")
-
-        # 扫描每个文件
-        for file_path in music_files:
-            try:
-                metadata = MusicMetadata(file_path)
-
-                # 尝试提取元数据
-                if MUTAGEN_AVAILABLE:
-                    metadata.extract_metadata()
-
-                playlist.append(metadata)
-
-            except Exception as e:
-                logger.debug(f"处理音乐文件失败 {file_path.name}: {e}")
-
-        # 按艺术家和标题排序
-        playlist.sort(key=lambda x: (x.artist or "Unknown", x.title or x.filename))
-
-        # 更新缓存
-        self._local_playlist = playlist
-        self._last_scan_time = current_time
-
-        logger.info(f"扫描完成，找到 {len(playlist)} 首本地音乐")
-        return playlist
+        if force_refresh or self.library.needs_scan(300):
+            await self.library.refresh()
+        return self.library.tracks()
 
     async def get_local_playlist(self, force_refresh: bool = False) -> dict:
         """
         获取本地音乐歌单.
         """
         try:
-            playlist = self._scan_local_music(force_refresh)
+            playlist = await self._scan_local_music(force_refresh)
 
             if not playlist:
                 return {
@@ -336,7 +280,7 @@ class MusicPlayer:
         搜索本地音乐.
         """
         try:
-            playlist = self._scan_local_music()
+            playlist = await self._scan_local_music()
 
             if not playlist:
                 return {
@@ -346,34 +290,19 @@ class MusicPlayer:
                     "found_count": 0,
                 }
 
-            query = query.lower()
+            # 倒排索引模糊搜索（支持错别字、拼音与首字母），按相关度排序
             results = []
-
-            for metadata in playlist:
-                # 在标题、艺术家、文件名中搜索
-                searchable_text = " ".join(
-                    filter(
-                        None,
-                        [
-                            metadata.title,
-                            metadata.artist,
-                            metadata.album,
-                            metadata.filename,
-                        ],
-                    )
-                ).lower()
-
-                if query in searchable_text:
-                    title = metadata.title or "未知标题"
-                    artist = metadata.artist or "未知艺术家"
-                    song_info = f"{title} - {artist}"
-                    results.append(
-                        {
-                            "song_info": song_info,
-                            "file_id": metadata.file_id,
-                            "duration": metadata.format_duration(),
-                        }
-                    )
+            for metadata in self.library.search(query):
+                title = metadata.title or "未知标题"
+                artist = metadata.artist or "未知艺术家"
+                song_info = f"{title} - {artist}"
+                results.append(
+                    {
+                        "song_info": song_info,
+                        "file_id": metadata.file_id,
+                        "duration": metadata.format_duration(),
+                    }
+                )
 
             return {
                 "status": "success",
@@ -396,27 +325,35 @@ class MusicPlayer:
         根据文件ID播放本地歌曲.
         """
         try:
-            # 构建文件路径
-            file_path = self.cache_dir / f"{file_id}.mp3"
-
-            if not file_path.exists():
-                # 尝试其他格式
-                for ext in [".m4a", ".flac", ".wav", ".ogg"]:
-                    alt_path = self.cache_dir / f"{file_id}{ext}"
-                    if alt_path.exists():
-                        file_path = alt_path
-                        break
-                else:
-                    return {"status": "error", "message": f"本地文件不存在: {file_id}"}
+            # 优先从索引获取歌曲信息
+            metadata = self.library.get(file_id)
+            if metadata is not None and metadata.file_path.exists():
+                file_path = metadata.file_path
+            else:
+                # 构建文件路径
+                file_path = self.cache_dir / f"{file_id}.mp3"
+
+                if not file_path.exists():
+                    # 尝试其他格式
+                    for ext in [".m4a", ".flac", ".wav", ".ogg"]:
+                        alt_path = self.cache_dir / f"{file_id}{ext}"
+                        if alt_path.exists():
+                            file_path = alt_path
+                            break
+                    else:
+                        return {
+                            "status": "error",
+                            "message": f"本地文件不存在: {file_id}",
+                        }
 
-            # 获取歌曲信息
-            metadata = MusicMetadata(file_path)
-            if MUTAGEN_AVAILABLE:
-                metadata.extract_metadata()
+                # 索引中没有时读取歌曲信息并加入索引
+                metadata = await asyncio.to_thread(self.library.update_file, file_path)
+                if metadata is None:
+                    return {"status": "error", "message": f"本地文件不存在: {file_id}"}
 
             # 停止当前播放
             if self.is_playing:
-                pygame.mixer.music.stop()
+                self._stop_music()
 
             # 加载并播放
             pygame.mixer.music.load(str(file_path))
@@ -434,9 +371,15 @@ class MusicPlayer:
             self.current_position = 0
             self.start_play_time = time.time()
             self.current_lyric_index = -1
-            self.lyrics = []  # 本地文件暂不支持歌词
+            self.lyrics = Lyrics()  # 本地文件暂不支持歌词
+            self._current_file = metadata.filename
+            self._update_prefetch()
+            self._schedule_lyrics()
+            self._watch_music()
+            self._adopt_current(file_path)
 
             logger.info(f"开始播放本地音乐: {self.current_song}")
+            await asyncio.to_thread(self.library.record_play, metadata.filename)
 
             # 更新UI
             if self.app and hasattr(self.app, "set_chat_message"):
@@ -470,8 +413,12 @@ class MusicPlayer:
 
         current_pos = min(self.total_duration, time.time() - self.start_play_time)
 
-        # 检查是否播放完成
-        if current_pos >= self.total_duration and self.total_duration > 0:
+        # 检查是否播放完成（以 mixer 的状态为准）
+        if (
+            current_pos >= self.total_duration
+            and self.total_duration > 0
+            and not self._output_busy()
+        ):
             await self._handle_playback_finished()
 
         return current_pos
@@ -491,16 +438,21 @@ class MusicPlayer:
         """
         if self.is_playing:
             logger.info(f"歌曲播放完成: {self.current_song}")
-            pygame.mixer.music.stop()
+            self._stop_music()
             self.is_playing = False
             self.paused = False
             self.current_position = self.total_duration
+            self._schedule_lyrics()
 
             # 更新UI显示完成状态
             if self.app and hasattr(self.app, "set_chat_message"):
                 dur_str = self._format_time(self.total_duration)
                 await self._safe_update_ui(f"播放完成: {self.current_song} [{dur_str}]")
 
+            # 继续播放队列中的下一首（在新任务中，调用方可能是播放进度定时器）
+            if self.queue.upcoming(1):
+                self._advance_task = asyncio.create_task(self.next())
+
     # 核心方法
     async def search_and_play(self, song_name: str) -> dict:
         """
@@ -508,17 +460,21 @@ class MusicPlayer:
         """
         try:
             # 搜索歌曲
-            song_id, url = await self._search_song(song_name)
-            if not song_id or not url:
+            item = QueueItem(song_name)
+            if not await self._search(item):
                 return {"status": "error", "message": f"未找到歌曲: {song_name}"}
 
-            # 播放歌曲
-            success = await self._play_url(url)
+            # 插到当前歌曲之后并立即播放，之前的歌曲仍可用“上一首”回到
+            self.queue.insert_next(item)
+            self.queue.advance()
+            success = await self._play_item(item)
             if success:
                 return {
                     "status": "success",
                     "message": f"正在播放: {self.current_song}",
                 }
+            elif not item.url:
+                return {"status": "error", "message": f"未找到歌曲: {song_name}"}
             else:
                 return {"status": "error", "message": "播放失败"}
 
@@ -543,9 +499,14 @@ class MusicPlayer:
 
             elif self.is_playing and self.paused:
                 # 恢复播放
-                pygame.mixer.music.unpause()
+                if self.gapless.active:
+                    self.gapless.resume()
+                else:
+                    pygame.mixer.music.unpause()
                 self.paused = False
                 self.start_play_time = time.time() - self.current_position
+                self._schedule_lyrics()
+                self._watch_music()
 
                 # 更新UI
                 if self.app and hasattr(self.app, "set_chat_message"):
@@ -558,9 +519,13 @@ class MusicPlayer:
 
             elif self.is_playing and not self.paused:
                 # 暂停播放
-                pygame.mixer.music.pause()
+                if self.gapless.active:
+                    self.gapless.pause()
+                else:
+                    pygame.mixer.music.pause()
                 self.paused = True
                 self.current_position = time.time() - self.start_play_time
+                self._schedule_lyrics()
 
                 # 更新UI
                 if self.app and hasattr(self.app, "set_chat_message"):
@@ -587,11 +552,12 @@ class MusicPlayer:
             if not self.is_playing:
                 return {"status": "info", "message": "没有正在播放的歌曲"}
 
-            pygame.mixer.music.stop()
+            self._stop_music()
             current_song = self.current_song
             self.is_playing = False
             self.paused = False
             self.current_position = 0
+            self._schedule_lyrics()
 
             # 更新UI
             if self.app and hasattr(self.app, "set_chat_message"):
@@ -615,11 +581,18 @@ class MusicPlayer:
             self.current_position = position
             self.start_play_time = time.time() - position
 
-            pygame.mixer.music.rewind()
-            pygame.mixer.music.set_pos(position)
+            if self.gapless.active:
+                self.gapless.seek(position)
+            else:
+                pygame.mixer.music.rewind()
+                pygame.mixer.music.set_pos(position)
 
-            if self.paused:
-                pygame.mixer.music.pause()
+                if self.paused:
+                    pygame.mixer.music.pause()
+
+            # 从新位置重新显示歌词并安排下一次更新
+            self.current_lyric_index = -1
+            self._schedule_lyrics()
 
             # 更新UI
             pos_str = self._format_time(position)
@@ -670,15 +643,100 @@ class MusicPlayer:
             "has_lyrics": len(self.lyrics) > 0,
         }
 
+    # 播放队列
+    async def enqueue(self, song_name: str) -> dict:
+        """
+        加入播放队列；当前没有在播放时立即开始播放.
+        """
+        try:
+            index = self.queue.add(QueueItem(song_name))
+            if not self.is_playing:
+                return await self.next()
+            self._update_prefetch()
+            return {
+                "status": "success",
+                "message": f"已加入播放队列（第 {index} 首）: {song_name}",
+            }
+        except Exception as e:
+            logger.error(f"加入播放队列失败: {e}")
+            return {"status": "error", "message": f"操作失败: {str(e)}"}
+
+    async def next(self) -> dict:
+        """
+        播放队列中的下一首.
+        """
+        item = self.queue.advance()
+        if item is None:
+            return {"status": "info", "message": "播放队列中没有下一首"}
+        return await self._play_queue_item(item)
+
+    async def previous(self) -> dict:
+        """
+        播放队列中的上一首.
+        """
+        item = self.queue.back()
+        if item is None:
+            return {"status": "info", "message": "播放队列中没有上一首"}
+        return await self._play_queue_item(item)
+
+    async def shuffle(self) -> dict:
+        """
+        打乱队列中即将播放的歌曲.
+        """
+        upcoming = self.queue.upcoming()
+        if len(upcoming) < 2:
+            return {"status": "info", "message": "播放队列中的歌曲不足两首"}
+        self.queue.shuffle()
+        self._update_prefetch()
+        return {
+            "status": "success",
+            "message": f"已打乱播放队列中的 {len(upcoming)} 首歌曲",
+        }
+
+    async def get_queue(self) -> dict:
+        """
+        获取播放队列.
+        """
+        current = self.queue.current
+        return {
+            "status": "success",
+            "current": str(current) if current is not None else "",
+            "upcoming": [str(item) for item in self.queue.upcoming()],
+        }
+
+    async def pin_current(self, pinned: bool = True) -> dict:
+        """
+        收藏（或取消收藏）当前歌曲，收藏的歌曲不会被缓存淘汰.
+        """
+        if not self._current_file:
+            return {"status": "error", "message": "没有正在播放的歌曲"}
+        try:
+            await asyncio.to_thread(
+                self.library.set_pinned, self._current_file, pinned
+            )
+            if not pinned:
+                await asyncio.to_thread(self._enforce_cache)
+            action = "已收藏" if pinned else "已取消收藏"
+            return {"status": "success", "message": f"{action}: {self.current_song}"}
+        except Exception as e:
+            logger.error(f"收藏歌曲失败: {e}")
+            return {"status": "error", "message": f"操作失败: {str(e)}"}
+
     # 内部方法
-    async def _search_song(self, song_name: str) -> Tuple[str, str]:
+    async def _search(self, item: QueueItem) -> bool:
         """
-        搜索歌曲获取ID和URL.
+        搜索歌曲，得到歌曲ID、显示名称与时长（缓存中有时连同播放URL）.
         """
+        cached = self._search_cache.get(self._search_key(item.song_name))
+        if cached is not None:
+            item.song_id, item.url, item.display_name, item.duration = cached
+            item.from_cache = True
+            return True
+
         try:
             # 构建搜索参数
             params = {
-                "all": song_name,
+                "all": item.song_name,
                 "ft": "music",
                 "newsearch": "1",
                 "alflac": "1",
@@ -699,34 +757,27 @@ class MusicPlayer:
             }
 
             # 搜索歌曲
-            response = await asyncio.to_thread(
-                requests.get,
-                self.config["SEARCH_URL"],
-                params=params,
-                headers=self.config["HEADERS"],
-                timeout=10,
-            )
-            response.raise_for_status()
+            text = await self.http.get_text(self.config["SEARCH_URL"], params)
 
             # 解析响应
-            text = response.text.replace("'", '"')
+            text = text.replace("'", '"')
 
             # 提取歌曲ID
             song_id = self._extract_value(text, '"DC_TARGETID":"', '"')
             if not song_id:
-                return "", ""
+                return False
 
             # 提取歌曲信息
-            title = self._extract_value(text, '"NAME":"', '"') or song_name
+            title = self._extract_value(text, '"NAME":"', '"') or item.song_name
             artist = self._extract_value(text, '"ARTIST":"', '"')
             album = self._extract_value(text, '"ALBUM":"', '"')
             duration_str = self._extract_value(text, '"DURATION":"', '"')
 
             if duration_str:
                 try:
-                    self.total_duration = int(duration_str)
+                    item.duration = int(duration_str)
                 except ValueError:
-                    self.total_duration = 0
+                    item.duration = 0
 
             # 设置显示名称
             display_name = title
@@ -734,27 +785,200 @@ class MusicPlayer:
                 display_name = f"{title} - {artist}"
                 if album:
                     display_name += f" ({album})"
-            self.current_song = display_name
-            self.song_id = song_id
+            item.display_name = display_name
+            item.song_id = song_id
+            return True
 
-            # 获取播放URL
-            play_url = f"{self.config['PLAY_URL']}?ID={song_id}"
-            url_response = await asyncio.to_thread(
-                requests.get, play_url, headers=self.config["HEADERS"], timeout=10
-            )
-            url_response.raise_for_status()
+        except Exception as e:
+            logger.error(f"搜索歌曲失败: {e}")
+            return False
 
-            play_url_text = url_response.text.strip()
+    async def _fetch_play_url(self, item: QueueItem) -> bool:
+        """
+        获取播放URL.
+        """
+        try:
+            play_url = f"{self.config['PLAY_URL']}?ID={item.song_id}"
+            play_url_text = (await self.http.get_text(play_url)).strip()
             if play_url_text and play_url_text.startswith("http"):
-                # 获取歌词
-                await self._fetch_lyrics(song_id)
-                return song_id, play_url_text
+                item.url = play_url_text
+                self._search_cache.put(
+                    self._search_key(item.song_name),
+                    (item.song_id, item.url, item.display_name, item.duration),
+                )
+                return True
+            return False
+
+        except Exception as e:
+            logger.error(f"获取播放URL失败: {e}")
+            return False
 
-            return song_id, ""
+    @staticmethod
+    def _search_key(song_name: str) -> str:
+        return " ".join(song_name.lower().split())
 
+    async def _play_queue_item(self, item: QueueItem) -> dict:
+        try:
+            if await self._play_item(item):
+                return {
+                    "status": "success",
+                    "message": f"正在播放: {self.current_song}",
+                }
+            return {"status": "error", "message": f"播放失败: {item}"}
         except Exception as e:
-            logger.error(f"搜索歌曲失败: {e}")
-            return "", ""
+            logger.error(f"播放队列歌曲失败: {e}")
+            return {"status": "error", "message": f"播放失败: {str(e)}"}
+
+    async def _play_item(self, item: QueueItem) -> bool:
+        """
+        把队列中的歌曲设为当前歌曲并播放，尚未搜索（预取）时先搜索.
+        """
+        if not item.song_id and not await self._search(item):
+            return False
+
+        self._set_current(item)
+        if not item.url and not await self._fetch_play_url(item):
+            return False
+        if not await self._play_url(item.url):
+            if not item.from_cache:
+                return False
+            # 缓存的播放URL可能已过期，重新获取后再试一次
+            logger.info(f"缓存的播放URL不可用，重新获取: {item}")
+            self._search_cache.pop(self._search_key(item.song_name))
+            item.from_cache = False
+            if not await self._fetch_play_url(item):
+                return False
+            if not await self._play_url(item.url):
+                return False
+        await asyncio.to_thread(self.library.record_play, item.filename)
+        return True
+
+    def _set_current(self, item: QueueItem):
+        """
+        把队列中的歌曲设为当前歌曲.
+        """
+        self.current_song = str(item)
+        self.song_id = item.song_id
+        self.total_duration = item.duration
+        self._current_file = item.filename
+        # 歌词与播放URL、音频并行获取
+        self.lyrics = Lyrics()
+        self._lyrics_fetch_task = asyncio.create_task(self._fetch_lyrics(item.song_id))
+        # 取消上一首的下载，预取接下来的歌曲
+        self._update_prefetch()
+
+    def _protected_files(self) -> set:
+        """
+        当前歌曲与即将播放（预取范围内）的歌曲的缓存文件名.
+        """
+        upcoming = self.queue.upcoming(self.config["PREFETCH_COUNT"])
+        names = {self._current_file} | {item.filename for item in upcoming}
+        names.discard("")
+        return names
+
+    def _update_prefetch(self):
+        """
+        当前歌曲或队列变化后：保护相关歌曲不被缓存淘汰，取消不再需要的下载，
+        预取接下来的歌曲.
+        """
+        protected = self._protected_files()
+        self.cache.protect(protected)
+
+        for path, download in list(self._downloads.items()):
+            if download.done:
+                del self._downloads[path]
+            elif path.name not in protected:
+                # 换歌、打乱后不再需要的下载
+                download.cancel()
+                del self._downloads[path]
+
+        for item in self.queue.upcoming(self.config["PREFETCH_COUNT"]):
+            if item not in self._prefetch_tasks:
+                self._prefetch_tasks[item] = asyncio.create_task(self._prefetch(item))
+        self._update_predecode()
+
+    def _update_predecode(self):
+        """
+        预解码队列中的下一首；下一首变化后取消之前的安排.
+        """
+        if not self.config["GAPLESS_PLAYBACK"]:
+            return
+        upcoming = self.queue.upcoming(1)
+        target = upcoming[0] if upcoming else None
+        keep = {self._current_file, target.filename if target else ""}
+        for key in list(self._decoded):
+            if key not in keep:
+                del self._decoded[key]
+        decoded = self._decoded.get(target.filename) if target else None
+        if self.gapless.next is not decoded:
+            self.gapless.set_next(decoded)
+        if target is None or decoded is not None:
+            return
+        if self._decode_task is not None and not self._decode_task.done():
+            if self._decode_item is target:
+                return
+            self._decode_task.cancel()
+        self._decode_item = target
+        self._decode_task = asyncio.create_task(self._predecode(target))
+
+    async def _predecode(self, item: QueueItem):
+        """
+        等下一首预取完成后在线程中解码，安排在当前歌曲之后无缝播放.
+        """
+        try:
+            prefetch = self._prefetch_tasks.get(item)
+            if prefetch is not None:
+                await asyncio.wait({prefetch})
+            if not item.filename:
+                return
+            path = self.cache_dir / item.filename
+            if not path.exists():
+                return
+            track = await asyncio.to_thread(decode_track, path)
+            # 解码期间队列可能已变化
+            upcoming = self.queue.upcoming(1)
+            if track is None or not upcoming or upcoming[0] is not item:
+                return
+            self._decoded[track.key] = track
+            self.gapless.set_next(track)
+            logger.info(f"已预解码下一首: {item}")
+        except Exception as e:
+            logger.warning(f"预解码失败 {item}: {e}")
+
+    async def _prefetch(self, item: QueueItem):
+        """
+        预取队列中的歌曲：搜索并下载到缓存，同时进行的预取下载数受
+        PREFETCH_WORKERS 限制.
+        """
+        try:
+            if self._prefetch_slots is None:
+                self._prefetch_slots = asyncio.Semaphore(
+                    self.config["PREFETCH_WORKERS"]
+                )
+            async with self._prefetch_slots:
+                # 等待期间可能已开始播放、被打乱到后面或被切掉
+                if item not in self.queue.upcoming(self.config["PREFETCH_COUNT"]):
+                    return
+                if not item.song_id and not await self._search(item):
+                    return
+                if not item.url and not await self._fetch_play_url(item):
+                    return
+                cache_path = self.cache_dir / item.filename
+                if cache_path.exists():
+                    return
+                self.cache.protect(self._protected_files())
+                download = self._downloads.get(cache_path)
+                if download is None or download.failed:
+                    download = await self._start_download(item.url, cache_path)
+                    if download is None:
+                        return
+                    self._downloads[cache_path] = download
+                logger.info(f"预取歌曲: {item}")
+                await download.async_wait()
+        except Exception as e:
+            logger.warning(f"预取歌曲失败 {item}: {e}")
+        finally:
+            self._prefetch_tasks.pop(item, None)
 
     async def _play_url(self, url: str) -> bool:
         """
@@ -763,16 +987,37 @@ class MusicPlayer:
         try:
             # 停止当前播放
             if self.is_playing:
-                pygame.mixer.music.stop()
+                self._stop_music()
 
-            # 检查缓存或下载
-            file_path = await self._get_or_download_file(url)
-            if not file_path:
+            # 缓存中的文件，或边下载边读取的文件对象
+            source = await self._open_source(url)
+            if source is None:
                 return False
 
-            # 加载并播放
-            pygame.mixer.music.load(str(file_path))
-            pygame.mixer.music.play()
+            # 加载并播放：预解码好的下一首在无缝播放的声道上播放；其他歌曲先由
+            # pygame.mixer.music 播放，缓存文件完整并解码后转到该声道
+            decoded = isinstance(source, Path) and self._decoded.get(source.name)
+            if decoded:
+                self.gapless.play(decoded)
+                self.total_duration = decoded.duration
+            elif isinstance(source, ProgressiveReader):
+                try:
+                    pygame.mixer.music.load(source, "mp3")
+                    # 解码器已打开文件，之后读到未下载的部分时等待
+                    source.start_streaming()
+                    self._stream = source
+                except Exception as e:
+                    # 解码器无法打开未下载完的文件时，等待下载完成
+                    logger.warning(f"无法边下载边播放，等待下载完成: {e}")
+                    source.close()
+                    source = await source.download.async_wait()
+                    if source is None:
+                        return False
+            if not self.gapless.active:
+                if not isinstance(source, ProgressiveReader):
+                    pygame.mixer.music.load(str(source))
+                pygame.mixer.music.play()
+                self._adopt_current(source)
 
             self.current_url = url
             self.is_playing = True
@@ -787,8 +1032,9 @@ class MusicPlayer:
             if self.app and hasattr(self.app, "set_chat_message"):
                 await self._safe_update_ui(f"正在播放: {self.current_song}")
 
-            # 启动歌词更新任务
-            asyncio.create_task(self._lyrics_update_task())
+            # 显示歌词并安排更新（歌词尚未获取到时，获取完成后重新安排）
+            self._schedule_lyrics()
+            self._watch_music()
 
             return True
 
@@ -796,214 +1042,291 @@ class MusicPlayer:
             logger.error(f"播放失败: {e}")
             return False
 
-    async def _get_or_download_file(self, url: str) -> Optional[Path]:
-        """获取或下载文件.
-
-        先检查缓存，如果缓存中没有则下载
+    def _stop_music(self):
         """
-        try:
-            # 使用歌曲ID作为缓存文件名
-            cache_filename = f"{self.song_id}.mp3"
-            cache_path = self.cache_dir / cache_filename
+        停止播放；边下载边播放时先让解码器不再等待数据，否则停止会等到数据到达.
+        """
+        if self._adopt_task is not None:
+            self._adopt_task.cancel()
+            self._adopt_task = None
+        if self._music_timer is not None:
+            self._music_timer.cancel()
+            self._music_timer = None
+        if self._stream is not None:
+            self._stream.abort()
+            self._stream = None
+        pygame.mixer.music.stop()
+        # 已预解码的下一首保留
+        self.gapless.stop(keep_next=True)
+
+    def _watch_music(self):
+        """
+        pygame.mixer.music 播放时定期检查 mixer 状态，停止即播放结束（不按歌曲信息中
+        的时长判断）；在无缝播放的声道上播放时由声道通知播放结束.
+        """
+        if self._music_timer is not None:
+            self._music_timer.cancel()
+            self._music_timer = None
+        if not self.is_playing or self.paused or self.gapless.active:
+            return
+        if not pygame.mixer.music.get_busy():
+            self._finish_task = asyncio.create_task(self._handle_playback_finished())
+            return
+        self._music_timer = asyncio.get_running_loop().call_later(
+            MUSIC_END_POLL_INTERVAL, self._watch_music
+        )
 
-            # 检查缓存是否存在
-            if cache_path.exists():
-                logger.info(f"使用缓存: {cache_path}")
-                return cache_path
+    def _adopt_current(self, source: Union[Path, ProgressiveReader]):
+        """
+        当前歌曲由 pygame.mixer.music 播放时，等缓存文件完整后解码，从当前位置转到
+        无缝播放的声道上，下一首才能在它之后精确衔接.
+        """
+        if not self.config["GAPLESS_PLAYBACK"]:
+            return
+        if self._adopt_task is not None:
+            self._adopt_task.cancel()
+        self._adopt_task = asyncio.create_task(self._adopt(source))
 
-            # 缓存不存在，需要下载
-            return await self._download_file(url, cache_filename)
+    async def _adopt(self, source: Union[Path, ProgressiveReader]):
+        try:
+            if isinstance(source, ProgressiveReader):
+                source = await source.download.async_wait()
+                if source is None:
+                    return
+            track = await asyncio.to_thread(decode_track, source)
+            # 解码期间可能已换歌、停止或播放结束
+            if (
+                track is None
+                or track.key != self._current_file
+                or not self.is_playing
+                or self.gapless.active
+            ):
+                return
+            if self.paused:
+                position = self.current_position
+            else:
+                position = time.time() - self.start_play_time
+            if position >= track.duration:
+                return
 
+            if self._stream is not None:
+                self._stream.abort()
+                self._stream = None
+            pygame.mixer.music.stop()
+            self._decoded[track.key] = track
+            self.gapless.play(track, position)
+            if self.paused:
+                self.gapless.pause()
+            self.total_duration = track.duration
+            logger.info(f"当前歌曲转到无缝播放: {self.current_song}")
+            # 安排下一首（已预解码时立即交给声道排队）
+            self._update_predecode()
         except Exception as e:
-            logger.error(f"获取文件失败: {e}")
-            return None
+            logger.warning(f"当前歌曲转到无缝播放失败: {e}")
 
-    async def _download_file(self, url: str, filename: str) -> Optional[Path]:
-        """下载文件到缓存目录.
+    def _output_busy(self) -> bool:
+        """
+        mixer 是否仍在播放当前歌曲.
+        """
+        return self.gapless.active or pygame.mixer.music.get_busy()
 
-        先下载到临时目录，下载完成后移动到正式缓存目录
+    def _on_gapless_track_start(self, track: DecodedTrack):
         """
-        temp_path = None
-        try:
-            # 创建临时文件路径
-            temp_path = self.temp_cache_dir / f"temp_{int(time.time())}_{filename}"
-
-            # 异步下载
-            response = await asyncio.to_thread(
-                requests.get,
-                url,
-                headers=self.config["HEADERS"],
-                stream=True,
-                timeout=30,
-            )
-            response.raise_for_status()
+        无缝播放切到了下一首（在事件循环中调用）：前进播放队列并更新播放状态.
+        """
+        item = self.queue.advance()
+        if item is None or item.filename != track.key:
+            # 下一首交给声道后播放队列又被改动，改为播放队列中的歌曲
+            self.gapless.stop()
+            if item is not None:
+                self._advance_task = asyncio.create_task(self._play_queue_item(item))
+            return
 
-            # 写入临时文件
-            with open(temp_path, "wb") as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+        self._set_current(item)
+        self.current_url = item.url
+        self.total_duration = track.duration
+        self.current_position = 0
+        self.start_play_time = time.time() - self.gapless.position()
+        self.current_lyric_index = -1
+        logger.info(f"无缝切换到: {self.current_song}")
+        self._update_ui(f"正在播放: {self.current_song}")
+        self._schedule_lyrics()
+        asyncio.get_running_loop().run_in_executor(
+            None, self.library.record_play, item.filename
+        )
+
+    def _on_gapless_finished(self):
+        """
+        无缝播放的声道播放完毕，且没有预解码好的下一首.
+        """
+        self._finish_task = asyncio.create_task(self._handle_playback_finished())
 
-            # 下载完成，移动到正式缓存目录
-            cache_path = self.cache_dir / filename
-            shutil.move(str(temp_path), str(cache_path))
+    async def _open_source(self, url: str) -> Union[Path, ProgressiveReader, None]:
+        """获取播放源.
 
-            logger.info(f"音乐下载完成并缓存: {cache_path}")
+        缓存中有完整文件时返回其路径；否则开始下载（同一首歌已在下载或预取时沿用），
+        开头部分到达后返回边下载边读取的文件对象。未开启边下载边播放或服务器
+        未给出文件大小时等待下载完成后返回缓存路径。失败时返回 None。
+        """
+        # 使用歌曲ID作为缓存文件名
+        cache_path = self.cache_dir / f"{self.song_id}.mp3"
+        if cache_path.exists():
+            logger.info(f"使用缓存: {cache_path}")
             return cache_path
 
+        download = self._downloads.get(cache_path)
+        if download is None or download.failed:
+            download = await self._start_download(url, cache_path)
+            if download is None:
+                return None
+            self._downloads[cache_path] = download
+
+        if not self.config["STREAM_PLAYBACK"] or not download.streamable:
+            return await download.async_wait()
+        if not await download.async_ready(30):
+            logger.error("等待音乐数据超时或下载失败")
+            return None
+        return download.open_reader()
+
+    async def _start_download(
+        self, url: str, cache_path: Path
+    ) -> Optional[ProgressiveDownload]:
+        """在后台下载到临时目录，下载完整后移动到正式缓存目录.
+
+        响应头到达后即返回，响应体在事件循环中读取，由下载线程写入文件。
+        """
+        try:
+            response = await self.http.open(url, timeout=30)
         except Exception as e:
             logger.error(f"下载失败: {e}")
-            # 清理临时文件
-            if temp_path and temp_path.exists():
-                try:
-                    temp_path.unlink()
-                    logger.debug(f"已清理临时下载文件: {temp_path}")
-                except Exception:
-                    pass
             return None
 
+        # 压缩传输时解码后的大小与 Content-Length 不一致
+        total = response.headers.get("Content-Length")
+        if response.headers.get("Content-Encoding", "identity") != "identity":
+            total = None
+        temp_path = self.temp_cache_dir / f"temp_{int(time.time())}_{cache_path.name}"
+        loop = asyncio.get_running_loop()
+        download = ProgressiveDownload(
+            iter_content_threadsafe(response, loop),
+            int(total) if total and total.isdigit() else None,
+            temp_path,
+            cache_path,
+            on_complete=self._on_download_complete,
+            close=lambda: loop.call_soon_threadsafe(response.close),
+        )
+        download.start()
+        return download
+
+    def _enforce_cache(self):
+        """
+        按缓存预算淘汰歌曲，并删除被淘汰歌曲的歌词缓存.
+        """
+        for name in self.cache.enforce():
+            try:
+                (self.lyrics_cache_dir / f"{Path(name).stem}.json").unlink()
+            except OSError:
+                pass
+
+    def _on_download_complete(self, path: Path):
+        """
+        下载完成（在下载线程中）：加入音乐库索引，超出缓存预算时淘汰旧歌曲.
+        """
+        self.library.update_file(path)
+        self._enforce_cache()
+
     async def _fetch_lyrics(self, song_id: str):
         """
-        获取歌词.
+        获取歌词：依次查找内存缓存、磁盘缓存与歌词API.
         """
         try:
-            # 重置歌词
-            self.lyrics = []
+            lyrics = self._lyrics_cache.get(song_id)
+            if lyrics is None:
+                lyrics_path = self.lyrics_cache_dir / f"{song_id}.json"
+                lyrics = await asyncio.to_thread(load_lyrics, lyrics_path)
+                if lyrics is None:
+                    lyrics = await self._download_lyrics(song_id)
+                    if lyrics is None:
+                        return
+                    if lyrics:
+                        await asyncio.to_thread(save_lyrics, lyrics_path, lyrics)
+                self._lyrics_cache.put(song_id, lyrics)
+
+            # 获取期间已切换到其他歌曲时丢弃
+            if song_id != self.song_id or not lyrics:
+                return
+            self.lyrics = lyrics
+            logger.info(f"成功获取歌词，共 {len(self.lyrics)} 行")
+            self.current_lyric_index = -1
+            self._schedule_lyrics()
 
+        except Exception as e:
+            logger.error(f"获取歌词失败: {e}")
+
+    async def _download_lyrics(self, song_id: str) -> Optional[Lyrics]:
+        """
+        从歌词API获取并解析歌词，没有歌词时返回空歌词，请求失败时返回 None.
+        """
+        try:
             # 构建歌词API请求
             lyric_url = self.config.get("LYRIC_URL")
             lyric_api_url = f"{lyric_url}?id={song_id}"
             logger.info(f"获取歌词URL: {lyric_api_url}")
 
-            response = await asyncio.to_thread(
-                requests.get, lyric_api_url, headers=self.config["HEADERS"], timeout=10
-            )
-            response.raise_for_status()
-
-            # 解析JSON
-            data = response.json()
-
-            # 解析歌词
-            if (
-                data.get("code") == 200
-                and data.get("data")
-                and data["data"].get("content")
-            ):
-                lrc_content = data["data"]["content"]
-
-                # 解析LRC格式歌词
-                lines = lrc_content.split("\n")
-                for line in lines:
-                    line = line.strip()
-                    if not line:
-                        continue
-
-                    # 匹配时间标签格式 [mm:ss.xx]
-                    import re
-
-                    time_match = re.match(r"\[(\d{2}):(\d{2})\.(\d{2})\](.+)", line)
-                    if time_match:
-                        minutes = int(time_match.group(1))
-                        seconds = int(time_match.group(2))
-                        centiseconds = int(time_match.group(3))
-                        text = time_match.group(4).strip()
-
-                        # 转换为总秒数
-                        time_sec = minutes * 60 + seconds + centiseconds / 100.0
-
-                        # 跳过空歌词和元信息歌词
-                        if (
-                            text
-                            and not text.startswith("作词")
-                            and not text.startswith("作曲")
-                            and not text.startswith("编曲")
-                            and not text.startswith("ti:")
-                            and not text.startswith("ar:")
-                            and not text.startswith("al:")
-                            and not text.startswith("by:")
-                            and not text.startswith("offset:")
-                        ):
-                            self.lyrics.append((time_sec, text))
-
-                logger.info(f"成功获取歌词，共 {len(self.lyrics)} 行")
-            else:
-                logger.warning(f"未获取到歌词或歌词格式错误: {data.get('msg', '')}")
-
+            data = await self.http.get_json(lyric_api_url)
         except Exception as e:
             logger.error(f"获取歌词失败: {e}")
+            return None
 
-    async def _lyrics_update_task(self):
-        """
-        歌词更新任务.
-        """
-        if not self.lyrics:
-            return
-
-        try:
-            while self.is_playing:
-                if self.paused:
-                    await asyncio.sleep(0.5)
-                    continue
-
-                current_time = time.time() - self.start_play_time
+        if not (
+            data.get("code") == 200
+            and data.get("data")
+            and data["data"].get("content")
+        ):
+            logger.warning(f"未获取到歌词或歌词格式错误: {data.get('msg', '')}")
+            return Lyrics()
 
-                # 检查是否播放完成
-                if current_time >= self.total_duration:
-                    await self._handle_playback_finished()
-                    break
+        # 解析LRC格式歌词（多时间标签、毫秒与 offset 标签）
+        return parse_lrc(data["data"]["content"])
 
-                # 查找当前时间对应的歌词
-                current_index = self._find_current_lyric_index(current_time)
+    def _schedule_lyrics(self):
+        """安排歌词更新.
 
-                # 如果歌词索引变化了，更新显示
-                if current_index != self.current_lyric_index:
-                    await self._display_current_lyric(current_index)
+        取消已安排的更新；正在播放时按当前位置显示歌词，并安排在下一行的时间点
+        再次调用。暂停、继续、跳转、换歌与歌词到达后调用。
+        """
+        if self._lyrics_timer is not None:
+            self._lyrics_timer.cancel()
+            self._lyrics_timer = None
+        if not self.is_playing or self.paused or not self.lyrics:
+            return
 
-                await asyncio.sleep(0.2)
-        except Exception as e:
-            logger.error(f"歌词更新任务异常: {e}")
-
-    def _find_current_lyric_index(self, current_time: float) -> int:
-        """
-        查找当前时间对应的歌词索引.
-        """
-        # 查找下一句歌词
-        next_lyric_index = None
-        for i, (time_sec, _) in enumerate(self.lyrics):
-            # 添加一个小的偏移量(0.5秒)，使歌词显示更准确
-            if time_sec > current_time - 0.5:
-                next_lyric_index = i
-                break
-
-        # 确定当前歌词索引
-        if next_lyric_index is not None and next_lyric_index > 0:
-            # 如果找到下一句歌词，当前歌词就是它的前一句
-            return next_lyric_index - 1
-        elif next_lyric_index is None and self.lyrics:
-            # 如果没找到下一句，说明已经到最后一句
-            return len(self.lyrics) - 1
-        else:
-            # 其他情况（如播放刚开始）
-            return 0
+        position = time.time() - self.start_play_time
+        index = self.lyrics.index_at(position)
+        if index != self.current_lyric_index:
+            self._display_current_lyric(index, position)
+        next_time = self.lyrics.next_change(index)
+        if next_time is not None:
+            self._lyrics_timer = asyncio.get_running_loop().call_later(
+                max(0.0, next_time - position), self._schedule_lyrics
+            )
 
-    async def _display_current_lyric(self, current_index: int):
+    def _display_current_lyric(self, current_index: int, position: float):
         """
         显示当前歌词.
         """
         self.current_lyric_index = current_index
+        text = self.lyrics.texts[current_index]
 
-        if current_index < len(self.lyrics):
-            time_sec, text = self.lyrics[current_index]
-
-            # 在歌词前添加时间和进度信息
-            position_str = self._format_time(time.time() - self.start_play_time)
-            duration_str = self._format_time(self.total_duration)
-            display_text = f"[{position_str}/{duration_str}] {text}"
+        # 在歌词前添加时间和进度信息
+        position_str = self._format_time(position)
+        duration_str = self._format_time(self.total_duration)
+        display_text = f"[{position_str}/{duration_str}] {text}"
 
-            # 更新UI
-            if self.app and hasattr(self.app, "set_chat_message"):
-                await self._safe_update_ui(display_text)
-                logger.debug(f"显示歌词: {text}")
+        # 更新UI
+        if self.app and hasattr(self.app, "set_chat_message"):
+            self._update_ui(display_text)
+            logger.debug(f"显示歌词: {text}")
 
     def _extract_value(self, text: str, start_marker: str, end_marker: str) -> str:
         """
@@ -1033,6 +1356,12 @@ class MusicPlayer:
         """
         安全地更新UI.
         """
+        self._update_ui(message)
+
+    def _update_ui(self, message: str):
+        """
+        安全地更新UI（同步版本，供定时回调使用）.
+        """
         if not self.app or not hasattr(self.app, "set_chat_message"):
             return
 
@@ -0,0 +1,105 @@
+"""
+播放队列.
+
+队列保存点歌时的歌名，搜索后补上歌曲ID与播放地址。已播放的歌曲保留在队列前部，
+供“上一首”使用，超过 HISTORY_SIZE 首后丢弃最早的。
+"""
+
+import random
+from typing import List, Optional
+
+# 队列中保留的已播放歌曲数
+HISTORY_SIZE = 50
+
+
+class QueueItem:
+    """
+    队列中的一首歌.
+    """
+
+    def __init__(self, song_name: str):
+        self.song_name = song_name
+        # 以下由搜索得到
+        self.song_id = ""
+        self.url = ""
+        self.display_name = ""
+        self.duration = 0
+        # 搜索结果（含播放地址）来自缓存，播放地址可能已过期
+        self.from_cache = False
+
+    @property
+    def filename(self) -> str:
+        """
+        缓存文件名，未搜索时为空.
+        """
+        return f"{self.song_id}.mp3" if self.song_id else ""
+
+    def __str__(self) -> str:
+        return self.display_name or self.song_name
+
+
+class PlayQueue:
+    """
+    播放队列：position 之前为已播放的歌曲，之后为即将播放的歌曲.
+    """
+
+    def __init__(self):
+        self.items: List[QueueItem] = []
+        self.position = -1  # 当前歌曲的下标，-1 表示尚未开始
+
+    @property
+    def current(self) -> Optional[QueueItem]:
+        if 0 <= self.position < len(self.items):
+            return self.items[self.position]
+        return None
+
+    def add(self, item: QueueItem) -> int:
+        """
+        加到队尾，返回在即将播放的歌曲中的序号（从 1 开始）.
+        """
+        self.items.append(item)
+        return len(self.items) - 1 - self.position
+
+    def insert_next(self, item: QueueItem):
+        """
+        插到当前歌曲之后.
+        """
+        self.items.insert(self.position + 1, item)
+
+    def advance(self) -> Optional[QueueItem]:
+        """
+        移到下一首，没有时返回 None.
+        """
+        if self.position + 1 >= len(self.items):
+            return None
+        self.position += 1
+        if self.position > HISTORY_SIZE:
+            drop = self.position - HISTORY_SIZE
+            del self.items[:drop]
+            self.position -= drop
+        return self.items[self.position]
+
+    def back(self) -> Optional[QueueItem]:
+        """
+        移到上一首，没有时返回 None.
+        """
+        if self.position <= 0:
+            return None
+        self.position -= 1
+        return self.items[self.position]
+
+    def upcoming(self, count: Optional[int] = None) -> List[QueueItem]:
+        """
+        即将播放的歌曲（最多 count 首）.
+        """
+        start = self.position + 1
+        end = len(self.items) if count is None else start + count
+        return self.items[start:end]
+
+    def shuffle(self, rng: Optional[random.Random] = None):
+        """
+        打乱即将播放的歌曲，已播放的歌曲与当前歌曲不变.
+        """
+        upcoming = self.upcoming()
+        (rng or random).shuffle(upcoming)
+        self.items[self.position + 1 :] = upcoming
@@ -0,0 +1,462 @@
+"""
+本地音乐搜索索引.
+
+每首歌的标题、歌手、专辑与歌曲ID规范化（NFKC、小写、去掉空白与标点）后作为检索
+键；含中文的标题、歌手、专辑另有全拼与首字母两个检索键（需要 pypinyin，拼音在
+建立音乐库索引时算好并随索引保存）。所有检索键的单字与相邻两字建立倒排表。
+
+查询按空白切分为若干词，每个词允许的编辑距离随长度增加（中文 4 字以上 1 处、
+9 字以上 2 处；拼音与英文信息量低，5 个字母以上 1 处、12 个以上 2 处）。k 处编辑
+最多破坏查询中的 2k 个二元组，所以匹配的检索键一定包含最少见的 2k + 1 个二元组
+之一：只取这几个倒排表的并集作为候选，包含的二元组不够的排除，再用位并行算法
+计算查询与候选任一子串的编辑距离（候选过多时只取包含其中二元组多、长度与查询
+接近的一部分）。精确匹配（子串）足够多时不再做模糊匹配。字母表小的拼音与英文
+要求至少保留 2 个二元组，否则候选过多。两字以上的中文查询另转为拼音与全拼检索键
+比较，以纠正语音识别的同音字。
+多个词连起来能匹配到时（如语音识别出的带空格的拼音、英文歌名）按整体匹配，否则
+每个词都要匹配到；按字段权重、编辑距离与是否整字段匹配打分排序，原文字段的精确
+匹配总排在拼音与模糊匹配之前，只取前几个结果时精确匹配够数即不再查找其他匹配。
+"""
+
+import heapq
+import unicodedata
+from array import array
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.utils.logging_config import get_logger
+
+# 尝试导入拼音库
+try:
+    from pypinyin import Style, lazy_pinyin
+
+    PYPINYIN_AVAILABLE = True
+except ImportError:
+    PYPINYIN_AVAILABLE = False
+
+logger = get_logger(__name__)
+
+# 字段权重
+_FIELDS = (("title", 1.0), ("artist", 0.8), ("album", 0.6))
+_FILE_ID_WEIGHT = 0.5
+
+# 检索键类型及其得分系数
+_TEXT, _FULL_PINYIN, _INITIALS = 0, 1, 2
+_KIND_FACTOR = (1.0, 0.9, 0.8)
+
+# 精确匹配到的条目少于这么多时才做模糊匹配
+_FUZZY_MIN_MATCHES = 5
+
+# 模糊匹配最多计算这么多个候选文本的编辑距离（包含的二元组多、长度接近的优先）
+_FUZZY_MAX_CANDIDATES = 128
+
+# 原文字段的精确（子串）匹配另加的得分，高于任何拼音或模糊匹配的得分
+_EXACT_BONUS = 1.0
+
+
+def normalize(text: Optional[str]) -> str:
+    """
+    规范化：NFKC、小写，只保留字母、数字与汉字.
+    """
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKC", text).lower()
+    return "".join(ch for ch in text if ch.isalnum())
+
+
+def _has_cjk(text: str) -> bool:
+    return any("一" <= ch <= "鿿" or "㐀" <= ch <= "䶿" for ch in text)
+
+
+@lru_cache(maxsize=4096)
+def to_pinyin(text: str) -> Tuple[str, str]:
+    """
+    (全拼, 首字母)，均已规范化；非中文部分原样保留.
+    """
+    full = normalize("".join(lazy_pinyin(text)))
+    initials = normalize("".join(lazy_pinyin(text, style=Style.FIRST_LETTER)))
+    return full, initials
+
+
+def pinyin_fields(title: str, artist: str, album: str) -> Optional[str]:
+    """
+    标题、歌手、专辑的全拼与首字母，以制表符连接（共 6 项，无中文的字段为空），
+    用于保存在音乐库索引中；未安装 pypinyin 时返回 None.
+    """
+    if not PYPINYIN_AVAILABLE:
+        return None
+    parts = []
+    for text in (title, artist, album):
+        if text and _has_cjk(text):
+            parts.extend(to_pinyin(text))
+        else:
+            parts.extend(("", ""))
+    return "\t".join(parts)
+
+
+def _grams(text: str) -> set:
+    grams = set(text)
+    grams.update(text[i : i + 2] for i in range(len(text) - 1))
+    return grams
+
+
+def _max_edits(length: int, cjk: bool) -> int:
+    if length >= (9 if cjk else 12):
+        return 2
+    if length >= (4 if cjk else 5):
+        return 1
+    return 0
+
+
+def _substring_distance(peq: Dict[str, int], length: int, text: str) -> int:
+    """
+    查询与 text 任一子串之间的最小编辑距离（Myers 位并行算法，子串起点不计代价）.
+
+    peq 为查询中每个字符出现位置的位图。
+    """
+    mask = (1 << length) - 1
+    high = 1 << (length - 1)
+    pv, mv, score = mask, 0, length
+    best = length
+    for ch in text:
+        eq = peq.get(ch, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+            if score < best:
+                best = score
+        ph = (ph << 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return best
+
+
+class _Pattern:
+    """
+    查询中的一个词在某种形式（原文或拼音）下的匹配参数.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        kinds: Tuple[int, ...],
+        factor: float = 1.0,
+        fuzzy: bool = True,
+    ):
+        self.text = text
+        self.kinds = kinds
+        self.factor = factor
+        self.length = len(text)
+        if self.length == 1:
+            self.grams = [text]
+        else:
+            self.grams = [text[i : i + 2] for i in range(self.length - 1)]
+            self.grams = list(dict.fromkeys(self.grams))
+        self.max_edits = 0
+        if fuzzy and self.length > 1:
+            # 编辑后至少保留 1 个（拼音、英文为 2 个）二元组用于筛选候选
+            cjk = _has_cjk(text)
+            self.max_edits = min(
+                _max_edits(self.length, cjk),
+                max(0, (len(self.grams) - (1 if cjk else 2)) // 2),
+            )
+        self.min_grams = len(self.grams) - 2 * self.max_edits
+        self.peq: Dict[str, int] = {}
+        for i, ch in enumerate(text):
+            self.peq[ch] = self.peq.get(ch, 0) | (1 << i)
+
+
+class MusicSearchIndex:
+    """
+    音乐元数据的倒排索引，支持增量更新；调用方负责加锁.
+
+    倒排表中记录的是去重后的检索键文本（同一歌手、专辑的多首歌共用一个），每个
+    文本再对应若干 (文件名, 类型, 字段权重)，编辑距离对每个文本只算一次。
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, array] = {}
+        # 文本 ID -> 文本，文本 -> 文本 ID
+        self._texts: List[str] = []
+        self._text_ids: Dict[str, int] = {}
+        # 文本 ID -> [(文件名, 类型, 字段权重)]
+        self._entries: List[List[Tuple[str, int, float]]] = []
+        # 文本 ID -> 出现过的检索键类型（位图），用于跳过不需要的文本
+        self._kinds = array("B")
+        # 文件名 -> (元数据, 文本 ID 列表)
+        self._docs: Dict[str, Tuple[object, List[int]]] = {}
+        # 文件名 -> 得分相同时的排序键 (歌手, 标题)
+        self._order: Dict[str, Tuple[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def rebuild(self, tracks: Iterable):
+        """
+        由全部歌曲重建索引.
+        """
+        self._postings = {}
+        self._texts = []
+        self._text_ids = {}
+        self._entries = []
+        self._kinds = array("B")
+        self._docs = {}
+        self._order = {}
+        for metadata in tracks:
+            self._add(metadata)
+
+    def update(self, changed: Iterable, removed: Iterable[str]):
+        """
+        增量更新：changed 为新增或变化的元数据，removed 为已删除的文件名.
+        """
+        for name in removed:
+            self._remove(name)
+        for metadata in changed:
+            self._remove(metadata.filename)
+            self._add(metadata)
+        # 不再被引用的文本过多时重建，避免倒排表中堆积无用的 ID
+        unused = sum(1 for entries in self._entries if not entries)
+        if unused > max(1000, len(self._texts) // 2):
+            self.rebuild([metadata for metadata, _ in self._docs.values()])
+
+    def _add(self, metadata):
+        name = metadata.filename
+        text_ids = []
+        pinyin = (metadata.pinyin or "").split("\t")
+        for index, (field, weight) in enumerate(_FIELDS):
+            text = normalize(getattr(metadata, field))
+            self._add_entry(text_ids, text, name, _TEXT, weight)
+            if len(pinyin) == 2 * len(_FIELDS):
+                full, initials = pinyin[2 * index], pinyin[2 * index + 1]
+                self._add_entry(text_ids, full, name, _FULL_PINYIN, weight)
+                self._add_entry(text_ids, initials, name, _INITIALS, weight)
+        file_id = normalize(metadata.file_id)
+        self._add_entry(text_ids, file_id, name, _TEXT, _FILE_ID_WEIGHT)
+        self._docs[name] = (metadata, text_ids)
+        self._order[name] = (
+            metadata.artist or "Unknown",
+            metadata.title or metadata.filename,
+        )
+
+    def _add_entry(
+        self, text_ids: List[int], text: str, name: str, kind: int, weight: float
+    ):
+        if not text:
+            return
+        text_id = self._text_ids.get(text)
+        if text_id is None:
+            text_id = self._text_ids[text] = len(self._texts)
+            self._texts.append(text)
+            self._entries.append([])
+            self._kinds.append(0)
+            for gram in _grams(text):
+                postings = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = array("I")
+                postings.append(text_id)
+        self._entries[text_id].append((name, kind, weight))
+        self._kinds[text_id] |= 1 << kind
+        text_ids.append(text_id)
+
+    def _remove(self, name: str):
+        doc = self._docs.pop(name, None)
+        if doc is None:
+            return
+        del self._order[name]
+        for text_id in set(doc[1]):
+            entries = self._entries[text_id]
+            entries[:] = [entry for entry in entries if entry[0] != name]
+
+    def search(self, query: str, limit: Optional[int] = None) -> List:
+        """
+        按相关度返回匹配的元数据；查询为空时返回空列表.
+        """
+        terms = [term for term in map(normalize, query.split()) if term]
+        if not terms:
+            return []
+
+        scores: Optional[Dict[str, float]] = None
+        if len(terms) > 1:
+            scores = self._match_term("".join(terms), limit=limit) or None
+        if scores is None:
+            # 只有一个词时该词的得分即最终得分，可以按 limit 提前结束
+            term_limit = limit if len(terms) == 1 else None
+            # 长的词更少见，先匹配，之后的词只在已匹配的歌曲中查找
+            for term in sorted(terms, key=len, reverse=True):
+                term_scores = self._match_term(term, scores, term_limit)
+                if scores is not None:
+                    term_scores = {
+                        name: score + scores[name]
+                        for name, score in term_scores.items()
+                    }
+                scores = term_scores
+                if not scores:
+                    return []
+
+        order = self._order
+
+        def sort_key(name):
+            return (-scores[name],) + order[name]
+
+        if limit is not None and limit < len(scores):
+            # 得分高于第 limit 高得分的歌曲按完整的键排序，与其得分相同的只按
+            # (歌手, 标题) 取剩余的名额
+            cutoff = heapq.nlargest(limit, scores.values())[-1]
+            names = sorted(
+                (name for name, score in scores.items() if score > cutoff),
+                key=sort_key,
+            )
+            ties = [name for name, score in scores.items() if score == cutoff]
+            names += heapq.nsmallest(limit - len(names), ties, key=order.__getitem__)
+        else:
+            names = sorted(scores, key=sort_key)
+        return [self._docs[name][0] for name in names]
+
+    def _match_term(
+        self,
+        term: str,
+        within: Optional[Dict[str, float]] = None,
+        limit: Optional[int] = None,
+    ) -> Dict[str, float]:
+        """每首匹配的歌曲（文件名）-> 该词的最高得分；within 不为 None 时只在其中查找.
+
+        给出 limit 时，原文精确匹配的歌曲已有 limit 首即不再查找得分更低的匹配，
+        结果中得分最高的 limit 首不变。
+        """
+        if _has_cjk(term):
+            patterns = [_Pattern(term, (_TEXT,))]
+            # 同音字纠错：拼音须完全一致；单字的同音字太多，不按拼音匹配
+            if PYPINYIN_AVAILABLE and len(term) > 1:
+                full, _ = to_pinyin(term)
+                if full and not _has_cjk(full):
+                    patterns.append(_Pattern(full, (_FULL_PINYIN,), 0.9, False))
+        else:
+            patterns = [_Pattern(term, (_TEXT, _FULL_PINYIN, _INITIALS))]
+
+        best: Dict[str, float] = {}
+        for pattern in patterns:
+            if self._match_pattern(pattern, best, within, limit):
+                break
+        return best
+
+    def _match_pattern(
+        self,
+        pattern: _Pattern,
+        best: Dict[str, float],
+        within: Optional[Dict[str, float]],
+        limit: Optional[int],
+    ) -> bool:
+        """
+        计入 pattern 的匹配；原文精确匹配已够 limit 首、无需再查找时返回 True.
+        """
+        postings = [self._postings.get(gram, ()) for gram in pattern.grams]
+        postings.sort(key=len)
+        # 精确匹配的文本包含全部二元组，只需查看最少见的那个倒排表
+        texts, entries = self._texts, self._entries
+        kinds = pattern.kinds
+        matches, matched = [], 0
+        if limit is not None and _TEXT in kinds:
+            # 原文精确匹配的得分高于其他所有匹配，够 limit 首时其余的不会进入结果，
+            # 先只查看原文检索键
+            matches = self._exact_matches(pattern, postings[0], (_TEXT,))
+            matched = self._add_scores(pattern, matches, best, within, (_TEXT,))
+            if sum(score >= _EXACT_BONUS for score in best.values()) >= limit:
+                return True
+            kinds = tuple(kind for kind in kinds if kind != _TEXT)
+        others = self._exact_matches(pattern, postings[0], kinds)
+        matched += self._add_scores(pattern, others, best, within, kinds)
+        matches += others
+        if pattern.max_edits == 0 or matched >= _FUZZY_MIN_MATCHES:
+            return False
+
+        # 匹配的文本至少包含 min_grams 个二元组，即一定包含最少见的几个之一：
+        # 按包含其中几个、长度与查询是否接近挑选候选，再核对包含的二元组个数
+        counts = Counter()
+        for ids in postings[: len(postings) - pattern.min_grams + 1]:
+            counts.update(ids)
+        for text_id, _ in matches:
+            del counts[text_id]
+        candidates = counts
+        if len(counts) > _FUZZY_MAX_CANDIDATES:
+            # 先按个数粗选，再在其中兼顾长度
+            candidates = heapq.nlargest(
+                4 * _FUZZY_MAX_CANDIDATES, counts, key=counts.__getitem__
+            )
+            candidates = heapq.nlargest(
+                _FUZZY_MAX_CANDIDATES,
+                candidates,
+                key=lambda text_id: (
+                    counts[text_id],
+                    -abs(len(texts[text_id]) - pattern.length),
+                ),
+            )
+        grams = pattern.grams
+        matches = []
+        for text_id in candidates:
+            text = texts[text_id]
+            if not entries[text_id]:
+                continue
+            if sum(gram in text for gram in grams) < pattern.min_grams:
+                continue
+            distance = _substring_distance(pattern.peq, pattern.length, text)
+            if distance <= pattern.max_edits:
+                matches.append((text_id, distance))
+        self._add_scores(pattern, matches, best, within, pattern.kinds)
+        return False
+
+    def _exact_matches(
+        self, pattern: _Pattern, text_ids: Iterable[int], kinds: Tuple[int, ...]
+    ) -> List[Tuple[int, int]]:
+        """
+        text_ids 中含有 kinds 类检索键、包含整个查询的文本，编辑距离均为 0.
+        """
+        texts, entries, text_kinds = self._texts, self._entries, self._kinds
+        kind_mask = sum(1 << kind for kind in kinds)
+        return [
+            (text_id, 0)
+            for text_id in text_ids
+            if text_kinds[text_id] & kind_mask
+            and entries[text_id]
+            and pattern.text in texts[text_id]
+        ]
+
+    def _add_scores(
+        self,
+        pattern: _Pattern,
+        matches: List[Tuple[int, int]],
+        best: Dict[str, float],
+        within: Optional[Dict[str, float]],
+        kinds: Tuple[int, ...],
+    ) -> int:
+        """
+        把匹配到的 (文本 ID, 编辑距离) 中 kinds 类检索键计入各歌曲的得分，返回计入的条目数.
+        """
+        count = 0
+        texts, entries, text_kinds = self._texts, self._entries, self._kinds
+        kind_mask = sum(1 << kind for kind in kinds)
+        for text_id, distance in matches:
+            if not text_kinds[text_id] & kind_mask:
+                continue
+            score = pattern.factor * (1 - distance / (pattern.max_edits + 1))
+            if distance == 0 and len(texts[text_id]) == pattern.length:
+                score *= 1.5  # 整个字段匹配
+            for name, kind, weight in entries[text_id]:
+                # 首字母太短，只接受精确匹配
+                if kind not in kinds or (distance and kind == _INITIALS):
+                    continue
+                if within is not None and name not in within:
+                    continue
+                count += 1
+                entry_score = score * weight * _KIND_FACTOR[kind]
+                if distance == 0 and kind == _TEXT:
+                    entry_score += _EXACT_BONUS
+                if entry_score > best.get(name, 0.0):
+                    best[name] = entry_score
+        return count
@@ -0,0 +1,331 @@
+"""
+边下载边播放.
+
+在线歌曲先下载到临时目录：ProgressiveDownload 在后台线程中把数据块写入临时文件并
+记录已写入的字节数，开头的可解码部分（ID3v2 标签加 STREAM_START_BYTES 字节音频）
+到达后即可开始播放。ProgressiveReader 是交给解码器的文件对象，读到尚未下载的位置
+时等待数据到达。下载完整（与 Content-Length 一致）后临时文件才移入缓存目录，缓存
+中不会出现不完整的文件；下载失败时已播放的部分不受影响，临时文件被删除。
+
+事件循环中用 async_ready()/async_wait() 等待，不占用线程池中的线程。
+
+解码器打开文件时会读取文件末尾的标签，没有 VBR 头时还会扫描整个文件计算时长，
+这时不能等待下载：打开期间（probing）读到未下载的位置直接返回文件结束，打开后
+才改为等待。
+"""
+
+import asyncio
+import io
+import os
+import shutil
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# 开始播放前至少缓冲的音频字节数（128kbps 约 4 秒）
+STREAM_START_BYTES = 64 * 1024
+
+
+def decodable_prefix(head: bytes, start_bytes: int = STREAM_START_BYTES) -> int:
+    """
+    开始播放前需要的字节数：ID3v2 标签（可能含封面图片）加 start_bytes 字节音频.
+
+    head 为文件开头至少 10 个字节。
+    """
+    if len(head) >= 10 and head[:3] == b"ID3":
+        size = (
+            (head[6] & 0x7F) << 21
+            | (head[7] & 0x7F) << 14
+            | (head[8] & 0x7F) << 7
+            | (head[9] & 0x7F)
+        )
+        footer = 10 if head[5] & 0x10 else 0
+        return 10 + size + footer + start_bytes
+    return start_bytes
+
+
+class ProgressiveDownload:
+    """
+    在后台线程中下载到临时文件，完整后移入缓存目录.
+    """
+
+    def __init__(
+        self,
+        chunks: Iterable[bytes],
+        total: Optional[int],
+        temp_path: Path,
+        cache_path: Path,
+        on_complete: Optional[Callable[[Path], object]] = None,
+        close: Optional[Callable[[], object]] = None,
+        start_bytes: int = STREAM_START_BYTES,
+    ):
+        """
+        chunks 为响应体的数据块，total 为 Content-Length（未知时为 None），
+        下载完整后调用 on_complete(cache_path)，结束时调用 close（如关闭响应）.
+        """
+        self._chunks = chunks
+        self.total = total
+        self.temp_path = Path(temp_path)
+        self.cache_path = Path(cache_path)
+        self._on_complete = on_complete
+        self._close = close
+        self._start_bytes = start_bytes
+        self.received = 0
+        self.done = False  # 下载结束（成功、失败或取消）
+        self.error: Optional[BaseException] = None
+        self.completed_path: Optional[Path] = None
+        self._cond = threading.Condition()
+        self._ready = threading.Event()
+        # 供事件循环等待：开头部分到达（或下载结束）、下载结束
+        self._ready_future: Future = Future()
+        self._done_future: Future = Future()
+        self._cancelled = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def streamable(self) -> bool:
+        """
+        能否边下载边播放：解码器需要事先知道文件大小.
+        """
+        return self.total is not None
+
+    @property
+    def failed(self) -> bool:
+        return self.done and self.completed_path is None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._run, name="music-download", daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        head = b""
+        prefix = None
+        try:
+            with open(self.temp_path, "wb") as f:
+                for chunk in self._chunks:
+                    if self._cancelled:
+                        raise IOError("下载已取消")
+                    if not chunk:
+                        continue
+                    f.write(chunk)
+                    f.flush()  # 读取方用另一个文件对象读取
+                    with self._cond:
+                        self.received += len(chunk)
+                        self._cond.notify_all()
+                    if prefix is None:
+                        head += chunk[:10]
+                        if len(head) >= 10:
+                            prefix = decodable_prefix(head, self._start_bytes)
+                    if prefix is not None and self.received >= prefix:
+                        self._set_ready()
+            if self.total is not None and self.received != self.total:
+                raise IOError(f"下载不完整: {self.received}/{self.total} 字节")
+            self._commit()
+        except Exception as e:
+            self.error = e
+            if not self._cancelled:
+                logger.error(f"下载失败: {e}")
+        finally:
+            if self._close is not None:
+                try:
+                    self._close()
+                except Exception:
+                    pass
+            with self._cond:
+                self.done = True
+                self._cond.notify_all()
+            self._set_ready()
+            if self.completed_path is None:
+                self._remove_temp()
+            self._done_future.set_result(self.completed_path)
+
+    def _set_ready(self):
+        if not self._ready.is_set():
+            self._ready.set()
+            self._ready_future.set_result(None)
+
+    def _commit(self):
+        try:
+            os.replace(self.temp_path, self.cache_path)
+        except OSError:
+            # Windows 上正在读取的文件不能改名，复制一份（临时文件下次启动时清理）
+            part_path = self.cache_path.with_name(self.cache_path.name + ".part")
+            shutil.copyfile(self.temp_path, part_path)
+            os.replace(part_path, self.cache_path)
+        with self._cond:
+            self.completed_path = self.cache_path
+        logger.info(f"音乐下载完成并缓存: {self.cache_path}")
+        if self._on_complete is not None:
+            try:
+                self._on_complete(self.cache_path)
+            except Exception as e:
+                logger.warning(f"更新音乐索引失败: {e}")
+
+    def _remove_temp(self):
+        try:
+            self.temp_path.unlink()
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            # 仍被读取时（Windows）删除失败，下次启动时清理
+            logger.debug(f"暂时无法删除临时下载文件: {e}")
+
+    def ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        等待开头的可解码部分到达或下载结束，可以开始播放时返回 True.
+        """
+        if not self._ready.wait(timeout):
+            return False
+        with self._cond:
+            # 开头部分到达后仍在下载，或已完整下载
+            return not self.done or self.completed_path is not None
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[Path]:
+        """
+        等待下载结束，返回缓存文件路径，失败时返回 None.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self.done, timeout)
+            return self.completed_path
+
+    async def async_ready(self, timeout: Optional[float] = None) -> bool:
+        """
+        ready() 的协程版本.
+        """
+        try:
+            await asyncio.wait_for(
+                asyncio.shield(asyncio.wrap_future(self._ready_future)), timeout
+            )
+        except asyncio.TimeoutError:
+            return False
+        return self.ready(0)
+
+    async def async_wait(self) -> Optional[Path]:
+        """
+        wait() 的协程版本.
+        """
+        return await asyncio.shield(asyncio.wrap_future(self._done_future))
+
+    def cancel(self):
+        """
+        取消下载并唤醒等待数据的读取方.
+        """
+        self._cancelled = True
+        with self._cond:
+            self._cond.notify_all()
+        if self._close is not None:
+            # 关闭响应，使阻塞在网络读取上的下载线程尽快结束
+            try:
+                self._close()
+            except Exception:
+                pass
+
+    def wake(self):
+        with self._cond:
+            self._cond.notify_all()
+
+    def open_reader(self) -> "ProgressiveReader":
+        """
+        打开一个边下载边读取的文件对象.
+        """
+        with self._cond:
+            path = self.completed_path or self.temp_path
+        try:
+            return ProgressiveReader(self, open(path, "rb"))
+        except FileNotFoundError:
+            # 刚好下载完成，临时文件已移入缓存目录
+            return ProgressiveReader(self, open(self.cache_path, "rb"))
+
+    def _available(self, end: int, wait: bool, reader: "ProgressiveReader") -> int:
+        """
+        已下载的字节数；wait 为 True 时等待到至少 end 字节、下载结束或读取方中止.
+        """
+        with self._cond:
+            while (
+                wait
+                and self.received < end
+                and not self.done
+                and not self._cancelled
+                and not reader.aborted
+            ):
+                self._cond.wait()
+            return self.received
+
+
+class ProgressiveReader(io.RawIOBase):
+    """
+    读取正在下载的文件，交给 pygame.mixer.music.load(reader, "mp3").
+
+    打开期间（probing 为 True）读到未下载的位置返回文件结束；调用
+    start_streaming() 后改为等待数据到达。
+    """
+
+    def __init__(self, download: ProgressiveDownload, file):
+        super().__init__()
+        self.download = download
+        self._file = file
+        self._pos = 0
+        self.probing = True
+        self.aborted = False
+
+    def start_streaming(self):
+        self.probing = False
+
+    def abort(self):
+        """
+        不再等待数据（停止播放前调用，否则解码线程可能一直等待）.
+        """
+        self.aborted = True
+        self.download.wake()
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            position = offset
+        elif whence == io.SEEK_CUR:
+            position = self._pos + offset
+        elif whence == io.SEEK_END:
+            size = self.download.total
+            if size is None:
+                size = self.download._available(0, False, self)
+            position = size + offset
+        else:
+            raise ValueError(f"无效的 whence: {whence}")
+        self._pos = max(0, position)
+        return self._pos
+
+    def tell(self) -> int:
+        return self._pos
+
+    def readinto(self, buffer) -> int:
+        size = len(buffer)
+        if size == 0:
+            return 0
+        wait = not self.probing and not self.aborted
+        available = self.download._available(self._pos + size, wait, self)
+        size = min(size, available - self._pos)
+        if size <= 0:
+            return 0
+        self._file.seek(self._pos)
+        data = self._file.read(size)
+        buffer[: len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+    def close(self):
+        if not self.closed:
+            self.aborted = True
+            self._file.close()
+        super().close()
@@ -0,0 +1,125 @@
+"""
+音乐缓存目录监视.
+
+Linux 上用 inotify 监视目录中文件的写入完成、移入、删除与移出，有音乐文件变化时
+（合并 debounce 秒内的连续变化）调用回调；其他平台不监视，由调用方定期增量扫描。
+"""
+
+import os
+import select
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from src.mcp.inotify import (
+    IN_CLOSE_WRITE,
+    IN_DELETE,
+    IN_MOVED_FROM,
+    IN_MOVED_TO,
+    Inotify,
+    inotify_supported,
+)
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class DirectoryWatcher:
+    """
+    在后台线程中监视目录，指定扩展名的文件变化后调用 on_change.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        extensions: Iterable[str],
+        on_change: Callable[[], None],
+        debounce: float = 0.5,
+    ):
+        self.directory = Path(directory)
+        self.extensions = tuple(ext.encode() for ext in extensions)
+        self.on_change = on_change
+        self.debounce = debounce
+        self._inotify: Optional[Inotify] = None
+        self._wake_r = self._wake_w = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    @staticmethod
+    def supported() -> bool:
+        return inotify_supported()
+
+    def start(self) -> bool:
+        """
+        开始监视，平台不支持或 inotify 不可用时返回 False.
+        """
+        if self._thread is not None:
+            return True
+        if not self.supported():
+            return False
+        mask = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE
+        try:
+            self._inotify = Inotify(str(self.directory), mask)
+        except OSError as e:
+            logger.warning(f"无法监视音乐目录，改为定期扫描: {e}")
+            return False
+
+        self._wake_r, self._wake_w = os.pipe()
+        self._thread = threading.Thread(
+            target=self._watch_loop, name="music-library-watcher", daemon=True
+        )
+        self._thread.start()
+        return True
+
+    def _watch_loop(self):
+        while not self._closed:
+            if not self._wait(None):
+                continue
+            # 合并连续的变化（如批量复制），安静 debounce 秒后再回调
+            while not self._closed and self._wait(self.debounce):
+                pass
+            if self._closed:
+                return
+            try:
+                self.on_change()
+            except Exception as e:
+                logger.error(f"处理音乐目录变化失败: {e}", exc_info=True)
+
+    def _wait(self, timeout: Optional[float]) -> bool:
+        """
+        等待目录变化，有音乐文件变化时返回 True.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._closed:
+            remaining = None
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+            fd = self._inotify.fileno()
+            ready, _, _ = select.select([fd, self._wake_r], [], [], remaining)
+            if self._wake_r in ready:
+                return False
+            if fd in ready and any(
+                name.lower().endswith(self.extensions)
+                for name in self._inotify.read_names()
+            ):
+                return True
+        return False
+
+    def stop(self):
+        """
+        停止监视.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is None:
+            return
+        os.write(self._wake_w, b"\0")
+        if self._thread is not threading.current_thread():
+            self._thread.join()
+        self._inotify.close()
+        for fd in (self._wake_r, self._wake_w):
+            os.close(fd)
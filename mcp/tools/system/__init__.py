@@ -3,9 +3,7 @@
 提供完整的系统管理功能，包括设备状态查询、音频控制等操作。
 """
 
-from .device_status import get_device_status
 from .manager import SystemToolsManager, get_system_tools_manager
-from .tools import get_system_status, set_volume
 
 __all__ = [
     "SystemToolsManager",
@@ -14,3 +12,16 @@ __all__ = [
     "get_system_status",
     "set_volume",
 ]
+
+
+def __getattr__(name):
+    # 设备状态依赖 psutil，按需导入
+    if name == "get_device_status":
+        from .device_status import get_device_status
+
+        return get_device_status
+    if name in ("get_system_status", "set_volume"):
+        from . import tools
+
+        return getattr(tools, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
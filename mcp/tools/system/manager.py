@@ -5,15 +5,24 @@
 
 from typing import Any, Dict
 
+from src.mcp.lazy_loader import lazy_callback
 from src.utils.logging_config import get_logger
 
-from .app_management.killer import kill_application, list_running_applications
-from .app_management.launcher import launch_application
-from .app_management.scanner import scan_installed_applications
-from .tools import get_system_status, set_volume
-
 logger = get_logger(__name__)
 
+# 工具回调延迟到首次调用时才导入（避免启动时加载 psutil 等）
+_APP_MODULE = f"{__package__}.app_management"
+kill_application = lazy_callback(f"{_APP_MODULE}.killer", "kill_application")
+list_running_applications = lazy_callback(
+    f"{_APP_MODULE}.killer", "list_running_applications"
+)
+launch_application = lazy_callback(f"{_APP_MODULE}.launcher", "launch_application")
+scan_installed_applications = lazy_callback(
+    f"{_APP_MODULE}.scanner", "scan_installed_applications"
+)
+get_system_status = lazy_callback(f"{__package__}.tools", "get_system_status")
+set_volume = lazy_callback(f"{__package__}.tools", "set_volume")
+
 
 class SystemToolsManager:
     """
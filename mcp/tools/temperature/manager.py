@@ -3,12 +3,16 @@
 负责温度和湿度工具的初始化、配置和MCP工具注册
 """
 
+from src.mcp.lazy_loader import lazy_callback
 from src.utils.logging_config import get_logger
 
-from .tools import get_temperature_humidity_wrapper
-
 logger = get_logger(__name__)
 
+# 工具回调延迟到首次调用时才导入
+get_temperature_humidity_wrapper = lazy_callback(
+    f"{__package__}.tools", "get_temperature_humidity_wrapper"
+)
+
 
 class TemperatureToolsManager:
     """
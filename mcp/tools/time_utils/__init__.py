@@ -3,21 +3,6 @@
 提供节假日查询、正计时器、闹钟等时间相关功能。
 """
 
-# 导出工具方法
-from .tools import (
-    cancel_alarm,
-    create_stopwatch,
-    delete_stopwatch,
-    get_active_alarms,
-    get_all_stopwatches,
-    get_holiday_info,
-    get_stopwatch_status,
-    pause_stopwatch,
-    reset_stopwatch,
-    set_alarm,
-    start_stopwatch,
-)
-
 # 导出管理器获取方法，供 mcp_server 注册使用
 from .manager import TimeUtilsManager, get_time_utils_manager
 
@@ -35,4 +20,13 @@ __all__ = [
     "get_active_alarms",
     "TimeUtilsManager",
     "get_time_utils_manager",
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    # 工具方法依赖 aiohttp 等，按需导入
+    if name in __all__ and name not in ("TimeUtilsManager", "get_time_utils_manager"):
+        from . import tools
+
+        return getattr(tools, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
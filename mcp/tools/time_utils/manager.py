@@ -5,24 +5,25 @@
 
 from typing import Any, Dict
 
+from src.mcp.lazy_loader import lazy_callback
 from src.utils.logging_config import get_logger
 
-from .tools import (
-    cancel_alarm,
-    create_stopwatch,
-    delete_stopwatch,
-    get_active_alarms,
-    get_all_stopwatches,
-    get_holiday_info,
-    get_stopwatch_status,
-    pause_stopwatch,
-    reset_stopwatch,
-    set_alarm,
-    start_stopwatch,
-)
-
 logger = get_logger(__name__)
 
+# 工具回调延迟到首次调用时才导入（避免启动时加载 aiohttp）
+_TOOLS_MODULE = f"{__package__}.tools"
+cancel_alarm = lazy_callback(_TOOLS_MODULE, "cancel_alarm")
+create_stopwatch = lazy_callback(_TOOLS_MODULE, "create_stopwatch")
+delete_stopwatch = lazy_callback(_TOOLS_MODULE, "delete_stopwatch")
+get_active_alarms = lazy_callback(_TOOLS_MODULE, "get_active_alarms")
+get_all_stopwatches = lazy_callback(_TOOLS_MODULE, "get_all_stopwatches")
+get_holiday_info = lazy_callback(_TOOLS_MODULE, "get_holiday_info")
+get_stopwatch_status = lazy_callback(_TOOLS_MODULE, "get_stopwatch_status")
+pause_stopwatch = lazy_callback(_TOOLS_MODULE, "pause_stopwatch")
+reset_stopwatch = lazy_callback(_TOOLS_MODULE, "reset_stopwatch")
+set_alarm = lazy_callback(_TOOLS_MODULE, "set_alarm")
+start_stopwatch = lazy_callback(_TOOLS_MODULE, "start_stopwatch")
+
 
 class TimeUtilsManager:
     """
@@ -5,16 +5,17 @@
 
 from typing import Any, Dict
 
+from src.mcp.lazy_loader import lazy_callback
 from src.utils.logging_config import get_logger
 
-from .tools import (
-    cancel_countdown_timer,
-    get_active_countdown_timers,
-    start_countdown_timer,
-)
-
 logger = get_logger(__name__)
 
+# 工具回调延迟到首次调用时才导入
+_TOOLS_MODULE = f"{__package__}.tools"
+start_countdown_timer = lazy_callback(_TOOLS_MODULE, "start_countdown_timer")
+cancel_countdown_timer = lazy_callback(_TOOLS_MODULE, "cancel_countdown_timer")
+get_active_countdown_timers = lazy_callback(_TOOLS_MODULE, "get_active_countdown_timers")
+
 
 class TimerToolsManager:
     """
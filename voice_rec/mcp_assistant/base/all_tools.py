@@ -24,7 +24,11 @@ from tools.calendar_tools import (
     delete_event,
     delete_events_batch,
     get_categories,
-    get_upcoming_events
+    get_upcoming_events,
+    search_events,
+    import_events,
+    export_events,
+    get_cache_stats
 )
 from tools.ir_control_tools import (
     list_ir_codes,
@@ -57,6 +61,10 @@ mcp.tool()(delete_event)
 mcp.tool()(delete_events_batch)
 mcp.tool()(get_categories)
 mcp.tool()(get_upcoming_events)
+mcp.tool()(search_events)
+mcp.tool()(import_events)
+mcp.tool()(export_events)
+mcp.tool()(get_cache_stats)
 mcp.tool()(list_ir_codes)
 mcp.tool()(send_ir_by_name)
 mcp.tool()(learn_ir_and_save)
@@ -74,6 +82,7 @@ if __name__ == "__main__":
         "set_volume", "get_volume", "launch_application", "get_system_info",
         "create_event", "get_events_by_date", "update_event", "delete_event",
         "delete_events_batch", "get_categories", "get_upcoming_events",
+        "search_events", "import_events", "export_events", "get_cache_stats",
         "list_ir_codes", "send_ir_by_name", "learn_ir_and_save",
         "get_ir_code_info", "set_ir_code_info", "test_ir_connection",
         "get_learning_result", "web_search", "read_webpage"
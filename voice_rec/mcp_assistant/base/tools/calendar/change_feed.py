@@ -0,0 +1,310 @@
+"""
+日程变更日志与跨进程变更订阅.
+
+mcp/tools/calendar 与 voice_rec 中的日程副本可能打开同一个数据库文件，各自的提醒
+服务需要知道对方的写入。events 表上的触发器把每次增删改写入 event_changes 表，
+seq 为 AUTOINCREMENT 主键（单调递增、不复用），任何写入方（包括 sqlite3 命令行）
+都会留下记录；日志只保留最近 CHANGE_LOG_RETENTION 条，由触发器顺带清理。
+
+ChangeFeed 记住已分发到的 seq，按 seq 拉取新记录分发给订阅者：本进程提交后
+直接拉取；其他进程的提交由后台线程发现——Linux 上用 inotify 监视数据库文件与
+WAL 文件，文件被写入时醒来，其他平台退回定时检查 PRAGMA data_version。
+"""
+
+import os
+import select
+import sqlite3
+import threading
+from typing import Callable, List, Optional, Tuple
+
+from .utils import get_logger
+
+from .inotify import (
+    IN_CLOSE_WRITE,
+    IN_CREATE,
+    IN_MODIFY,
+    IN_MOVED_TO,
+    Inotify,
+    inotify_supported,
+)
+
+logger = get_logger(__name__)
+
+# 变更日志保留的记录数；订阅者落后超过这么多条时收到整体重载通知
+CHANGE_LOG_RETENTION = 10000
+# 一次拉取的最大记录数，超过时同样按整体重载通知
+CHANGE_BATCH_LIMIT = 1000
+
+CHANGE_LOG_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS event_changes (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        event_id TEXT NOT NULL,
+        op TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_change_insert AFTER INSERT ON events BEGIN
+        INSERT INTO event_changes (event_id, op) VALUES (new.id, 'insert');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_change_update AFTER UPDATE ON events BEGIN
+        INSERT INTO event_changes (event_id, op) VALUES (new.id, 'update');
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS events_change_delete AFTER DELETE ON events BEGIN
+        INSERT INTO event_changes (event_id, op) VALUES (old.id, 'delete');
+    END
+    """,
+    # 每写入 1000 条清理一次过旧的记录
+    f"""
+    CREATE TRIGGER IF NOT EXISTS event_changes_prune AFTER INSERT ON event_changes
+    WHEN new.seq % 1000 = 0 BEGIN
+        DELETE FROM event_changes WHERE seq <= new.seq - {CHANGE_LOG_RETENTION};
+    END
+    """,
+)
+
+# (seq, 事件ID, 操作 insert/update/delete)
+Change = Tuple[int, str, str]
+# 参数为变更的事件 ID 列表，None 表示变更过多或已无法得知，应整体重载
+ChangeListener = Callable[[Optional[List[str]]], None]
+
+
+class _InotifyWatcher:
+    """
+    用 inotify 监视数据库所在目录，数据库文件或 WAL 文件被写入时唤醒.
+    """
+
+    def __init__(self, db_file: str):
+        # 监视目录而不是文件：WAL 文件在最后一个连接关闭时被删除，之后重建
+        directory = os.path.dirname(os.path.abspath(db_file))
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+        self._inotify = Inotify(directory, mask)
+        name = os.path.basename(db_file)
+        self._names = {os.fsencode(name), os.fsencode(name + "-wal")}
+        self._wake_r, self._wake_w = os.pipe()
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """
+        等待数据库文件变化、wake() 或超时，数据库文件有变化时返回 True.
+        """
+        fd = self._inotify.fileno()
+        ready, _, _ = select.select([fd, self._wake_r], [], [], timeout)
+        if self._wake_r in ready:
+            os.read(self._wake_r, 4096)
+        if fd not in ready:
+            return False
+        return any(name in self._names for name in self._inotify.read_names())
+
+    def wake(self):
+        os.write(self._wake_w, b"\0")
+
+    def close(self):
+        self._inotify.close()
+        for fd in (self._wake_r, self._wake_w):
+            os.close(fd)
+
+
+class _PollingWatcher:
+    """
+    不支持 inotify 时的退路：每隔 interval 秒醒来检查一次.
+    """
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self._event = threading.Event()
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        if timeout is None or timeout > self.interval:
+            timeout = self.interval
+        self._event.wait(timeout)
+        self._event.clear()
+        # 无法得知文件是否变化，由调用方检查数据版本
+        return False
+
+    def wake(self):
+        self._event.set()
+
+    def close(self):
+        pass
+
+
+def _create_watcher(db_file: str, poll_interval: float, use_inotify: bool):
+    if use_inotify and inotify_supported():
+        try:
+            return _InotifyWatcher(db_file)
+        except OSError as e:
+            logger.warning(f"inotify 不可用，日程变更改为定时检查: {e}")
+    return _PollingWatcher(poll_interval)
+
+
+class ChangeFeed:
+    """
+    变更日志的订阅者：按 seq 拉取新记录并分发给回调.
+    """
+
+    def __init__(
+        self,
+        db_file: str,
+        poll_interval: float = 1.0,
+        idle_timeout: float = 60.0,
+        use_inotify: bool = True,
+    ):
+        self.db_file = db_file
+        self.use_inotify = use_inotify
+        # 不支持 inotify 时检查的间隔
+        self.poll_interval = poll_interval
+        # 使用 inotify 时也每隔这么久检查一次，防止漏掉通知（如网络文件系统）
+        self.idle_timeout = idle_timeout
+        self._listeners: List[ChangeListener] = []
+        self._lock = threading.RLock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._version: Optional[int] = None
+        self._cursor: Optional[int] = None
+        self._watcher = None
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def _connection(self) -> sqlite3.Connection:
+        # 专用的只读连接：PRAGMA data_version 只随其他连接的提交变化
+        if self._conn is None:
+            self._conn = sqlite3.connect(
+                self.db_file, timeout=5.0, check_same_thread=False
+            )
+        return self._conn
+
+    def latest_seq(self) -> int:
+        """
+        变更日志中最新的 seq（没有记录时为 0）.
+        """
+        with self._lock:
+            row = (
+                self._connection()
+                .execute("SELECT seq FROM sqlite_sequence WHERE name = 'event_changes'")
+                .fetchone()
+            )
+            return row[0] if row else 0
+
+    def changes_since(self, seq: int, limit: int = CHANGE_BATCH_LIMIT) -> List[Change]:
+        """按 seq 升序返回 seq 之后的变更记录，最多 limit 条.
+
+        第一条记录的 seq 大于 seq + 1 时，说明中间的记录已被清理。
+        """
+        with self._lock:
+            return self._connection().execute(
+                "SELECT seq, event_id, op FROM event_changes "
+                "WHERE seq > ? ORDER BY seq LIMIT ?",
+                (seq, limit),
+            ).fetchall()
+
+    def subscribe(self, listener: ChangeListener):
+        """
+        订阅此后的变更（回调在提交写入的线程或后台线程中调用，需自行切换线程）.
+        """
+        with self._lock:
+            if self._closed or listener in self._listeners:
+                return
+            if self._cursor is None:
+                self._cursor = self.latest_seq()
+                self._version = self._data_version()
+            self._listeners.append(listener)
+            self._start()
+
+    def unsubscribe(self, listener: ChangeListener):
+        """
+        取消订阅.
+        """
+        with self._lock:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def poll(self) -> int:
+        """
+        拉取新的变更记录并分发，返回拉取到的记录数.
+        """
+        return self._poll()[1]
+
+    def _poll(self) -> Tuple[bool, int]:
+        """
+        返回 (自上次检查后是否有新的提交, 拉取到的记录数).
+        """
+        with self._lock:
+            if not self._listeners:
+                return False, 0
+            version = self._data_version()
+            if version == self._version:
+                return False, 0
+            self._version = version
+
+            changes = self.changes_since(self._cursor)
+            if not changes:
+                return True, 0
+            # 中间的记录已被清理，或一次拉取不完（如批量导入），整体重载
+            if changes[0][0] > self._cursor + 1 or len(changes) >= CHANGE_BATCH_LIMIT:
+                self._cursor = self.latest_seq()
+                event_ids = None
+            else:
+                self._cursor = changes[-1][0]
+                event_ids = list(dict.fromkeys(change[1] for change in changes))
+            self._dispatch(event_ids)
+            return True, len(changes)
+
+    def _data_version(self) -> int:
+        return self._connection().execute("PRAGMA data_version").fetchone()[0]
+
+    def _dispatch(self, event_ids: Optional[List[str]]):
+        for listener in list(self._listeners):
+            try:
+                listener(event_ids)
+            except Exception as e:
+                logger.warning(f"事件变更回调失败: {e}")
+
+    def _start(self):
+        if self._thread is not None:
+            return
+        self._watcher = _create_watcher(
+            self.db_file, self.poll_interval, self.use_inotify
+        )
+        self._thread = threading.Thread(
+            target=self._watch_loop, name="calendar-change-feed", daemon=True
+        )
+        self._thread.start()
+
+    def _watch_loop(self):
+        while not self._closed:
+            changed = self._watcher.wait(self.idle_timeout)
+            if self._closed:
+                return
+            try:
+                committed, _ = self._poll()
+                if not changed or committed:
+                    continue
+                # 文件已写入但提交可能尚未可见（WAL 索引稍后更新），稍后重试几次
+                for delay in (0.001, 0.004, 0.016):
+                    self._watcher.wait(delay)
+                    if self._closed or self._poll()[0]:
+                        break
+            except sqlite3.Error as e:
+                logger.warning(f"读取日程变更日志失败: {e}")
+
+    def close(self):
+        """
+        停止后台线程并关闭连接.
+        """
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._listeners.clear()
+            thread, watcher = self._thread, self._watcher
+        if watcher is not None:
+            watcher.wake()
+            thread.join()
+            watcher.close()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
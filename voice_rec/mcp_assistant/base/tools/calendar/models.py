@@ -4,7 +4,7 @@
 
 import uuid
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 
 class CalendarEvent:
@@ -21,6 +21,7 @@ class CalendarEvent:
         category: str = "默认",
         reminder_minutes: int = 15,
         event_id: str = None,
+        rrule: Optional[str] = None,
     ):
         self.id = event_id or str(uuid.uuid4())
         self.title = title
@@ -29,6 +30,7 @@ class CalendarEvent:
         self.description = description
         self.category = category
         self.reminder_minutes = reminder_minutes
+        self.rrule = rrule or None  # 重复规则（RRULE），None 表示单次事件
         self.reminder_time = self._calculate_reminder_time()
         self.reminder_sent = False
         self.created_at = datetime.now().isoformat()
@@ -50,6 +52,7 @@ class CalendarEvent:
             "reminder_sent": self.reminder_sent,
             "created_at": self.created_at,
             "updated_at": self.updated_at,
+            "rrule": self.rrule,
         }
 
     @classmethod
@@ -65,6 +68,7 @@ class CalendarEvent:
             category=data.get("category", "默认"),
             reminder_minutes=data.get("reminder_minutes", 15),
             event_id=data["id"],
+            rrule=data.get("rrule"),
         )
         event.reminder_time = data.get("reminder_time", event.reminder_time)
         event.reminder_sent = data.get("reminder_sent", False)
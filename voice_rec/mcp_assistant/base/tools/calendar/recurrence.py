@@ -0,0 +1,319 @@
+"""
+日程重复规则.
+
+支持 RFC 5545 RRULE 的常用子集：FREQ=DAILY/WEEKLY/MONTHLY/YEARLY、INTERVAL、
+BYDAY（不带序号的星期，如 MO,TU,WE）、COUNT 与 UNTIL。重复事件在数据库中只保存
+一行，查询时按窗口惰性展开：直接定位到窗口所在的周期，只生成窗口内的发生时间，
+开销与系列总长度无关。
+"""
+
+import calendar
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+
+# 连续这么多个周期都没有发生时间时停止展开（如间隔总落在没有 31 日的月份）
+_MAX_EMPTY_PERIODS = 1000
+# 无限重复的系列只在这段时间内检查冲突
+CONFLICT_HORIZON = timedelta(days=366)
+
+
+def parse_datetime(text: str) -> datetime:
+    """
+    解析 ISO 时间，带时区的时间转换为本地时间并去掉时区，便于与本地时间比较.
+    """
+    value = datetime.fromisoformat(text)
+    if value.tzinfo is not None:
+        value = value.astimezone().replace(tzinfo=None)
+    return value
+
+
+def _parse_until(text: str) -> datetime:
+    # RFC 5545 格式：20261231 / 20261231T235959 / 20261231T235959Z
+    if text.isdigit() and len(text) == 8:
+        return datetime.strptime(text, "%Y%m%d") + timedelta(days=1, microseconds=-1)
+    if len(text) >= 15 and text[8] == "T" and text[:8].isdigit():
+        value = datetime.strptime(text[:15], "%Y%m%dT%H%M%S")
+        if text.endswith("Z"):
+            value = value.replace(tzinfo=timezone.utc).astimezone()
+            value = value.replace(tzinfo=None)
+        return value
+    return parse_datetime(text)
+
+
+@dataclass(frozen=True)
+class RecurrenceRule:
+    """
+    重复规则（不可变，可作为缓存键）.
+    """
+
+    freq: str
+    interval: int = 1
+    by_day: Tuple[int, ...] = ()
+    count: Optional[int] = None
+    until: Optional[datetime] = None
+
+    @classmethod
+    def parse(cls, text: str) -> "RecurrenceRule":
+        """解析 RRULE 文本，如 "FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR".
+
+        不支持的写法抛出 ValueError。
+        """
+        return _parse_rule(text.strip())
+
+    def __str__(self) -> str:
+        parts = [f"FREQ={self.freq}"]
+        if self.interval != 1:
+            parts.append(f"INTERVAL={self.interval}")
+        if self.by_day:
+            parts.append("BYDAY=" + ",".join(WEEKDAYS[d] for d in self.by_day))
+        if self.count is not None:
+            parts.append(f"COUNT={self.count}")
+        if self.until is not None:
+            parts.append(f"UNTIL={self.until.strftime('%Y%m%dT%H%M%S')}")
+        return ";".join(parts)
+
+    def occurrences(
+        self,
+        dtstart: datetime,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> Iterator[datetime]:
+        """
+        按时间顺序生成 start <= t < end 的发生时间（start/end 为 None 表示不限）.
+        """
+        period = 0
+        if start is not None and start > dtstart:
+            period = self._period_of(dtstart, start)
+        index = self._count_before(dtstart, period) if self.count is not None else 0
+        empty = 0
+        while empty <= _MAX_EMPTY_PERIODS:
+            occurrences = self._period_occurrences(dtstart, period)
+            empty = 0 if occurrences else empty + 1
+            for occurrence in occurrences:
+                if self.count is not None and index >= self.count:
+                    return
+                if self.until is not None and occurrence > self.until:
+                    return
+                if end is not None and occurrence >= end:
+                    return
+                index += 1
+                if start is None or occurrence >= start:
+                    yield occurrence
+            period += 1
+
+    def next_after(self, dtstart: datetime, after: datetime) -> Optional[datetime]:
+        """
+        晚于 after 的第一次发生时间，系列已结束时返回 None.
+        """
+        return next(
+            self.occurrences(dtstart, start=after + timedelta(microseconds=1)), None
+        )
+
+    def last_start(self, dtstart: datetime) -> Optional[datetime]:
+        """最后一次发生时间的上界，无限重复时返回 None.
+
+        有 UNTIL 时直接取 UNTIL；有 COUNT 时逐个展开（只在写入时计算一次）。
+        """
+        if self.until is not None:
+            return self.until
+        if self.count is not None:
+            last = deque(self.occurrences(dtstart), maxlen=1)
+            return last[0] if last else dtstart
+        return None
+
+    # ==================== 周期定位 ====================
+
+    def _weekdays(self, dtstart: datetime) -> Tuple[int, ...]:
+        return self.by_day or (dtstart.weekday(),)
+
+    def _period_of(self, dtstart: datetime, moment: datetime) -> int:
+        """
+        moment 所在周期的序号.
+        """
+        if self.freq == "DAILY":
+            return (moment.date() - dtstart.date()).days // self.interval
+        if self.freq == "WEEKLY":
+            week0 = dtstart.date() - timedelta(days=dtstart.weekday())
+            return (moment.date() - week0).days // 7 // self.interval
+        if self.freq == "MONTHLY":
+            months = (moment.year - dtstart.year) * 12 + moment.month - dtstart.month
+            return months // self.interval
+        return (moment.year - dtstart.year) // self.interval
+
+    def _period_occurrences(self, dtstart: datetime, period: int) -> List[datetime]:
+        """
+        第 period 个周期内的发生时间（不早于 dtstart）.
+        """
+        if self.freq == "DAILY":
+            day = dtstart + timedelta(days=period * self.interval)
+            if self.by_day and day.weekday() not in self.by_day:
+                return []
+            return [day]
+        if self.freq == "WEEKLY":
+            week = dtstart - timedelta(
+                days=dtstart.weekday() - period * self.interval * 7
+            )
+            return [
+                occurrence
+                for occurrence in (
+                    week + timedelta(days=d) for d in self._weekdays(dtstart)
+                )
+                if occurrence >= dtstart
+            ]
+        if self.freq == "MONTHLY":
+            year, month = divmod(dtstart.month - 1 + period * self.interval, 12)
+            year += dtstart.year
+            month += 1
+            # 当月没有这一天（如 31 日、2 月 30 日）时跳过，与 RFC 5545 一致
+            if dtstart.day > calendar.monthrange(year, month)[1]:
+                return []
+            return [dtstart.replace(year=year, month=month)]
+        try:
+            return [dtstart.replace(year=dtstart.year + period * self.interval)]
+        except ValueError:  # 2 月 29 日遇到平年
+            return []
+
+    def _count_before(self, dtstart: datetime, period: int) -> int:
+        """
+        前 period 个周期内的发生次数（用于 COUNT 定位）.
+        """
+        if period <= 0:
+            return 0
+        if self.freq == "DAILY":
+            if not self.by_day:
+                return period
+            # 星期按 7 个周期循环
+            weekday0 = dtstart.weekday()
+            hits = [(weekday0 + j * self.interval) % 7 in self.by_day for j in range(7)]
+            cycles, rest = divmod(period, 7)
+            return cycles * sum(hits) + sum(hits[:rest])
+        if self.freq == "WEEKLY":
+            weekdays = self._weekdays(dtstart)
+            first = sum(1 for d in weekdays if d >= dtstart.weekday())
+            return first + (period - 1) * len(weekdays)
+        if self.freq == "MONTHLY" and dtstart.day <= 28:
+            return period
+        if self.freq == "YEARLY" and (dtstart.month, dtstart.day) != (2, 29):
+            return period
+        # 会跳过个别周期的月/年规则逐个计数（每年至多 12 个周期）
+        return sum(len(self._period_occurrences(dtstart, j)) for j in range(period))
+
+
+@lru_cache(maxsize=256)
+def _parse_rule(text: str) -> RecurrenceRule:
+    if text.upper().startswith("RRULE:"):
+        text = text[6:]
+    fields = {}
+    for part in filter(None, text.split(";")):
+        key, sep, value = part.partition("=")
+        if not sep or not value:
+            raise ValueError(f"重复规则格式错误: {part}")
+        fields[key.strip().upper()] = value.strip()
+
+    freq = fields.pop("FREQ", "").upper()
+    if freq not in FREQUENCIES:
+        raise ValueError(f"不支持的重复频率: {freq or '未指定'}")
+
+    interval = _positive_int(fields.pop("INTERVAL", "1"), "INTERVAL")
+    count = fields.pop("COUNT", None)
+    count = _positive_int(count, "COUNT") if count is not None else None
+    until = fields.pop("UNTIL", None)
+    until = _parse_until(until) if until is not None else None
+    if count is not None and until is not None:
+        raise ValueError("COUNT 与 UNTIL 不能同时使用")
+
+    by_day: Tuple[int, ...] = ()
+    if "BYDAY" in fields:
+        if freq not in ("DAILY", "WEEKLY"):
+            raise ValueError("BYDAY 只支持 DAILY 或 WEEKLY 频率")
+        names = [name.strip().upper() for name in fields.pop("BYDAY").split(",")]
+        unknown = [name for name in names if name not in WEEKDAYS]
+        if unknown:
+            raise ValueError(f"不支持的 BYDAY 取值: {','.join(unknown)}")
+        by_day = tuple(sorted({WEEKDAYS.index(name) for name in names}))
+
+    # 周按周一起算
+    if fields.pop("WKST", "MO").upper() != "MO":
+        raise ValueError("只支持 WKST=MO")
+    if fields:
+        raise ValueError(f"不支持的重复规则字段: {','.join(fields)}")
+    return RecurrenceRule(freq, interval, by_day, count, until)
+
+
+def _positive_int(value: str, name: str) -> int:
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{name} 必须是正整数: {value}")
+    if number < 1:
+        raise ValueError(f"{name} 必须是正整数: {value}")
+    return number
+
+
+class RecurringSeries:
+    """
+    数据库中的一个重复事件：行内的开始/结束时间是第一次发生，rrule 为重复规则.
+    """
+
+    def __init__(self, row: Dict[str, Any]):
+        self.row = row
+        self.rule = RecurrenceRule.parse(row["rrule"])
+        self.dtstart = parse_datetime(row["start_time"])
+        self.duration = parse_datetime(row["end_time"]) - self.dtstart
+
+    def last_end(self) -> Optional[datetime]:
+        """
+        最后一次发生的结束时间上界，无限重复时返回 None.
+        """
+        last = self.rule.last_start(self.dtstart)
+        return last + self.duration if last is not None else None
+
+    def horizon(self) -> datetime:
+        """
+        冲突检测覆盖到的时间：有限系列到最后一次结束，无限系列只看一年.
+        """
+        last_end = self.last_end()
+        if last_end is not None:
+            return last_end
+        return self.dtstart + CONFLICT_HORIZON + self.duration
+
+    def next_start(self, after: datetime) -> Optional[datetime]:
+        return self.rule.next_after(self.dtstart, after)
+
+    def occurrence(self, start: datetime) -> Dict[str, Any]:
+        """
+        某一次发生对应的事件字典（ID 与所属系列相同）.
+        """
+        event = dict(self.row)
+        reminder_time = start - timedelta(minutes=event.get("reminder_minutes") or 0)
+        event["start_time"] = start.isoformat()
+        event["end_time"] = (start + self.duration).isoformat()
+        event["reminder_time"] = reminder_time.isoformat()
+        # 系列行的 reminder_time 指向下一次待提醒的发生，更早的都已提醒过
+        event["reminder_sent"] = bool(self.row.get("reminder_sent")) or (
+            event["reminder_time"] < (self.row.get("reminder_time") or "")
+        )
+        return event
+
+    def expand(self, start: Optional[datetime], end: datetime) -> Iterator[Dict]:
+        """
+        开始时间在 [start, end) 内的各次发生.
+        """
+        for occurrence in self.rule.occurrences(self.dtstart, start, end):
+            yield self.occurrence(occurrence)
+
+    def overlapping(self, start: datetime, end: datetime) -> Iterator[Dict]:
+        """
+        与 [start, end) 时间段重叠的各次发生.
+        """
+        for occurrence in self.rule.occurrences(
+            self.dtstart, start - self.duration, end
+        ):
+            if occurrence + self.duration > start:
+                yield self.occurrence(occurrence)
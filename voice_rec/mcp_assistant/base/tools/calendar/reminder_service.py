@@ -1,29 +1,185 @@
 """
-日程提醒服务 定期检查数据库中的事件，当到达提醒时间时通过TTS播报提醒.
+日程提醒服务 按提醒时间调度数据库中的事件，到达提醒时间时通过TTS播报提醒.
+
+待提醒事件按提醒时间放入最小堆（从数据库分批加载），服务只在最早的提醒时间
+到达时醒来；事件增删改（包括其他进程的写入）通过数据库的变更回调唤醒服务重新
+排程，不轮询数据库；系统时间跳变（如开机后 NTP 校时）由 timerfd 察觉，无需定时醒来。
+重复事件的 reminder_time 只指向下一次发生，提醒后推进到再下一次。
+数据库读写经由异步访问层在后台线程执行，不阻塞事件循环。
 """
 
 import asyncio
+import ctypes
+import ctypes.util
+import errno
+import heapq
 import json
+import os
+import sys
+import threading
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, List, Optional, Set, Tuple
 
 from .utils import get_logger
 
-from .database import get_calendar_database
+from .async_database import AsyncCalendarDatabase, get_async_calendar_database
+from .database import CalendarDatabase
+from .recurrence import RecurringSeries, parse_datetime
 
 logger = get_logger(__name__)
 
 
+# 不支持 timerfd 时单次睡眠的上限（秒）。没有 RTC 的设备开机后 NTP 校时可能让
+# 系统时间向前跳几个小时，按跳变前的时间算出的睡眠时长会让提醒迟到，分段睡眠
+# 并按当前时间重新计算
+MAX_SLEEP_SECONDS = 60.0
+
+_CLOCK_REALTIME = 0
+_TFD_TIMER_ABSTIME = 1
+_TFD_TIMER_CANCEL_ON_SET = 2
+
+
+class _Timespec(ctypes.Structure):
+    _fields_ = [("tv_sec", ctypes.c_long), ("tv_nsec", ctypes.c_long)]
+
+
+class _Itimerspec(ctypes.Structure):
+    _fields_ = [("it_interval", _Timespec), ("it_value", _Timespec)]
+
+
+_libc = None
+
+
+def _load_libc():
+    global _libc
+    if _libc is None:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    return _libc
+
+
+class SystemClock:
+    """
+    提醒服务使用的时钟：读取当前时间，并等待唤醒事件或超时.
+    """
+
+    def __init__(self):
+        self._use_timerfd = sys.platform.startswith("linux")
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    async def wait(self, event: asyncio.Event, timeout: Optional[float]) -> bool:
+        """
+        等待 event 被设置或超时（timeout 为 None 时一直等待），被唤醒时返回 True.
+
+        超时按系统时间计算。Linux 上用 CLOCK_REALTIME 的 timerfd 在截止时刻醒来，
+        系统时间被修改时内核取消定时器（TFD_TIMER_CANCEL_ON_SET），按新时间重新
+        设定；其他平台每次最多睡眠 MAX_SLEEP_SECONDS 后按当前时间检查。
+        """
+        if timeout is None:
+            await event.wait()
+            return True
+        deadline = self.now() + timedelta(seconds=timeout)
+        if self._use_timerfd:
+            try:
+                fd = self._create_timerfd()
+            except (OSError, AttributeError) as e:
+                logger.warning(f"timerfd 不可用，提醒改为分段睡眠: {e}")
+                self._use_timerfd = False
+            else:
+                try:
+                    return await self._wait_timerfd(fd, event, deadline)
+                finally:
+                    os.close(fd)
+        while True:
+            remaining = (deadline - self.now()).total_seconds()
+            if remaining <= 0:
+                return False
+            try:
+                await asyncio.wait_for(event.wait(), min(remaining, MAX_SLEEP_SECONDS))
+                return True
+            except asyncio.TimeoutError:
+                continue
+
+    @staticmethod
+    def _create_timerfd() -> int:
+        fd = _load_libc().timerfd_create(
+            _CLOCK_REALTIME, os.O_NONBLOCK | os.O_CLOEXEC
+        )
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "timerfd_create 失败")
+        return fd
+
+    @staticmethod
+    def _arm_timerfd(fd: int, deadline: datetime):
+        sec, frac = divmod(deadline.timestamp(), 1)
+        spec = _Itimerspec()
+        spec.it_value.tv_sec = int(sec)
+        # it_value 全零表示解除定时器，截止时刻恰为整秒时至少留 1 纳秒
+        spec.it_value.tv_nsec = max(int(frac * 1e9), 1)
+        flags = _TFD_TIMER_ABSTIME | _TFD_TIMER_CANCEL_ON_SET
+        if _load_libc().timerfd_settime(fd, flags, ctypes.byref(spec), None) < 0:
+            raise OSError(ctypes.get_errno(), "timerfd_settime 失败")
+
+    async def _wait_timerfd(
+        self, fd: int, event: asyncio.Event, deadline: datetime
+    ) -> bool:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._arm_timerfd(fd, deadline)
+            expired = loop.create_future()
+            loop.add_reader(fd, lambda: expired.done() or expired.set_result(None))
+            waiter = asyncio.ensure_future(event.wait())
+            try:
+                await asyncio.wait(
+                    {waiter, expired}, return_when=asyncio.FIRST_COMPLETED
+                )
+            finally:
+                loop.remove_reader(fd)
+                waiter.cancel()
+            if event.is_set():
+                return True
+            try:
+                os.read(fd, 8)
+                return False
+            except OSError as e:
+                # ECANCELED：系统时间被修改，按新的时间重新设定截止时刻
+                if e.errno not in (errno.ECANCELED, errno.EAGAIN):
+                    raise
+
+
 class CalendarReminderService:
     """
     日程提醒服务.
     """
 
-    def __init__(self):
-        self.db = get_calendar_database()
+    def __init__(
+        self,
+        db: Optional[CalendarDatabase] = None,
+        clock: Optional[SystemClock] = None,
+    ):
+        # 未指定数据库时与日程工具共用异步访问层（同一个写线程）
+        self._owns_adb = db is not None
+        self.adb = AsyncCalendarDatabase(db) if db else get_async_calendar_database()
+        self.db = self.adb.db
+        self.clock = clock or SystemClock()
         self.is_running = False
         self._task: Optional[asyncio.Task] = None
-        self.check_interval = 30  # 检查间隔（秒）
+        self.batch_size = 64  # 每次从数据库加载的待提醒事件数
+
+        # 最小堆 (提醒时间, 事件ID)；_scheduled 记录事件当前有效的提醒时间，
+        # 堆中提醒时间与之不一致的条目视为已失效，出堆时丢弃
+        self._heap: List[Tuple[str, str]] = []
+        self._scheduled: Dict[str, str] = {}
+        # 已加载到的位置，None 表示数据库中的待提醒事件已全部加载
+        self._cursor: Optional[Tuple[str, str]] = ("", "")
+
+        # 数据库变更可能来自其他线程，记录后唤醒事件循环中的调度任务
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._changes_lock = threading.Lock()
+        self._changed_ids: Set[str] = set()
+        self._reload_requested = True
 
     def _get_application(self):
         """
@@ -46,11 +202,17 @@ class CalendarReminderService:
             return
 
         self.is_running = True
-        self._task = asyncio.create_task(self._reminder_loop())
-        logger.info("日程提醒服务已启动")
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self.db.add_change_listener(self._on_events_changed)
 
-        # 程序启动时重置未来事件的提醒标志
+        # 程序启动时重置未来事件的提醒标志，并清理过期事件
         await self.reset_reminder_flags_for_future_events()
+        await self._cleanup_expired_reminders()
+        self._request_reload()
+
+        self._task = asyncio.create_task(self._reminder_loop())
+        logger.info("日程提醒服务已启动")
 
     async def stop(self):
         """
@@ -60,6 +222,7 @@ class CalendarReminderService:
             return
 
         self.is_running = False
+        self.db.remove_change_listener(self._on_events_changed)
         if self._task:
             self._task.cancel()
             try:
@@ -67,50 +230,192 @@ class CalendarReminderService:
             except asyncio.CancelledError:
                 pass
             self._task = None
+        if self._owns_adb:
+            await asyncio.get_running_loop().run_in_executor(None, self.adb.close)
 
         logger.info("日程提醒服务已停止")
 
     async def _reminder_loop(self):
         """
-        提醒检查循环.
+        提醒调度循环：睡眠到最早的提醒时间，或被事件变更唤醒.
         """
-        logger.info("开始日程提醒检查循环")
+        logger.info("开始日程提醒调度循环")
 
         while self.is_running:
             try:
-                await self._check_and_send_reminders()
-                # 定期清理过期事件的提醒标志
-                await self._cleanup_expired_reminders()
-                await asyncio.sleep(self.check_interval)
+                await self._apply_changes()
+                deadline = await self._next_deadline()
+                now = self.clock.now()
+
+                if deadline is not None and deadline <= now:
+                    await self._pop_due(now)
+                    await self._check_and_send_reminders()
+                    await self._cleanup_expired_reminders()
+                    continue
+
+                timeout = None
+                if deadline is not None:
+                    timeout = (deadline - now).total_seconds()
+                await self.clock.wait(self._wakeup, timeout)
+                self._wakeup.clear()
             except asyncio.CancelledError:
                 break
             except Exception as e:
-                logger.error(f"提醒检查循环出错: {e}", exc_info=True)
-                await asyncio.sleep(self.check_interval)
+                logger.error(f"提醒调度循环出错: {e}", exc_info=True)
+                self._request_reload()
+                await self.clock.wait(self._wakeup, 30)
+                self._wakeup.clear()
+
+    def _on_events_changed(self, event_ids: Optional[List[str]]):
+        """
+        数据库变更回调，可能在任意线程中调用.
+        """
+        with self._changes_lock:
+            if event_ids is None:
+                self._reload_requested = True
+            else:
+                self._changed_ids.update(event_ids)
+        self._wake()
+
+    def _request_reload(self):
+        with self._changes_lock:
+            self._reload_requested = True
+        self._wake()
+
+    def _wake(self):
+        if self._loop is None or self._wakeup is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass  # 事件循环已关闭
+
+    async def _apply_changes(self):
+        """
+        将变更的事件重新排入堆中（整体重载时清空堆后从头加载）.
+        """
+        with self._changes_lock:
+            reload = self._reload_requested
+            changed = list(self._changed_ids)
+            self._reload_requested = False
+            self._changed_ids.clear()
+
+        # 变更过多（如批量导入）时整体重载比逐个查询更省事
+        if reload or len(changed) > self.batch_size:
+            self._heap = []
+            self._scheduled = {}
+            self._cursor = ("", "")
+            return
+        if not changed:
+            return
+
+        for event_id in changed:
+            self._scheduled.pop(event_id, None)
+
+        rows = await self.adb.read(
+            self._query_pending, changed, self._expiry_threshold()
+        )
+        for event_id, reminder_time in rows:
+            # 超出已加载范围的事件留待后续分批加载
+            if self._cursor is None or (reminder_time, event_id) <= self._cursor:
+                self._schedule(event_id, reminder_time)
+
+    def _query_pending(self, event_ids: List[str], threshold: str) -> List[tuple]:
+        placeholders = ", ".join("?" * len(event_ids))
+        with self.db._get_connection() as conn:
+            return conn.execute(
+                f"""
+                SELECT id, reminder_time FROM events
+                WHERE id IN ({placeholders})
+                AND reminder_sent = 0 AND reminder_time IS NOT NULL
+                AND (start_time > ? OR rrule IS NOT NULL)
+            """,
+                (*event_ids, threshold),
+            ).fetchall()
+
+    def _schedule(self, event_id: str, reminder_time: str):
+        self._scheduled[event_id] = reminder_time
+        heapq.heappush(self._heap, (reminder_time, event_id))
+
+    async def _load_next_batch(self):
+        """
+        按 (提醒时间, 事件ID) 顺序从数据库加载下一批待提醒事件.
+        """
+        rows = await self.adb.read(
+            self._query_next_batch, self._cursor, self._expiry_threshold()
+        )
+        for event_id, reminder_time in rows:
+            self._schedule(event_id, reminder_time)
+        if len(rows) < self.batch_size:
+            self._cursor = None
+        else:
+            self._cursor = (rows[-1][1], rows[-1][0])
+
+    def _query_next_batch(self, cursor: Tuple[str, str], threshold: str) -> List:
+        with self.db._get_connection() as conn:
+            return conn.execute(
+                """
+                SELECT id, reminder_time FROM events
+                WHERE reminder_sent = 0
+                AND reminder_time IS NOT NULL
+                AND (reminder_time, id) > (?, ?)
+                AND (start_time > ? OR rrule IS NOT NULL)
+                ORDER BY reminder_time, id
+                LIMIT ?
+            """,
+                (*cursor, threshold, self.batch_size),
+            ).fetchall()
+
+    async def _next_deadline(self) -> Optional[datetime]:
+        """
+        堆顶有效条目的提醒时间，堆空时按需加载下一批.
+        """
+        while True:
+            while self._heap:
+                reminder_time, event_id = self._heap[0]
+                if self._scheduled.get(event_id) != reminder_time:
+                    heapq.heappop(self._heap)
+                    continue
+                try:
+                    deadline = datetime.fromisoformat(reminder_time)
+                except ValueError:
+                    logger.warning(f"事件 {event_id} 的提醒时间无效: {reminder_time}")
+                    heapq.heappop(self._heap)
+                    del self._scheduled[event_id]
+                    continue
+                if deadline.tzinfo is not None:
+                    deadline = deadline.astimezone().replace(tzinfo=None)
+                return deadline
+
+            if self._cursor is None:
+                return None
+            await self._load_next_batch()
+
+    async def _pop_due(self, now: datetime):
+        """
+        移出提醒时间已到的条目（是否发送以数据库查询为准）.
+        """
+        while True:
+            deadline = await self._next_deadline()
+            if deadline is None or deadline > now:
+                return
+            _, event_id = heapq.heappop(self._heap)
+            del self._scheduled[event_id]
+
+    def _expiry_threshold(self) -> str:
+        """
+        开始时间早于该值（一小时前）的事件不再提醒.
+        """
+        return (self.clock.now() - timedelta(hours=1)).isoformat()
 
     async def _check_and_send_reminders(self):
         """
         检查并发送提醒.
         """
         try:
-            now = datetime.now()
-
-            # 查询所有未发送提醒且提醒时间已到的事件
-            # 同时确保事件还没有过期（开始时间在当前时间之后或者在合理的过期时间内）
-            with self.db._get_connection() as conn:
-                cursor = conn.execute(
-                    """
-                    SELECT * FROM events
-                    WHERE reminder_sent = 0
-                    AND reminder_time IS NOT NULL
-                    AND reminder_time <= ?
-                    AND start_time > ?
-                    ORDER BY reminder_time
-                """,
-                    (now.isoformat(), (now - timedelta(hours=1)).isoformat()),
-                )
+            now = self.clock.now()
 
-                pending_reminders = cursor.fetchall()
+            pending_reminders = await self.adb.read(self._query_due, now)
 
             if not pending_reminders:
                 return
@@ -119,11 +424,78 @@ class CalendarReminderService:
 
             # 处理每个提醒
             for reminder in pending_reminders:
-                await self._send_reminder(dict(reminder))
+                if reminder["rrule"]:
+                    await self._send_series_reminder(dict(reminder), now)
+                else:
+                    await self._send_reminder(dict(reminder))
 
         except Exception as e:
             logger.error(f"检查提醒失败: {e}", exc_info=True)
 
+    def _query_due(self, now: datetime) -> List:
+        # 查询所有未发送提醒且提醒时间已到的事件
+        # 同时确保事件还没有过期（开始时间在当前时间之后或者在合理的过期时间内）
+        with self.db._get_connection() as conn:
+            cursor = conn.execute(
+                """
+                SELECT * FROM events
+                WHERE reminder_sent = 0
+                AND reminder_time IS NOT NULL
+                AND reminder_time <= ?
+                AND (start_time > ? OR rrule IS NOT NULL)
+                ORDER BY reminder_time
+            """,
+                (now.isoformat(), (now - timedelta(hours=1)).isoformat()),
+            )
+            return cursor.fetchall()
+
+    async def _send_series_reminder(self, event_data: dict, now: datetime):
+        """
+        提醒重复事件的当前一次发生，并把提醒推进到下一次（开始超过一小时的跳过）.
+        """
+        series = RecurringSeries(event_data)
+        occurrence = parse_datetime(event_data["reminder_time"]) + timedelta(
+            minutes=event_data["reminder_minutes"] or 0
+        )
+        expiry = now - timedelta(hours=1)
+        if occurrence > expiry:
+            await self._send_reminder(series.occurrence(occurrence))
+        await self._advance_series(series, max(occurrence, expiry))
+
+    async def _advance_series(self, series: RecurringSeries, after: datetime):
+        """
+        将重复事件的提醒时间指向 after 之后的下一次发生，系列结束时标记为已提醒.
+        """
+        next_start = series.next_start(after)
+        try:
+            await self.adb.write(
+                self._write_series_reminder, series, next_start, self.clock.now()
+            )
+        except Exception as e:
+            logger.error(f"推进重复事件提醒失败: {e}", exc_info=True)
+
+    @staticmethod
+    def _write_series_reminder(
+        conn, series: RecurringSeries, next_start: Optional[datetime], now: datetime
+    ):
+        event_id = series.row["id"]
+        if next_start is None:
+            conn.execute(
+                "UPDATE events SET reminder_sent = 1, updated_at = ? WHERE id = ?",
+                (now.isoformat(), event_id),
+            )
+        else:
+            reminder_time = next_start - timedelta(
+                minutes=series.row["reminder_minutes"] or 0
+            )
+            conn.execute(
+                "UPDATE events SET reminder_time = ?, reminder_sent = 0, "
+                "updated_at = ? WHERE id = ?",
+                (reminder_time.isoformat(), now.isoformat(), event_id),
+            )
+        # 变更通知会唤醒调度循环，按新的提醒时间重新排程
+        return None, [event_id]
+
     async def _send_reminder(self, event_data: dict):
         """
         发送单个提醒.
@@ -137,7 +509,7 @@ class CalendarReminderService:
 
             # 计算距离开始时间
             start_dt = datetime.fromisoformat(start_time)
-            now = datetime.now()
+            now = self.clock.now()
             time_until = start_dt - now
 
             if time_until.total_seconds() > 0:
@@ -207,42 +579,41 @@ class CalendarReminderService:
         标记提醒已发送.
         """
         try:
-            with self.db._get_connection() as conn:
-                conn.execute(
-                    """
-                    UPDATE events
-                    SET reminder_sent = 1, updated_at = ?
-                    WHERE id = ?
-                """,
-                    (datetime.now().isoformat(), event_id),
-                )
-                conn.commit()
-
+            await self.adb.write(
+                self._write_reminder_sent, event_id, self.clock.now().isoformat()
+            )
             logger.debug(f"已标记提醒为已发送: {event_id}")
 
         except Exception as e:
             logger.error(f"标记提醒已发送失败: {e}", exc_info=True)
 
+    @staticmethod
+    def _write_reminder_sent(conn, event_id: str, now: str):
+        conn.execute(
+            """
+            UPDATE events
+            SET reminder_sent = 1, updated_at = ?
+            WHERE id = ?
+        """,
+            (now, event_id),
+        )
+        # 已提醒的事件出堆后不再排程，无需通知
+        return None, []
+
     async def check_daily_events(self):
         """
         检查今日事件（可在程序启动时调用）
         """
         try:
-            now = datetime.now()
+            now = self.clock.now()
             today_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
             today_end = today_start + timedelta(days=1)
 
-            with self.db._get_connection() as conn:
-                cursor = conn.execute(
-                    """
-                    SELECT * FROM events
-                    WHERE start_time >= ? AND start_time < ?
-                    ORDER BY start_time
-                """,
-                    (today_start.isoformat(), today_end.isoformat()),
-                )
-
-                today_events = cursor.fetchall()
+            # 含当天展开的重复事件；结束日期是包含的，取次日零点前一刻
+            today_events = await self.adb.get_events(
+                today_start.isoformat(),
+                (today_end - timedelta(microseconds=1)).isoformat(),
+            )
 
             if today_events:
                 logger.info(f"今日有 {len(today_events)} 个日程")
@@ -252,7 +623,7 @@ class CalendarReminderService:
                     "type": "daily_schedule",
                     "date": today_start.strftime("%Y-%m-%d"),
                     "total_events": len(today_events),
-                    "events": [dict(event) for event in today_events],
+                    "events": today_events,
                     "message": self._format_daily_summary(today_events),
                 }
 
@@ -294,48 +665,42 @@ class CalendarReminderService:
         重置未来事件的提醒标志（程序重启时调用）
         """
         try:
-            now = datetime.now()
-
-            with self.db._get_connection() as conn:
-                # 重置所有未来事件的提醒标志
-                cursor = conn.execute(
-                    """
-                    UPDATE events
-                    SET reminder_sent = 0, updated_at = ?
-                    WHERE start_time > ? AND reminder_sent = 1
-                """,
-                    (now.isoformat(), now.isoformat()),
-                )
-
-                reset_count = cursor.rowcount
-                conn.commit()
+            now = self.clock.now()
 
+            reset_count = await self.adb.write(self._write_reset_flags, now.isoformat())
             if reset_count > 0:
                 logger.info(f"已重置 {reset_count} 个未来事件的提醒标志")
 
         except Exception as e:
             logger.error(f"重置提醒标志失败: {e}", exc_info=True)
 
+    @staticmethod
+    def _write_reset_flags(conn, now: str):
+        # 重置所有未来事件的提醒标志
+        cursor = conn.execute(
+            """
+            UPDATE events
+            SET reminder_sent = 0, updated_at = ?
+            WHERE start_time > ? AND reminder_sent = 1
+        """,
+            (now, now),
+        )
+        # 有事件重新等待提醒时通知整体重载
+        return cursor.rowcount, None if cursor.rowcount > 0 else []
+
     async def _cleanup_expired_reminders(self):
         """
         清理过期事件的提醒标志（超过24小时的过期事件）
         """
         try:
-            now = datetime.now()
+            now = self.clock.now()
             cleanup_threshold = now - timedelta(hours=24)
 
-            with self.db._get_connection() as conn:
-                cursor = conn.execute(
-                    """
-                    UPDATE events
-                    SET reminder_sent = 1, updated_at = ?
-                    WHERE start_time < ? AND reminder_sent = 0
-                """,
-                    (now.isoformat(), cleanup_threshold.isoformat()),
-                )
-
-                cleanup_count = cursor.rowcount
-                conn.commit()
+            cleanup_count = await self.adb.write(
+                self._write_cleanup_flags,
+                now.isoformat(),
+                cleanup_threshold.isoformat(),
+            )
 
             if cleanup_count > 0:
                 logger.info(f"已清理 {cleanup_count} 个过期事件的提醒标志")
@@ -343,6 +708,19 @@ class CalendarReminderService:
         except Exception as e:
             logger.error(f"清理过期提醒标志失败: {e}", exc_info=True)
 
+    @staticmethod
+    def _write_cleanup_flags(conn, now: str, threshold: str):
+        cursor = conn.execute(
+            """
+            UPDATE events
+            SET reminder_sent = 1, updated_at = ?
+            WHERE start_time < ? AND reminder_sent = 0 AND rrule IS NULL
+        """,
+            (now, threshold),
+        )
+        # 过期事件早已不在调度范围内，无需通知
+        return cursor.rowcount, []
+
 
 # 全局提醒服务实例
 _reminder_service = None
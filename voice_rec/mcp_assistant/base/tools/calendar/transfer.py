@@ -0,0 +1,516 @@
+"""
+日程批量导入导出.
+
+支持 iCalendar (.ics) 与 JSON Lines (.jsonl，每行一个事件，字段同
+CalendarEvent.to_dict) 两种格式。导入时逐行解析文件，边解析边按块写入数据库，
+内存占用与文件大小无关；导入不做逐条冲突检查，可选在写入完成后统一检查并报告
+冲突。导出时从数据库分批读取并逐条写出，重复事件导出为带 RRULE 的一条。
+
+ICS 只读取 VEVENT 的常用属性：UID、SUMMARY、DTSTART、DTEND/DURATION、
+DESCRIPTION、CATEGORIES（取第一个）、RRULE 与 VALARM 的相对 TRIGGER。
+已取消（STATUS:CANCELLED）的事件与重复事件的单次修改（RECURRENCE-ID）被跳过，
+EXDATE 被忽略。
+
+命令行用法（在 mcp_assistant/base 目录下）:
+    python -m tools.calendar.transfer import calendar.ics [--check-conflicts]
+    python -m tools.calendar.transfer export backup.jsonl \
+        [--start 2026-01-01] [--end 2026-12-31]
+"""
+
+import json
+import re
+import uuid
+from datetime import date, datetime, timedelta, timezone
+from typing import IO, Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .utils import get_logger
+
+from .database import CalendarDatabase, get_calendar_database
+from .models import CalendarEvent
+from .recurrence import RecurrenceRule, parse_datetime
+
+logger = get_logger(__name__)
+
+FORMATS = ("ics", "jsonl")
+# 每个事务写入的事件数
+IMPORT_BATCH_SIZE = 5000
+# 导入报告中最多列出的跳过事件与冲突示例数
+REPORT_LIMIT = 20
+
+_DURATION_RE = re.compile(
+    r"^([+-])?P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$"
+)
+_ICS_FOLD_OCTETS = 75
+
+
+def detect_format(path: str, fmt: Optional[str] = None) -> str:
+    """
+    确定文件格式：优先使用指定的格式，否则按扩展名判断.
+    """
+    fmt = (fmt or str(path).rsplit(".", 1)[-1]).lower()
+    if fmt == "ical":
+        fmt = "ics"
+    if fmt not in FORMATS:
+        raise ValueError(f"不支持的文件格式: {fmt}（支持 {', '.join(FORMATS)}）")
+    return fmt
+
+
+# ==================== JSON Lines ====================
+
+
+def iter_jsonl(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """
+    逐行解析 JSON Lines，空行跳过；无法解析的行以 {"error": ...} 的形式给出.
+    """
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as e:
+            yield {"error": f"第 {number} 行不是有效的 JSON: {e}"}
+            continue
+        if not isinstance(data, dict):
+            yield {"error": f"第 {number} 行不是 JSON 对象"}
+            continue
+        yield data
+
+
+def write_jsonl(events: Iterable[Dict[str, Any]], fp: IO[str]) -> int:
+    """
+    逐条写出事件，返回写出的数量.
+    """
+    count = 0
+    for event in events:
+        event = CalendarEvent.from_dict(event).to_dict()
+        event["reminder_sent"] = bool(event["reminder_sent"])
+        fp.write(json.dumps(event, ensure_ascii=False))
+        fp.write("\n")
+        count += 1
+    return count
+
+
+# ==================== iCalendar ====================
+
+
+def _unfold(lines: Iterable[str]) -> Iterator[str]:
+    """
+    合并折行（以空格或制表符开头的行是上一行的延续）.
+    """
+    current = None
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t"):
+            if current is not None:
+                current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current:
+        yield current
+
+
+def _split_content_line(line: str) -> Tuple[str, Dict[str, str], str]:
+    """
+    拆分内容行为 (属性名, 参数, 值)，参数值中引号内的冒号、分号不作分隔.
+    """
+    if '"' not in line:
+        head, sep, value = line.partition(":")
+        if not sep:
+            raise ValueError(f"无效的内容行: {line[:40]}")
+        if ";" not in head:
+            return head.upper(), {}, value
+    else:
+        in_quotes = False
+        for index, char in enumerate(line):
+            if char == '"':
+                in_quotes = not in_quotes
+            elif char == ":" and not in_quotes:
+                head, value = line[:index], line[index + 1 :]
+                break
+        else:
+            raise ValueError(f"无效的内容行: {line[:40]}")
+
+    name, *raw_params = re.split(r';(?=(?:[^"]*"[^"]*")*[^"]*$)', head)
+    params = {}
+    for param in raw_params:
+        key, _, param_value = param.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def _unescape_text(value: str) -> str:
+    if "\\" not in value:
+        return value
+    return re.sub(
+        r"\\([\\;,nN])",
+        lambda m: "\n" if m.group(1) in "nN" else m.group(1),
+        value,
+    )
+
+
+def _escape_text(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _parse_ics_time(value: str, params: Dict[str, str]) -> Tuple[datetime, bool]:
+    """解析 DTSTART/DTEND，返回 (本地时间, 是否为全天日期).
+
+    UTC（Z 后缀）与带 TZID 的时间转换为本地时间；浮动时间按本地时间处理。
+    """
+    value = value.strip()
+    if len(value) < 15 or value[8] != "T" or not value[:8].isdigit():
+        if params.get("VALUE", "").upper() == "DATE" or len(value) == 8:
+            return datetime.strptime(value[:8], "%Y%m%d"), True
+        raise ValueError(f"无效的时间: {value}")
+
+    # 逐段取数比 strptime 快得多，导入大文件时这里是热点
+    moment = datetime(
+        int(value[:4]),
+        int(value[4:6]),
+        int(value[6:8]),
+        int(value[9:11]),
+        int(value[11:13]),
+        int(value[13:15]),
+    )
+    if value.endswith("Z"):
+        moment = moment.replace(tzinfo=timezone.utc)
+    elif "TZID" in params:
+        try:
+            from zoneinfo import ZoneInfo
+
+            moment = moment.replace(tzinfo=ZoneInfo(params["TZID"]))
+        except Exception:
+            logger.debug(f"未知时区 {params['TZID']}，按本地时间处理")
+    if moment.tzinfo is not None:
+        moment = moment.astimezone().replace(tzinfo=None)
+    return moment, False
+
+
+def _parse_duration(value: str) -> timedelta:
+    match = _DURATION_RE.match(value.strip())
+    if not match:
+        raise ValueError(f"无效的时长: {value}")
+    sign, weeks, days, hours, minutes, seconds = match.groups()
+    duration = timedelta(
+        weeks=int(weeks or 0),
+        days=int(days or 0),
+        hours=int(hours or 0),
+        minutes=int(minutes or 0),
+        seconds=int(seconds or 0),
+    )
+    return -duration if sign == "-" else duration
+
+
+def _format_duration(minutes: int) -> str:
+    days, rest = divmod(minutes, 24 * 60)
+    hours, minutes = divmod(rest, 60)
+    text = f"{days}D" if days else ""
+    if hours or minutes or not days:
+        text += "T" + (f"{hours}H" if hours else "")
+        text += f"{minutes}M" if minutes or not hours else ""
+    return "P" + text
+
+
+def _vevent_to_event(props: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    把一个 VEVENT 的属性转换为事件字段，不支持的事件抛出 ValueError.
+    """
+    if "DTSTART" not in props:
+        raise ValueError("缺少 DTSTART")
+    start, all_day = _parse_ics_time(*props["DTSTART"])
+    if "DTEND" in props:
+        end = _parse_ics_time(*props["DTEND"])[0]
+    elif "DURATION" in props:
+        end = start + _parse_duration(props["DURATION"][0])
+    else:
+        # RFC 5545：没有结束时间的全天事件持续一天，其余为零时长
+        end = start + timedelta(days=1) if all_day else start
+
+    rrule = props.get("RRULE", ("",))[0] or None
+    if rrule is not None:
+        rrule = str(RecurrenceRule.parse(rrule))
+
+    categories = props.get("CATEGORIES", ("",))[0]
+    category = _unescape_text(re.split(r"(?<!\\),", categories)[0]).strip()
+    return {
+        "id": props.get("UID", ("",))[0] or str(uuid.uuid4()),
+        "title": _unescape_text(props.get("SUMMARY", ("",))[0]) or "未命名事件",
+        "start_time": start.isoformat(),
+        "end_time": end.isoformat(),
+        "description": _unescape_text(props.get("DESCRIPTION", ("",))[0]),
+        "category": category or "默认",
+        "reminder_minutes": props.get("reminder_minutes", 15),
+        "rrule": rrule,
+    }
+
+
+def iter_ics(lines: Iterable[str]) -> Iterator[Dict[str, Any]]:
+    """逐个解析 VEVENT，产出事件字段（未补全提醒时间等，见 _valid_events）.
+
+    无法转换的事件以 {"id": UID, "error": ...} 的形式给出，不中断解析。
+    """
+    props: Optional[Dict[str, Any]] = None
+    in_alarm = False
+    for line in _unfold(lines):
+        if not line.strip():
+            continue
+        try:
+            name, params, value = _split_content_line(line)
+        except ValueError as e:
+            if props is not None:
+                props.setdefault("_error", str(e))
+            continue
+
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            props = {}
+        elif props is None:
+            continue
+        elif name == "BEGIN" and value.upper() == "VALARM":
+            in_alarm = True
+        elif name == "END" and value.upper() == "VALARM":
+            in_alarm = False
+        elif in_alarm:
+            # 只取相对开始时间的提前提醒，如 TRIGGER:-PT15M
+            related = params.get("RELATED", "START").upper()
+            if name == "TRIGGER" and related == "START" and "VALUE" not in params:
+                try:
+                    offset = -_parse_duration(value)
+                except ValueError:
+                    continue
+                if offset >= timedelta(0) and "reminder_minutes" not in props:
+                    props["reminder_minutes"] = int(offset.total_seconds() // 60)
+        elif name == "END" and value.upper() == "VEVENT":
+            yield _finish_vevent(props)
+            props = None
+        elif name not in props:
+            props[name] = (value, params)
+
+
+def _finish_vevent(props: Dict[str, Any]) -> Dict[str, Any]:
+    uid = props.get("UID", ("",))[0]
+    if "_error" in props:
+        return {"id": uid, "error": props["_error"]}
+    if props.get("STATUS", ("",))[0].upper() == "CANCELLED":
+        return {"id": uid, "error": "事件已取消"}
+    if "RECURRENCE-ID" in props:
+        return {"id": uid, "error": "不支持重复事件的单次修改"}
+    try:
+        return _vevent_to_event(props)
+    except ValueError as e:
+        return {"id": uid, "error": str(e)}
+
+
+def _fold(line: str) -> str:
+    """
+    按 RFC 5545 折行：每行不超过 75 个字节，不拆分多字节字符.
+    """
+    if len(line.encode("utf-8")) <= _ICS_FOLD_OCTETS:
+        return line + "\r\n"
+    parts = []
+    current, size = "", 0
+    limit = _ICS_FOLD_OCTETS
+    for char in line:
+        width = len(char.encode("utf-8"))
+        if size + width > limit:
+            parts.append(current)
+            current, size = "", 0
+            limit = _ICS_FOLD_OCTETS - 1  # 续行开头的空格占一个字节
+        current += char
+        size += width
+    parts.append(current)
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _ics_time(value: str) -> str:
+    return parse_datetime(value).strftime("%Y%m%dT%H%M%S")
+
+
+def _vevent_lines(event: Dict[str, Any], stamp: str) -> List[str]:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{event['id']}",
+        f"DTSTAMP:{stamp}",
+        f"DTSTART:{_ics_time(event['start_time'])}",
+        f"DTEND:{_ics_time(event['end_time'])}",
+        f"SUMMARY:{_escape_text(event['title'])}",
+    ]
+    if event.get("description"):
+        lines.append(f"DESCRIPTION:{_escape_text(event['description'])}")
+    if event.get("category"):
+        lines.append(f"CATEGORIES:{_escape_text(event['category'])}")
+    if event.get("rrule"):
+        lines.append(f"RRULE:{event['rrule']}")
+    reminder_minutes = event.get("reminder_minutes")
+    if reminder_minutes is not None and reminder_minutes >= 0:
+        lines.extend(
+            [
+                "BEGIN:VALARM",
+                "ACTION:DISPLAY",
+                f"DESCRIPTION:{_escape_text(event['title'])}",
+                f"TRIGGER:-{_format_duration(int(reminder_minutes))}",
+                "END:VALARM",
+            ]
+        )
+    lines.append("END:VEVENT")
+    return lines
+
+
+def write_ics(events: Iterable[Dict[str, Any]], fp: IO[str]) -> int:
+    """
+    逐条写出 VCALENDAR，时间以本地浮动时间表示，返回写出的事件数.
+    """
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    fp.write("BEGIN:VCALENDAR\r\nVERSION:2.0\r\n")
+    fp.write("PRODID:-//py-xiaozhi//Calendar//ZH\r\nCALSCALE:GREGORIAN\r\n")
+    count = 0
+    for event in events:
+        fp.write("".join(_fold(line) for line in _vevent_lines(event, stamp)))
+        count += 1
+    fp.write("END:VCALENDAR\r\n")
+    return count
+
+
+# ==================== 导入导出 ====================
+
+
+def _valid_events(
+    records: Iterable[Dict[str, Any]], skipped: List[Dict[str, str]]
+) -> Iterator[Dict[str, Any]]:
+    """
+    规范化解析出的事件（补全提醒时间等字段），无效的记入 skipped.
+    """
+    for record in records:
+        if "error" in record:
+            skipped.append({"id": record.get("id", ""), "error": record["error"]})
+            continue
+        record.setdefault("id", str(uuid.uuid4()))
+        try:
+            parse_datetime(record["start_time"])
+            parse_datetime(record["end_time"])
+            yield CalendarEvent.from_dict(record).to_dict()
+        except KeyError as e:
+            skipped.append({"id": record.get("id", ""), "error": f"缺少字段 {e}"})
+        except (TypeError, ValueError) as e:
+            skipped.append({"id": record.get("id", ""), "error": str(e)})
+
+
+def import_file(
+    path: str,
+    fmt: Optional[str] = None,
+    check_conflicts: bool = False,
+    db: Optional[CalendarDatabase] = None,
+    batch_size: int = IMPORT_BATCH_SIZE,
+) -> Dict[str, Any]:
+    """从 ICS 或 JSONL 文件批量导入事件，ID 相同的已有事件被覆盖.
+
+    check_conflicts 为 True 时在全部写入后检查导入时间范围内相互重叠的单次事件，
+    只报告不回滚。
+    """
+    fmt = detect_format(path, fmt)
+    db = db or get_calendar_database()
+    skipped: List[Dict[str, str]] = []
+    parse = iter_ics if fmt == "ics" else iter_jsonl
+    with open(path, "r", encoding="utf-8-sig", newline="") as fp:
+        result = db.import_events(_valid_events(parse(fp), skipped), batch_size)
+    skipped.extend(result["skipped"])
+
+    report = {
+        "success": True,
+        "format": fmt,
+        "imported": result["imported"],
+        "skipped": len(skipped),
+        "skipped_events": skipped[:REPORT_LIMIT],
+    }
+    if check_conflicts and result["start_time"] is not None:
+        conflicts = db.find_conflicts(
+            result["start_time"], result["end_time"], REPORT_LIMIT
+        )
+        report["conflicts"] = conflicts["count"]
+        report["conflict_examples"] = conflicts["examples"]
+    report["message"] = f"导入 {report['imported']} 个事件，跳过 {report['skipped']} 个"
+    if report.get("conflicts"):
+        report["message"] += f"，发现 {report['conflicts']} 处时间冲突"
+    return report
+
+
+def export_file(
+    path: str,
+    fmt: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    db: Optional[CalendarDatabase] = None,
+) -> Dict[str, Any]:
+    """
+    把事件导出为 ICS 或 JSONL 文件（可按开始时间范围筛选）.
+    """
+    fmt = detect_format(path, fmt)
+    db = db or get_calendar_database()
+    write = write_ics if fmt == "ics" else write_jsonl
+    with open(path, "w", encoding="utf-8", newline="") as fp:
+        count = write(db.iter_events(start_date, end_date), fp)
+    return {
+        "success": True,
+        "format": fmt,
+        "exported": count,
+        "path": str(path),
+        "message": f"导出 {count} 个事件到 {path}",
+    }
+
+
+def _date_bound(value: Optional[str], end: bool) -> Optional[str]:
+    # 命令行允许只写日期，结束日期包含当天
+    if value and len(value) == 10:
+        moment = datetime.combine(date.fromisoformat(value), datetime.min.time())
+        if end:
+            moment += timedelta(days=1, microseconds=-1)
+        return moment.isoformat()
+    return value
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="日程批量导入导出")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    import_parser = commands.add_parser("import", help="从 ICS/JSONL 文件导入")
+    import_parser.add_argument("path")
+    import_parser.add_argument("--format", choices=FORMATS)
+    import_parser.add_argument("--check-conflicts", action="store_true")
+    import_parser.add_argument("--db", help="数据库文件（默认使用用户数据目录）")
+
+    export_parser = commands.add_parser("export", help="导出为 ICS/JSONL 文件")
+    export_parser.add_argument("path")
+    export_parser.add_argument("--format", choices=FORMATS)
+    export_parser.add_argument("--start", help="开始日期，如 2026-01-01")
+    export_parser.add_argument("--end", help="结束日期（包含当天）")
+    export_parser.add_argument("--db", help="数据库文件（默认使用用户数据目录）")
+
+    args = parser.parse_args()
+    db = CalendarDatabase(args.db) if args.db else None
+    if args.command == "import":
+        result = import_file(
+            args.path, args.format, check_conflicts=args.check_conflicts, db=db
+        )
+    else:
+        result = export_file(
+            args.path,
+            args.format,
+            _date_bound(args.start, end=False),
+            _date_bound(args.end, end=True),
+            db=db,
+        )
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
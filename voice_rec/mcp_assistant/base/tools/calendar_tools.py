@@ -6,13 +6,18 @@ from .calendar.tools import (
     delete_event as _delete_event,
     delete_events_batch as _delete_events_batch,
     get_categories as _get_categories,
-    get_upcoming_events as _get_upcoming_events
+    get_upcoming_events as _get_upcoming_events,
+    search_events as _search_events,
+    import_events as _import_events,
+    export_events as _export_events,
+    get_cache_stats as _get_cache_stats
 )
 
-async def create_event(title: str, start_time: str, end_time: Optional[str] = None, description: str = "", category: str = "默认", reminder_minutes: int = 15) -> str:
+async def create_event(title: str, start_time: str, end_time: Optional[str] = None, description: str = "", category: str = "默认", reminder_minutes: int = 15, rrule: Optional[str] = None) -> str:
     """
     Create a calendar event.
     start_time and end_time should be in ISO format (e.g. '2023-10-27T10:00:00').
+    rrule makes it a repeating event stored once, e.g. 'FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR'.
     """
     return await _create_event({
         "title": title,
@@ -20,7 +25,8 @@ async def create_event(title: str, start_time: str, end_time: Optional[str] = No
         "end_time": end_time,
         "description": description,
         "category": category,
-        "reminder_minutes": reminder_minutes
+        "reminder_minutes": reminder_minutes,
+        "rrule": rrule
     })
 
 async def get_events_by_date(date_type: str = "today", category: Optional[str] = None, start_date: Optional[str] = None, end_date: Optional[str] = None) -> str:
@@ -35,9 +41,9 @@ async def get_events_by_date(date_type: str = "today", category: Optional[str] =
         "end_date": end_date
     })
 
-async def update_event(event_id: int, title: Optional[str] = None, start_time: Optional[str] = None, end_time: Optional[str] = None, description: Optional[str] = None, category: Optional[str] = None, reminder_minutes: Optional[int] = None) -> str:
+async def update_event(event_id: int, title: Optional[str] = None, start_time: Optional[str] = None, end_time: Optional[str] = None, description: Optional[str] = None, category: Optional[str] = None, reminder_minutes: Optional[int] = None, rrule: Optional[str] = None) -> str:
     """
-    Update an existing event.
+    Update an existing event. Changes to a repeating event apply to the whole series.
     """
     args = {"event_id": event_id}
     if title: args["title"] = title
@@ -46,6 +52,7 @@ async def update_event(event_id: int, title: Optional[str] = None, start_time: O
     if description: args["description"] = description
     if category: args["category"] = category
     if reminder_minutes is not None: args["reminder_minutes"] = reminder_minutes
+    if rrule: args["rrule"] = rrule
     return await _update_event(args)
 
 async def delete_event(event_id: int) -> str:
@@ -77,3 +84,44 @@ async def get_upcoming_events(hours: int = 24) -> str:
     Get upcoming events within the specified hours (default 24).
     """
     return await _get_upcoming_events({"hours": hours})
+
+async def search_events(query: str, start_date: Optional[str] = None, end_date: Optional[str] = None, category: Optional[str] = None, limit: int = 10) -> str:
+    """
+    Search events by keyword in title, description and category, ranked by relevance.
+    Space-separated keywords must all match; results include a snippet with matches marked by 【】.
+    """
+    return await _search_events({
+        "query": query,
+        "start_date": start_date,
+        "end_date": end_date,
+        "category": category,
+        "limit": limit
+    })
+
+async def import_events(path: str, format: Optional[str] = None, check_conflicts: bool = False) -> str:
+    """
+    Bulk import events from an iCalendar (.ics) or JSON Lines (.jsonl) file.
+    Events with an existing ID are overwritten; with check_conflicts overlapping events are reported after the import.
+    """
+    return await _import_events({
+        "path": path,
+        "format": format,
+        "check_conflicts": check_conflicts
+    })
+
+async def export_events(path: str, format: Optional[str] = None, start_date: Optional[str] = None, end_date: Optional[str] = None) -> str:
+    """
+    Export events to an iCalendar (.ics) or JSON Lines (.jsonl) file, optionally limited to a start_date/end_date range.
+    """
+    return await _export_events({
+        "path": path,
+        "format": format,
+        "start_date": start_date,
+        "end_date": end_date
+    })
+
+async def get_cache_stats(clear: bool = False) -> str:
+    """
+    Show hit statistics of the calendar query cache; optionally clear it.
+    """
+    return await _get_cache_stats({"clear": clear})